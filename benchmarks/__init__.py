@@ -0,0 +1,11 @@
+# benchmarks/__init__.py
+"""
+GENESIS-1 Benchmark Suite:
+Reproducible, seeded benchmarks for every pipeline stage.
+
+Run all benchmarks and write a JSON report:
+    python -m benchmarks.run --size small --out bench_results.json
+
+Compare a run against a stored baseline (exit code 1 on regression):
+    python -m benchmarks.compare benchmarks/baseline.json bench_results.json --threshold 0.15
+"""
@@ -0,0 +1,52 @@
+# benchmarks/bench_actions.py
+"""
+Action Benchmarks:
+Executing and logging a batch of decisions. The baseline runs them one by one and rewrites the
+whole JSON action log after each; the executor runs the batch concurrently and appends the log
+once per batch. Results carry actions/s and the executor's queueing latency.
+"""
+
+import asyncio
+import json
+import os
+
+from benchmarks.harness import benchmark, measure
+
+_DECISIONS = ("Positive inference: proceed.", "Negative inference: hold back.")
+
+
+def _decisions(ctx):
+    return [_DECISIONS[i % 2] for i in range(ctx.size["memory_writes"])]
+
+
+@benchmark("actions.sequential_rewrite_baseline")
+def bench_sequential(ctx):
+    from modules.action import execute_action
+
+    decisions = _decisions(ctx)
+    path = ctx.path("baseline_actions.json")
+
+    def run():
+        for decision in decisions:
+            outcome = execute_action(decision)
+            log = []
+            if os.path.exists(path):
+                with open(path, "r", encoding="utf-8") as f:
+                    log = json.load(f)
+            log.append({"reasoning_output": decision, "result": outcome})
+            with open(path, "w", encoding="utf-8") as f:
+                json.dump(log, f, indent=4)
+    return measure(run, repeat=ctx.repeat, items=len(decisions))
+
+
+@benchmark("actions.executor_batch")
+def bench_executor(ctx):
+    from modules.action_executor import ActionRegistry, ActionExecutor, ActionLog
+
+    decisions = _decisions(ctx)
+    path = ctx.path("executor_actions.json")
+    executor = ActionExecutor(ActionRegistry.from_log(path), ActionLog(path))
+    result = measure(lambda: asyncio.run(executor.execute_many(decisions)), repeat=ctx.repeat, items=len(decisions))
+    stats = executor.stats()
+    result.update({"queue_ms_p50": stats["queue_ms_p50"], "queue_ms_p95": stats["queue_ms_p95"]})
+    return result
@@ -0,0 +1,175 @@
+# benchmarks/bench_cold_start.py
+"""
+Cold Start Benchmarks:
+Time from process start to the first embedding, and the memory of that process, when the text
+and vision encoders load from their original checkpoints versus from model_snapshot snapshots.
+Every run is a fresh Python process. Both variants load the same randomly initialized encoders
+(a DistilBERT-shaped text model saved with save_pretrained(), a truncated ResNet18 saved as a
+torchvision state dict), so no download is needed.
+
+Memory comes from /proc (Linux): rss_mb is the resident set, anon_mb its private part,
+file_mb the part backed by shared page-cache pages (memory-mapped weights), and pss_mb the
+proportional share that would be charged to each of several processes mapping the same files.
+
+    python -m benchmarks.bench_cold_start --layers 6
+"""
+
+import argparse
+import atexit
+import functools
+import json
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+from benchmarks.data import VOCABULARY, tiny_text_model
+from benchmarks.harness import benchmark, BenchmarkSkipped
+
+_TEXT_NAME = "bench/distilbert"
+
+
+def prepare(workdir, layers=2):
+    """
+    Writes the checkpoint and the snapshot of each encoder under `workdir`.
+
+    Returns:
+        dict: Paths used by the child processes.
+    """
+    import torch
+    from torchvision import models
+    from modules.model_snapshot import save_text_snapshot, save_vision_snapshot
+
+    paths = {"text_checkpoint": os.path.join(workdir, "text_checkpoint"),
+             "vision_checkpoint": os.path.join(workdir, "resnet18.pth"),
+             "snapshots": os.path.join(workdir, "snapshots")}
+    # a tokenizer over a small vocabulary, with DistilBERT's default dimensions otherwise
+    tokenizer, model = tiny_text_model(workdir, words=VOCABULARY[:21], vocab_size=30522, hidden_dim=3072,
+                                       n_layers=layers, n_heads=12)
+    tokenizer.save_pretrained(paths["text_checkpoint"])
+    model.save_pretrained(paths["text_checkpoint"])
+    save_text_snapshot(tokenizer, model, _TEXT_NAME, root=paths["snapshots"])
+
+    # the torchvision checkpoint holds the full network, classification layer included
+    resnet = models.resnet18().eval()
+    torch.save(resnet.state_dict(), paths["vision_checkpoint"])
+    save_vision_snapshot(torch.nn.Sequential(*list(resnet.children())[:-1]), root=paths["snapshots"])
+    return paths
+
+
+@functools.lru_cache(maxsize=None)
+def _prepared(layers):
+    # Shared by the four benchmarks of one run; removed when the process exits.
+    workdir = tempfile.mkdtemp(prefix="genesis_cold_start_")
+    atexit.register(shutil.rmtree, workdir, True)
+    return prepare(workdir, layers)
+
+
+def _memory():
+    # Resident memory of this process in MB, split by /proc into private and file-backed pages.
+    memory = {}
+    try:
+        with open("/proc/self/status", encoding="utf-8") as f:
+            fields = dict(line.split(":", 1) for line in f if ":" in line)
+        for key, name in (("VmRSS", "rss_mb"), ("RssAnon", "anon_mb"), ("RssFile", "file_mb")):
+            memory[name] = int(fields[key].split()[0]) / 1024
+        with open("/proc/self/smaps_rollup", encoding="utf-8") as f:
+            fields = dict(line.split(":", 1) for line in f if ":" in line)
+        memory["pss_mb"] = int(fields["Pss"].split()[0]) / 1024
+    except (OSError, KeyError):
+        import resource
+        memory["rss_mb"] = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    return memory
+
+
+def _child(kind, variant, paths_json):
+    # Runs in a fresh interpreter: load one encoder, embed one input, report timings and memory.
+    start = time.perf_counter()
+    paths = json.loads(paths_json)
+    import torch
+    import torch.nn as nn
+    from torchvision import models
+    from modules import model_snapshot
+    from modules.understanding import load_model, get_embeddings_batch
+    from modules.multi_modal import load_vision_model
+    if kind == "text":
+        from transformers import DistilBertModel  # noqa: F401  (imported lazily by both loaders)
+    model_snapshot.SNAPSHOT_DIR = paths["snapshots"]
+    imported = time.perf_counter()
+    if kind == "text":
+        if variant == "snapshot":
+            tokenizer, model = load_model(_TEXT_NAME)
+        else:
+            tokenizer, model = load_model(paths["text_checkpoint"], use_snapshot=False)
+        loaded = time.perf_counter()
+        get_embeddings_batch(["agent memory reasoning graph"], tokenizer, model)
+    else:
+        if variant == "snapshot":
+            model, _ = load_vision_model()
+        else:
+            # what load_vision_model() does with a cached torchvision checkpoint
+            full = models.resnet18()
+            full.load_state_dict(torch.load(paths["vision_checkpoint"]))
+            model = nn.Sequential(*list(full.children())[:-1]).eval()
+        loaded = time.perf_counter()
+        with torch.no_grad():
+            model(torch.zeros(1, 3, 224, 224))
+    done = time.perf_counter()
+    print(json.dumps({"import_s": imported - start, "load_s": loaded - imported,
+                      "first_embedding_s": done - start, **_memory()}))
+
+
+def cold_start(paths, kind, variant, runs=3):
+    """
+    Starts `runs` fresh processes that load one encoder and embed one input.
+
+    Returns:
+        dict: Medians of the wall time to the first embedding (interpreter start and imports
+              included) and of the model load time alone, plus the memory figures of the last run.
+    """
+    samples = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        output = subprocess.run([sys.executable, "-c",
+                                 "import sys; from benchmarks.bench_cold_start import _child; _child(*sys.argv[1:])",
+                                 kind, variant, json.dumps(paths)],
+                                check=True, capture_output=True, text=True).stdout
+        report = json.loads(output.strip().splitlines()[-1])
+        report["wall_s"] = time.perf_counter() - start
+        samples.append(report)
+    result = {"median_s": statistics.median(s["wall_s"] for s in samples),
+              "load_s": statistics.median(s["load_s"] for s in samples), "repeat": runs}
+    result.update({k: round(v, 1) for k, v in samples[-1].items() if k.endswith("_mb")})
+    return result
+
+
+def _register(kind, variant):
+    @benchmark(f"cold_start.{kind}.{variant}", group="end_to_end")
+    def bench(ctx):
+        try:
+            paths = _prepared(ctx.size["encoder_layers"])
+        except ImportError as e:
+            raise BenchmarkSkipped(f"model libraries unavailable: {e}")
+        return cold_start(paths, kind, variant, runs=min(ctx.repeat, 3))
+    return bench
+
+
+bench_text_checkpoint = _register("text", "checkpoint")
+bench_text_snapshot = _register("text", "snapshot")
+bench_vision_checkpoint = _register("vision", "checkpoint")
+bench_vision_snapshot = _register("vision", "snapshot")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare encoder cold starts from checkpoints and snapshots.")
+    parser.add_argument("--layers", type=int, default=6, help="Transformer layers of the text model (6 = DistilBERT).")
+    parser.add_argument("--runs", type=int, default=3)
+    args = parser.parse_args()
+    with tempfile.TemporaryDirectory() as workdir:
+        paths = prepare(workdir, args.layers)
+        report = {f"{kind}.{variant}": cold_start(paths, kind, variant, args.runs)
+                  for kind in ("text", "vision") for variant in ("checkpoint", "snapshot")}
+    print(json.dumps(report, indent=2))
@@ -0,0 +1,63 @@
+# benchmarks/bench_concept_retrieval.py
+"""
+Concept Retrieval Benchmarks:
+Nearest-concept search and weighted multi-hop expansion on random weighted graphs of
+ctx.size["kg_nodes"] nodes (10^5 at --size large) with 768-d label embeddings.
+"""
+
+from functools import lru_cache
+
+import numpy as np
+
+from benchmarks.harness import benchmark, measure
+
+QUERIES = 256
+
+
+@lru_cache(maxsize=None)
+def _graph(n, seed):
+    import networkx as nx
+
+    graph = nx.gnm_random_graph(n, n * 4, seed=seed)
+    rng = np.random.default_rng(seed)
+    for (u, v), weight in zip(graph.edges, rng.uniform(0.1, 1.0, graph.number_of_edges())):
+        graph[u][v]["weight"] = float(weight)
+    return graph, rng.standard_normal((n, 768)).astype(np.float32)
+
+
+def _index(ctx, **kwargs):
+    from modules.concept_retrieval import ConceptIndex
+
+    graph, embeddings = _graph(ctx.size["kg_nodes"], ctx.seed)
+    return ConceptIndex(graph, embeddings=embeddings, **kwargs)
+
+
+@benchmark("concept_retrieval.build_index")
+def bench_build(ctx):
+    _index(ctx)  # builds the cached graph outside the timing
+    return measure(lambda: _index(ctx), repeat=ctx.repeat, items=ctx.size["kg_nodes"])
+
+
+@benchmark("concept_retrieval.nearest")
+def bench_nearest(ctx):
+    index = _index(ctx)
+    queries = np.random.default_rng(ctx.seed).standard_normal((QUERIES, 768)).astype(np.float32)
+    return measure(lambda: index.nearest(queries, k=5), repeat=ctx.repeat, items=QUERIES)
+
+
+@benchmark("concept_retrieval.expand.uncached")
+def bench_expand(ctx):
+    index = _index(ctx, cache_size=0)
+    rng = np.random.default_rng(ctx.seed)
+    seed_sets = [rng.choice(ctx.size["kg_nodes"], size=5, replace=False).tolist() for _ in range(QUERIES)]
+    return measure(lambda: [index.expand(seeds, hops=2) for seeds in seed_sets], repeat=ctx.repeat, items=QUERIES)
+
+
+@benchmark("concept_retrieval.retrieve_batch.cached")
+def bench_retrieve_cached(ctx):
+    # Repeated inputs (as in a corpus with recurring topics) are served from the expansion LRU.
+    index = _index(ctx)
+    queries = np.random.default_rng(ctx.seed).standard_normal((16, 768)).astype(np.float32)
+    queries = np.tile(queries, (QUERIES // 16, 1))
+    index.retrieve_batch(queries)
+    return measure(lambda: index.retrieve_batch(queries), repeat=ctx.repeat, items=QUERIES)
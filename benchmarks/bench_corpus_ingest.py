@@ -0,0 +1,81 @@
+# benchmarks/bench_corpus_ingest.py
+"""
+Corpus Ingestion Benchmarks:
+Reading a directory tree of many small text files and one of a few large files. The baseline is
+a sequential ingest_local_file() loop; ingest_corpus() reads on a thread pool and memory-maps the
+large files. A second pass with a manifest measures the cost of skipping an unchanged corpus.
+Results carry MB/s (files are in the page cache after the first repeat, so this is the decode
+and hashing ceiling rather than raw disk throughput).
+"""
+
+import os
+
+from benchmarks.harness import benchmark, measure
+from benchmarks.data import generate_texts, write_text_files
+
+_LARGE_FILES = 4
+
+
+def _small_corpus(ctx):
+    directory = ctx.path("small_files")
+    paths = write_text_files(directory, 16 * ctx.size["texts"], ctx.size["words"], ctx.seed)
+    return directory, paths
+
+
+def _large_corpus(ctx):
+    directory = ctx.path("large_files")
+    os.makedirs(directory, exist_ok=True)
+    chunk = "\n".join(generate_texts(ctx.size["texts"], ctx.size["words"], ctx.seed))
+    paths = []
+    for i in range(_LARGE_FILES):
+        path = os.path.join(directory, f"large_{i}.txt")
+        with open(path, "w", encoding="utf-8") as f:
+            for _ in range(64):
+                f.write(chunk)
+        paths.append(path)
+    return directory, paths
+
+
+def _with_throughput(result, paths):
+    megabytes = sum(os.path.getsize(p) for p in paths) / (1 << 20)
+    result["megabytes"] = round(megabytes, 2)
+    result["mb_per_s"] = round(megabytes / result["mean_s"], 1)
+    return result
+
+
+def _baseline(corpus):
+    @benchmark(f"corpus.{corpus.__name__.strip('_')}.sequential_baseline")
+    def bench(ctx):
+        from modules.perception import ingest_local_file
+
+        _, paths = corpus(ctx)
+        result = measure(lambda: [ingest_local_file(p) for p in paths], repeat=ctx.repeat, items=len(paths))
+        return _with_throughput(result, paths)
+    return bench
+
+
+def _parallel(corpus):
+    @benchmark(f"corpus.{corpus.__name__.strip('_')}.ingest_corpus")
+    def bench(ctx):
+        from modules.perception import ingest_corpus
+
+        directory, paths = corpus(ctx)
+        result = measure(lambda: list(ingest_corpus(directory)), repeat=ctx.repeat, items=len(paths))
+        return _with_throughput(result, paths)
+    return bench
+
+
+bench_small_baseline = _baseline(_small_corpus)
+bench_small_parallel = _parallel(_small_corpus)
+bench_large_baseline = _baseline(_large_corpus)
+bench_large_parallel = _parallel(_large_corpus)
+
+
+@benchmark("corpus.small_corpus.unchanged_rescan")
+def bench_unchanged(ctx):
+    from modules.perception import ingest_corpus
+
+    directory, paths = _small_corpus(ctx)
+    manifest = ctx.path("manifest.json")
+    list(ingest_corpus(directory, manifest_path=manifest))
+    return measure(lambda: list(ingest_corpus(directory, manifest_path=manifest)), repeat=ctx.repeat, items=len(paths))
@@ -0,0 +1,43 @@
+# benchmarks/bench_dedup.py
+"""
+Near-Duplicate Benchmarks:
+Signature computation and LSH lookups for a stream where every other input is a lightly edited
+copy of an earlier one. The result carries the index's hit rate (inputs whose embedding and
+reasoning would be skipped) and its false-positive rate on labeled pairs.
+"""
+
+from benchmarks.harness import benchmark, measure
+from benchmarks.data import generate_texts
+
+
+def _stream(ctx):
+    originals = generate_texts(ctx.size["texts"], ctx.size["words"], ctx.seed)
+    copies = [text.replace(".", "!", 1).upper() for text in originals]
+    return originals, [text for pair in zip(originals, copies) for text in pair]
+
+
+@benchmark("dedup.signature_lookup")
+def bench_signature_lookup(ctx):
+    from modules.dedup import DedupIndex
+    from modules.perception import preprocess_text
+
+    originals, stream = _stream(ctx)
+    runs = []
+
+    def setup():
+        runs.append(len(runs))
+        return DedupIndex(ctx.path(f"index_{runs[-1]}"))
+
+    def run(index):
+        for text in stream:
+            signature = index.signature(preprocess_text(text))
+            if index.lookup(signature) is None:
+                index.add(signature, [0.0] * index.dim, "decision")
+        index.save()
+    result = measure(run, repeat=ctx.repeat, items=len(stream), setup=setup)
+    index = DedupIndex(ctx.path("evaluation"))
+    run(index)
+    result["hit_rate"] = index.stats()["hit_rate"]
+    pairs = [(a, b, False) for a, b in zip(originals, originals[1:])]
+    result["false_positive_rate"] = index.evaluate(pairs)["false_positive_rate"]
+    return result
@@ -0,0 +1,50 @@
+# benchmarks/bench_embedding_batch.py
+"""
+Embedding Batch Benchmarks:
+Per-input summary statistics as the pipeline used to compute them (np.mean and np.std for the
+memory event, then a mean each in analyze_system and simple_reasoning) against one cached
+EmbeddingBatch pass, plus the .npy write through the buffer protocol.
+"""
+
+import numpy as np
+
+from benchmarks.harness import benchmark, measure
+
+
+def _matrix(ctx):
+    return np.random.default_rng(ctx.seed).standard_normal((ctx.size["texts"], 768)).astype(np.float32)
+
+
+@benchmark("embedding_batch.stats.per_stage_passes")
+def bench_per_stage(ctx):
+    matrix = _matrix(ctx)
+
+    def run():
+        for row in matrix:
+            float(np.mean(row)), float(np.std(row)), float(row.mean()), np.mean(row)
+    return measure(run, repeat=ctx.repeat, items=len(matrix))
+
+
+@benchmark("embedding_batch.stats.cached")
+def bench_cached(ctx):
+    from modules.embedding_batch import EmbeddingBatch
+
+    matrix = _matrix(ctx)
+
+    def run():
+        batch = EmbeddingBatch(matrix)
+        batch.stats()
+        for i in range(len(batch)):
+            row = batch[i]
+            row.summary(), row.mean(), row.mean()
+    return measure(run, repeat=ctx.repeat, items=len(matrix))
+
+
+@benchmark("embedding_batch.save")
+def bench_save(ctx):
+    from modules.embedding_batch import EmbeddingBatch
+
+    batch = EmbeddingBatch(_matrix(ctx))
+    result = measure(lambda: batch.save(ctx.path("batch.npy")), repeat=ctx.repeat, items=len(batch))
+    result["bytes"] = batch.nbytes
+    return result
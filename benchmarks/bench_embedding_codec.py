@@ -0,0 +1,74 @@
+# benchmarks/bench_embedding_codec.py
+"""
+Embedding Codec Benchmarks:
+PCA + product quantization of synthetic embeddings (benchmarks.data.generate_embeddings) for
+the two vector kinds worth archiving: the 128-d fused vectors stored in long-term memory and
+768-d text embeddings. Training streams the vectors in chunks; the scan benchmarks score 16
+queries against every stored vector, on uint8 codes (asymmetric distance computation) and on
+the float32 matrix. The code scans carry the compression ratio, reconstruction error, recall@10
+and the recall of the true top 10 within the top 100 by codes (the shortlist a float re-ranking
+step would start from).
+"""
+
+from benchmarks.harness import benchmark, measure
+from benchmarks.data import generate_embeddings
+
+# name -> (dim, num_subvectors, pca_dim, vectors per memory_events)
+VARIANTS = {"fused128": (128, 16, None, 10), "text768": (768, 32, 256, 2)}
+QUERIES = 16
+
+
+def _vectors(ctx, name):
+    dim, _, _, scale = VARIANTS[name]
+    return generate_embeddings(ctx.size["memory_events"] * scale + QUERIES, dim, seed=ctx.seed)
+
+
+def _chunks(vectors, size=8192):
+    return (vectors[start:start + size] for start in range(0, len(vectors), size))
+
+
+def _codec(name, vectors):
+    from modules.embedding_codec import PQCodec
+
+    dim, num_subvectors, pca_dim, _ = VARIANTS[name]
+    return PQCodec(dim, num_subvectors, pca_dim).fit(_chunks(vectors), sample_size=min(len(vectors), 32768), iters=10)
+
+
+def _register(name):
+    @benchmark(f"embedding_codec.{name}.train")
+    def bench_train(ctx):
+        vectors = _vectors(ctx, name)
+        return measure(lambda: _codec(name, vectors), repeat=min(ctx.repeat, 3), warmup=0, items=len(vectors))
+
+    @benchmark(f"embedding_codec.{name}.scan_pq")
+    def bench_scan_pq(ctx):
+        from modules.embedding_codec import evaluate_codec
+
+        vectors = _vectors(ctx, name)
+        queries, stored = vectors[:QUERIES], vectors[QUERIES:]
+        codec = _codec(name, stored)
+        codes = codec.encode(stored)
+        result = measure(lambda: codec.search(queries, codes, k=10), repeat=ctx.repeat, items=len(stored) * QUERIES)
+        quality = evaluate_codec(codec, stored, queries, repeat=1)
+        result.update({key: quality[key] for key in ("compression_ratio", "bytes_per_vector",
+                                                     "reconstruction_error", "recall_at_10", "recall_10_at_100")})
+        return result
+
+    @benchmark(f"embedding_codec.{name}.scan_float32")
+    def bench_scan_float32(ctx):
+        import numpy as np
+
+        vectors = _vectors(ctx, name)
+        queries, stored = vectors[:QUERIES], vectors[QUERIES:]
+
+        def scan():
+            scores = queries @ stored.T
+            return np.argpartition(-scores, 9, axis=1)[:, :10]
+        result = measure(scan, repeat=ctx.repeat, items=len(stored) * QUERIES)
+        result["bytes_per_vector"] = stored.shape[1] * 4
+        return result
+    return bench_train, bench_scan_pq, bench_scan_float32
+
+
+for _name in VARIANTS:
+    _register(_name)
@@ -0,0 +1,63 @@
+# benchmarks/bench_external_sync.py
+"""
+External Data Sync Benchmarks:
+Repeated headline fetches against the local Hacker News stub while the front page churns
+(NEW_PER_RUN new stories and EDITS_PER_RUN retitled stories between runs), tracking the top
+10 stories as the pipeline does:
+  - full:  fetch_hacker_news_headlines() refetches the top list and every item each run;
+  - delta: external_data.HeadlineSync fetches only new, changed or stale items and keeps the
+           rest in its local item store.
+Each result carries the item and HTTP requests per run and the new headlines per run (the text
+incremental training sees: everything for full, the delta for delta).
+"""
+
+from benchmarks.harness import benchmark, measure
+from benchmarks.hn_stub import serve_hn_stub
+
+RUNS = 10
+NEW_PER_RUN = 2
+EDITS_PER_RUN = 1
+
+
+def _churn(stub, run):
+    # New stories go to the top; edited stories are listed in /updates.json like the real API.
+    next_id = max(stub.items) + 1
+    for i in range(NEW_PER_RUN):
+        stub.add_item(next_id + i, f"Fresh headline {next_id + i}")
+    for item_id in stub.top_ids[NEW_PER_RUN:NEW_PER_RUN + EDITS_PER_RUN]:
+        stub.update_item(item_id, f"{stub.items[item_id]['title']} (edit {run})")
+
+
+def _register(mode):
+    @benchmark(f"external_data.sync.{mode}")
+    def bench(ctx):
+        from modules.external_data import HeadlineSync, fetch_hacker_news_headlines
+
+        with serve_hn_stub(ctx.size["hn_items"]) as stub:
+            sync = HeadlineSync(ctx.path("hn_sync"), base_url=stub.base_url)
+            sync.sync()  # the first sync of either mode fetches everything
+            counts = {"runs": 0, "headlines": 0}
+
+            def runs():
+                for run in range(RUNS):
+                    _churn(stub, counts["runs"])
+                    if mode == "delta":
+                        counts["headlines"] += len(sync.sync().delta)
+                    else:
+                        counts["headlines"] += len(fetch_hacker_news_headlines(base_url=stub.base_url))
+                    counts["runs"] += 1
+
+            stub.requests.clear()
+            result = measure(runs, repeat=ctx.repeat, warmup=0, items=RUNS)
+            result.update({
+                "items_fetched_per_run": stub.item_requests() / counts["runs"],
+                "requests_per_run": sum(stub.requests.values()) / counts["runs"],
+                "new_headlines_per_run": counts["headlines"] / counts["runs"],
+                "full_refetch_items_per_run": sync.limit,
+            })
+            return result
+    return bench
+
+
+for _mode in ("full", "delta"):
+    _register(_mode)
@@ -0,0 +1,38 @@
+# benchmarks/bench_fusion.py
+"""
+Fusion Benchmarks:
+Latency and memory of the multi-modal fusion forward pass, per batch size and output dtype.
+"""
+
+import tracemalloc
+
+import numpy as np
+
+from benchmarks.harness import benchmark, measure
+
+
+def _register(batch, dtype):
+    @benchmark(f"fusion.fuse_batch.b{batch}.{np.dtype(dtype).name}")
+    def bench(ctx):
+        from modules.fusion import FusionModel
+
+        model = FusionModel(seed=ctx.seed)
+        rng = np.random.default_rng(ctx.seed)
+        text = rng.standard_normal((batch, 768)).astype(np.float32)
+        image = rng.standard_normal((batch, 512)).astype(np.float32)
+        numerical = rng.standard_normal((batch, model.input_dims["numerical"])).astype(np.float32)
+        result = measure(lambda: model.fuse_batch(text, image, numerical, dtype=dtype), repeat=ctx.repeat, items=batch)
+
+        tracemalloc.start()
+        fused = model.fuse_batch(text, image, numerical, dtype=dtype)
+        result["peak_alloc_bytes"] = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        result["output_bytes"] = fused.nbytes
+        result["input_bytes"] = text.nbytes + image.nbytes + numerical.nbytes
+        return result
+    return bench
+
+
+for _batch in (1, 64, 1024):
+    for _dtype in (np.float32, np.float16):
+        _register(_batch, _dtype)
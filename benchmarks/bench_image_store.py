@@ -0,0 +1,63 @@
+# benchmarks/bench_image_store.py
+"""
+Image Store Benchmarks:
+Image embedding with the persistent content-hash store: a cold store (every image decoded and
+embedded) against a warm one (stat() pre-check and memmap reads only), plus directory warming.
+
+An untrained ResNet18 stands in for the pretrained one: the cost per image is identical and
+no weights need to be downloaded.
+"""
+
+import shutil
+from functools import lru_cache
+
+from benchmarks.data import generate_images
+from benchmarks.harness import benchmark, measure, BenchmarkSkipped
+
+
+@lru_cache(maxsize=None)
+def _embedder():
+    try:
+        import torch.nn as nn
+        from torchvision import models
+        from modules.multi_modal import build_vision_transform, get_image_embeddings_batch, vision_fingerprint
+    except ImportError as e:
+        raise BenchmarkSkipped(f"torchvision unavailable: {e}")
+    model = nn.Sequential(*list(models.resnet18().children())[:-1]).eval()
+    transform = build_vision_transform()
+    return vision_fingerprint(model, transform), lambda images: get_image_embeddings_batch(images, model, transform)
+
+
+def _store(directory):
+    from modules.image_store import ImageEmbeddingStore
+
+    fingerprint, embed = _embedder()
+    return ImageEmbeddingStore(directory, fingerprint=fingerprint, embedder=embed)
+
+
+@benchmark("image_store.get_many.cold")
+def bench_cold(ctx):
+    paths = generate_images(ctx.path("images"), ctx.size["images"], ctx.size["image_px"], ctx.seed)
+
+    def run():
+        shutil.rmtree(ctx.path("store"), ignore_errors=True)
+        _store(ctx.path("store")).get_many(paths)
+    return measure(run, repeat=ctx.repeat, items=len(paths))
+
+
+@benchmark("image_store.get_many.warm")
+def bench_warm(ctx):
+    paths = generate_images(ctx.path("images"), ctx.size["images"], ctx.size["image_px"], ctx.seed)
+    _store(ctx.path("store")).get_many(paths)
+    # Reopen per run so the stat() pre-check and index load are included, as in a new process.
+    return measure(lambda: _store(ctx.path("store")).get_many(paths), repeat=ctx.repeat, items=len(paths))
+
+
+@benchmark("image_store.warm_directory")
+def bench_warm_directory(ctx):
+    paths = generate_images(ctx.path("images"), ctx.size["images"], ctx.size["image_px"], ctx.seed)
+
+    def run():
+        shutil.rmtree(ctx.path("store"), ignore_errors=True)
+        _store(ctx.path("store")).warm_directory(ctx.path("images"))
+    return measure(run, repeat=ctx.repeat, items=len(paths))
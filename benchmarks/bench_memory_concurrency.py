@@ -0,0 +1,117 @@
+# benchmarks/bench_memory_concurrency.py
+"""
+Memory Concurrency Stress Test:
+N writer processes append to one tiered store at the same time while a reader process keeps
+loading the hot tier. Afterwards every event must be present exactly once, sequence numbers
+must be unique and gap-free, and the reader must never have seen a partial file.
+
+    python -m benchmarks.bench_memory_concurrency --processes 8 --events 500 --batch 4
+"""
+
+import argparse
+import json
+import multiprocessing
+import os
+import tempfile
+import time
+from datetime import datetime
+
+from benchmarks.harness import benchmark
+
+STRESS_POLICY = {"hot_max_events": 200, "segment_events": 50, "compression": "gzip"}
+
+
+def _writer(hot_path, archive_dir, writer, events, batch, start_event):
+    from modules.tiered_storage import TieredStore
+
+    store = TieredStore(hot_path, archive_dir, STRESS_POLICY)
+    start_event.wait()
+    for first in range(0, events, batch):
+        store.append_many([{"timestamp": datetime.utcnow().isoformat(), "writer": writer, "n": n}
+                           for n in range(first, min(first + batch, events))])
+
+
+def _reader(hot_path, stop_event, results):
+    reads = partial = 0
+    while not stop_event.is_set():
+        try:
+            with open(hot_path, "r", encoding="utf-8") as f:
+                json.load(f)
+            reads += 1
+        except FileNotFoundError:
+            continue
+        except ValueError:
+            partial += 1
+    results.put((reads, partial))
+
+
+def stress_store(workdir, processes=4, events=200, batch=1):
+    """
+    Hammers one store from `processes` writer processes.
+
+    Args:
+        workdir (str): Directory for the store.
+        processes (int): Concurrent writer processes.
+        events (int): Events appended per writer.
+        batch (int): Events per append_many() call.
+
+    Returns:
+        dict: events, lost, duplicates, seq_ok, reads, partial_reads, seconds and events_per_s.
+    """
+    from modules.tiered_storage import TieredStore
+
+    hot_path = os.path.join(workdir, "memory.json")
+    archive_dir = os.path.join(workdir, "memory_archive")
+    store = TieredStore(hot_path, archive_dir, STRESS_POLICY)
+    store.initialize()
+    start_event, stop_event = multiprocessing.Event(), multiprocessing.Event()
+    results = multiprocessing.Queue()
+    reader = multiprocessing.Process(target=_reader, args=(hot_path, stop_event, results))
+    writers = [multiprocessing.Process(target=_writer, args=(hot_path, archive_dir, w, events, batch, start_event))
+               for w in range(processes)]
+    reader.start()
+    for process in writers:
+        process.start()
+    start = time.perf_counter()
+    start_event.set()
+    for process in writers:
+        process.join()
+    seconds = time.perf_counter() - start
+    stop_event.set()
+    reads, partial = results.get()
+    reader.join()
+
+    stored = list(store.iter_range())
+    keys = [(event["writer"], event["n"]) for event in stored]
+    expected = {(w, n) for w in range(processes) for n in range(events)}
+    total = processes * events
+    return {
+        "events": total,
+        "lost": len(expected - set(keys)),
+        "duplicates": len(keys) - len(set(keys)),
+        "seq_ok": sorted(event["seq"] for event in stored) == list(range(1, total + 1)),
+        "reads": reads,
+        "partial_reads": partial,
+        "seconds": seconds,
+        "events_per_s": total / seconds if seconds > 0 else None,
+    }
+
+
+@benchmark("memory.concurrent_writers")
+def bench_concurrent_writers(ctx):
+    workdir = ctx.path("concurrent")
+    os.makedirs(workdir, exist_ok=True)
+    result = stress_store(workdir, processes=4, events=ctx.size["memory_writes"] // 4, batch=1)
+    if result["lost"] or result["duplicates"] or not result["seq_ok"] or result["partial_reads"]:
+        raise AssertionError(f"Concurrent writers corrupted the store: {result}")
+    return {"median_s": result["seconds"], "items": result["events"], "items_per_s": result["events_per_s"]}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Stress a tiered memory store with concurrent writer processes.")
+    parser.add_argument("--processes", type=int, default=4)
+    parser.add_argument("--events", type=int, default=200, help="Events per writer.")
+    parser.add_argument("--batch", type=int, default=1, help="Events per append.")
+    args = parser.parse_args()
+    with tempfile.TemporaryDirectory() as workdir:
+        print(json.dumps(stress_store(workdir, args.processes, args.events, args.batch), indent=2))
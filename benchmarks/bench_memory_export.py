@@ -0,0 +1,76 @@
+# benchmarks/bench_memory_export.py
+"""
+Memory Export Benchmarks:
+Streaming export of a tiered memory store (the retrieve-everything baseline builds the full list
+first) and resumable import, reported in events per second.
+"""
+
+import json
+import os
+
+from benchmarks.harness import benchmark, measure, isolated_memory, BenchmarkSkipped
+from benchmarks.data import generate_memory_history
+
+
+def _mkdir(path):
+    os.makedirs(path, exist_ok=True)
+    return path
+
+
+@benchmark("memory_export.retrieve_all_baseline")
+def bench_retrieve_all(ctx):
+    from modules import memory
+
+    path = ctx.path("baseline.jsonl")
+
+    def run():
+        events = memory.retrieve_memory(include_archive=True)
+        with open(path, "w", encoding="utf-8") as f:
+            for event in events:
+                f.write(json.dumps(event) + "\n")
+    with isolated_memory(_mkdir(ctx.path("baseline"))):
+        memory._get_store().append_many(generate_memory_history(ctx.size["memory_events"], ctx.seed))
+        return measure(run, repeat=ctx.repeat, items=ctx.size["memory_events"])
+
+
+def _bench_export(ctx, filename):
+    from modules import memory
+    from modules.memory_export import export_store
+
+    with isolated_memory(_mkdir(ctx.path(filename + "_store"))):
+        memory._get_store().append_many(generate_memory_history(ctx.size["memory_events"], ctx.seed))
+        try:
+            return measure(lambda: export_store(memory._get_store(), ctx.path(filename)), repeat=ctx.repeat,
+                           items=ctx.size["memory_events"])
+        except ImportError as e:
+            raise BenchmarkSkipped(str(e))
+
+
+@benchmark("memory_export.export_jsonl_gz")
+def bench_export_gzip(ctx):
+    return _bench_export(ctx, "export.jsonl.gz")
+
+
+@benchmark("memory_export.export_parquet")
+def bench_export_parquet(ctx):
+    return _bench_export(ctx, "export.parquet")
+
+
+@benchmark("memory_export.import_jsonl_gz")
+def bench_import(ctx):
+    from modules import memory
+    from modules.memory_export import export_store, import_events
+    from modules.tiered_storage import TieredStore
+
+    path = ctx.path("import.jsonl.gz")
+    with isolated_memory(_mkdir(ctx.path("import_source"))):
+        memory._get_store().append_many(generate_memory_history(ctx.size["memory_events"], ctx.seed))
+        export_store(memory._get_store(), path)
+    runs = []
+
+    def setup():
+        runs.append(len(runs))
+        target = ctx.path(f"import_target_{runs[-1]}")
+        return TieredStore(target + ".json", target)
+    return measure(lambda target: import_events(path, target), repeat=ctx.repeat,
+                   items=ctx.size["memory_events"], setup=setup)
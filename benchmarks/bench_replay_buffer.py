@@ -0,0 +1,67 @@
+# benchmarks/bench_replay_buffer.py
+"""
+Replay Buffer Benchmarks:
+Experience appends and minibatch training steps. The baseline keeps experiences as a list of
+tuples and samples and updates one experience at a time; the ring buffer samples through the sum
+tree and updates the linear head on the whole minibatch.
+"""
+
+import random
+
+import numpy as np
+
+from benchmarks.harness import benchmark, measure
+
+_CAPACITY = 10000
+_BATCH = 32
+_STEPS = 200
+
+
+def _experiences(ctx, count):
+    rng = np.random.default_rng(ctx.seed)
+    embeddings = rng.standard_normal((count, 768)).astype(np.float32)
+    return embeddings, rng.integers(0, 2, count), rng.choice([-1.0, 1.0], count)
+
+
+@benchmark("replay.append")
+def bench_append(ctx):
+    from modules.replay_buffer import ReplayBuffer
+
+    embeddings, actions, rewards = _experiences(ctx, _CAPACITY)
+
+    def run():
+        buffer = ReplayBuffer(_CAPACITY, 768)
+        for i in range(_CAPACITY):
+            buffer.append(embeddings[i], actions[i], rewards[i])
+    return measure(run, repeat=ctx.repeat, items=_CAPACITY)
+
+
+@benchmark("replay.train_step.list_baseline")
+def bench_train_list(ctx):
+    embeddings, actions, rewards = _experiences(ctx, _CAPACITY)
+    experiences = list(zip(embeddings, actions, rewards))
+    weights = np.zeros((2, 768), dtype=np.float32)
+    rng = random.Random(ctx.seed)
+
+    def run():
+        for _ in range(_STEPS):
+            for embedding, action, reward in rng.choices(experiences, k=_BATCH):
+                error = reward - float(weights[action] @ embedding)
+                weights[action] += (0.1 / _BATCH) * error * embedding
+    return measure(run, repeat=ctx.repeat, items=_STEPS * _BATCH)
+
+
+@benchmark("replay.train_step.prioritized")
+def bench_train_prioritized(ctx):
+    from modules.replay_buffer import ReplayBuffer, LinearHead
+
+    buffer = ReplayBuffer(_CAPACITY, 768)
+    buffer.extend(*_experiences(ctx, _CAPACITY))
+    head = LinearHead(768, 2)
+    rng = np.random.default_rng(ctx.seed)
+
+    def run():
+        for _ in range(_STEPS):
+            batch = buffer.sample(_BATCH, rng=rng)
+            buffer.update_priorities(batch.indices, head.update(batch))
+    return measure(run, repeat=ctx.repeat, items=_STEPS * _BATCH)
@@ -0,0 +1,44 @@
+# benchmarks/bench_sandbox.py
+"""
+Sandbox Benchmarks:
+Jobs/sec for many small generated snippets, subprocess-per-call versus the warm SandboxPool.
+"""
+
+import os
+
+from benchmarks.harness import benchmark, measure
+
+SNIPPET = '''
+values = [i * {n} for i in range(1000)]
+print("snippet {n}:", sum(values))
+'''
+
+
+def _write_snippets(ctx, count):
+    os.makedirs(ctx.path("snippets"), exist_ok=True)
+    paths = []
+    for n in range(count):
+        path = ctx.path("snippets", f"snippet_{n:04d}.py")
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(SNIPPET.format(n=n))
+        paths.append(path)
+    return paths
+
+
+@benchmark("sandbox.run_in_sandbox")
+def bench_subprocess_per_call(ctx):
+    from sandbox import run_in_sandbox
+
+    paths = _write_snippets(ctx, 16)
+    return measure(lambda: [run_in_sandbox(p) for p in paths], repeat=min(ctx.repeat, 3), items=len(paths))
+
+
+@benchmark("sandbox.pool")
+def bench_warm_pool(ctx):
+    from sandbox import SandboxPool
+
+    paths = _write_snippets(ctx, 16)
+    with SandboxPool(workers=min(4, os.cpu_count() or 1), timeout=10) as pool:
+        # Submit everything up front and collect from the futures, as a caller evaluating many snippets would.
+        return measure(lambda: [f.result() for f in [pool.submit(script=p) for p in paths]],
+                       repeat=ctx.repeat, items=len(paths))
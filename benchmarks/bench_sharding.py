@@ -0,0 +1,26 @@
+# benchmarks/bench_sharding.py
+"""
+Sharding Benchmarks:
+Scaling of distributed_processing.run_sharded from 1 to N local workers.
+"""
+
+from benchmarks.harness import benchmark, measure
+from benchmarks.data import write_text_files
+from modules.resources import available_cpus
+
+WORKER_COUNTS = sorted({1, 2, 4, available_cpus()})
+
+
+def _register(workers):
+    @benchmark(f"distributed.run_sharded.workers_{workers}", group="scaling")
+    def bench(ctx):
+        from distributed_processing import run_sharded, preprocess_shard
+
+        paths = write_text_files(ctx.path("corpus"), ctx.size["texts"] * 8, ctx.size["words"] * 4, ctx.seed)
+        return measure(lambda: run_sharded(paths, preprocess_shard, workers=workers),
+                       repeat=min(ctx.repeat, 3), items=len(paths))
+    return bench
+
+
+for _workers in WORKER_COUNTS:
+    _register(_workers)
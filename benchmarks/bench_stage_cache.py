@@ -0,0 +1,67 @@
+# benchmarks/bench_stage_cache.py
+"""
+Stage Cache Benchmarks:
+Re-running the text stages of the pipeline (read + preprocess, near-duplicate signature) over a
+corpus in which 10% of the files changed since the previous run. The baseline recomputes every
+stage; the cached run recomputes only the changed files, from the memory tier or (in a fresh
+process, modeled by a fresh cache) from the disk tier. Results carry the per-stage hit rates.
+"""
+
+import os
+
+from benchmarks.harness import benchmark, measure, isolated_memory
+from benchmarks.data import generate_texts, write_text_files
+
+
+def _corpus(ctx):
+    count = 4 * ctx.size["texts"]
+    paths = write_text_files(ctx.path("corpus"), count, ctx.size["words"], ctx.seed)
+    edits = generate_texts(count, ctx.size["words"], ctx.seed + 1)
+    runs = []
+
+    def change_tenth():
+        # each run edits a different 10% of the files
+        runs.append(len(runs))
+        for i in range(runs[-1] % 10, count, 10):
+            with open(paths[i], "w", encoding="utf-8") as f:
+                f.write(edits[i] + f" edit {runs[-1]}")
+    return paths, change_tenth
+
+
+@benchmark("stage_cache.rerun_uncached_baseline")
+def bench_uncached(ctx):
+    from modules.dedup import simhash
+    from main import _read_and_preprocess
+
+    paths, change_tenth = _corpus(ctx)
+    return measure(lambda _: [simhash(_read_and_preprocess(p)[1]) for p in paths], repeat=ctx.repeat,
+                   items=len(paths), setup=change_tenth)
+
+
+def _cached_rerun(ctx, fresh_cache):
+    from modules import stage_cache
+    from main import _prepare_input
+
+    paths, change_tenth = _corpus(ctx)
+    with isolated_memory(ctx.workdir):
+        [_prepare_input(p) for p in paths]
+
+        def setup():
+            change_tenth()
+            if fresh_cache:
+                stage_cache._cache = None
+            stage_cache.get_stage_cache().reset_stats()
+        result = measure(lambda _: [_prepare_input(p) for p in paths], repeat=ctx.repeat, items=len(paths), setup=setup)
+        for stage, counters in stage_cache.get_stage_cache().stats()["stages"].items():
+            result[f"{stage}_hit_rate"] = round(counters["hit_rate"], 3)
+    return result
+
+
+@benchmark("stage_cache.rerun_memory_tier")
+def bench_memory_tier(ctx):
+    return _cached_rerun(ctx, fresh_cache=False)
+
+
+@benchmark("stage_cache.rerun_disk_tier")
+def bench_disk_tier(ctx):
+    return _cached_rerun(ctx, fresh_cache=True)
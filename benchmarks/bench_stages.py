@@ -0,0 +1,171 @@
+# benchmarks/bench_stages.py
+"""
+Stage Benchmarks:
+One benchmark per GENESIS-1 pipeline stage, plus an end-to-end throughput scenario.
+"""
+
+import functools
+import os
+import random
+
+import numpy as np
+
+from benchmarks.harness import benchmark, measure, isolated_memory, BenchmarkSkipped
+from benchmarks.data import (generate_texts, write_text_files, generate_images, generate_csv,
+                             generate_memory_history)
+from benchmarks.hn_stub import serve_hn_stub
+
+
+def _mkdir(path):
+    os.makedirs(path, exist_ok=True)
+    return path
+
+
+@functools.lru_cache(maxsize=None)
+def _text_model():
+    from modules.understanding import load_model
+    try:
+        return load_model()
+    except Exception as e:
+        raise BenchmarkSkipped(f"text model unavailable: {e}")
+
+
+@functools.lru_cache(maxsize=None)
+def _vision_model():
+    from modules.multi_modal import load_vision_model
+    try:
+        return load_vision_model()
+    except Exception as e:
+        raise BenchmarkSkipped(f"vision model unavailable: {e}")
+
+
+@benchmark("perception.preprocess_text")
+def bench_preprocess(ctx):
+    from modules.perception import preprocess_text
+
+    texts = generate_texts(ctx.size["texts"], ctx.size["words"], ctx.seed)
+    return measure(lambda: [preprocess_text(t) for t in texts], repeat=ctx.repeat, items=len(texts))
+
+
+@benchmark("understanding.get_embeddings")
+def bench_embeddings(ctx):
+    from modules.understanding import get_embeddings
+
+    tokenizer, model = _text_model()
+    texts = generate_texts(min(ctx.size["texts"], 16), ctx.size["words"], ctx.seed)
+    return measure(lambda: [get_embeddings(t, tokenizer, model) for t in texts],
+                   repeat=ctx.repeat, items=len(texts))
+
+
+@benchmark("reasoning.enhanced_reasoning")
+def bench_reasoning(ctx):
+    from modules.reasoning import enhanced_reasoning
+
+    rng = np.random.default_rng(ctx.seed)
+    embeddings = rng.standard_normal((ctx.size["texts"], 768)).astype(np.float32)
+    return measure(lambda: [enhanced_reasoning(e) for e in embeddings], repeat=ctx.repeat, items=len(embeddings))
+
+
+@benchmark("knowledge_graph.query")
+def bench_kg_query(ctx):
+    import networkx as nx
+    from modules.knowledge_graph import query_knowledge_graph
+
+    n = ctx.size["kg_nodes"]
+    graph = nx.gnm_random_graph(n, n * 4, seed=ctx.seed)
+    rng = random.Random(ctx.seed)
+    concepts = [rng.randrange(n) for _ in range(1000)]
+    return measure(lambda: [query_knowledge_graph(graph, c) for c in concepts], repeat=ctx.repeat, items=len(concepts))
+
+
+@benchmark("memory.store")
+def bench_memory_store(ctx):
+    from modules.memory import store_memory
+
+    events = generate_memory_history(ctx.size["memory_writes"], ctx.seed)
+    runs = iter(range(10 ** 9))
+
+    def setup():
+        # A fresh store per run so every run appends to the same starting state.
+        return _mkdir(ctx.path(f"store_{next(runs)}"))
+
+    def run(workdir):
+        with isolated_memory(workdir):
+            for event in events:
+                store_memory(event)
+
+    return measure(run, repeat=ctx.repeat, items=len(events), setup=setup)
+
+
+@benchmark("memory.query_range")
+def bench_memory_query(ctx):
+    from modules import memory
+
+    events = generate_memory_history(ctx.size["memory_events"], ctx.seed)
+    with isolated_memory(_mkdir(ctx.path("query"))):
+        memory._get_store().append_many(events)
+        start, end = events[len(events) // 2]["timestamp"], events[len(events) // 2 + 100]["timestamp"]
+        return measure(lambda: memory.query_memory_range(start, end), repeat=ctx.repeat)
+
+
+@benchmark("multi_modal.preprocess_numerical_data")
+def bench_csv_normalization(ctx):
+    from modules.multi_modal import ingest_numerical_data, preprocess_numerical_data
+
+    path = generate_csv(ctx.path("data.csv"), ctx.size["csv_rows"], ctx.size["csv_cols"], ctx.seed)
+    return measure(lambda: preprocess_numerical_data(ingest_numerical_data(path)),
+                   repeat=ctx.repeat, items=ctx.size["csv_rows"])
+
+
+@benchmark("multi_modal.get_image_embedding")
+def bench_image_embedding(ctx):
+    from modules.multi_modal import ingest_image, get_image_embedding
+
+    model, transform = _vision_model()
+    paths = generate_images(ctx.path("images"), ctx.size["images"], ctx.size["image_px"], ctx.seed)
+    return measure(lambda: [get_image_embedding(ingest_image(p), model, transform) for p in paths],
+                   repeat=ctx.repeat, items=len(paths))
+
+
+@benchmark("external_data.fetch")
+def bench_external_fetch(ctx):
+    from modules.external_data import fetch_hacker_news_headlines, preprocess_external_data
+
+    with serve_hn_stub(ctx.size["hn_items"]) as stub:
+        return measure(lambda: preprocess_external_data(fetch_hacker_news_headlines(base_url=stub.base_url)),
+                       repeat=ctx.repeat, items=min(10, ctx.size["hn_items"]))
+
+
+@benchmark("pipeline.integrate_system", group="end_to_end")
+def bench_end_to_end(ctx):
+    from modules import external_data
+    import main
+
+    _text_model()
+    paths = write_text_files(ctx.path("corpus"), min(ctx.size["texts"], 4), ctx.size["words"], ctx.seed)
+    csv_path = generate_csv(ctx.path("e2e.csv"), 200, 4, ctx.seed)
+    saved_base = external_data.HN_API_BASE
+    with serve_hn_stub(ctx.size["hn_items"]) as stub, isolated_memory(_mkdir(ctx.path("e2e"))):
+        external_data.HN_API_BASE = stub.base_url
+        try:
+            return measure(lambda: [main.integrate_system(p, csv_path=csv_path, ci_mode=True) for p in paths],
+                           repeat=1, warmup=0, items=len(paths))
+        finally:
+            external_data.HN_API_BASE = saved_base
+
+
+@benchmark("pipeline.integrate_many", group="end_to_end")
+def bench_end_to_end_batch(ctx):
+    from modules import external_data
+    import main
+
+    _text_model()
+    paths = write_text_files(ctx.path("corpus"), ctx.size["texts"], ctx.size["words"], ctx.seed)
+    saved_base = external_data.HN_API_BASE
+    with serve_hn_stub(ctx.size["hn_items"]) as stub, isolated_memory(_mkdir(ctx.path("e2e"))):
+        external_data.HN_API_BASE = stub.base_url
+        try:
+            return measure(lambda: sum(1 for _ in main.integrate_many(paths, batch_size=16, ci_mode=True)),
+                           repeat=1, warmup=0, items=len(paths))
+        finally:
+            external_data.HN_API_BASE = saved_base
@@ -0,0 +1,67 @@
+# benchmarks/bench_thread_budget.py
+"""
+Thread Budget Benchmarks:
+Throughput of torch compute stages running on 1 to N concurrent threads (as concurrent
+integrate_system_async pipelines do) under two policies:
+  - unmanaged: every stage uses torch's default sizing, one thread per core of the machine;
+  - budgeted:  every stage runs as a resources.ResourceManager compute stage, so the stages
+               running at once split the available cores.
+Unmanaged concurrency beyond one stage oversubscribes the CPU; the gap grows with the core count.
+"""
+
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+from benchmarks.harness import benchmark, measure, BenchmarkSkipped
+from modules.resources import available_cpus
+
+CONCURRENCY = sorted({1, 2, 4, available_cpus()})
+POLICIES = ("unmanaged", "budgeted")
+DIM = 384
+
+
+def _stage_fn(policy):
+    import torch
+    from modules.resources import ResourceManager
+
+    weights = torch.randn(DIM, DIM) / DIM ** 0.5
+    manager = ResourceManager()
+
+    def stage(_):
+        x = torch.randn(64, DIM)
+        for _ in range(8):
+            x = torch.tanh(x @ weights)
+        return x
+
+    if policy == "budgeted":
+        return lambda item: manager.call(stage, item)
+
+    def unmanaged(item):
+        torch.set_num_threads(os.cpu_count() or 1)
+        return stage(item)
+    return unmanaged
+
+
+def _register(concurrency, policy):
+    @benchmark(f"thread_budget.concurrency_{concurrency}.{policy}", group="scaling")
+    def bench(ctx):
+        try:
+            import torch
+        except ImportError as e:
+            raise BenchmarkSkipped(f"torch unavailable: {e}")
+        tasks = min(ctx.size["texts"], 128) * 4
+        stage = _stage_fn(policy)
+        saved = torch.get_num_threads()
+        try:
+            with ThreadPoolExecutor(max_workers=concurrency) as pool:
+                result = measure(lambda: list(pool.map(stage, range(tasks))), repeat=ctx.repeat, items=tasks)
+        finally:
+            torch.set_num_threads(saved)
+        result["available_cpus"] = available_cpus()
+        return result
+    return bench
+
+
+for _concurrency in CONCURRENCY:
+    for _policy in POLICIES:
+        _register(_concurrency, _policy)
@@ -0,0 +1,49 @@
+# benchmarks/bench_token_corpus.py
+"""
+Token Corpus Benchmarks:
+Re-embedding a corpus from raw text (read, normalize, tokenize, embed) against embedding it
+from a pre-tokenized token corpus, plus the one-off cost of building the corpus.
+"""
+
+from benchmarks.bench_stages import _text_model
+from benchmarks.data import write_text_files
+from benchmarks.harness import benchmark, measure
+
+
+def _corpus_files(ctx):
+    return write_text_files(ctx.path("texts"), ctx.size["texts"], ctx.size["words"], ctx.seed)
+
+
+@benchmark("token_corpus.build")
+def bench_build(ctx):
+    from modules.token_corpus import build_token_corpus
+
+    tokenizer, _ = _text_model()
+    paths = _corpus_files(ctx)
+    return measure(lambda: build_token_corpus(paths, tokenizer, ctx.path("corpus")), repeat=ctx.repeat, items=len(paths))
+
+
+@benchmark("token_corpus.embed_from_text")
+def bench_embed_from_text(ctx):
+    from modules.perception import ingest_local_file, preprocess_text
+    from modules.understanding import get_embeddings_batch
+
+    tokenizer, model = _text_model()
+    paths = _corpus_files(ctx)
+
+    def run():
+        texts = [" ".join(preprocess_text(ingest_local_file(p))) for p in paths]
+        return get_embeddings_batch(texts, tokenizer, model)
+    return measure(run, repeat=ctx.repeat, items=len(paths))
+
+
+@benchmark("token_corpus.embed_from_tokens")
+def bench_embed_from_tokens(ctx):
+    from modules.token_corpus import build_token_corpus, TokenCorpus
+    from modules.understanding import get_embeddings_from_tokens
+
+    tokenizer, model = _text_model()
+    paths = _corpus_files(ctx)
+    build_token_corpus(paths, tokenizer, ctx.path("corpus"))
+    return measure(lambda: get_embeddings_from_tokens(TokenCorpus(ctx.path("corpus")), model),
+                   repeat=ctx.repeat, items=len(paths))
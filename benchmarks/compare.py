@@ -0,0 +1,85 @@
+# benchmarks/compare.py
+"""
+Benchmark Comparison:
+Compares a benchmark report against a stored baseline and flags regressions.
+
+Usage:
+    python -m benchmarks.compare baseline.json current.json [--threshold 0.15] [--metric median_s]
+
+Exits with status 1 if any benchmark is slower than the baseline by more than the threshold.
+"""
+
+import argparse
+import json
+import sys
+
+
+def compare_reports(baseline, current, threshold=0.15, metric="median_s", min_delta_s=0.0005):
+    """
+    Compares two reports produced by benchmarks.run.
+
+    Args:
+        baseline (dict): The stored baseline report.
+        current (dict): The new report.
+        threshold (float): Relative slowdown tolerated before flagging (0.15 = 15%).
+        metric (str): Timing field to compare (lower is better).
+        min_delta_s (float): Absolute differences below this are treated as noise.
+
+    Returns:
+        list: One row per benchmark present in both reports, with keys
+              name, baseline, current, change and status ("regression", "improvement" or "ok").
+    """
+    rows = []
+    for name, new in sorted(current["results"].items()):
+        old = baseline["results"].get(name)
+        if not old or old.get("status") != "ok" or new.get("status") != "ok":
+            continue
+        change = (new[metric] - old[metric]) / old[metric] if old[metric] else 0.0
+        if abs(new[metric] - old[metric]) < min_delta_s:
+            status = "ok"
+        elif change > threshold:
+            status = "regression"
+        elif change < -threshold:
+            status = "improvement"
+        else:
+            status = "ok"
+        rows.append({"name": name, "baseline": old[metric], "current": new[metric], "change": change, "status": status})
+    return rows
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compare a benchmark report against a baseline.")
+    parser.add_argument("baseline")
+    parser.add_argument("current")
+    parser.add_argument("--threshold", type=float, default=0.15)
+    parser.add_argument("--metric", default="median_s")
+    parser.add_argument("--min-delta", type=float, default=0.0005, help="Ignore absolute changes below this (seconds).")
+    parser.add_argument("--json", action="store_true", help="Print the comparison as JSON.")
+    args = parser.parse_args(argv)
+
+    with open(args.baseline, "r", encoding="utf-8") as f:
+        baseline = json.load(f)
+    with open(args.current, "r", encoding="utf-8") as f:
+        current = json.load(f)
+
+    for key in ("size", "seed"):
+        if baseline["meta"].get(key) != current["meta"].get(key):
+            print(f"[BENCHMARK] Warning: reports differ in {key} "
+                  f"({baseline['meta'].get(key)} vs {current['meta'].get(key)}).", file=sys.stderr)
+
+    rows = compare_reports(baseline, current, args.threshold, args.metric, args.min_delta)
+    if args.json:
+        print(json.dumps(rows, indent=4))
+    else:
+        for row in rows:
+            print(f"{row['status']:>11}  {row['name']:<45} {row['baseline'] * 1000:10.2f} ms -> "
+                  f"{row['current'] * 1000:10.2f} ms  ({row['change']:+.1%})")
+    regressions = [row for row in rows if row["status"] == "regression"]
+    if regressions:
+        print(f"[BENCHMARK] {len(regressions)} regression(s) above {args.threshold:.0%}.", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,180 @@
+# benchmarks/data.py
+"""
+Synthetic Data Generators:
+Seeded generators for text, images, CSV files, embeddings, memory histories and a tiny text
+encoder, so that every benchmark (and test) sees byte-identical inputs across commits and machines.
+"""
+
+import os
+import random
+from datetime import datetime, timedelta
+
+import numpy as np
+
+VOCABULARY = (
+    "agent learning neural network memory reasoning graph vision signal model data "
+    "system feedback reward policy embedding token concept knowledge action perception "
+    "positive negative context input output layer weight gradient update sample batch"
+).split()
+# The words tiny_text_model() knows by default
+TINY_VOCABULARY = VOCABULARY[:12]
+
+
+def generate_texts(count, words=200, seed=1234):
+    """
+    Generates pseudo-English documents with punctuation and mixed case.
+
+    Args:
+        count (int): Number of documents.
+        words (int): Words per document.
+        seed (int): Random seed.
+
+    Returns:
+        list: Document strings.
+    """
+    rng = random.Random(seed)
+    texts = []
+    for _ in range(count):
+        tokens = [rng.choice(VOCABULARY) for _ in range(words)]
+        for i in range(0, words, 12):
+            tokens[i] = tokens[i].capitalize()
+            if i:
+                tokens[i - 1] += rng.choice([".", ",", "!", ";"])
+        texts.append(" ".join(tokens))
+    return texts
+
+
+def write_text_files(directory, count, words=200, seed=1234):
+    """
+    Writes generate_texts() output as numbered .txt files.
+
+    Returns:
+        list: The written file paths.
+    """
+    os.makedirs(directory, exist_ok=True)
+    paths = []
+    for i, text in enumerate(generate_texts(count, words, seed)):
+        path = os.path.join(directory, f"doc_{i:06d}.txt")
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(text)
+        paths.append(path)
+    return paths
+
+
+def generate_images(directory, count, size=64, seed=1234):
+    """
+    Writes seeded RGB noise images with a smooth gradient as PNG files.
+
+    Args:
+        directory (str): Output directory.
+        count (int): Number of images.
+        size (int): Width and height in pixels.
+        seed (int): Random seed.
+
+    Returns:
+        list: The written file paths.
+    """
+    from PIL import Image
+
+    os.makedirs(directory, exist_ok=True)
+    rng = np.random.default_rng(seed)
+    gradient = np.linspace(0, 255, size, dtype=np.float32)[None, :, None]
+    paths = []
+    for i in range(count):
+        noise = rng.integers(0, 64, size=(size, size, 3)).astype(np.float32)
+        pixels = np.clip(gradient * 0.75 + noise, 0, 255).astype(np.uint8)
+        path = os.path.join(directory, f"img_{i:06d}.png")
+        Image.fromarray(pixels, "RGB").save(path)
+        paths.append(path)
+    return paths
+
+
+def generate_embeddings(count, dim=768, rank=64, seed=1234):
+    """
+    Generates unit-norm embeddings with the structure of real ones: most of the variance lies in
+    a `rank`-dimensional subspace with a decaying spectrum, plus isotropic noise.
+
+    Returns:
+        numpy.array: (count, dim) float32 matrix.
+    """
+    rng = np.random.default_rng(seed)
+    basis = rng.standard_normal((rank, dim)) * np.linspace(1.0, 0.1, rank)[:, None]
+    vectors = rng.standard_normal((count, rank)) @ basis + 0.05 * rng.standard_normal((count, dim))
+    return (vectors / np.linalg.norm(vectors, axis=1, keepdims=True)).astype(np.float32)
+
+
+def generate_csv(path, rows, cols=8, seed=1234):
+    """
+    Writes a CSV with `cols` numeric columns and one text column.
+
+    Returns:
+        str: The CSV path.
+    """
+    rng = np.random.default_rng(seed)
+    data = rng.normal(loc=50.0, scale=15.0, size=(rows, cols))
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(",".join([f"x{j}" for j in range(cols)] + ["label"]) + "\n")
+        for i in range(rows):
+            f.write(",".join(f"{v:.4f}" for v in data[i]) + f",row{i}\n")
+    return path
+
+
+def generate_memory_history(count, seed=1234, start=datetime(2025, 1, 1), step=timedelta(minutes=5)):
+    """
+    Generates memory events shaped like modules.memory.create_memory_event() output.
+
+    Args:
+        count (int): Number of events.
+        seed (int): Random seed.
+        start (datetime): Timestamp of the first event.
+        step (timedelta): Time between events.
+
+    Returns:
+        list: Event dictionaries, oldest first.
+    """
+    rng = random.Random(seed)
+    texts = generate_texts(min(count, 64), words=20, seed=seed)
+    events = []
+    for i in range(count):
+        reward = rng.choice([1, -1])
+        mean = rng.gauss(0, 0.05)
+        decision = ("Positive" if reward > 0 else "Negative") + " inference: synthetic event."
+        events.append({
+            "timestamp": (start + i * step).isoformat(),
+            "input_summary": texts[i % len(texts)][:100],
+            "embedding_stats": {"mean": mean, "std": abs(rng.gauss(0.4, 0.05))},
+            "decision": decision,
+            "reward": reward,
+            "analysis_report": {"average_embedding_value": mean, "decision": decision,
+                                "reward": reward, "improvement_needed": reward < 0},
+            "improvement_outcome": "synthetic",
+        })
+    return events
+
+
+def tiny_text_model(directory, words=TINY_VOCABULARY, seed=0, **config):
+    """
+    Builds a randomly initialized DistilBERT encoder and its tokenizer over a small vocabulary,
+    so text pipelines run without downloading a checkpoint.
+
+    Args:
+        directory (str): Directory for the vocabulary file.
+        words (list): Vocabulary (besides the special tokens).
+        seed (int): Torch seed for the weights.
+        **config: DistilBertConfig overrides (defaults: dim 768, one layer, two heads).
+
+    Returns:
+        tuple: (DistilBertTokenizerFast, DistilBertModel in eval mode).
+    """
+    import torch
+    from transformers import DistilBertConfig, DistilBertModel, DistilBertTokenizerFast
+
+    os.makedirs(directory, exist_ok=True)
+    vocab_path = os.path.join(directory, "vocab.txt")
+    with open(vocab_path, "w", encoding="utf-8") as f:
+        f.write("\n".join(["[PAD]", "[UNK]", "[CLS]", "[SEP]", "[MASK]"] + list(words)))
+    # DistilBERT's own tokenizer: it emits no token_type_ids, which DistilBertModel rejects
+    tokenizer = DistilBertTokenizerFast(vocab_file=vocab_path)
+    torch.manual_seed(seed)
+    config = dict({"vocab_size": len(words) + 5, "hidden_dim": 64, "n_layers": 1, "n_heads": 2}, **config)
+    return tokenizer, DistilBertModel(DistilBertConfig(**config)).eval()
@@ -0,0 +1,151 @@
+# benchmarks/harness.py
+"""
+Benchmark Harness:
+A small registry of benchmark functions plus the timing helper they share.
+
+A benchmark is a function taking a BenchContext and returning a result dict,
+usually built with `measure()`. Register it with the `@benchmark` decorator;
+`benchmarks.run` imports every benchmark module and executes the registry.
+"""
+
+import gc
+import os
+import statistics
+import time
+from contextlib import contextmanager
+
+# Named size profiles. Every generator and benchmark scales off these numbers.
+SIZES = {
+    "small": {"texts": 32, "words": 200, "images": 4, "image_px": 64, "csv_rows": 1000, "csv_cols": 8,
+              "memory_events": 2000, "memory_writes": 200, "kg_nodes": 1000, "hn_items": 10, "encoder_layers": 2,
+              "repeat": 5},
+    "medium": {"texts": 256, "words": 400, "images": 16, "image_px": 128, "csv_rows": 20000, "csv_cols": 16,
+               "memory_events": 20000, "memory_writes": 1000, "kg_nodes": 20000, "hn_items": 30, "encoder_layers": 6,
+               "repeat": 5},
+    "large": {"texts": 2048, "words": 800, "images": 64, "image_px": 224, "csv_rows": 200000, "csv_cols": 32,
+              "memory_events": 200000, "memory_writes": 5000, "kg_nodes": 100000, "hn_items": 100, "encoder_layers": 6,
+              "repeat": 3},
+}
+
+DEFAULT_SEED = 1234
+
+BENCHMARKS = {}
+
+
+class BenchmarkSkipped(Exception):
+    """
+    Raised by a benchmark whose prerequisites (models, optional packages) are unavailable.
+    """
+
+
+class BenchContext:
+    """
+    Per-benchmark inputs: the size profile, the seed and a private scratch directory.
+    """
+
+    def __init__(self, size, seed, workdir):
+        self.size = size
+        self.seed = seed
+        self.workdir = workdir
+        self.repeat = size["repeat"]
+
+    def path(self, *parts):
+        """
+        Returns a path inside the scratch directory.
+        """
+        return os.path.join(self.workdir, *parts)
+
+
+@contextmanager
+def isolated_memory(workdir):
+    """
+    Points the short- and long-term memory stores, the image embedding store, the concept label
+    cache, the replay buffer, the action log, the near-duplicate index, the stage cache, the
+    embedding codecs and the headline sync state at files inside `workdir` for the duration of
+    the block, so benchmarks never touch the repository's stores.
+    """
+    from modules import (memory, long_term_memory, image_store, concept_retrieval, learning, action, dedup,
+                         stage_cache, embedding_codec, external_data)
+
+    saved = (memory.MEMORY_FILE, memory.MEMORY_ARCHIVE_DIR,
+             long_term_memory.LONG_TERM_MEMORY_FILE, long_term_memory.LONG_TERM_ARCHIVE_DIR,
+             image_store.IMAGE_STORE_DIR, concept_retrieval.CONCEPT_CACHE_DIR, learning.REPLAY_DIR,
+             action.ACTIONS_FILE, dedup.DEDUP_DIR, stage_cache.STAGE_CACHE_DIR, embedding_codec.EMBEDDING_CODEC_DIR,
+             external_data.HN_SYNC_DIR)
+    memory.MEMORY_FILE = os.path.join(workdir, "memory.json")
+    memory.MEMORY_ARCHIVE_DIR = os.path.join(workdir, "memory_archive")
+    long_term_memory.LONG_TERM_MEMORY_FILE = os.path.join(workdir, "long_term_memory.json")
+    long_term_memory.LONG_TERM_ARCHIVE_DIR = os.path.join(workdir, "long_term_memory_archive")
+    image_store.IMAGE_STORE_DIR = os.path.join(workdir, "image_embeddings")
+    concept_retrieval.CONCEPT_CACHE_DIR = os.path.join(workdir, "concept_cache")
+    learning.REPLAY_DIR = os.path.join(workdir, "replay_buffer")
+    action.ACTIONS_FILE = os.path.join(workdir, "actions.json")
+    dedup.DEDUP_DIR = os.path.join(workdir, "dedup_index")
+    stage_cache.STAGE_CACHE_DIR = os.path.join(workdir, "stage_cache")
+    embedding_codec.EMBEDDING_CODEC_DIR = os.path.join(workdir, "embedding_codecs")
+    external_data.HN_SYNC_DIR = os.path.join(workdir, "hn_sync")
+    try:
+        yield
+    finally:
+        (memory.MEMORY_FILE, memory.MEMORY_ARCHIVE_DIR,
+         long_term_memory.LONG_TERM_MEMORY_FILE, long_term_memory.LONG_TERM_ARCHIVE_DIR,
+         image_store.IMAGE_STORE_DIR, concept_retrieval.CONCEPT_CACHE_DIR, learning.REPLAY_DIR,
+         action.ACTIONS_FILE, dedup.DEDUP_DIR, stage_cache.STAGE_CACHE_DIR, embedding_codec.EMBEDDING_CODEC_DIR,
+         external_data.HN_SYNC_DIR) = saved
+
+
+def benchmark(name, group="stage"):
+    """
+    Registers a benchmark function under a unique name.
+
+    Args:
+        name (str): Benchmark name used in reports, e.g. "memory.store".
+        group (str): Category, e.g. "stage" or "end_to_end".
+
+    Returns:
+        function: The decorator.
+    """
+    def decorator(fn):
+        if name in BENCHMARKS:
+            raise ValueError(f"Duplicate benchmark name: {name}")
+        BENCHMARKS[name] = {"fn": fn, "group": group}
+        return fn
+    return decorator
+
+
+def measure(fn, repeat=5, warmup=1, items=None, setup=None):
+    """
+    Times a callable and summarizes the samples.
+
+    Args:
+        fn (callable): The code under test. Receives setup()'s return value if setup is given.
+        repeat (int): Number of timed runs.
+        warmup (int): Untimed runs executed first.
+        items (int, optional): Items processed per run; adds an items_per_s figure.
+        setup (callable, optional): Untimed per-run preparation.
+
+    Returns:
+        dict: median_s, mean_s, min_s, stdev_s, repeat and optionally items / items_per_s.
+    """
+    def run_once():
+        arg = setup() if setup else None
+        gc.collect()
+        start = time.perf_counter()
+        fn(arg) if setup else fn()
+        return time.perf_counter() - start
+
+    for _ in range(warmup):
+        run_once()
+    samples = [run_once() for _ in range(repeat)]
+    median = statistics.median(samples)
+    result = {
+        "median_s": median,
+        "mean_s": statistics.fmean(samples),
+        "min_s": min(samples),
+        "stdev_s": statistics.stdev(samples) if len(samples) > 1 else 0.0,
+        "repeat": repeat,
+    }
+    if items:
+        result["items"] = items
+        result["items_per_s"] = items / median if median > 0 else None
+    return result
@@ -0,0 +1,98 @@
+# benchmarks/hn_stub.py
+"""
+Hacker News API Stub:
+A local HTTP server implementing the Hacker News endpoints used by
+modules/external_data.py (top stories, items and the recent-updates list), so fetch benchmarks and tests never touch the network.
+
+Usage:
+    with serve_hn_stub(num_items=30) as stub:
+        fetch_hacker_news_headlines(base_url=stub.base_url)
+"""
+
+import json
+import threading
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+class HNStub:
+    """
+    In-memory item catalogue served by the stub. Tests may mutate `top_ids` and
+    `items` between requests (update_item() also lists the item in /updates.json);
+    `requests` counts hits per path.
+    """
+
+    def __init__(self, num_items=10, first_id=40000000):
+        self.items = {}
+        self.top_ids = []
+        self.updated_ids = []
+        self.requests = {}
+        self.base_url = None
+        for i in range(num_items):
+            self.add_item(first_id + i, f"Synthetic headline number {i}")
+
+    def add_item(self, item_id, title, top=True):
+        self.items[item_id] = {"id": item_id, "title": title, "type": "story", "time": 1700000000 + item_id % 100000}
+        if top and item_id not in self.top_ids:
+            self.top_ids.insert(0, item_id)
+
+    def update_item(self, item_id, title):
+        self.items[item_id]["title"] = title
+        if item_id in self.updated_ids:
+            self.updated_ids.remove(item_id)
+        self.updated_ids.insert(0, item_id)
+
+    def item_requests(self):
+        return sum(count for path, count in self.requests.items() if path.startswith("/v0/item/"))
+
+    def handle(self, path):
+        self.requests[path] = self.requests.get(path, 0) + 1
+        if path == "/v0/topstories.json":
+            return 200, self.top_ids
+        if path == "/v0/updates.json":
+            return 200, {"items": self.updated_ids[:100], "profiles": []}
+        if path.startswith("/v0/item/") and path.endswith(".json"):
+            try:
+                item_id = int(path[len("/v0/item/"):-len(".json")])
+            except ValueError:
+                return 404, None
+            return 200, self.items.get(item_id)
+        return 404, None
+
+
+@contextmanager
+def serve_hn_stub(num_items=10, stub=None):
+    """
+    Serves an HNStub on 127.0.0.1 on an ephemeral port for the duration of the block.
+
+    Args:
+        num_items (int): Number of stories in the catalogue (ignored if stub is given).
+        stub (HNStub, optional): A pre-populated stub.
+
+    Yields:
+        HNStub: The stub, with base_url set (e.g. "http://127.0.0.1:54321/v0").
+    """
+    stub = stub or HNStub(num_items)
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            status, payload = stub.handle(self.path)
+            body = json.dumps(payload).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    stub.base_url = f"http://127.0.0.1:{server.server_address[1]}/v0"
+    try:
+        yield stub
+    finally:
+        server.shutdown()
+        server.server_close()
@@ -0,0 +1,124 @@
+# benchmarks/run.py
+"""
+Benchmark Runner:
+Executes the registered benchmarks and writes a machine-readable JSON report.
+
+Usage:
+    python -m benchmarks.run --size small --out bench_results.json [--only memory.] [--verbose]
+"""
+
+import argparse
+import contextlib
+import importlib
+import io
+import json
+import os
+import pkgutil
+import platform
+import shutil
+import subprocess
+import sys
+import tempfile
+import traceback
+from datetime import datetime
+
+import benchmarks
+from benchmarks.harness import BENCHMARKS, SIZES, DEFAULT_SEED, BenchContext, BenchmarkSkipped
+from modules.resources import available_cpus
+
+
+def load_benchmark_modules():
+    """
+    Imports every benchmarks/bench_*.py module so their benchmarks register themselves.
+    """
+    for module in pkgutil.iter_modules(benchmarks.__path__):
+        if module.name.startswith("bench_"):
+            importlib.import_module(f"benchmarks.{module.name}")
+
+
+def _git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "HEAD"], capture_output=True, text=True,
+                              check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run_benchmarks(size="small", seed=DEFAULT_SEED, only=None, verbose=False):
+    """
+    Runs the registered benchmarks.
+
+    Args:
+        size (str): Size profile name from SIZES.
+        seed (int): Seed for every data generator.
+        only (list, optional): Name prefixes to select a subset.
+        verbose (bool): If False, stdout produced by the code under test is discarded.
+
+    Returns:
+        dict: The report, with "meta" and "results" sections.
+    """
+    load_benchmark_modules()
+    report = {
+        "meta": {
+            "timestamp": datetime.utcnow().isoformat(),
+            "git_commit": _git_commit(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "available_cpus": available_cpus(),
+            "size": size,
+            "seed": seed,
+        },
+        "results": {},
+    }
+    for name in sorted(BENCHMARKS):
+        if only and not any(name.startswith(prefix) for prefix in only):
+            continue
+        entry = BENCHMARKS[name]
+        workdir = tempfile.mkdtemp(prefix="genesis_bench_")
+        ctx = BenchContext(SIZES[size], seed, workdir)
+        sink = contextlib.nullcontext() if verbose else contextlib.redirect_stdout(io.StringIO())
+        try:
+            with sink:
+                result = entry["fn"](ctx)
+            result["status"] = "ok"
+        except BenchmarkSkipped as e:
+            result = {"status": "skipped", "reason": str(e)}
+        except Exception as e:
+            result = {"status": "error", "reason": f"{type(e).__name__}: {e}"}
+            if verbose:
+                traceback.print_exc()
+        finally:
+            shutil.rmtree(workdir, ignore_errors=True)
+        result["group"] = entry["group"]
+        report["results"][name] = result
+        print(f"[BENCHMARK] {name}: {_summary(result)}", file=sys.stderr)
+    return report
+
+
+def _summary(result):
+    if result["status"] != "ok":
+        return f"{result['status']} ({result.get('reason')})"
+    text = f"median {result['median_s'] * 1000:.2f} ms"
+    if result.get("items_per_s"):
+        text += f", {result['items_per_s']:.1f} items/s"
+    return text
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run the GENESIS-1 benchmark suite.")
+    parser.add_argument("--size", choices=sorted(SIZES), default="small")
+    parser.add_argument("--seed", type=int, default=DEFAULT_SEED)
+    parser.add_argument("--only", action="append", help="Run benchmarks whose name starts with this prefix.")
+    parser.add_argument("--out", default="bench_results.json", help="Path of the JSON report.")
+    parser.add_argument("--verbose", action="store_true", help="Show output of the code under test.")
+    args = parser.parse_args(argv)
+
+    report = run_benchmarks(args.size, args.seed, args.only, args.verbose)
+    with open(args.out, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=4)
+    print(f"[BENCHMARK] Wrote {len(report['results'])} results to {args.out}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
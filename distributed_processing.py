@@ -1,16 +1,593 @@
 # distributed_processing.py
-import multiprocessing
-from modules.external_data import fetch_hacker_news_headlines, preprocess_external_data
+"""
+Distributed Processing:
+Shards input corpora (text files, image lists, CSV chunks) across a local process pool,
+or across machines through a small TCP coordinator, with per-shard checkpoints so that
+failed shards can be retried without recomputing finished ones.
+
+Local run (results merged into the memory store in input order; a rerun with the same
+--checkpoint-dir only merges shards it has not merged before):
+    python distributed_processing.py --inputs "corpus/*.txt" --workers 4 --checkpoint-dir .shards
+
+Multi-node run (shared filesystem assumed for input paths):
+    python distributed_processing.py --inputs "corpus/*.txt" --serve 127.0.0.1:50000
+    python distributed_processing.py --connect 127.0.0.1:50000 --authkey <key>   # on each worker node
+
+The coordinator prints a random authkey unless --authkey is given, and workers must pass it.
+Coordinator and workers exchange pickles, so anyone holding the key can run code on both:
+keep the coordinator on loopback (reach it from other nodes through an SSH tunnel) or on a
+trusted private network, never on a public interface.
+"""
+
+import argparse
+import glob
+import hashlib
+import importlib
+import ipaddress
+import json
+import os
+import pickle
+import secrets
+import socket
+import threading
+import time
+import traceback
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from multiprocessing.managers import BaseManager
+
+from modules.resources import available_cpus, get_resource_manager, init_worker
+from modules.structured_logging import get_logger
+from modules.tiered_storage import atomic_write_json
+
+logger = get_logger(__name__)
+
+Shard = namedtuple("Shard", ["shard_id", "items"])
+
+DEFAULT_SHARD_FN = "distributed_processing:process_text_shard"
+# In a checkpoint directory: digests of the shard results already merged into memory
+MERGED_FILE = "merged.json"
+
+
+class ShardFailed(Exception):
+    """
+    Raised when shards still fail after all retries. `failures` maps shard_id to the last error.
+    """
+
+    def __init__(self, failures):
+        self.failures = failures
+        super().__init__(f"{len(failures)} shard(s) failed: {sorted(failures)}")
+
+
+def partition(items, num_shards):
+    """
+    Splits items into contiguous, order-preserving shards of near-equal size.
+
+    Args:
+        items (list): Inputs (text paths, image paths, CSV chunk descriptors...).
+        num_shards (int): Number of shards.
+
+    Returns:
+        list: Shard tuples; empty shards are dropped.
+    """
+    items = list(items)
+    num_shards = max(1, min(num_shards, len(items)))
+    size, extra = divmod(len(items), num_shards)
+    shards, start = [], 0
+    for shard_id in range(num_shards):
+        end = start + size + (1 if shard_id < extra else 0)
+        if end > start:
+            shards.append(Shard(shard_id, items[start:end]))
+        start = end
+    return shards
+
+
+def csv_chunks(csv_path, rows_per_chunk=100000):
+    """
+    Describes a CSV file as (csv_path, first_row, nrows) chunks that workers can read independently.
+
+    Args:
+        csv_path (str): Path to the CSV file (with a header row).
+        rows_per_chunk (int): Data rows per chunk.
+
+    Returns:
+        list: Chunk descriptors.
+    """
+    with open(csv_path, "rb") as f:
+        rows = sum(1 for _ in f) - 1
+    return [(csv_path, start, min(rows_per_chunk, rows - start)) for start in range(0, rows, rows_per_chunk)]
+
+
+def resolve_shard_fn(shard_fn):
+    """
+    Resolves a "module:function" reference (needed for remote workers) or returns a callable as-is.
+    """
+    if callable(shard_fn):
+        return shard_fn
+    module_name, _, attr = shard_fn.partition(":")
+    return getattr(importlib.import_module(module_name), attr)
+
+
+def shard_fn_name(shard_fn):
+    """
+    Returns the "module:qualname" of a shard function (a callable or a "module:function" reference).
+    """
+    fn = resolve_shard_fn(shard_fn)
+    return f"{fn.__module__}:{fn.__qualname__}"
+
+
+# ---- shard functions ------------------------------------------------------
+
+_worker_models = {}
+
+
+def process_text_shard(items, shared=None):
+    """
+    Runs the GENESIS-1 pipeline over one shard without touching the memory store;
+    the caller merges the returned events in shard order.
+
+    Args:
+        items (list): Text paths or (text_path, image_path, csv_path) tuples.
+        shared (dict, optional): Output of main.run_shared_setup(), computed once by the caller.
+
+    Returns:
+        list: Per-input dicts with text_filepath, decision, reward, memory_event, long_term_event and
+              error (see main.integrate_many(); only error is set for a failed input).
+    """
+    import main
+    from modules.understanding import load_model
+
+    shared = dict(shared or {"external_data": "", "user_feedback": "", "incremental_train_success": False})
+    # Models are loaded once per worker process and reused by every shard it runs.
+    if "text_model" not in _worker_models:
+        _worker_models["text_model"] = load_model()
+    shared["text_model"] = _worker_models["text_model"]
+    return [
+        {key: result.get(key) for key in ("text_filepath", "decision", "reward", "memory_event", "long_term_event", "error")}
+        for result in main.integrate_many(items, ci_mode=True, shared=shared, store_events=False)
+    ]
+
+
+def preprocess_shard(items, shared=None):
+    """
+    Reads and tokenizes one shard of text files (a light, model-free shard function).
+
+    Returns:
+        list: (text_path, token_count) pairs.
+    """
+    from modules.perception import ingest_local_file, preprocess_text
+
+    return [(path, len(preprocess_text(ingest_local_file(path)))) for path in items]
+
+
+def image_embedding_shard(items, shared=None):
+    """
+    Embeds one shard of image paths with the vision model.
+
+    Returns:
+        list: (image_path, embedding) pairs; unreadable images get None.
+    """
+    from modules.multi_modal import ingest_image, load_vision_model, get_image_embeddings_batch
+
+    if "vision_model" not in _worker_models:
+        _worker_models["vision_model"] = load_vision_model()
+    model, transform = _worker_models["vision_model"]
+    images = [(path, ingest_image(path)) for path in items]
+    loaded = [(path, image) for path, image in images if image is not None]
+    matrix = get_image_embeddings_batch([image for _, image in loaded], model, transform)
+    embeddings = {path: row for (path, _), row in zip(loaded, matrix)}
+    return [(path, embeddings.get(path)) for path in items]
+
+
+def csv_stats_shard(items, shared=None):
+    """
+    Computes per-column count/sum/sum-of-squares over CSV chunks, for merge_csv_stats().
+
+    Returns:
+        dict: column -> [count, sum, sum_sq].
+    """
+    import pandas as pd
+    import numpy as np
+
+    stats = {}
+    for csv_path, first_row, nrows in items:
+        df = pd.read_csv(csv_path, skiprows=range(1, first_row + 1), nrows=nrows)
+        numeric = df.select_dtypes(include=[np.number])
+        for column in numeric.columns:
+            values = numeric[column].dropna().to_numpy(dtype=np.float64)
+            entry = stats.setdefault(column, [0, 0.0, 0.0])
+            entry[0] += len(values)
+            entry[1] += float(values.sum())
+            entry[2] += float(np.dot(values, values))
+    return stats
+
+
+def merge_csv_stats(shard_results):
+    """
+    Combines csv_stats_shard() outputs into global column means and sample standard deviations.
+
+    Returns:
+        dict: column -> (mean, std).
+    """
+    totals = {}
+    for stats in shard_results:
+        for column, (count, total, total_sq) in stats.items():
+            entry = totals.setdefault(column, [0, 0.0, 0.0])
+            entry[0] += count
+            entry[1] += total
+            entry[2] += total_sq
+    merged = {}
+    for column, (count, total, total_sq) in totals.items():
+        mean = total / count if count else float("nan")
+        variance = (total_sq - count * mean * mean) / (count - 1) if count > 1 else float("nan")
+        merged[column] = (mean, max(variance, 0.0) ** 0.5)
+    return merged
+
+
+# ---- checkpoints ------------------------------------------------------------
+
+def _input_fingerprint(item):
+    # Files are identified by (path, size, mtime_ns), so an edited input invalidates its shard;
+    # tuples (e.g. CSV chunk descriptors) are fingerprinted element-wise.
+    if isinstance(item, (tuple, list)):
+        return tuple(_input_fingerprint(part) for part in item)
+    if isinstance(item, str) and os.path.isfile(item):
+        stat = os.stat(item)
+        return (item, stat.st_size, stat.st_mtime_ns)
+    return item
+
+
+class ShardCheckpoints:
+    """
+    One pickle file per finished shard; written atomically so a crash never leaves a partial checkpoint.
+    A checkpoint is keyed on the shard function's qualified name and the shard's items, with the size
+    and modification time of every input file, and is only reused if all of them are unchanged.
+    """
+
+    def __init__(self, directory, shard_fn=DEFAULT_SHARD_FN):
+        self.directory = directory
+        self.shard_fn = shard_fn_name(shard_fn)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+    def _path(self, shard_id):
+        return os.path.join(self.directory, f"shard-{shard_id:05d}.pkl")
+
+    def _key(self, shard):
+        return (self.shard_fn, [_input_fingerprint(item) for item in shard.items])
+
+    def load(self, shard):
+        """
+        Returns (True, result) for a valid checkpoint of this shard, else (False, None).
+        """
+        if not self.directory or not os.path.exists(self._path(shard.shard_id)):
+            return False, None
+        with open(self._path(shard.shard_id), "rb") as f:
+            key, result = pickle.load(f)
+        return (True, result) if key == self._key(shard) else (False, None)
+
+    def save(self, shard, result):
+        if not self.directory:
+            return
+        tmp_path = self._path(shard.shard_id) + ".tmp"
+        with open(tmp_path, "wb") as f:
+            pickle.dump((self._key(shard), result), f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, self._path(shard.shard_id))
+
+
+# ---- local executor ---------------------------------------------------------
+
+def run_sharded(items, shard_fn=DEFAULT_SHARD_FN, workers=None, num_shards=None, checkpoint_dir=None,
+                max_retries=2, shared=None, pin=False):
+    """
+    Runs shard_fn over partitions of items on a local process pool.
+
+    Args:
+        items (list): Inputs to partition.
+        shard_fn (callable or str): Function (or "module:function") called as shard_fn(items, shared).
+        workers (int, optional): Worker processes (defaults to the available cores, see modules.resources).
+        num_shards (int, optional): Number of shards (defaults to 4 per worker, for load balancing).
+        checkpoint_dir (str, optional): Where finished shards are checkpointed; existing checkpoints are reused.
+        max_retries (int): Extra attempts for a failing shard.
+        shared (object, optional): Read-only data passed to every shard (e.g. main.run_shared_setup()).
+        pin (bool): Pin each worker process to its own set of CPUs.
+
+    Returns:
+        list: Shard results in shard (input) order.
+    """
+    # Workers split the CPU budget: torch and BLAS in each get cpus // workers threads
+    pool_options = get_resource_manager().process_pool_options(workers, pin=pin)
+    workers = pool_options["max_workers"]
+    shards = partition(items, num_shards or workers * 4)
+    checkpoints = ShardCheckpoints(checkpoint_dir, shard_fn)
+    results = {}
+    todo = []
+    for shard in shards:
+        found, result = checkpoints.load(shard)
+        if found:
+            results[shard.shard_id] = result
+        else:
+            todo.append(shard)
+    if todo:
+        logger.info("Running %d of %d shards on %d workers.", len(todo), len(shards), workers)
+
+    fn = resolve_shard_fn(shard_fn)
+    attempts = {shard.shard_id: 0 for shard in todo}
+    failures = {}
+    with ProcessPoolExecutor(**pool_options) as pool:
+        futures = {pool.submit(fn, shard.items, shared): shard for shard in todo}
+        while futures:
+            for future in as_completed(list(futures)):
+                shard = futures.pop(future)
+                try:
+                    result = future.result()
+                except Exception as e:
+                    attempts[shard.shard_id] += 1
+                    if attempts[shard.shard_id] <= max_retries:
+                        logger.warning("Shard %s failed (%s); retrying.", shard.shard_id, e)
+                        futures[pool.submit(fn, shard.items, shared)] = shard
+                    else:
+                        failures[shard.shard_id] = repr(e)
+                    continue
+                checkpoints.save(shard, result)
+                results[shard.shard_id] = result
+    if failures:
+        raise ShardFailed(failures)
+    return [results[shard.shard_id] for shard in shards]
+
+
+def _events_digest(results):
+    # Identifies a shard's events by their content (memory_export.event_id()), so a shard reloaded
+    # from its checkpoint has the same digest and a recomputed one a new digest.
+    from modules.memory_export import event_id
+
+    ids = [[event_id(r["memory_event"]), event_id(r["long_term_event"])] for r in results]
+    return hashlib.sha1(json.dumps(ids).encode("utf-8")).hexdigest()
+
+
+def merge_into_memory(shard_results, checkpoint_dir=None):
+    """
+    Writes process_text_shard() outputs into the short- and long-term memory stores, in shard order
+    (failed inputs have no events and are skipped).
+
+    Args:
+        shard_results (list): Output of run_sharded() / run_coordinator() with process_text_shard.
+        checkpoint_dir (str, optional): The run's checkpoint directory. Merged shards are recorded
+            there, so a rerun that reloads them from their checkpoints does not merge them again.
+
+    Returns:
+        int: Number of merged events.
+    """
+    from modules.memory import store_memories
+    from modules.long_term_memory import store_long_term_memories
+
+    merged_path = os.path.join(checkpoint_dir, MERGED_FILE) if checkpoint_dir else None
+    merged = set()
+    if merged_path and os.path.exists(merged_path):
+        with open(merged_path, "r", encoding="utf-8") as f:
+            merged = set(json.load(f))
+    count = 0
+    for results in shard_results:
+        results = [r for r in results or () if not r.get("error")]
+        if not results:
+            continue
+        digest = _events_digest(results) if merged_path else None
+        if digest in merged:
+            continue
+        store_memories([r["memory_event"] for r in results])
+        store_long_term_memories([r["long_term_event"] for r in results])
+        count += len(results)
+        if merged_path:
+            merged.add(digest)
+            os.makedirs(checkpoint_dir, exist_ok=True)
+            atomic_write_json(merged_path, sorted(merged))
+    return count
+
+
+# ---- multi-node coordinator ---------------------------------------------------
+
+class _Coordinator:
+    """
+    Hands out shards to remote workers over TCP, with leases so shards held by a dead worker are re-issued.
+    """
+
+    def __init__(self, shards, shard_fn, shared, checkpoints, max_retries, lease_seconds):
+        self.shard_fn = shard_fn
+        self.shared = shared
+        self.checkpoints = checkpoints
+        self.max_retries = max_retries
+        self.lease_seconds = lease_seconds
+        self.shards = {shard.shard_id: shard for shard in shards}
+        self.pending = [shard.shard_id for shard in shards]
+        self.leases = {}
+        self.attempts = {shard.shard_id: 0 for shard in shards}
+        self.results = {}
+        self.failures = {}
+        self.lock = threading.Lock()
+        self.done = threading.Event()
+
+    def get_job(self):
+        # Returns ("shard", shard_id, items, shard_fn, shared), ("wait",) or ("stop",).
+        with self.lock:
+            now = time.monotonic()
+            for shard_id, expires in list(self.leases.items()):
+                if now > expires:
+                    del self.leases[shard_id]
+                    self.pending.append(shard_id)
+            if self.pending:
+                shard_id = self.pending.pop(0)
+                self.leases[shard_id] = now + self.lease_seconds
+                return ("shard", shard_id, self.shards[shard_id].items, self.shard_fn, self.shared)
+            return ("stop",) if self.done.is_set() else ("wait",)
+
+    def complete(self, shard_id, result):
+        with self.lock:
+            if shard_id in self.results or shard_id not in self.leases:
+                return
+            del self.leases[shard_id]
+            self.checkpoints.save(self.shards[shard_id], result)
+            self.results[shard_id] = result
+            self._check_done()
+
+    def fail(self, shard_id, error):
+        with self.lock:
+            if shard_id not in self.leases:
+                return
+            del self.leases[shard_id]
+            self.attempts[shard_id] += 1
+            if self.attempts[shard_id] <= self.max_retries:
+                self.pending.append(shard_id)
+            else:
+                self.failures[shard_id] = error
+                self._check_done()
+
+    def _check_done(self):
+        if len(self.results) + len(self.failures) == len(self.shards):
+            self.done.set()
+
+
+class _CoordinatorManager(BaseManager):
+    pass
+
+
+def _parse_address(text):
+    host, _, port = text.rpartition(":")
+    return (host or "127.0.0.1", int(port))
+
+
+def _is_loopback(host):
+    try:
+        return ipaddress.ip_address(socket.gethostbyname(host)).is_loopback
+    except (OSError, ValueError):
+        return False
+
+
+def run_coordinator(items, address, authkey, shard_fn=DEFAULT_SHARD_FN, num_shards=None, checkpoint_dir=None,
+                    max_retries=2, lease_seconds=600, shared=None):
+    """
+    Serves shards to remote workers (see run_remote_worker) and waits until every shard is done.
+
+    Args:
+        items (list): Inputs to partition (paths must be readable by every worker node).
+        address (tuple): (host, port) to listen on.
+        authkey (bytes): Shared secret required from workers.
+        shard_fn (str): "module:function" importable on every worker node.
+        num_shards (int, optional): Number of shards (defaults to 64).
+        checkpoint_dir (str, optional): Checkpoint directory on the coordinator.
+        max_retries (int): Extra attempts for a failing shard.
+        lease_seconds (float): A shard not completed within this time is handed to another worker.
+        shared (object, optional): Read-only data sent with every shard.
+
+    Returns:
+        list: Shard results in shard (input) order.
+    """
+    if callable(shard_fn):
+        raise ValueError("Remote workers need shard_fn as an importable 'module:function' string.")
+    shards = partition(items, num_shards or 64)
+    checkpoints = ShardCheckpoints(checkpoint_dir, shard_fn)
+    coordinator = _Coordinator(shards, shard_fn, shared, checkpoints, max_retries, lease_seconds)
+    for shard in shards:
+        found, result = checkpoints.load(shard)
+        if found:
+            coordinator.results[shard.shard_id] = result
+            coordinator.pending.remove(shard.shard_id)
+    coordinator._check_done()
+
+    _CoordinatorManager.register("get_job", callable=coordinator.get_job)
+    _CoordinatorManager.register("complete", callable=coordinator.complete)
+    _CoordinatorManager.register("fail", callable=coordinator.fail)
+    if not authkey:
+        raise ValueError("run_coordinator needs a non-empty authkey.")
+    if not _is_loopback(address[0]):
+        logger.warning("Coordinator bound to non-loopback address %s: anyone who can reach it and holds the "
+                       "authkey can run code on the coordinator and its workers.", address[0])
+    manager = _CoordinatorManager(address=address, authkey=authkey)
+    server = manager.get_server()
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    print(f"[DISTRIBUTED] Coordinator listening on {address[0]}:{address[1]} with {len(shards)} shards.")
+    coordinator.done.wait()
+    # Give polling workers a moment to receive "stop" before the server goes away.
+    time.sleep(1.0)
+    if coordinator.failures:
+        raise ShardFailed(coordinator.failures)
+    return [coordinator.results[shard.shard_id] for shard in shards]
+
+
+def run_remote_worker(address, authkey, poll_seconds=1.0):
+    """
+    Connects to a coordinator and processes shards until told to stop.
+
+    Args:
+        address (tuple): Coordinator (host, port).
+        authkey (bytes): Shared secret.
+        poll_seconds (float): Wait between polls when no shard is available.
+
+    Returns:
+        int: Number of shards processed.
+    """
+    _CoordinatorManager.register("get_job")
+    _CoordinatorManager.register("complete")
+    _CoordinatorManager.register("fail")
+    manager = _CoordinatorManager(address=address, authkey=authkey)
+    manager.connect()
+    # One worker per node: it gets the node's whole CPU budget
+    init_worker(available_cpus())
+    processed = 0
+    while True:
+        try:
+            job = manager.get_job()._getvalue()
+        except (EOFError, ConnectionError):
+            return processed
+        if job[0] == "stop":
+            return processed
+        if job[0] == "wait":
+            time.sleep(poll_seconds)
+            continue
+        _, shard_id, items, shard_fn, shared = job
+        try:
+            result = resolve_shard_fn(shard_fn)(items, shared)
+        except Exception:
+            manager.fail(shard_id, traceback.format_exc())
+            continue
+        manager.complete(shard_id, result)
+        processed += 1
 
-def process_external_data(_):
-    headlines = fetch_hacker_news_headlines()
-    processed = preprocess_external_data(headlines)
-    return processed
 
 if __name__ == "__main__":
-    # Create a pool with 2 processes as an example
-    pool = multiprocessing.Pool(processes=2)
-    results = pool.map(process_external_data, range(2))
-    pool.close()
-    pool.join()
-    print("Distributed processing results:", results)
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Shard the GENESIS-1 pipeline across processes or machines.")
+    parser.add_argument("--inputs", help="Glob pattern of text files to process.")
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--shards", type=int, default=None)
+    parser.add_argument("--pin", action="store_true", help="Pin local worker processes to disjoint CPU sets.")
+    parser.add_argument("--checkpoint-dir", default=None)
+    parser.add_argument("--shard-fn", default=DEFAULT_SHARD_FN)
+    parser.add_argument("--serve", help="Run as coordinator on host:port.")
+    parser.add_argument("--connect", help="Run as a remote worker of the coordinator at host:port.")
+    parser.add_argument("--authkey", help="Shared secret; required with --connect, generated for --serve if omitted.")
+    args = parser.parse_args()
+    if args.connect and not args.authkey:
+        parser.error("--connect requires the coordinator's --authkey")
+    if args.serve and not args.authkey:
+        args.authkey = secrets.token_hex(16)
+        print(f"[DISTRIBUTED] Generated authkey (pass it to every worker with --authkey): {args.authkey}")
+    authkey = (args.authkey or "").encode("utf-8")
+
+    if args.connect:
+        count = run_remote_worker(_parse_address(args.connect), authkey)
+        print(f"[DISTRIBUTED] Worker processed {count} shards.")
+    else:
+        import main
+        inputs = sorted(glob.glob(args.inputs or "sample.txt", recursive=True))
+        # External data, feedback and incremental training happen once, here, not once per worker.
+        shared = main.run_shared_setup(ci_mode=True)
+        if args.serve:
+            results = run_coordinator(inputs, _parse_address(args.serve), authkey, args.shard_fn, args.shards,
+                                      args.checkpoint_dir, shared=shared)
+        else:
+            results = run_sharded(inputs, args.shard_fn, args.workers, args.shards, args.checkpoint_dir, shared=shared,
+                                  pin=args.pin)
+        if args.shard_fn == DEFAULT_SHARD_FN:
+            print(f"[DISTRIBUTED] Merged {merge_into_memory(results, args.checkpoint_dir)} events into memory.")
+        else:
+            print("Distributed processing results:", results)
@@ -5,48 +5,120 @@ This script demonstrates the complete data flow from text ingestion to multi-mod
 enhanced reasoning (using a knowledge graph), continuous learning, and long-term memory storage.
 """
 
+import argparse
+import asyncio
+import functools
+import glob
+import os
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import nullcontext
 from datetime import datetime
+from itertools import islice
 import numpy as np
 
 # Import previous modules
-from modules.perception import ingest_local_file, preprocess_text
-from modules.understanding import load_model, get_embeddings
+from modules.perception import ingest_local_file, ingest_local_file_async, preprocess_text
+from modules.understanding import load_model, get_embeddings, get_embeddings_batch
 from modules.learning import evaluate_decision, update_learning_model
 from modules.self_improvement import analyze_system, self_improve
-from modules.memory import create_memory_event, store_memory, retrieve_memory
-from modules.action import execute_action
-from modules.code_analyzer import analyze_code_performance, propose_code_enhancements
+from modules.memory import create_memory_event, store_memory, store_memories, store_memory_async, retrieve_memory
+from modules.action import execute_action, execute_actions, get_action_executor
+from modules.code_analyzer import analyze_code_performance, propose_code_enhancements, current_hotspot_report
 from modules.auto_code_generator import generate_code_enhancement
-from modules.external_data import fetch_hacker_news_headlines as fetch_headlines, preprocess_external_data
-from modules.user_interface import get_user_feedback
+from modules.external_data import get_headline_sync, preprocess_external_data
+from modules.user_interface import get_user_feedback, get_user_feedback_async
 from modules.incremental_learning import incremental_train
 
 # Import Phase 4 modules
-from modules.multi_modal import ingest_image, get_image_embedding, load_vision_model, ingest_numerical_data, preprocess_numerical_data
+from modules.model_snapshot import model_identity
+from modules.multi_modal import ingest_numerical_data, preprocess_numerical_data
+from modules.image_store import ImageEmbeddingStore, get_image_store
 from modules.knowledge_graph import create_knowledge_graph, query_knowledge_graph
-from modules.reasoning import enhanced_reasoning  # Use the enhanced reasoning function
-from modules.long_term_memory import store_long_term_memory, retrieve_long_term_memory, query_long_term_memory
+from modules.reasoning import enhanced_reasoning, enhanced_reasoning_batch  # Use the enhanced reasoning function
+from modules.concept_retrieval import ConceptIndex, text_model_embedder
+from modules.long_term_memory import store_long_term_memory, store_long_term_memories, store_long_term_memory_async, retrieve_long_term_memory, query_long_term_memory
+from modules.tiered_storage import run_write_async
+from modules.fusion import get_fusion_model, pool_numerical_features
+from modules.embedding_batch import EmbeddingBatch
+from modules.dedup import DedupIndex, get_dedup_index, simhash
+from modules.stage_cache import StageCache, get_stage_cache, source_file
+from modules.metrics import stage_timer, stage_summary, reset_metrics
+from modules.autotuner import load_runtime_config, apply_runtime_config
+from modules.resources import get_resource_manager
+from modules.structured_logging import (get_logger, configure_logging, parse_levels, request_context,
+                                        with_request_id, current_request_id, run_in_thread)
 
+logger = get_logger(__name__)
+
+IMAGE_EXTENSIONS = (".jpg", ".jpeg", ".png", ".bmp", ".gif")
+
+# Stage cache versions (see modules.stage_cache): bump a stage's version whenever its code or
+# configuration changes. Every stage downstream of it is invalidated along with it. The embedding
+# stages also take the model they ran as an input (model_snapshot.model_identity() for text, the
+# image store's vision fingerprint for images), so swapped or fine-tuned weights miss by themselves.
+STAGE_VERSIONS = {
+    "preprocess": 1,
+    "signature": 1,
+    "embed_text": "mean-pool",
+    "reasoning": 1,
+    "analysis": 1,
+    "embed_image": "avgpool",
+    "numerical": 1,
+}
+
+def _read_and_preprocess(text_filepath):
+    raw_text = ingest_local_file(text_filepath)
+    return raw_text, preprocess_text(raw_text)
+
+def _load_numerical(csv_path):
+    df = ingest_numerical_data(csv_path)
+    return preprocess_numerical_data(df) if df is not None else None
+
+def _signature(text, shingle_size):
+    return simhash(text[1], shingle_size)
+
+def _embed_image(image_path, vision_fingerprint):
+    # The fingerprint only keys the stage; the store embeds with the pipeline it names
+    return get_image_store().get(image_path)
+
+def _cached_stage(stage, fn, *inputs, stage_cache=None):
+    # Runs one memoized pipeline stage at its declared version (in the process-wide stage cache by default)
+    return (stage_cache or get_stage_cache()).run(stage, fn, *inputs, version=STAGE_VERSIONS[stage])
+
+def _training_text(external_delta, user_feedback):
+    # Incremental training only sees headlines that are new since the last sync
+    return " ".join(text for text in (external_delta, user_feedback) if text)
+
+@functools.lru_cache(maxsize=None)
+def _shared_text_model():
+    # One text model per process, shared by every integrate_system() and integrate_system_async() call.
+    return load_model()
+
+@with_request_id
 def integrate_system(text_filepath, image_path=None, csv_path=None, ci_mode=False):
     """
     Integrates all modules of GENESIS-1, including multi-modal processing, enhanced reasoning,
     and long-term memory storage.
     
     Steps:
-      1. Ingest and preprocess raw text.
+      1. Ingest and preprocess raw text. An unchanged input reuses its cached embedding and
+         decision, and a near-duplicate of an earlier input reuses that input's, skipping steps 2-3.
       2. Generate text embeddings using a pre-trained language model.
       3. Produce an enhanced reasoning decision that incorporates knowledge graph context.
       4. Evaluate the decision and update the learning model.
       5. Analyze system performance and perform self-improvement.
       6. Execute an action based on the decision.
       7. Log the event into short-term memory.
-      8. Retrieve memory logs and perform code analysis.
+      8. Retrieve memory logs, perform code analysis and rank hotspots of the latest profile.
       9. Auto-generate further code improvement suggestions.
      10. Fetch and preprocess external data.
      11. Get user feedback.
      12. Perform incremental training with new data.
      13. Process multi-modal inputs (image and numerical data) if provided.
-     14. Store an event in long-term memory and query historical events.
+     14. Fuse text, image and numerical features into one multi-modal vector.
+     15. Store an event in long-term memory and query historical events.
     
     Args:
         text_filepath (str): Path to the text file.
@@ -55,25 +127,55 @@ def integrate_system(text_filepath, image_path=None, csv_path=None, ci_mode=Fals
     
     Returns:
         dict: A dictionary containing outputs and event details.
+    
+    Stages with deterministic results (preprocessing, embeddings, reasoning, analysis and
+    numerical data) are memoized in the stage cache, keyed on their inputs and STAGE_VERSIONS.
     """
-    # Step 1: Ingest raw text from file and preprocess
-    raw_text = ingest_local_file(text_filepath)
-    tokens = preprocess_text(raw_text)
+    stage_cache = get_stage_cache()
+    
+    # Step 1: Ingest raw text from file and preprocess (keyed on the file's size and mtime)
+    text = _cached_stage("preprocess", _read_and_preprocess, source_file(text_filepath))
+    raw_text, tokens = text.value
     processed_text = " ".join(tokens)
     
-    # Step 2: Load language model and generate text embeddings
-    tokenizer, text_model = load_model()
-    text_embeddings = get_embeddings(processed_text, tokenizer, text_model)
+    # The language model is loaded once per process; cached embeddings are keyed on its identity
+    tokenizer, text_model = _shared_text_model()
+    text_identity = model_identity(text_model)
     
-    # Step 3: Produce enhanced reasoning decision (using a knowledge graph)
-    decision = enhanced_reasoning(text_embeddings, concept="Machine Learning")
+    # An unchanged input reuses its cached embedding and decision; a near-duplicate of an
+    # earlier input reuses that input's (either way, steps 2 and 3 are skipped)
+    embedded = stage_cache.lookup("embed_text", text, text_identity, version=STAGE_VERSIONS["embed_text"])
+    reasoned = stage_cache.lookup("reasoning", embedded, "Machine Learning", version=STAGE_VERSIONS["reasoning"])
+    duplicate_row = None
+    if embedded.hit and reasoned.hit:
+        text_embeddings = EmbeddingBatch(embedded.value)
+        decision = reasoned.value
+    else:
+        # Step 2: Generate text embeddings
+        dedup_index = get_dedup_index(text_identity)
+        signature = _cached_stage("signature", _signature, text, dedup_index.shingle_size).value
+        duplicate_row = dedup_index.lookup(signature)
+        if duplicate_row is not None:
+            embedding, decision = dedup_index.get(duplicate_row)
+            text_embeddings = EmbeddingBatch(embedding)
+        else:
+            # One buffer with cached statistics, shared read-only by every stage below
+            text_embeddings = EmbeddingBatch(get_embeddings(processed_text, tokenizer, text_model))
+            
+            # Step 3: Produce enhanced reasoning decision (using a knowledge graph and the concepts nearest to the input)
+            KG = create_knowledge_graph()
+            concept_index = ConceptIndex(KG, embedder=text_model_embedder(tokenizer, text_model))
+            decision = enhanced_reasoning(text_embeddings, "Machine Learning", KG, concept_index)
+            dedup_index.add(signature, text_embeddings.array, decision)
+        embedded = stage_cache.store(embedded, text_embeddings.array)
+        reasoned = stage_cache.store(reasoned, decision)
     
     # Step 4: Evaluate decision and update learning model
     reward = evaluate_decision(decision)
     update_learning_model(text_embeddings, decision, reward)
     
     # Step 5: Analyze system performance and trigger self-improvement
-    analysis_report = analyze_system(text_embeddings, decision, reward)
+    analysis_report = _cached_stage("analysis", analyze_system, embedded, reasoned, reward).value
     improvement_outcome = self_improve(analysis_report)
     
     # Step 6: Execute an action based on the decision
@@ -81,7 +183,7 @@ def integrate_system(text_filepath, image_path=None, csv_path=None, ci_mode=Fals
     
     # Step 7: Log the event into short-term memory
     input_summary = raw_text[:100] + "..." if len(raw_text) > 100 else raw_text
-    embedding_stats = {"mean": float(np.mean(text_embeddings)), "std": float(np.std(text_embeddings))}
+    embedding_stats = text_embeddings.summary()
     memory_event = create_memory_event(
         input_summary=input_summary,
         embedding_stats=embedding_stats,
@@ -95,16 +197,18 @@ def integrate_system(text_filepath, image_path=None, csv_path=None, ci_mode=Fals
     # Step 8: Retrieve memory logs and perform code analysis
     memory_logs = retrieve_memory()
     code_analysis_report = analyze_code_performance(memory_logs)
-    code_suggestion = propose_code_enhancements()
-    auto_code_suggestion = generate_code_enhancement("The system's tokenization process is identified as a bottleneck.")
+    hotspots = current_hotspot_report()
+    code_suggestion = propose_code_enhancements(hotspots)
+    auto_code_suggestion = generate_code_enhancement(hotspots or "The system's tokenization process is identified as a bottleneck.")
     
-    print("[CODE ANALYZER] Analysis Report:", code_analysis_report)
-    print("[CODE ANALYZER] Code Improvement Suggestion:", code_suggestion)
-    print("[AUTO CODE GENERATOR] Code Improvement Suggestion:", auto_code_suggestion)
+    logger.info("Code analysis report: %s", code_analysis_report)
+    logger.info("Code improvement suggestion: %s", code_suggestion)
+    logger.info("Auto-generated code improvement suggestion: %s", auto_code_suggestion)
     
-    # Step 9: Fetch external data and preprocess it
-    headlines = fetch_headlines()
-    external_data = preprocess_external_data(headlines)
+    # Step 9: Sync external data (only new or changed headlines are fetched) and preprocess it
+    headlines = get_headline_sync().sync()
+    external_data = preprocess_external_data(headlines.headlines)
+    external_delta = preprocess_external_data(headlines.delta)
     
     # Step 10: Get user feedback
     # Update user feedback call
@@ -112,28 +216,32 @@ def integrate_system(text_filepath, image_path=None, csv_path=None, ci_mode=Fals
     
     # Update file handling for CI
     if ci_mode:
-        print("[CI MODE] Using test files from test_files/ directory")  
+        logger.info("CI mode: using test files from test_files/ directory")
       
-    # Step 11: Perform incremental training with external data and feedback
-    new_training_data = external_data + " " + user_feedback
+    # Step 11: Perform incremental training with new external data and feedback
+    new_training_data = _training_text(external_delta, user_feedback)
     incremental_train_success = incremental_train(new_training_data)
     
     # Step 12: Multi-modal integration: process image if provided
+    # (served from the content-hash keyed embedding store; the vision model only loads on a miss)
     image_embedding = None
     if image_path:
-        image = ingest_image(image_path)
-        if image:
-            vision_model, vision_transform = load_vision_model()
-            image_embedding = get_image_embedding(image, vision_model, vision_transform)
+        image_embedding = _cached_stage("embed_image", _embed_image, source_file(image_path),
+                                        get_image_store().fingerprint).value
     
     # Step 13: Multi-modal integration: process numerical data if provided
     numerical_data = None
     if csv_path:
-        df = ingest_numerical_data(csv_path)
-        if df is not None:
-            numerical_data = preprocess_numerical_data(df)
+        numerical_data = _cached_stage("numerical", _load_numerical, source_file(csv_path)).value
+    
+    # Step 14: Fuse text, image and numerical features into one multi-modal vector
+    fused_embedding = get_fusion_model().fuse(
+        text=text_embeddings,
+        image=image_embedding,
+        numerical=pool_numerical_features(numerical_data)
+    )
     
-    # Step 14: Store event in long-term memory with multi-modal details
+    # Step 15: Store event in long-term memory with multi-modal details
     long_term_event = {
         "timestamp": datetime.utcnow().isoformat(),
         "input_summary": input_summary,
@@ -142,13 +250,166 @@ def integrate_system(text_filepath, image_path=None, csv_path=None, ci_mode=Fals
         "multi_modal": {
             "image_embedding_shape": image_embedding.shape if image_embedding is not None else None,
             "numerical_data_shape": numerical_data.shape if numerical_data is not None else None
-        }
+        },
+        "fused_embedding": fused_embedding.tolist()
     }
     store_long_term_memory(long_term_event)
     long_term_events = query_long_term_memory("Esrom")  # Example query term
     
     return {
-        "text_embeddings": text_embeddings,
+        "text_embeddings": text_embeddings.array,
+        "decision": decision,
+        "reward": reward,
+        "analysis_report": analysis_report,
+        "improvement_outcome": improvement_outcome,
+        "action_outcome": action_outcome,
+        "memory_event": memory_event,
+        "code_analysis_report": code_analysis_report,
+        "code_suggestion": code_suggestion,
+        "auto_code_suggestion": auto_code_suggestion,
+        "external_data": external_data,
+        "external_delta": external_delta,
+        "user_feedback": user_feedback,
+        "incremental_train_success": incremental_train_success,
+        "image_embedding": image_embedding,
+        "numerical_data": numerical_data,
+        "fused_embedding": fused_embedding,
+        "long_term_events": long_term_events,
+        "deduplicated": duplicate_row is not None,
+        "request_id": current_request_id()
+    }
+
+@with_request_id
+async def integrate_system_async(text_filepath, image_path=None, csv_path=None, ci_mode=False,
+                                 feedback_provider=None, text_model=None, executor=None):
+    """
+    Async version of integrate_system() for embedding GENESIS-1 in an asyncio application.
+    
+    I/O stages are coroutines: the text file is read with aiofiles (or a worker thread), headlines are
+    fetched with concurrent async HTTP, memory writes go through the shared store writer thread, and
+    feedback comes from an awaitable provider. CPU/torch stages run on `executor`. Independent stages
+    (text embedding, image embedding, numerical data, external data and feedback) run concurrently,
+    and many pipelines can share one event loop without blocking it. The process-wide torch thread
+    count is set to one stage's share of the cores whenever a CPU stage starts or finishes
+    (modules.resources).
+    
+    Args:
+        text_filepath (str): Path to the text file.
+        image_path (str, optional): Path to an image file.
+        csv_path (str, optional): Path to a CSV file with numerical data.
+        ci_mode (bool): Skip user feedback.
+        feedback_provider (callable, optional): `async def provider() -> str`
+            (defaults to user_interface.get_user_feedback_async).
+        text_model (tuple, optional): A preloaded (tokenizer, model); by default one model is
+            loaded per process and shared.
+        executor (concurrent.futures.Executor, optional): Executor for CPU stages (defaults to the loop's).
+    
+    Returns:
+        dict: The same keys as integrate_system().
+    """
+    loop = asyncio.get_running_loop()
+    # Executor threads run in a copy of this context, so their log records carry the request ID
+    # Each stage runs as a budgeted compute stage, so concurrent pipelines split the cores between them
+    resources = get_resource_manager()
+    run = lambda fn, *args: run_in_thread(loop, resources.call, fn, *args, executor=executor)
+
+    async def embed_text():
+        if duplicate_row is not None:
+            return EmbeddingBatch(dedup_index.get(duplicate_row)[0])
+        return EmbeddingBatch(await run(get_embeddings, processed_text, tokenizer, model))
+
+    async def load_numerical():
+        df = await run(ingest_numerical_data, csv_path)
+        return await run(preprocess_numerical_data, df) if df is not None else None
+
+    async def no_result():
+        return None
+
+    async def feedback():
+        if ci_mode:
+            return ""
+        return await (feedback_provider or get_user_feedback_async)()
+
+    # Step 1: Ingest raw text from file and preprocess
+    raw_text = await ingest_local_file_async(text_filepath)
+    tokens = await run(preprocess_text, raw_text)
+    processed_text = " ".join(tokens)
+    tokenizer, model = text_model or await run(_shared_text_model)
+    dedup_index = get_dedup_index(await run(model_identity, model))
+    signature = dedup_index.signature(tokens)
+    duplicate_row = dedup_index.lookup(signature)
+    
+    # Steps 2, 9, 10, 12, 13: independent stages run concurrently
+    text_embeddings, headlines, user_feedback, image_embedding, numerical_data = await asyncio.gather(
+        embed_text(),
+        get_headline_sync().sync_async(),
+        feedback(),
+        run(get_image_store().get, image_path) if image_path else no_result(),
+        load_numerical() if csv_path else no_result(),
+    )
+    external_data = preprocess_external_data(headlines.headlines)
+    external_delta = preprocess_external_data(headlines.delta)
+    
+    # Steps 3-6: reasoning, learning, self-improvement and action
+    if duplicate_row is not None:
+        decision = dedup_index.get(duplicate_row)[1]
+    else:
+        KG = create_knowledge_graph()
+        concept_index = await run(ConceptIndex, KG, None, text_model_embedder(tokenizer, model))
+        decision = await run(enhanced_reasoning, text_embeddings, "Machine Learning", KG, concept_index)
+        await run_write_async(dedup_index.add, signature, text_embeddings.array, decision)
+    reward = evaluate_decision(decision)
+    await run(update_learning_model, text_embeddings, decision, reward)
+    analysis_report = analyze_system(text_embeddings, decision, reward)
+    improvement_outcome = self_improve(analysis_report)
+    action_outcome = await run(execute_action, decision)
+    
+    # Step 7: Log the event into short-term memory
+    input_summary = raw_text[:100] + "..." if len(raw_text) > 100 else raw_text
+    memory_event = create_memory_event(
+        input_summary=input_summary,
+        embedding_stats=text_embeddings.summary(),
+        decision=decision,
+        reward=reward,
+        analysis_report=analysis_report,
+        improvement_outcome=improvement_outcome + " | " + action_outcome
+    )
+    await store_memory_async(memory_event)
+    
+    # Step 8: Code analysis over the memory logs (read on the writer thread, so it sees the write above)
+    memory_logs = await run_write_async(retrieve_memory)
+    code_analysis_report = analyze_code_performance(memory_logs)
+    hotspots = await run(current_hotspot_report)
+    code_suggestion = propose_code_enhancements(hotspots)
+    auto_code_suggestion = generate_code_enhancement(hotspots or "The system's tokenization process is identified as a bottleneck.")
+    
+    # Step 11: Incremental training with new external data and feedback
+    incremental_train_success = await run(incremental_train, _training_text(external_delta, user_feedback))
+    
+    # Step 14: Fuse text, image and numerical features
+    fused_embedding = get_fusion_model().fuse(
+        text=text_embeddings,
+        image=image_embedding,
+        numerical=pool_numerical_features(numerical_data)
+    )
+    
+    # Step 15: Store event in long-term memory and query historical events
+    long_term_event = {
+        "timestamp": datetime.utcnow().isoformat(),
+        "input_summary": input_summary,
+        "decision": decision,
+        "reward": reward,
+        "multi_modal": {
+            "image_embedding_shape": image_embedding.shape if image_embedding is not None else None,
+            "numerical_data_shape": numerical_data.shape if numerical_data is not None else None
+        },
+        "fused_embedding": fused_embedding.tolist()
+    }
+    await store_long_term_memory_async(long_term_event)
+    long_term_events = await run_write_async(query_long_term_memory, "Esrom")
+    
+    return {
+        "text_embeddings": text_embeddings.array,
         "decision": decision,
         "reward": reward,
         "analysis_report": analysis_report,
@@ -159,13 +420,338 @@ def integrate_system(text_filepath, image_path=None, csv_path=None, ci_mode=Fals
         "code_suggestion": code_suggestion,
         "auto_code_suggestion": auto_code_suggestion,
         "external_data": external_data,
+        "external_delta": external_delta,
         "user_feedback": user_feedback,
         "incremental_train_success": incremental_train_success,
         "image_embedding": image_embedding,
         "numerical_data": numerical_data,
-        "long_term_events": long_term_events
+        "fused_embedding": fused_embedding,
+        "long_term_events": long_term_events,
+        "deduplicated": duplicate_row is not None,
+        "request_id": current_request_id()
+    }
+
+def _prepare_input(item, shingle_size=3, stage_cache=None):
+    """
+    Reads and preprocesses one integrate_many() input (runs on a worker thread).
+    
+    Args:
+        item (str or tuple): A text path, or a (text_path, image_path, csv_path) tuple.
+        shingle_size (int): Shingle size of the near-duplicate index.
+        stage_cache (StageCache, optional): Defaults to the process-wide stage cache.
+    
+    Returns:
+        dict: Raw and processed text, the "preprocess" stage result (the key of its downstream
+              stages), its near-duplicate signature, the image path and the normalized numerical data.
+    """
+    if isinstance(item, str):
+        item = (item,)
+    text_filepath, image_path, csv_path = (tuple(item) + (None, None))[:3]
+    text = _cached_stage("preprocess", _read_and_preprocess, source_file(text_filepath), stage_cache=stage_cache)
+    raw_text, tokens = text.value
+    numerical_data = None
+    if csv_path:
+        numerical_data = _cached_stage("numerical", _load_numerical, source_file(csv_path), stage_cache=stage_cache).value
+    return {
+        "text_filepath": text_filepath,
+        "raw_text": raw_text,
+        "processed_text": " ".join(tokens),
+        "text": text,
+        "signature": _cached_stage("signature", _signature, text, shingle_size, stage_cache=stage_cache).value,
+        "image_path": image_path,
+        "numerical_data": numerical_data,
+    }
+
+def run_shared_setup(ci_mode=False):
+    """
+    Performs the once-per-run steps of integrate_many(): external data, feedback and incremental training.
+    Compute this once and pass it to several integrate_many() calls (e.g. one per shard) to avoid repeating them.
+    
+    Args:
+        ci_mode (bool): Skip interactive user feedback.
+    
+    Returns:
+        dict: external_data, external_delta, user_feedback and incremental_train_success.
+    """
+    headlines = get_headline_sync().sync()
+    external_delta = preprocess_external_data(headlines.delta)
+    user_feedback = get_user_feedback() if not ci_mode else ""
+    return {
+        "external_data": preprocess_external_data(headlines.headlines),
+        "external_delta": external_delta,
+        "user_feedback": user_feedback,
+        "incremental_train_success": incremental_train(_training_text(external_delta, user_feedback)),
     }
 
+def integrate_many(inputs, batch_size=16, workers=4, ci_mode=False, concept="Machine Learning",
+                   shared=None, store_events=True, trial=False):
+    """
+    Runs the GENESIS-1 pipeline over many inputs, sharing setup and batching every stage.
+    
+    Compared with calling integrate_system() per file:
+      - models, the knowledge graph, external data, user feedback and incremental training
+        are set up once per run;
+      - text embeddings are computed in batches, image embeddings come from the persistent
+        image store (only unseen images are embedded), reasoning is vectorized per batch,
+        and memory writes are grouped into one write per batch;
+      - near-duplicate inputs reuse the embedding and decision of the input they repeat;
+      - file reading and preprocessing for the next batch overlap with model inference
+        on a thread pool.
+    Results are yielded as they are produced, so memory use stays bounded by batch_size.
+    Code analysis over the memory logs is a per-run diagnostic and is left to integrate_system().
+    An input that cannot be read or preprocessed is logged and yields an error result in its place;
+    the rest of its batch goes on.
+    
+    Args:
+        inputs (iterable): Text paths or (text_path, image_path, csv_path) tuples.
+        batch_size (int): Inputs processed per batch.
+        workers (int): Threads used for file reading and preprocessing (capped by the CPU budget).
+        ci_mode (bool): Skip interactive user feedback.
+        concept (str): Knowledge graph concept used by enhanced reasoning.
+        shared (dict, optional): Output of run_shared_setup(), optionally with a preloaded
+            "text_model" (tokenizer, model) tuple; computed here if omitted.
+        store_events (bool): Write memory events per batch. When False, the caller is responsible
+            for storing each result's memory_event and long_term_event.
+        trial (bool): Autotuning trial: the stage cache, dedup index and image store are scratch
+            copies discarded at the end, and no actions, learning updates or memory events happen,
+            so every trial computes the same stages and leaves no trace.
+    
+    Yields:
+        dict: Per-input outputs in input order (a subset of integrate_system()'s result keys, with
+              "error": None), or {"text_filepath", "error", "request_id"} for a failed input.
+    """
+    # One-time setup shared by every input
+    shared = shared or run_shared_setup(ci_mode)
+    tokenizer, text_model = shared.get("text_model") or load_model()
+    KG = create_knowledge_graph()
+    concept_index = ConceptIndex(KG, embedder=text_model_embedder(tokenizer, text_model))
+    fusion_model = get_fusion_model()
+    image_store = get_image_store()
+    text_identity = model_identity(text_model)
+    dedup_index = get_dedup_index(text_identity)
+    stage_cache = get_stage_cache()
+    scratch = tempfile.TemporaryDirectory(prefix="genesis_trial_") if trial else None
+    if trial:
+        store_events = False
+        stage_cache = StageCache(directory=None)
+        dedup_index = DedupIndex(os.path.join(scratch.name, "dedup"), model_id=text_identity)
+        image_store = ImageEmbeddingStore(os.path.join(scratch.name, "images"), fingerprint=image_store.fingerprint,
+                                          embedder=image_store.embedder)
+    external_data = shared["external_data"]
+    external_delta = shared.get("external_delta", "")
+    user_feedback = shared["user_feedback"]
+    incremental_train_success = shared["incremental_train_success"]
+
+    iterator = iter(inputs)
+    # Reader threads mostly wait on files; inference on this thread uses the torch budget
+    with ThreadPoolExecutor(max_workers=get_resource_manager().pool_workers(workers, io_bound=True)) as pool, \
+            scratch or nullcontext():
+        submit = lambda batch: [(item, pool.submit(_prepare_input, item, dedup_index.shingle_size, stage_cache))
+                                for item in batch]
+        pending = submit(islice(iterator, batch_size))
+        while pending:
+            prepared, positions, failures = [], [], {}
+            with stage_timer("prepare_wait", items=len(pending)):
+                for position, (item, future) in enumerate(pending):
+                    try:
+                        prepared.append(future.result())
+                        positions.append(position)
+                    except Exception as e:  # one unreadable input must not abort its batch
+                        failures[position] = _failed_input(item, e)
+            # Start reading the next batch while this one is on the models
+            pending = submit(islice(iterator, batch_size))
+            n = len(prepared)
+            if not n:
+                yield from failures.values()
+                continue
+
+            # Unchanged inputs (cached stages) and near-duplicates (of stored inputs or of earlier
+            # inputs in this batch) skip embedding and reasoning
+            with stage_timer("dedup", items=n):
+                embedded = [stage_cache.lookup("embed_text", p["text"], text_identity, version=STAGE_VERSIONS["embed_text"])
+                            for p in prepared]
+                reasoned = [stage_cache.lookup("reasoning", e, concept, version=STAGE_VERSIONS["reasoning"])
+                            for e in embedded]
+                embeddings = np.empty((n, dedup_index.dim), dtype=np.float32)
+                decisions = [None] * n
+                missed = []
+                for i in range(n):
+                    if embedded[i].hit and reasoned[i].hit:
+                        embeddings[i], decisions[i] = embedded[i].value, reasoned[i].value
+                    else:
+                        missed.append(i)
+                signatures = {i: prepared[i]["signature"] for i in missed}
+                missed_rows, missed_aliases = dedup_index.lookup_many([signatures[i] for i in missed])
+                rows, aliases = [None] * n, [None] * n
+                for i, row, alias in zip(missed, missed_rows, missed_aliases):
+                    rows[i] = row
+                    aliases[i] = None if alias is None else missed[alias]
+                fresh = [i for i in missed if rows[i] is None and aliases[i] is None]
+                for i, row in enumerate(rows):
+                    if row is not None:
+                        embeddings[i], decisions[i] = dedup_index.get(row)
+            if fresh:
+                with stage_timer("embed_text", items=len(fresh)):
+                    embeddings[fresh] = get_embeddings_batch([prepared[i]["processed_text"] for i in fresh], tokenizer, text_model, batch_size)
+                with stage_timer("reasoning", items=len(fresh)):
+                    fresh_decisions = enhanced_reasoning_batch(embeddings[fresh], concept, KG, concept_index)
+                for i, decision in zip(fresh, fresh_decisions):
+                    decisions[i] = decision
+                dedup_index.add_many([signatures[i] for i in fresh], embeddings[fresh], fresh_decisions)
+            for i, alias in enumerate(aliases):
+                if alias is not None:
+                    embeddings[i], decisions[i] = embeddings[alias], decisions[alias]
+            for i in missed:
+                stage_cache.store(embedded[i], embeddings[i].copy())
+                stage_cache.store(reasoned[i], decisions[i])
+            text_matrix = EmbeddingBatch(embeddings)
+            text_matrix.stats()  # one pass; the rows below reuse the cached per-row statistics
+
+            image_rows = [i for i, p in enumerate(prepared) if p["image_path"]]
+            image_matrix = np.full((n, image_store.dim), np.nan, dtype=np.float32)
+            if image_rows:
+                with stage_timer("embed_image", items=len(image_rows)):
+                    image_matrix[image_rows] = image_store.get_many([prepared[i]["image_path"] for i in image_rows], batch_size)
+            image_embeddings = {i: image_matrix[i] for i in image_rows if not np.isnan(image_matrix[i]).all()}
+            with stage_timer("fusion", items=n):
+                numerical_matrix = np.full((n, fusion_model.input_dims["numerical"]), np.nan, dtype=np.float32)
+                for i, item in enumerate(prepared):
+                    pooled = pool_numerical_features(item["numerical_data"])
+                    if pooled is not None:
+                        numerical_matrix[i] = pooled
+                fused_matrix = fusion_model.fuse_batch(text_matrix, image_matrix, numerical_matrix)
+
+            if not trial:
+                with stage_timer("action", items=n):
+                    actions = execute_actions(decisions)
+
+            results, memory_events, long_term_events = [], [], []
+            for i, item in enumerate(prepared):
+                with request_context() as request_id:
+                    text_embeddings = text_matrix[i]
+                    decision = decisions[i]
+                    reward = evaluate_decision(decision)
+                    if not trial:
+                        update_learning_model(text_embeddings, decision, reward)
+                    analysis_report = analyze_system(text_embeddings, decision, reward)
+                    improvement_outcome = self_improve(analysis_report)
+                    if trial:
+                        action_outcome = "No action taken (tuning trial)."
+                    else:
+                        action_outcome = actions[i].result or f"{actions[i].action} action failed ({actions[i].status})."
+
+                    raw_text = item["raw_text"]
+                    input_summary = raw_text[:100] + "..." if len(raw_text) > 100 else raw_text
+                    memory_event = create_memory_event(
+                        input_summary=input_summary,
+                        embedding_stats=text_embeddings.summary(),
+                        decision=decision,
+                        reward=reward,
+                        analysis_report=analysis_report,
+                        improvement_outcome=improvement_outcome + " | " + action_outcome
+                    )
+                    image_embedding = image_embeddings.get(i)
+                    numerical_data = item["numerical_data"]
+                    long_term_event = {
+                        "timestamp": datetime.utcnow().isoformat(),
+                        "input_summary": input_summary,
+                        "decision": decision,
+                        "reward": reward,
+                        "multi_modal": {
+                            "image_embedding_shape": image_embedding.shape if image_embedding is not None else None,
+                            "numerical_data_shape": numerical_data.shape if numerical_data is not None else None
+                        },
+                        "fused_embedding": fused_matrix[i].tolist()
+                    }
+                    memory_events.append(memory_event)
+                    long_term_events.append(long_term_event)
+                    results.append({
+                        "text_filepath": item["text_filepath"],
+                        "text_embeddings": text_embeddings.array,
+                        "decision": decision,
+                        "reward": reward,
+                        "analysis_report": analysis_report,
+                        "improvement_outcome": improvement_outcome,
+                        "action_outcome": action_outcome,
+                        "memory_event": memory_event,
+                        "external_data": external_data,
+                        "external_delta": external_delta,
+                        "user_feedback": user_feedback,
+                        "incremental_train_success": incremental_train_success,
+                        "image_embedding": image_embedding,
+                        "numerical_data": numerical_data,
+                        "fused_embedding": fused_matrix[i],
+                        "long_term_event": long_term_event,
+                        "deduplicated": rows[i] is not None or aliases[i] is not None,
+                        "request_id": request_id,
+                        "error": None,
+                    })
+
+            # Grouped memory writes: one per store per batch
+            if store_events:
+                with stage_timer("memory_write", items=n):
+                    store_memories(memory_events)
+                    store_long_term_memories(long_term_events)
+            for position, result in zip(positions, results):
+                failures[position] = result
+            yield from (failures[position] for position in sorted(failures))
+
+def _failed_input(item, error):
+    # The result integrate_many() yields for an input it could not read or preprocess
+    text_filepath = item if isinstance(item, str) else tuple(item)[0]
+    with request_context() as request_id:
+        logger.error("Skipping %s: %s: %s", text_filepath, type(error).__name__, error,
+                     extra={"request_id": request_id, "text_filepath": text_filepath})
+    return {"text_filepath": text_filepath, "error": f"{type(error).__name__}: {error}", "request_id": request_id}
+
+def tuning_objective(sample, shared, concept="Machine Learning"):
+    """
+    Builds an autotuner objective that times integrate_many() over a fixed sample of inputs.
+    
+    Args:
+        sample (list): Inputs for the trial runs (a few batches' worth is enough).
+        shared (dict): Output of run_shared_setup() with a preloaded "text_model", so trials
+            measure the batched stages only.
+        concept (str): Knowledge graph concept used by enhanced reasoning.
+    
+    Returns:
+        callable: (config, budget) -> (seconds per input, {"stages": per-stage metrics}),
+        running `budget` passes over the sample. Each pass is an integrate_many() trial: it starts
+        from empty caches and never acts or writes to memory.
+    """
+    sample = list(sample)
+
+    def objective(config, budget):
+        apply_runtime_config(config)
+        reset_metrics()
+        start = time.perf_counter()
+        count = 0
+        for _ in range(budget):
+            for _ in integrate_many(sample, config["batch_size"], config["workers"], concept=concept,
+                                    shared=shared, trial=True):
+                count += 1
+        return (time.perf_counter() - start) / max(count, 1), {"stages": stage_summary()}
+    return objective
+
+def discover_inputs(pattern):
+    """
+    Expands a directory or glob pattern into integrate_many() inputs.
+    Each .txt file is paired with a same-named image and/or CSV file next to it, if present.
+    
+    Args:
+        pattern (str): A directory (searched recursively for .txt files) or a glob pattern.
+    
+    Yields:
+        tuple: (text_path, image_path or None, csv_path or None)
+    """
+    if os.path.isdir(pattern):
+        pattern = os.path.join(pattern, "**", "*.txt")
+    for text_path in sorted(glob.iglob(pattern, recursive=True)):
+        stem = os.path.splitext(text_path)[0]
+        image_path = next((stem + ext for ext in IMAGE_EXTENSIONS if os.path.exists(stem + ext)), None)
+        csv_path = stem + ".csv" if os.path.exists(stem + ".csv") else None
+        yield (text_path, image_path, csv_path)
+
 def main(ci_mode=False):
     print("Initializing full GENESIS-1 integration with Phase 4: Multi-Domain Reasoning & Generalization...")
     
@@ -190,6 +776,7 @@ def main(ci_mode=False):
     print("[AUTO CODE GENERATOR] Code Improvement Suggestion:", result["auto_code_suggestion"])
     print("[EXTERNAL DATA] Preprocessed External Data:")
     print(result["external_data"])
+    print("[EXTERNAL DATA] New Since Last Sync:", result["external_delta"] or "(none)")
     print("[USER FEEDBACK] Feedback Received:", result["user_feedback"])
     print("[INCREMENTAL LEARNING] Training Success:", result["incremental_train_success"])
     if result["image_embedding"] is not None:
@@ -198,5 +785,57 @@ def main(ci_mode=False):
         print("[MULTI-MODAL] Numerical Data Shape:", result["numerical_data"].shape)
     print("[LONG-TERM MEMORY] Queried Events:", result["long_term_events"])
 
+def cli(argv=None):
+    """
+    Command-line entry point.
+    
+    Without --inputs, runs the single-file demo (main()). With --inputs, runs integrate_many()
+    over a directory or glob pattern, e.g.:
+        python main.py --inputs "corpus/**/*.txt" --batch-size 32 --workers 8 --ci
+    """
+    parser = argparse.ArgumentParser(description="Run the GENESIS-1 pipeline.")
+    parser.add_argument("--inputs", help="Directory or glob pattern of text files to process in batch.")
+    parser.add_argument("--batch-size", type=int, help="Defaults to the tuned runtime configuration.")
+    parser.add_argument("--workers", type=int, help="Defaults to the tuned runtime configuration.")
+    parser.add_argument("--ci", action="store_true", help="Non-interactive mode (no user feedback prompt).")
+    parser.add_argument("--autotune", type=int, metavar="N",
+                        help="Before processing, tune the runtime configuration on the first N inputs.")
+    parser.add_argument("--seed", type=int, default=0, help="Autotuner seed.")
+    parser.add_argument("--log-level", help='Log levels, e.g. "INFO" or "WARNING,memory=DEBUG" (overrides GENESIS_LOG_LEVEL).')
+    args = parser.parse_args(argv)
+    if args.log_level:
+        level, levels = parse_levels(args.log_level)
+        configure_logging(level=level, levels=levels)
+
+    # Load the runtime configuration persisted by the autotuner
+    config = load_runtime_config()
+    apply_runtime_config(config)
+
+    if not args.inputs:
+        main(ci_mode=args.ci)
+        return
+    shared = run_shared_setup(args.ci)
+    shared["text_model"] = load_model()
+    if args.autotune:
+        sample = list(islice(discover_inputs(args.inputs), args.autotune))
+        # --autotune is an explicit request, so it does not wait for a negative-reward report
+        outcome = self_improve({"improvement_needed": True}, objective=tuning_objective(sample, shared), seed=args.seed)
+        print("[AUTOTUNER]", outcome)
+        config = load_runtime_config()
+        apply_runtime_config(config)
+    batch_size = args.batch_size or config["batch_size"]
+    workers = args.workers or config["workers"]
+    count = failed = 0
+    for result in integrate_many(discover_inputs(args.inputs), batch_size, workers, ci_mode=args.ci, shared=shared):
+        count += 1
+        if result["error"]:
+            failed += 1
+            continue
+        logger.info("%s: reward=%s | %s", result["text_filepath"], result["reward"], result["action_outcome"],
+                    extra={"request_id": result["request_id"], "text_filepath": result["text_filepath"], "reward": result["reward"]})
+    print(f"[BATCH] Processed {count} inputs ({failed} failed).")
+    print("[ACTIONS]", get_action_executor().stats())
+    print("[STAGE CACHE]", {stage: round(c["hit_rate"], 3) for stage, c in get_stage_cache().stats()["stages"].items()})
+
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    cli()
\ No newline at end of file
@@ -2,9 +2,45 @@
 """
 Action Module:
 Executes actions based on the decisions produced by the Reasoning Module.
-For this prototype, actions are simulated by logging output messages.
+For this prototype, actions are simulated by their handlers' result messages.
+
+Action types come from the action registry built from ACTIONS_FILE (see modules/action_executor.py).
+execute_action() runs one decision directly; execute_actions() (or execute_actions_async()
+from a coroutine) runs a batch through the rate-limited executor and appends it to the action log.
 """
 
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+
+from modules.action_executor import ActionRegistry, ActionExecutor, ActionLog
+from modules.structured_logging import get_logger
+
+logger = get_logger(__name__)
+
+ACTIONS_FILE = "actions.json"
+
+_registry = None
+_executor = None
+
+def get_action_registry():
+    """
+    Returns the process-wide action registry built from ACTIONS_FILE.
+    """
+    global _registry
+    if _registry is None or _registry.path != ACTIONS_FILE:
+        _registry = ActionRegistry.from_log(ACTIONS_FILE)
+    return _registry
+
+def get_action_executor():
+    """
+    Returns the process-wide action executor, logging to ACTIONS_FILE.
+    """
+    global _executor
+    registry = get_action_registry()
+    if _executor is None or _executor.registry is not registry:
+        _executor = ActionExecutor(registry, ActionLog(ACTIONS_FILE))
+    return _executor
+
 def execute_action(decision):
     """
     Executes an action based on the provided reasoning decision.
@@ -15,18 +51,47 @@ def execute_action(decision):
     Returns:
         str: A confirmation message indicating the executed action.
     """
-    print("[ACTION] Executing action based on decision:")
-    print(">>", decision)
+    logger.debug("Executing action based on decision: %s", decision)
+    action_result = get_action_registry().dispatch(decision).handler(decision)
+    logger.debug("Action result: %s", action_result)
+    return action_result
+
+async def execute_actions_async(decisions, idempotency_keys=None):
+    """
+    Executes a batch of decisions through the action executor, on the running event loop.
     
-    # Simulated mapping: if decision mentions "Positive", perform a positive action;
-    # otherwise, perform a negative or cautionary action.
-    if "Positive" in decision:
-        action_result = "Positive action executed: Affirmative tasks initiated."
-    else:
-        action_result = "Negative action executed: Caution tasks initiated."
+    Args:
+        decisions (list): Reasoning decisions.
+        idempotency_keys (list, optional): One key (or None) per decision; a key seen before
+                                           returns the earlier result without acting again.
     
-    print("[ACTION] Action result:", action_result)
-    return action_result
+    Returns:
+        list: ActionResult tuples in input order.
+    """
+    executor = get_action_executor()
+    results = await executor.execute_many(decisions, idempotency_keys)
+    logger.debug("Executed %d actions: %s", len(results), executor.stats())
+    return results
+
+def execute_actions(decisions, idempotency_keys=None):
+    """
+    Executes a batch of decisions through the action executor (from synchronous code).
+    Coroutines should await execute_actions_async() instead; when called from a thread that is
+    already running an event loop, the batch runs on its own loop in a helper thread.
+    
+    Args:
+        decisions (list): Reasoning decisions.
+        idempotency_keys (list, optional): One key (or None) per decision.
+    
+    Returns:
+        list: ActionResult tuples in input order.
+    """
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return asyncio.run(execute_actions_async(decisions, idempotency_keys))
+    with ThreadPoolExecutor(max_workers=1) as pool:
+        return pool.submit(asyncio.run, execute_actions_async(decisions, idempotency_keys)).result()
 
 def test_action_module():
     """
@@ -37,4 +102,4 @@ def test_action_module():
     print("Test Action Result:", result)
 
 if __name__ == "__main__":
-    test_action_module()
\ No newline at end of file
+    test_action_module()
@@ -0,0 +1,363 @@
+# modules/action_executor.py
+"""
+Action Executor Module:
+A registry of typed actions and an asynchronous executor that runs them under limits.
+
+The registry maps every action type recorded in the action log (actions.json) to its handler
+and limits in one dictionary, so dispatching a decision is a keyword route plus a dict lookup.
+The executor runs decisions in batches:
+  - a global cap on in-flight actions, plus a per-type concurrency limit;
+  - a token bucket per type (rate actions/s, `burst` at once);
+  - a per-type timeout;
+  - idempotency keys, so a retried decision returns the first result instead of acting twice.
+Finished actions are appended to the log in batches, without rewriting the file.
+"""
+
+import asyncio
+import json
+import os
+import statistics
+import threading
+import time
+from collections import OrderedDict, deque, namedtuple
+from datetime import datetime
+
+from modules.tiered_storage import FileLock
+from modules.structured_logging import get_logger, run_in_thread
+
+logger = get_logger(__name__)
+
+ActionType = namedtuple("ActionType", ["name", "description", "handler", "concurrency", "rate", "burst", "timeout"])
+ActionResult = namedtuple("ActionResult", ["action", "result", "status", "idempotency_key", "queued_s", "run_s"])
+
+DEFAULT_LIMITS = {"concurrency": 8, "rate": None, "burst": None, "timeout": 5.0}
+
+# Decision keyword -> action type; decisions matching none of them get FALLBACK_ACTION.
+ROUTES = (("Positive", "EXECUTE_TASK"),)
+FALLBACK_ACTION = "CAUTION_TASK"
+
+
+def execute_task(decision):
+    return "Positive action executed: Affirmative tasks initiated."
+
+
+def caution_task(decision):
+    return "Negative action executed: Caution tasks initiated."
+
+
+BUILTIN_ACTIONS = {
+    "EXECUTE_TASK": ("Perform a task based on learning.", execute_task),
+    "CAUTION_TASK": ("Hold back and flag the input for review.", caution_task),
+}
+
+
+def append_json_array(path, items):
+    """
+    Appends items to a file holding a JSON array by rewriting only its closing bracket,
+    so the cost is independent of the log's size. Creates the file if needed.
+    """
+    if not items:
+        return
+    payload = ",\n".join("    " + json.dumps(item) for item in items).encode("utf-8")
+    with FileLock(path + ".lock"):
+        if not os.path.exists(path) or os.path.getsize(path) == 0:
+            with open(path, "wb") as f:
+                f.write(b"[\n" + payload + b"\n]")
+            return
+        with open(path, "r+b") as f:
+            f.seek(0, os.SEEK_END)
+            end = f.tell()
+            f.seek(max(end - 4096, 0))
+            tail = f.read()
+            bracket = tail.rfind(b"]")
+            if bracket < 0 or tail[bracket + 1:].strip():
+                raise ValueError(f"{path} does not end with a JSON array.")
+            empty = tail[:bracket].rstrip().endswith(b"[")
+            f.seek(end - len(tail) + bracket)
+            f.truncate()
+            f.write((b"\n" if empty else b",\n") + payload + b"\n]")
+
+
+class ActionLog:
+    """
+    Buffers action log entries and appends them to the JSON log `flush_every` at a time.
+    """
+
+    def __init__(self, path, flush_every=100):
+        self.path = path
+        self.flush_every = flush_every
+        self.pending = []
+        self.lock = threading.Lock()
+
+    def add(self, entry):
+        with self.lock:
+            self.pending.append(entry)
+            full = len(self.pending) >= self.flush_every
+        if full:
+            self.flush()
+
+    def flush(self):
+        with self.lock:
+            entries, self.pending = self.pending, []
+        append_json_array(self.path, entries)
+
+
+class ActionRegistry:
+    """
+    The dispatch table: action type name -> ActionType.
+    """
+
+    def __init__(self):
+        self.types = {}
+        self.path = None
+
+    def register(self, name, handler, description="", **limits):
+        """
+        Adds (or replaces) an action type.
+
+        Args:
+            name (str): Action type, e.g. "EXECUTE_TASK".
+            handler (callable): decision -> result string; a plain function (run on a worker
+                thread by the executor) or a coroutine function.
+            description (str): Human-readable description, as recorded in the action log.
+            **limits: concurrency, rate (actions/s, None for unlimited), burst and timeout (s)
+                overriding DEFAULT_LIMITS.
+        """
+        options = dict(DEFAULT_LIMITS, **limits)
+        if options["rate"] and not options["burst"]:
+            options["burst"] = max(1, int(options["rate"]))
+        self.types[name] = ActionType(name, description, handler, **options)
+
+    @classmethod
+    def from_log(cls, path, limits=None):
+        """
+        Builds the registry from the built-in actions plus every action type recorded in a log.
+        Types without a built-in handler get one that reports their logged description.
+
+        Args:
+            path (str): The action log (a JSON array of entries with "selected_action").
+            limits (dict, optional): Per-type limit overrides, {type: {"rate": ..., ...}}.
+        """
+        limits = limits or {}
+        registry = cls()
+        for name, (description, handler) in BUILTIN_ACTIONS.items():
+            registry.register(name, handler, description, **limits.get(name, {}))
+        entries = []
+        if os.path.exists(path):
+            try:
+                with open(path, "r", encoding="utf-8") as f:
+                    entries = json.load(f)
+            except ValueError as e:
+                logger.warning("Ignoring unreadable action log %s: %s", path, e)
+        for entry in entries:
+            selected = entry.get("selected_action") or {}
+            name = selected.get("type")
+            if name and name not in registry.types:
+                description = selected.get("description", "")
+                registry.register(name, _logged_action(name, description), description, **limits.get(name, {}))
+        registry.path = path
+        return registry
+
+    def route(self, decision):
+        """
+        Returns the action type for a reasoning decision.
+        """
+        for keyword, name in ROUTES:
+            if keyword in decision:
+                return name
+        return FALLBACK_ACTION
+
+    def dispatch(self, decision):
+        """
+        Returns the ActionType a decision is executed with.
+        """
+        return self.types[self.route(decision)]
+
+
+def _logged_action(name, description):
+    def handler(decision):
+        return f"{name} action executed: {description}"
+    return handler
+
+
+class TokenBucket:
+    """
+    Thread-safe token bucket. reserve() takes a token now (the balance may go negative) and
+    returns how long the caller must wait before using it, so waiters queue up in order.
+    """
+
+    def __init__(self, rate, burst):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = float(burst)
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def reserve(self):
+        with self.lock:
+            now = time.monotonic()
+            self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            self.tokens -= 1
+            return max(0.0, -self.tokens / self.rate)
+
+
+class ActionExecutor:
+    """
+    Runs decisions through an ActionRegistry with concurrency limits, rate limits, timeouts
+    and idempotency keys, and reports throughput and queueing latency.
+    """
+
+    def __init__(self, registry, log=None, max_in_flight=64, idempotency_cache=10000):
+        """
+        Args:
+            registry (ActionRegistry): The action types.
+            log (ActionLog, optional): Where finished actions are recorded.
+            max_in_flight (int): Actions running or waiting on limits at once.
+            idempotency_cache (int): Most recent idempotency keys remembered.
+        """
+        self.registry = registry
+        self.log = log
+        self.max_in_flight = max_in_flight
+        self.idempotency_cache = idempotency_cache
+        self.buckets = {t.name: TokenBucket(t.rate, t.burst) for t in registry.types.values() if t.rate}
+        self.results = OrderedDict()  # idempotency key -> ActionResult or in-flight Future
+        self.latencies = deque(maxlen=10000)
+        self.counts = {}
+        self.busy_s = 0.0
+        self._loop = None
+
+    def _limits(self):
+        # asyncio primitives belong to one event loop; rebuild them when run from a new one
+        loop = asyncio.get_running_loop()
+        if loop is not self._loop:
+            self._loop = loop
+            self._slots = asyncio.Semaphore(self.max_in_flight)
+            self._type_slots = {t.name: asyncio.Semaphore(t.concurrency) for t in self.registry.types.values()}
+        return self._slots, self._type_slots
+
+    async def submit(self, decision, idempotency_key=None):
+        """
+        Executes one decision.
+
+        Returns:
+            ActionResult: status is "ok", "timeout", "error" or "duplicate" (an earlier result
+                          returned again for a repeated idempotency key).
+        """
+        queued_at = time.perf_counter()
+        slots, _ = self._limits()
+        async with slots:
+            return await self._submit(decision, idempotency_key, queued_at)
+
+    async def _submit(self, decision, idempotency_key, queued_at):
+        if idempotency_key is not None:
+            known = self.results.get(idempotency_key)
+            if known is not None:
+                try:
+                    result = await known if isinstance(known, asyncio.Future) else known
+                except Exception:
+                    # The first submission failed or was cancelled: report it as an error here
+                    # rather than failing (or cancelling) the waiter's whole batch
+                    self.counts["error"] = self.counts.get("error", 0) + 1
+                    return ActionResult(self.registry.dispatch(decision).name, None, "error", idempotency_key,
+                                        time.perf_counter() - queued_at, 0.0)
+                self.counts["duplicate"] = self.counts.get("duplicate", 0) + 1
+                return result._replace(status="duplicate")
+            future = self.results[idempotency_key] = self._loop.create_future()
+        try:
+            result = await self._run(self.registry.dispatch(decision), decision, idempotency_key, queued_at)
+        except BaseException as e:
+            if idempotency_key is not None:
+                del self.results[idempotency_key]  # let a retry run it again
+                if not future.done():
+                    future.set_exception(e if isinstance(e, Exception) else RuntimeError(f"action interrupted: {e!r}"))
+                    future.exception()  # retrieved here, so a future without waiters logs nothing
+            raise
+        if idempotency_key is not None:
+            self.results[idempotency_key] = result
+            future.set_result(result)
+            while len(self.results) > self.idempotency_cache:
+                self.results.popitem(last=False)
+        return result
+
+    async def _run(self, action, decision, idempotency_key, queued_at):
+        _, type_slots = self._limits()
+        async with type_slots[action.name]:
+            bucket = self.buckets.get(action.name)
+            if bucket is not None:
+                await asyncio.sleep(bucket.reserve())
+            started = time.perf_counter()
+            try:
+                if asyncio.iscoroutinefunction(action.handler):
+                    call = action.handler(decision)
+                else:
+                    call = run_in_thread(self._loop, action.handler, decision)
+                output, status = await asyncio.wait_for(call, action.timeout), "ok"
+            except asyncio.TimeoutError:
+                output, status = None, "timeout"
+            except Exception as e:
+                logger.warning("Action %s failed: %s", action.name, e)
+                output, status = None, "error"
+            finished = time.perf_counter()
+        result = ActionResult(action.name, output, status, idempotency_key, started - queued_at, finished - started)
+        self.latencies.append(result.queued_s)
+        self.counts[status] = self.counts.get(status, 0) + 1
+        if self.log is not None:
+            self.log.add({"timestamp": datetime.now().isoformat(), "reasoning_output": decision,
+                          "selected_action": {"type": action.name, "description": action.description},
+                          "status": status, "result": output, "idempotency_key": idempotency_key})
+        return result
+
+    async def execute_many(self, decisions, idempotency_keys=None):
+        """
+        Executes a batch of decisions concurrently (at most max_in_flight at a time) and
+        flushes the action log once the batch is done.
+
+        Args:
+            decisions (iterable): Reasoning decisions.
+            idempotency_keys (iterable, optional): One key (or None) per decision.
+
+        Returns:
+            list: ActionResults in input order.
+        """
+        slots, _ = self._limits()
+        start = time.perf_counter()
+        decisions = list(decisions)
+        keys = list(idempotency_keys) if idempotency_keys is not None else [None] * len(decisions)
+
+        async def run(decision, key, queued_at):
+            try:
+                return await self._submit(decision, key, queued_at)
+            finally:
+                slots.release()
+        tasks = []
+        try:
+            for decision, key in zip(decisions, keys):
+                queued_at = time.perf_counter()
+                await slots.acquire()
+                tasks.append(asyncio.ensure_future(run(decision, key, queued_at)))
+            return list(await asyncio.gather(*tasks))
+        finally:
+            self.busy_s += time.perf_counter() - start
+            if self.log is not None:
+                self.log.flush()
+
+    def stats(self):
+        """
+        Returns:
+            dict: actions, actions_per_s (over time spent in execute_many), queue latency
+                  percentiles in ms and counts per status.
+        """
+        actions = sum(count for status, count in self.counts.items() if status != "duplicate")
+        latencies = sorted(self.latencies)
+
+        def percentile(q):
+            return 1000 * latencies[min(int(q * len(latencies)), len(latencies) - 1)] if latencies else None
+        return {
+            "actions": actions,
+            "actions_per_s": actions / self.busy_s if self.busy_s else None,
+            "queue_ms_p50": 1000 * statistics.median(latencies) if latencies else None,
+            "queue_ms_p95": percentile(0.95),
+            "queue_ms_max": percentile(1.0),
+            "statuses": dict(self.counts),
+        }
@@ -1,23 +1,59 @@
 # modules/auto_code_generator.py
 """
 Auto Code Generator Module:
-Simulates the auto-generation of code improvements using natural language prompts.
+Generates code improvement suggestions from hotspot reports (see code_analyzer.hotspot_report()),
+falling back to keyword matching for free-text prompts.
 In a real implementation, this module would interface with a GPT-based model to generate suggestions.
 """
 
+# What to do about each pipeline stage when it dominates a profile.
+STAGE_ADVICE = {
+    "load_model": "Load models once per process and share them instead of reloading per input.",
+    "embed_text": "Batch texts through get_embeddings_batch and let the dedup index skip repeated inputs.",
+    "embed_image": "Serve image embeddings from the image store and warm it ahead of time.",
+    "reasoning": "Use enhanced_reasoning_batch and keep the ConceptIndex label cache warm.",
+    "preprocess": "Read and preprocess inputs on the integrate_many worker pool.",
+    "memory_write": "Group memory writes per batch (store_memories) and keep the hot tier small.",
+    "external_fetch": "Fetch headlines once per run, concurrently (fetch_hacker_news_headlines_async).",
+    "user_feedback": "The pipeline is blocked on interactive input; run with --ci or an async feedback provider.",
+    "incremental_train": "Train once per run (run_shared_setup) rather than once per input.",
+    "fusion": "Fuse whole batches with fuse_batch.",
+    "action": "Execute decisions in batches with execute_actions.",
+    "learning": "Reduce replay minibatch size or train every few experiences instead of every one.",
+}
+
+def _suggest_from_report(report):
+    regressions = [r for r in report.get("regressions", []) if r["kind"] == "stage"]
+    if regressions:
+        stage = regressions[0]["name"]
+        change = regressions[0]["change"]
+        lead = f"{stage} regressed ({'+' + format(change, '.0%') if change is not None else 'new'} vs. baseline)"
+    elif report.get("stages"):
+        stage, entry = next(iter(report["stages"].items()))
+        lead = f"{stage} takes {entry['share']:.0%} of the run"
+    else:
+        return "Suggestion: Review the module for potential optimizations and refactor redundant code."
+    advice = STAGE_ADVICE.get(stage, f"Review the {stage} stage for potential optimizations.")
+    hottest = next((f for f in report.get("top_self", []) if f["stage"] == stage), None)
+    where = f" Start with {hottest['function']}." if hottest else ""
+    return f"Suggestion: {lead}. {advice}{where}"
+
 def generate_code_enhancement(prompt):
     """
-    Simulates generating a code enhancement suggestion based on a prompt.
+    Generates a code enhancement suggestion.
     
     Args:
-        prompt (str): A description of the current inefficiency or improvement area.
+        prompt (dict or str): A hotspot report (code_analyzer.hotspot_report()): the suggestion
+            targets its worst stage regression, else its slowest stage. A free-text description
+            of the inefficiency is matched by keyword instead.
         
     Returns:
         str: A code improvement suggestion.
     """
-    # Placeholder: In a full implementation, you would call an API like OpenAI's GPT here.
-    # For simulation purposes, we'll return a fixed suggestion that depends on the prompt.
+    if isinstance(prompt, dict):
+        return _suggest_from_report(prompt)
     
+    # Placeholder: In a full implementation, you would call an API like OpenAI's GPT here.
     if "tokenization" in prompt.lower():
         return "Suggestion: Optimize the tokenization process by caching results and reducing redundant computations."
     elif "reasoning" in prompt.lower():
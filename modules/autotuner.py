@@ -0,0 +1,214 @@
+# modules/autotuner.py
+"""
+Autotuner Module:
+Searches runtime knobs (batch size, worker threads, torch threads, inference backend) for the
+fastest pipeline configuration using successive halving over short in-process trials, and
+persists the winner to RUNTIME_CONFIG_FILE, which later runs load at startup.
+
+The search is deterministic under a fixed seed: the candidate configurations, the order they are
+evaluated in and the tie-breaking are all derived from the seed, so a deterministic objective
+always yields the same result.
+
+Tuning is started from the command line (`python main.py --inputs ... --autotune N`); the
+pipelines' per-input self_improve() calls never start a search.
+"""
+
+import json
+import os
+import random
+from collections import namedtuple
+
+from modules.resources import available_cpus, get_resource_manager
+from modules.structured_logging import get_logger
+
+logger = get_logger(__name__)
+
+RUNTIME_CONFIG_FILE = "runtime_config.json"
+
+DEFAULT_RUNTIME_CONFIG = {
+    "batch_size": 16,        # inputs per integrate_many() batch (and per forward pass)
+    "workers": 4,            # file reading / preprocessing threads
+    "torch_threads": None,   # torch intra-op threads; None uses the CPU budget (modules.resources)
+    "backend": "no_grad",    # text model inference context: "no_grad" or "inference_mode"
+}
+
+# Cache sizes are not searched: trials start from empty caches and read each stage result once
+# (main.tuning_objective()), so StageCache.memory_items/memory_bytes never evict during a trial,
+# the image store has no size limit, and ConceptIndex.cache_size (1024 expansions) is far above the
+# handful of seed sets the knowledge graph yields. Their cost would be identical for every candidate.
+SEARCH_SPACE = {
+    "batch_size": [4, 8, 16, 32, 64],
+    "workers": [1, 2, 4, 8],
+    "torch_threads": sorted({1, 2, 4, available_cpus()}),
+    "backend": ["no_grad", "inference_mode"],
+}
+
+TuningResult = namedtuple("TuningResult", ["best", "score", "trials"])
+
+
+def load_runtime_config(path=None):
+    """
+    Loads the persisted runtime configuration, filling missing keys with defaults.
+
+    Args:
+        path (str, optional): Config file (defaults to RUNTIME_CONFIG_FILE).
+
+    Returns:
+        dict: The runtime configuration.
+    """
+    path = path or RUNTIME_CONFIG_FILE
+    config = dict(DEFAULT_RUNTIME_CONFIG)
+    if os.path.exists(path):
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                config.update(json.load(f).get("config", {}))
+        except (OSError, ValueError) as e:
+            logger.warning("Ignoring unreadable runtime config %s: %s", path, e)
+    return config
+
+
+def save_runtime_config(config, path=None, score=None):
+    """
+    Persists a runtime configuration (atomically).
+
+    Args:
+        config (dict): The configuration to save.
+        path (str, optional): Config file (defaults to RUNTIME_CONFIG_FILE).
+        score (float, optional): The configuration's measured cost, kept for reference.
+    """
+    path = path or RUNTIME_CONFIG_FILE
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump({"config": config, "score": score}, f, indent=4)
+    os.replace(tmp_path, path)
+
+
+def apply_runtime_config(config):
+    """
+    Applies the process-wide knobs of a configuration (torch and BLAS threads through the
+    resource manager, and the inference backend). batch_size and workers are passed to
+    integrate_many() by the caller.
+    """
+    from modules import understanding
+
+    get_resource_manager().apply(torch_threads=config.get("torch_threads"))
+    understanding.INFERENCE_BACKEND = config.get("backend", DEFAULT_RUNTIME_CONFIG["backend"])
+
+
+class Autotuner:
+    """
+    Successive halving over a discrete search space.
+
+    Each round evaluates the surviving candidates with the current budget, keeps the best
+    1/eta of them and multiplies the budget by eta, until one candidate remains.
+    """
+
+    def __init__(self, objective, space=None, seed=0, num_candidates=8, min_budget=1, eta=2,
+                 baseline=None, warmup=True):
+        """
+        Args:
+            objective (callable): (config, budget) -> cost, or (cost, info dict). Lower is better;
+                budget is a positive integer (e.g. passes over a trial sample).
+            space (dict, optional): knob -> list of values (defaults to SEARCH_SPACE).
+            seed (int): Seed for candidate sampling.
+            num_candidates (int): Configurations in the first round.
+            min_budget (int): Budget of the first round.
+            eta (int): Halving factor.
+            baseline (dict, optional): A configuration always included as the first candidate
+                (defaults to DEFAULT_RUNTIME_CONFIG, restricted to the space's knobs).
+            warmup (bool): Run the first candidate once before timing anything, so one-time
+                costs (model loading, caches) are not charged to it.
+        """
+        self.objective = objective
+        self.space = space or SEARCH_SPACE
+        self.seed = seed
+        self.num_candidates = num_candidates
+        self.min_budget = min_budget
+        self.eta = max(2, eta)
+        self.baseline = baseline if baseline is not None else DEFAULT_RUNTIME_CONFIG
+        self.warmup = warmup
+
+    def candidates(self):
+        """
+        Returns the first-round configurations: the baseline, then distinct seeded samples.
+        """
+        rng = random.Random(self.seed)
+        knobs = sorted(self.space)
+        total = 1
+        for knob in knobs:
+            total *= len(self.space[knob])
+        configs, seen = [], set()
+
+        def add(config):
+            key = tuple(config[k] for k in knobs)
+            if key not in seen:
+                seen.add(key)
+                configs.append(config)
+
+        # The baseline is always a candidate (even with values outside the space, e.g. torch_threads=None),
+        # so the winner is never worse than the current configuration under the objective.
+        baseline = {k: self.baseline.get(k) for k in knobs}
+        add(baseline)
+        in_space = all(baseline[k] in self.space[k] for k in knobs)
+        while len(configs) < min(self.num_candidates, total + (0 if in_space else 1)):
+            add({k: rng.choice(self.space[k]) for k in knobs})
+        return configs
+
+    def _evaluate(self, config, budget):
+        outcome = self.objective(dict(config), budget)
+        cost, info = outcome if isinstance(outcome, tuple) else (outcome, {})
+        return float(cost), info
+
+    def run(self):
+        """
+        Runs the search.
+
+        Returns:
+            TuningResult: (best config, its last cost, trials), where trials is a list of
+            {"round", "budget", "config", "score", ...info} dicts in evaluation order.
+        """
+        configs = self.candidates()
+        if self.warmup and configs:
+            self._evaluate(configs[0], self.min_budget)
+        trials = []
+        survivors = list(enumerate(configs))
+        scores = {}
+        budget = self.min_budget
+        round_number = 0
+        while True:
+            for index, config in survivors:
+                cost, info = self._evaluate(config, budget)
+                scores[index] = cost
+                trials.append(dict(info, round=round_number, budget=budget, config=config, score=cost))
+            # Ties keep the earlier (seed-determined) candidate.
+            survivors.sort(key=lambda item: (scores[item[0]], item[0]))
+            if len(survivors) == 1:
+                break
+            survivors = survivors[:max(1, len(survivors) // self.eta)]
+            if len(survivors) == 1:
+                break
+            budget *= self.eta
+            round_number += 1
+        index, best = survivors[0]
+        logger.info("Best configuration after %d trials: %s (cost %.6f)", len(trials), best, scores[index])
+        return TuningResult(best, scores[index], trials)
+
+
+def autotune(objective, seed=0, config_path=None, **kwargs):
+    """
+    Runs an Autotuner and persists the winning configuration, merged over the current one.
+
+    Args:
+        objective (callable): See Autotuner.
+        seed (int): Search seed.
+        config_path (str, optional): Config file (defaults to RUNTIME_CONFIG_FILE).
+        **kwargs: Further Autotuner arguments.
+
+    Returns:
+        TuningResult: The search result.
+    """
+    current = load_runtime_config(config_path)
+    result = Autotuner(objective, seed=seed, baseline=current, **kwargs).run()
+    config = dict(current, **result.best)
+    save_runtime_config(config, config_path, score=result.score)
+    return result._replace(best=config)
@@ -1,10 +1,62 @@
 # modules/code_analyzer.py
 """
 Code Analyzer Module:
-Analyzes system performance metrics and logs to identify potential inefficiencies,
-and simulates the generation of code improvement suggestions.
+Analyzes system performance metrics and logs to identify potential inefficiencies.
+
+Hotspot analysis reads a cProfile dump (profile_performance.py writes PROFILE_FILE) or per-stage
+metrics (modules/metrics.py). It ranks GENESIS-1's own functions by self and cumulative time and
+attributes time to pipeline stages. It can also diff against a baseline to flag regressions.
+The result is a JSON-serializable hotspot report, consumed by propose_code_enhancements() and
+auto_code_generator.generate_code_enhancement().
+
+    python -m modules.code_analyzer profile_results.prof --baseline old.prof --out hotspots.json
 """
 
+import functools
+import json
+import os
+import pstats
+from collections import Counter
+
+from modules.metrics import stage_summary
+from modules.tiered_storage import atomic_write_json
+
+PROFILE_FILE = "profile_results.prof"
+HOTSPOT_FILE = "hotspots.json"
+
+_REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Pipeline stage of each module (names match the stage_timer() stages where one exists).
+STAGE_MODULES = {
+    "modules/perception.py": "preprocess",
+    "modules/dedup.py": "dedup",
+    "modules/understanding.py": "embed_text",
+    "modules/embedding_batch.py": "embed_text",
+    "modules/reasoning.py": "reasoning",
+    "modules/knowledge_graph.py": "reasoning",
+    "modules/concept_retrieval.py": "reasoning",
+    "modules/learning.py": "learning",
+    "modules/replay_buffer.py": "learning",
+    "modules/self_improvement.py": "self_improvement",
+    "modules/autotuner.py": "self_improvement",
+    "modules/action.py": "action",
+    "modules/action_executor.py": "action",
+    "modules/memory.py": "memory_write",
+    "modules/long_term_memory.py": "memory_write",
+    "modules/tiered_storage.py": "memory_write",
+    "modules/code_analyzer.py": "code_analysis",
+    "modules/auto_code_generator.py": "code_analysis",
+    "modules/external_data.py": "external_fetch",
+    "modules/user_interface.py": "user_feedback",
+    "modules/incremental_learning.py": "incremental_train",
+    "modules/multi_modal.py": "embed_image",
+    "modules/image_store.py": "embed_image",
+    "modules/fusion.py": "fusion",
+}
+
+# Functions whose time belongs to a different stage than their module's.
+STAGE_FUNCTIONS = {"load_model": "load_model", "load_vision_model": "load_model"}
+
 def analyze_code_performance(log_data):
     """
     Analyzes performance log data and calculates the average reward.
@@ -40,15 +92,171 @@ def analyze_code_performance(log_data):
         "suggestions": suggestions
     }
 
-def propose_code_enhancements():
+@functools.lru_cache(maxsize=None)
+def _project_files():
+    files = set()
+    for dirpath, dirnames, filenames in os.walk(_REPO_ROOT):
+        dirnames[:] = [d for d in dirnames if not d.startswith((".", "__"))]
+        rel_dir = os.path.relpath(dirpath, _REPO_ROOT).replace(os.sep, "/")
+        files.update(name if rel_dir == "." else f"{rel_dir}/{name}" for name in filenames if name.endswith(".py"))
+    return frozenset(files)
+
+def _profile_root(filenames):
+    """
+    Finds the repository root a profile was recorded in (it may come from another machine or OS):
+    the most common prefix of files that end in one of our modules/*.py paths.
+    """
+    roots = Counter()
+    for filename in filenames:
+        path = filename.replace("\\", "/")
+        head, sep, tail = path.rpartition("/modules/")
+        if sep and "modules/" + tail in _project_files():
+            roots[head + "/"] += 1
+    return roots.most_common(1)[0][0] if roots else None
+
+def _stage_of(relpath, name):
+    if name == "<module>":
+        return None  # import time: nested imports would be counted twice
+    return STAGE_FUNCTIONS.get(name) or STAGE_MODULES.get(relpath)
+
+def _report_from_profile(path, top):
+    stats = pstats.Stats(path)
+    root = _profile_root(filename for filename, _, _ in stats.stats)
+    project = {}
+    for key in stats.stats:
+        path_key = key[0].replace("\\", "/")
+        if root and path_key.startswith(root) and path_key[len(root):] in _project_files():
+            relpath = path_key[len(root):]
+            project[key] = (relpath, _stage_of(relpath, key[2]))
+
+    functions, stages = [], Counter()
+    for key, (relpath, stage) in project.items():
+        _, calls, self_s, cumulative_s, callers = stats.stats[key]
+        functions.append({"function": f"{relpath}:{key[1]}({key[2]})", "file": relpath, "name": key[2],
+                          "stage": stage, "calls": calls, "self_s": self_s, "cumulative_s": cumulative_s})
+        if stage is not None:
+            # A stage's time is what its functions take when entered from outside the stage,
+            # so calls within a stage are not counted twice.
+            for caller, (_, _, _, edge_cumulative_s) in callers.items():
+                if project.get(caller, (None, None))[1] != stage:
+                    stages[stage] += edge_cumulative_s
+    return {"source": str(path), "kind": "profile", "total_s": stats.total_tt,
+            "stages": _stage_shares(stages, stats.total_tt),
+            "top_cumulative": sorted(functions, key=lambda f: -f["cumulative_s"])[:top],
+            "top_self": sorted(functions, key=lambda f: -f["self_s"])[:top]}
+
+def _report_from_metrics(summary, source):
+    stages = {stage: entry["total_s"] for stage, entry in summary.items()}
+    total = sum(stages.values())
+    return {"source": source, "kind": "metrics", "total_s": total, "stages": _stage_shares(stages, total),
+            "top_cumulative": [], "top_self": []}
+
+def _stage_shares(seconds_by_stage, total):
+    return {stage: {"seconds": seconds, "share": seconds / total if total else 0.0}
+            for stage, seconds in sorted(seconds_by_stage.items(), key=lambda kv: -kv[1])}
+
+def hotspot_report(source=PROFILE_FILE, baseline=None, top=20, threshold=0.1, min_seconds=0.05):
     """
-    Simulates proposing code enhancements based on performance analysis.
+    Builds a hotspot report.
+    
+    Args:
+        source: A cProfile/pstats dump, a JSON file holding a stage summary or an earlier
+                report, or a stage summary dict (metrics.stage_summary()).
+        baseline (optional): Another source to diff against (see diff_reports()).
+        top (int): Functions listed per ranking.
+        threshold (float): Relative slowdown reported as a regression.
+        min_seconds (float): Absolute slowdown below which changes are ignored.
     
     Returns:
-        str: A simulated code improvement suggestion.
+        dict: source, kind ("profile" or "metrics"), total_s, stages (stage -> {seconds, share},
+              slowest first), top_cumulative and top_self (functions with file, name, stage,
+              calls, self_s and cumulative_s) and regressions.
+    """
+    if isinstance(source, dict):
+        report = _report_from_metrics(source, "metrics")
+    elif str(source).endswith(".json"):
+        with open(source, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        report = data if "top_cumulative" in data else _report_from_metrics(data, str(source))
+    else:
+        report = _report_from_profile(source, top)
+    if baseline is not None:
+        report["regressions"] = diff_reports(hotspot_report(baseline, top=top), report, threshold, min_seconds)
+    report.setdefault("regressions", [])
+    return report
+
+def diff_reports(base, current, threshold=0.1, min_seconds=0.05):
     """
-    # For this simulation, we return a fixed suggestion.
-    suggestion = "Consider optimizing tokenization in the Perception Module to reduce processing time."
+    Lists stages and functions that got slower between two hotspot reports. Functions are
+    matched by file and name, so line shifts between versions don't matter.
+    
+    Returns:
+        list: {kind, name, base_s, current_s, change} dicts, largest slowdown first
+              (change is relative; None when the item is new).
+    """
+    def functions(report):
+        entries = {}
+        for entry in report["top_cumulative"]:
+            entries.setdefault(f"{entry['file']}:{entry['name']}", entry["cumulative_s"])
+        return entries
+
+    regressions = []
+    for kind, old, new in (("stage", {k: v["seconds"] for k, v in base["stages"].items()},
+                            {k: v["seconds"] for k, v in current["stages"].items()}),
+                           ("function", functions(base), functions(current))):
+        for name, current_s in new.items():
+            base_s = old.get(name, 0.0)
+            if current_s - base_s >= min_seconds and (not base_s or current_s / base_s - 1 >= threshold):
+                regressions.append({"kind": kind, "name": name, "base_s": base_s, "current_s": current_s,
+                                    "change": current_s / base_s - 1 if base_s else None})
+    return sorted(regressions, key=lambda r: r["base_s"] - r["current_s"])
+
+def write_report(report, path=HOTSPOT_FILE):
+    """
+    Writes a hotspot report as JSON.
+    """
+    atomic_write_json(path, report, indent=2)
+
+@functools.lru_cache(maxsize=4)
+def _cached_profile_report(path, mtime):
+    return hotspot_report(path)
+
+def current_hotspot_report():
+    """
+    The hotspot report of the latest profile (PROFILE_FILE, re-read only when it changes), or of
+    this process' stage metrics when there is no profile.
+    
+    Returns:
+        dict: The report, or None when there is nothing to analyze.
+    """
+    if os.path.exists(PROFILE_FILE):
+        return _cached_profile_report(PROFILE_FILE, os.path.getmtime(PROFILE_FILE))
+    metrics = stage_summary()
+    return hotspot_report(metrics) if metrics else None
+
+def propose_code_enhancements(report=None):
+    """
+    Proposes a code enhancement from a hotspot report.
+    
+    Args:
+        report (dict, optional): A hotspot_report(); defaults to current_hotspot_report().
+    
+    Returns:
+        str: A code improvement suggestion naming the slowest stage and function, and any regressions.
+    """
+    report = report or current_hotspot_report()
+    if not report or not report["stages"]:
+        return "Consider optimizing tokenization in the Perception Module to reduce processing time."
+    stage, entry = next(iter(report["stages"].items()))
+    suggestion = f"Consider optimizing the {stage} stage ({entry['seconds']:.2f} s, {entry['share']:.0%} of the run)"
+    hottest = next((f for f in report["top_cumulative"] if f["stage"] == stage), None)
+    if hottest:
+        suggestion += f"; its costliest function is {hottest['function']} ({hottest['cumulative_s']:.2f} s cumulative)"
+    suggestion += "."
+    if report["regressions"]:
+        suggestion += " Regressions: " + ", ".join(
+            f"{r['name']} {'+' + format(r['change'], '.0%') if r['change'] is not None else '(new)'}"
+            for r in report["regressions"][:3]) + "."
     return suggestion
 
 def test_code_analyzer():
@@ -70,4 +278,16 @@ def test_code_analyzer():
     print("Improvement Suggestion:", improvement_suggestion)
 
 if __name__ == "__main__":
-    test_code_analyzer()
\ No newline at end of file
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Rank GENESIS-1 hotspots in a profile or stage metrics file.")
+    parser.add_argument("source", nargs="?", default=PROFILE_FILE)
+    parser.add_argument("--baseline", help="Profile or report to diff against.")
+    parser.add_argument("--out", default=HOTSPOT_FILE)
+    parser.add_argument("--top", type=int, default=20)
+    parser.add_argument("--threshold", type=float, default=0.1, help="Relative slowdown reported as a regression.")
+    args = parser.parse_args()
+    report = hotspot_report(args.source, args.baseline, args.top, args.threshold)
+    write_report(report, args.out)
+    print(propose_code_enhancements(report))
+    print(f"Wrote {args.out}")
\ No newline at end of file
@@ -0,0 +1,210 @@
+# modules/concept_retrieval.py
+"""
+Concept Retrieval Module:
+Relates an input embedding to the knowledge graph at reasoning time.
+
+  1. Every node label is embedded once (batched) and cached on disk under CONCEPT_CACHE_DIR,
+     so only labels added since the last run are embedded.
+  2. The top-k nodes nearest to the input embedding (cosine similarity) are found with one
+     matrix-vector product over the normalized label matrix.
+  3. From those seeds, weighted multi-hop neighborhoods are expanded over a CSR copy of the
+     graph: a node's score is the best product of edge weights along a path from any seed,
+     times `decay` per hop. Expansions are memoized in an LRU keyed by (seed set, hops).
+"""
+
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+from modules.structured_logging import get_logger
+
+logger = get_logger(__name__)
+
+CONCEPT_CACHE_DIR = "concept_cache"
+
+
+def text_model_embedder(tokenizer=None, model=None, batch_size=64):
+    """
+    Returns an embedder (list of labels -> matrix) backed by the pipeline's text model.
+    Without an explicit tokenizer and model, the default model is loaded.
+    The embedder's `cache_name` (model_snapshot.model_identity()) identifies the model and its
+    weights in the label embedding cache, so fine-tuned weights never reuse stale labels.
+    """
+    from modules.model_snapshot import model_identity
+    from modules.understanding import load_model, get_embeddings_batch
+
+    if model is None:
+        tokenizer, model = load_model()
+
+    def embed(labels):
+        return get_embeddings_batch(labels, tokenizer, model, batch_size)
+    embed.cache_name = model_identity(model)
+    return embed
+
+
+class ConceptIndex:
+    """
+    Label embeddings, a CSR adjacency and an expansion cache for one knowledge graph.
+    """
+
+    def __init__(self, G, embeddings=None, embedder=None, cache_dir=None, cache_size=1024, decay=0.9):
+        """
+        Args:
+            G (Graph): The knowledge graph (edge attribute "weight", default 1.0).
+            embeddings (numpy.array, optional): Precomputed (num_nodes, dim) label embeddings in G.nodes order.
+            embedder (callable, optional): list of labels -> (n, dim) matrix, used when `embeddings`
+                is omitted (defaults to text_model_embedder()).
+            cache_dir (str, optional): Label embedding cache (defaults to CONCEPT_CACHE_DIR).
+            cache_size (int): Maximum number of memoized expansions.
+            decay (float): Score multiplier per hop.
+        """
+        self.labels = list(G.nodes)
+        self.position = {label: i for i, label in enumerate(self.labels)}
+        self.decay = decay
+        self.cache_size = cache_size
+        self._expansions = OrderedDict()
+        self.hits = self.misses = 0
+        if embeddings is None:
+            embeddings = self._embed_labels(embedder or text_model_embedder(), cache_dir or CONCEPT_CACHE_DIR)
+        matrix = np.asarray(embeddings, dtype=np.float32)
+        self.matrix = matrix / np.maximum(np.linalg.norm(matrix, axis=1, keepdims=True), 1e-12)
+        self._build_csr(G)
+
+    def _embed_labels(self, embedder, cache_dir):
+        # Incremental on-disk cache: label -> embedding, per embedder.
+        name = getattr(embedder, "cache_name", getattr(embedder, "__name__", "embedder"))
+        path = os.path.join(cache_dir, f"labels-{hashlib.sha1(name.encode('utf-8')).hexdigest()[:12]}.npz")
+        cached = {}
+        if os.path.exists(path):
+            with np.load(path, allow_pickle=False) as data:
+                cached = dict(zip(data["labels"].tolist(), data["embeddings"]))
+        keys = [str(label) for label in self.labels]
+        missing = [key for key in keys if key not in cached]
+        if missing:
+            logger.info("Embedding %d new knowledge graph labels.", len(missing))
+            cached.update(zip(missing, np.asarray(embedder(missing), dtype=np.float32)))
+            os.makedirs(cache_dir, exist_ok=True)
+            tmp_path = f"{path[:-len('.npz')]}.{os.getpid()}-{threading.get_ident()}.tmp.npz"
+            np.savez(tmp_path, labels=np.array(list(cached)), embeddings=np.stack(list(cached.values())))
+            os.replace(tmp_path, path)
+        return np.stack([cached[key] for key in keys])
+
+    def _build_csr(self, G):
+        n = len(self.labels)
+        edges = [(self.position[u], self.position[v], w) for u, v, w in G.edges(data="weight", default=1.0)]
+        src = np.array([e[0] for e in edges], dtype=np.int64)
+        dst = np.array([e[1] for e in edges], dtype=np.int64)
+        weight = np.array([e[2] for e in edges], dtype=np.float32)
+        if not G.is_directed():
+            src, dst, weight = np.concatenate([src, dst]), np.concatenate([dst, src]), np.concatenate([weight, weight])
+        order = np.argsort(src, kind="stable")
+        self.indices = dst[order]
+        self.weights = weight[order]
+        self.indptr = np.zeros(n + 1, dtype=np.int64)
+        np.cumsum(np.bincount(src, minlength=n), out=self.indptr[1:])
+
+    def nearest(self, embeddings, k=5):
+        """
+        Finds the k nodes nearest to each embedding.
+
+        Args:
+            embeddings (numpy.array): A (dim,) vector or (batch, dim) matrix.
+            k (int): Nodes per query.
+
+        Returns:
+            list: Per query, a list of (label, cosine similarity), most similar first.
+        """
+        queries = np.asarray(embeddings, dtype=np.float32).reshape(-1, self.matrix.shape[1])
+        queries = queries / np.maximum(np.linalg.norm(queries, axis=1, keepdims=True), 1e-12)
+        scores = queries @ self.matrix.T  # (batch, num_nodes)
+        k = min(k, len(self.labels))
+        top = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+        results = []
+        for row, candidates in zip(scores, top):
+            ranked = candidates[np.argsort(-row[candidates], kind="stable")]
+            results.append([(self.labels[i], float(row[i])) for i in ranked])
+        return results
+
+    def expand(self, seeds, hops=2):
+        """
+        Expands weighted multi-hop neighborhoods around a seed set (memoized).
+
+        Args:
+            seeds (iterable): Seed node labels.
+            hops (int): Maximum path length.
+
+        Returns:
+            dict: label -> (score, hop) for every reached node other than the seeds, where score is the
+            best product of edge weights (times decay per hop) along a path of `hop` edges from a seed.
+        """
+        key = (frozenset(seeds), hops)
+        if key in self._expansions:
+            self.hits += 1
+            self._expansions.move_to_end(key)
+            return self._expansions[key]
+        self.misses += 1
+        result = self._expand(key[0], hops)
+        self._expansions[key] = result
+        if len(self._expansions) > self.cache_size:
+            self._expansions.popitem(last=False)
+        return result
+
+    def _expand(self, seeds, hops):
+        best = np.zeros(len(self.labels), dtype=np.float32)
+        hop_of = np.zeros(len(self.labels), dtype=np.int32)
+        seed_ids = np.array(sorted(self.position[s] for s in seeds if s in self.position), dtype=np.int64)
+        best[seed_ids] = 1.0
+        frontier, frontier_scores = seed_ids, np.ones(len(seed_ids), dtype=np.float32)
+        for hop in range(1, hops + 1):
+            if not len(frontier):
+                break
+            starts, counts = self.indptr[frontier], self.indptr[frontier + 1] - self.indptr[frontier]
+            # Flattened CSR slices of every frontier node
+            edge_ids = np.repeat(starts - np.cumsum(counts) + counts, counts) + np.arange(counts.sum())
+            neighbors = self.indices[edge_ids]
+            scores = np.repeat(frontier_scores, counts) * self.weights[edge_ids] * self.decay
+            # Best score per neighbor: sort by (neighbor, -score) and keep the first of each run
+            order = np.lexsort((-scores, neighbors))
+            neighbors, scores = neighbors[order], scores[order]
+            first = np.ones(len(neighbors), dtype=bool)
+            first[1:] = neighbors[1:] != neighbors[:-1]
+            neighbors, scores = neighbors[first], scores[first]
+            improved = scores > best[neighbors]
+            neighbors, scores = neighbors[improved], scores[improved]
+            best[neighbors] = scores
+            hop_of[neighbors] = hop
+            frontier, frontier_scores = neighbors, scores
+        best[seed_ids] = 0.0
+        reached = np.flatnonzero(best)
+        return {self.labels[i]: (float(best[i]), int(hop_of[i])) for i in reached}
+
+    def retrieve(self, embedding, k=5, hops=2, limit=10):
+        """
+        Finds the concepts related to an input embedding: its k nearest nodes and their
+        weighted multi-hop neighborhood.
+
+        Returns:
+            dict: "seeds" - [(label, similarity)], "related" - [(label, score, hop)] best first (at most `limit`).
+        """
+        return self.retrieve_batch(np.asarray(embedding).reshape(1, -1), k, hops, limit)[0]
+
+    def retrieve_batch(self, embeddings, k=5, hops=2, limit=10):
+        """
+        Batched retrieve(): one matrix product for all nearest-node searches.
+        """
+        results = []
+        for seeds in self.nearest(embeddings, k):
+            expanded = self.expand([label for label, _ in seeds], hops)
+            related = sorted(expanded.items(), key=lambda item: (-item[1][0], item[1][1], str(item[0])))[:limit]
+            results.append({"seeds": seeds, "related": [(label, score, hop) for label, (score, hop) in related]})
+        return results
+
+    def cache_info(self):
+        """
+        Returns:
+            dict: Expansion cache hits, misses and current size.
+        """
+        return {"hits": self.hits, "misses": self.misses, "size": len(self._expansions)}
@@ -0,0 +1,340 @@
+# modules/dedup.py
+"""
+Near-Duplicate Detection Module:
+Recognizes inputs that are near-identical to one already processed (repeated headlines,
+re-submitted files), so the pipeline can reuse that input's embedding and decision instead of
+running the text model and reasoning again.
+
+Each input is reduced to a 64-bit SimHash over word shingles of its preprocessed tokens
+(perception.preprocess_text). Two inputs are near-duplicates when the fraction of equal signature
+bits reaches the threshold. Candidates come from an LSH index: the signature is cut into `bands`
+bit bands, and any stored signature that equals it on one band is a candidate. By the pigeonhole
+principle every signature differing in fewer than `bands` bits is found.
+
+Layout of the index directory:
+  - signatures.u64 and embeddings.f32: memory-mapped arrays, one row per distinct input;
+  - index.json: parameters, row count and each row's decision;
+  - index.lock: held (tiered_storage.FileLock) while rows are added or index.json is written.
+Changing the shingle size, band count, embedding dimension or text model clears the index.
+Processes may share one directory: add_many() first adopts the rows other processes added.
+"""
+
+import hashlib
+import json
+import os
+import threading
+
+import numpy as np
+
+from modules.perception import preprocess_text
+from modules.structured_logging import get_logger
+from modules.tiered_storage import FileLock, atomic_write_json
+
+logger = get_logger(__name__)
+
+DEDUP_DIR = "dedup_index"
+SIGNATURE_BITS = 64
+DEFAULT_THRESHOLD = 0.9  # 0.9 tolerates 6 differing bits, within the 8-band LSH guarantee
+_HASH_CHUNK = 4096  # shingles per vectorized block
+
+
+def shingles(tokens, size=3):
+    """
+    Returns the word `size`-grams of a token list (the whole text if it is shorter).
+    """
+    if len(tokens) <= size:
+        return [" ".join(tokens)] if tokens else []
+    return [" ".join(tokens[i:i + size]) for i in range(len(tokens) - size + 1)]
+
+
+def simhash(tokens, shingle_size=3):
+    """
+    64-bit SimHash of a token list: every distinct shingle votes with its count on each bit of
+    its own 64-bit hash, and the signature keeps the bits with a positive total.
+
+    Returns:
+        int: The signature (0 for an empty input).
+    """
+    grams, counts = np.unique(np.array(shingles(tokens, shingle_size), dtype=object), return_counts=True)
+    if not len(grams):
+        return 0
+    hashes = np.fromiter((int.from_bytes(hashlib.blake2b(g.encode("utf-8"), digest_size=8).digest(), "little")
+                          for g in grams), dtype=np.uint64, count=len(grams))
+    positions = np.arange(SIGNATURE_BITS, dtype=np.uint64)
+    votes = np.zeros(SIGNATURE_BITS, dtype=np.int64)
+    for start in range(0, len(hashes), _HASH_CHUNK):
+        bits = ((hashes[start:start + _HASH_CHUNK, None] >> positions) & np.uint64(1)).astype(np.int64)
+        votes += counts[start:start + _HASH_CHUNK] @ (2 * bits - 1)
+    return int(np.packbits(votes > 0, bitorder="little").view("<u8")[0])
+
+
+def similarity(a, b):
+    """
+    Fraction of equal bits between two signatures.
+    """
+    return 1.0 - bin(a ^ b).count("1") / SIGNATURE_BITS  # int.bit_count() needs Python 3.10
+
+
+class DedupIndex:
+    """
+    Persistent LSH index of SimHash signatures with the embedding and decision of each input.
+    """
+
+    def __init__(self, directory=DEDUP_DIR, threshold=DEFAULT_THRESHOLD, bands=8, shingle_size=3, dim=768,
+                 model_id=None):
+        """
+        Args:
+            directory (str): Index directory.
+            threshold (float): Minimum signature similarity of a near-duplicate.
+            bands (int): LSH bands (must divide 64); more bands find more distant candidates.
+            shingle_size (int): Words per shingle.
+            dim (int): Embedding dimension.
+            model_id (str, optional): Identity of the text model the stored embeddings come from
+                (model_snapshot.model_identity()).
+        """
+        if SIGNATURE_BITS % bands:
+            raise ValueError("bands must divide 64")
+        self.directory = directory
+        self.threshold = threshold
+        self.bands = bands
+        self.shingle_size = shingle_size
+        self.dim = dim
+        self.model_id = model_id
+        self.band_bits = SIGNATURE_BITS // bands
+        self.lock = threading.RLock()
+        self.counters = {"lookups": 0, "hits": 0, "misses": 0}
+        os.makedirs(directory, exist_ok=True)
+        self._index_path = os.path.join(directory, "index.json")
+        self._paths = {"signatures": os.path.join(directory, "signatures.u64"),
+                       "embeddings": os.path.join(directory, "embeddings.f32")}
+        self.file_lock = FileLock(os.path.join(directory, "index.lock"))
+        with self.file_lock:
+            self._load()
+
+    # ---- persistence ------------------------------------------------------
+
+    def _params(self):
+        return {"bands": self.bands, "shingle_size": self.shingle_size, "dim": self.dim, "model": self.model_id}
+
+    def _read_index(self):
+        if not os.path.exists(self._index_path):
+            return None
+        with open(self._index_path, "r", encoding="utf-8") as f:
+            return json.load(f)
+
+    def _load(self):
+        index = self._read_index()
+        if index is None or index["params"] != self._params():
+            if index is not None:
+                logger.info("Dedup parameters changed; clearing the near-duplicate index.")
+            index = {"params": self._params(), "rows": 0, "capacity": 0, "decisions": []}
+            for path in self._paths.values():
+                if os.path.exists(path):
+                    os.remove(path)
+        self.index = index
+        self.signatures = self.embeddings = None
+        if index["capacity"]:
+            self._map(index["capacity"])
+        self.tables = [{} for _ in range(self.bands)]
+        for row in range(index["rows"]):
+            self._insert(int(self.signatures[row]), row)
+
+    def _map(self, capacity):
+        self.signatures = np.memmap(self._paths["signatures"], dtype=np.uint64, mode="r+", shape=(capacity,))
+        self.embeddings = np.memmap(self._paths["embeddings"], dtype=np.float32, mode="r+", shape=(capacity, self.dim))
+
+    def _sync(self):
+        # Adopts the rows other processes added since index.json was last read (call under the file lock)
+        index = self._read_index()
+        if index is None or index["params"] != self._params() or index["rows"] < self.index["rows"]:
+            self._load()  # cleared by a process with other parameters
+            return
+        if index["capacity"] > self.index["capacity"]:
+            self._map(index["capacity"])
+        for row in range(self.index["rows"], index["rows"]):
+            self._insert(int(self.signatures[row]), row)
+        self.index = index
+
+    def _write_index(self):
+        if self.signatures is not None:
+            self.signatures.flush()
+            self.embeddings.flush()
+        atomic_write_json(self._index_path, self.index)
+
+    def save(self):
+        """
+        Flushes the arrays and writes index.json (add_many() already records the rows it adds).
+        """
+        with self.lock, self.file_lock:
+            self._sync()
+            self._write_index()
+
+    def _reserve(self, count):
+        # Grows both memory-mapped arrays geometrically so appends stay amortized O(1).
+        needed = self.index["rows"] + count
+        if needed <= self.index["capacity"]:
+            return
+        capacity = max(needed, 2 * self.index["capacity"], 256)
+        if self.signatures is not None:
+            self.signatures.flush()
+            self.embeddings.flush()
+            self.signatures = self.embeddings = None
+        for path, row_bytes in ((self._paths["signatures"], 8), (self._paths["embeddings"], 4 * self.dim)):
+            with open(path, "ab") as f:
+                f.truncate(capacity * row_bytes)
+        self.index["capacity"] = capacity
+        self._map(capacity)
+
+    # ---- signatures and lookups -------------------------------------------
+
+    def signature(self, tokens):
+        """
+        SimHash of preprocessed tokens (see perception.preprocess_text).
+        """
+        return simhash(tokens, self.shingle_size)
+
+    def _band_keys(self, signature):
+        mask = (1 << self.band_bits) - 1
+        return [(signature >> (band * self.band_bits)) & mask for band in range(self.bands)]
+
+    def _insert(self, signature, row):
+        for table, key in zip(self.tables, self._band_keys(signature)):
+            table.setdefault(key, []).append(row)
+
+    def is_near_duplicate(self, a, b):
+        """
+        True when the index would match two signatures: they share a band and are similar enough.
+        """
+        shared_band = any(x == y for x, y in zip(self._band_keys(a), self._band_keys(b)))
+        return shared_band and similarity(a, b) >= self.threshold
+
+    def lookup(self, signature):
+        """
+        Finds the most similar stored input at or above the threshold.
+
+        Returns:
+            int: Its row, or None.
+        """
+        with self.lock:
+            candidates = set()
+            for table, key in zip(self.tables, self._band_keys(signature)):
+                candidates.update(table.get(key, ()))
+            best, best_similarity = None, self.threshold
+            for row in candidates:
+                score = similarity(signature, int(self.signatures[row]))
+                if score >= best_similarity:
+                    best, best_similarity = row, score
+            self.counters["lookups"] += 1
+            self.counters["hits" if best is not None else "misses"] += 1
+            return best
+
+    def lookup_many(self, signatures):
+        """
+        Looks up a batch, also matching inputs against earlier ones in the same batch.
+
+        Returns:
+            tuple: (rows, aliases) - per signature, the row of a stored near-duplicate (or None)
+                   and, when not stored, the position of an earlier near-duplicate in the batch (or None).
+        """
+        rows, aliases, originals = [], [], []
+        for i, signature in enumerate(signatures):
+            row = self.lookup(signature)
+            alias = None
+            if row is None:
+                alias = next((j for j in originals if self.is_near_duplicate(signatures[j], signature)), None)
+                if alias is None:
+                    originals.append(i)
+                else:
+                    # counted as a miss by lookup(), but its work is skipped all the same
+                    self.counters["misses"] -= 1
+                    self.counters["hits"] += 1
+            rows.append(row)
+            aliases.append(alias)
+        return rows, aliases
+
+    def get(self, row):
+        """
+        Returns:
+            tuple: (embedding, decision) stored for a row.
+        """
+        with self.lock:
+            return np.array(self.embeddings[row]), self.index["decisions"][row]
+
+    def add_many(self, signatures, embeddings, decisions):
+        """
+        Stores newly processed inputs after the rows other processes added, and records them in index.json.
+
+        Returns:
+            list: Their rows.
+        """
+        with self.lock, self.file_lock:
+            self._sync()
+            self._reserve(len(signatures))
+            first = self.index["rows"]
+            rows = list(range(first, first + len(signatures)))
+            if rows:
+                self.signatures[first:first + len(rows)] = np.array(signatures, dtype=np.uint64)
+                self.embeddings[first:first + len(rows)] = np.asarray(embeddings, dtype=np.float32).reshape(len(rows), self.dim)
+            for row, signature, decision in zip(rows, signatures, decisions):
+                self._insert(signature, row)
+                self.index["decisions"].append(decision)
+            self.index["rows"] = first + len(rows)
+            self._write_index()
+            return rows
+
+    def add(self, signature, embedding, decision):
+        return self.add_many([signature], [embedding], [decision])[0]
+
+    # ---- reporting ----------------------------------------------------------
+
+    def stats(self):
+        """
+        Returns:
+            dict: lookups, hits (inputs whose embedding and reasoning were skipped), misses,
+                  hit_rate and the number of stored inputs.
+        """
+        counters = dict(self.counters)
+        counters["hit_rate"] = counters["hits"] / counters["lookups"] if counters["lookups"] else None
+        counters["stored"] = self.index["rows"]
+        return counters
+
+    def evaluate(self, pairs):
+        """
+        Measures the matching rule on a labeled sample.
+
+        Args:
+            pairs (iterable): (text_a, text_b, is_duplicate) triples.
+
+        Returns:
+            dict: pairs, false_positives, false_positive_rate (over the non-duplicate pairs)
+                  and recall (over the duplicate pairs).
+        """
+        positives = negatives = true_positives = false_positives = 0
+        for text_a, text_b, is_duplicate in pairs:
+            matched = self.is_near_duplicate(self.signature(preprocess_text(text_a)),
+                                             self.signature(preprocess_text(text_b)))
+            if is_duplicate:
+                positives += 1
+                true_positives += matched
+            else:
+                negatives += 1
+                false_positives += matched
+        return {
+            "pairs": positives + negatives,
+            "false_positives": false_positives,
+            "false_positive_rate": false_positives / negatives if negatives else None,
+            "recall": true_positives / positives if positives else None,
+        }
+
+
+_index = None
+
+
+def get_dedup_index(model_id=None):
+    """
+    Returns the process-wide near-duplicate index at DEDUP_DIR for embeddings of the text model `model_id`.
+    """
+    global _index
+    if _index is None or _index.directory != DEDUP_DIR or _index.model_id != model_id:
+        _index = DedupIndex(DEDUP_DIR, model_id=model_id)
+    return _index
@@ -0,0 +1,203 @@
+# modules/embedding_batch.py
+"""
+Embedding Batch Module:
+A shared container for embeddings passed between pipeline stages.
+
+An EmbeddingBatch owns one contiguous (n, dim) float32 buffer (taken over from the model output
+without copying), computes per-row and overall mean/std once in a single chunked pass, and caches
+them, so reasoning, self-analysis and memory logging stop re-scanning the same vector. Stages get
+read-only views; the buffer goes to disk (.npy) or shared memory through the buffer protocol.
+"""
+
+import operator
+
+import numpy as np
+
+# Rows per chunk of the statistics pass; a chunk of 768-d float32 rows stays within the L2 cache.
+_STATS_CHUNK_ROWS = 64
+
+
+class EmbeddingBatch:
+    """
+    One contiguous buffer of embeddings with cached summary statistics.
+    """
+
+    def __init__(self, data, _stats=None, _shm=None):
+        """
+        Args:
+            data: A (dim,) or (n, dim) array, or a CPU torch tensor. No copy is made when the
+                data is already a C-contiguous float32 array (or tensor).
+        """
+        if hasattr(data, "detach"):
+            data = data.detach().numpy()  # shares the tensor's memory
+        array = np.ascontiguousarray(data, dtype=np.float32)
+        self.single = array.ndim == 1
+        self._array = array.reshape(1, -1) if self.single else array
+        self._stats = _stats
+        self._shm = _shm
+
+    # ---- views ------------------------------------------------------------
+
+    @property
+    def array(self):
+        """
+        A read-only (n, dim) view of the buffer (a (dim,) view for single embeddings).
+        """
+        view = self._array[0] if self.single else self._array.view()
+        view.flags.writeable = False
+        return view
+
+    def __array__(self, dtype=None, copy=None):
+        # np.asarray(batch) hands out the read-only view; only a dtype change or copy=True copies.
+        view = self.array
+        if (dtype is None or np.dtype(dtype) == view.dtype) and not copy:
+            return view
+        return view.astype(dtype or view.dtype)
+
+    def __len__(self):
+        return len(self._array)
+
+    def __getitem__(self, index):
+        """
+        Returns row `index` (an int; negative counts from the end) as a single-embedding
+        EmbeddingBatch that shares the buffer and the already computed statistics.
+        """
+        index = operator.index(index)  # slices and arrays would not line up with the cached row stats
+        if not -len(self) <= index < len(self):
+            raise IndexError(f"row {index} out of range for {len(self)} embeddings")
+        index %= len(self)
+        stats = None
+        if self._stats is not None:
+            row_mean, row_std = self._stats["row_mean"][index:index + 1], self._stats["row_std"][index:index + 1]
+            stats = {"row_mean": row_mean, "row_std": row_std, "mean": float(row_mean[0]), "std": float(row_std[0])}
+        return EmbeddingBatch(self._array[index], _stats=stats)
+
+    @property
+    def shape(self):
+        return self.array.shape
+
+    @property
+    def nbytes(self):
+        return self._array.nbytes
+
+    def memoryview(self):
+        """
+        A read-only memoryview of the raw buffer (e.g. for file.write() or socket.send()).
+        """
+        return memoryview(self.array.reshape(-1)).toreadonly()
+
+    # ---- statistics -------------------------------------------------------
+
+    def stats(self):
+        """
+        Per-row and overall mean and standard deviation, computed once in a chunked single pass
+        (sum and sum of squares, accumulated in float64) and cached.
+
+        Returns:
+            dict: row_mean, row_std (arrays of length n), mean and std (floats, over all values).
+        """
+        if self._stats is None:
+            n, dim = self._array.shape
+            sums = np.empty(n, dtype=np.float64)
+            sumsq = np.empty(n, dtype=np.float64)
+            for start in range(0, n, _STATS_CHUNK_ROWS):
+                chunk = self._array[start:start + _STATS_CHUNK_ROWS]
+                sums[start:start + len(chunk)] = chunk.sum(axis=1, dtype=np.float64)
+                sumsq[start:start + len(chunk)] = np.einsum("ij,ij->i", chunk, chunk, dtype=np.float64)
+            row_mean = sums / dim
+            row_std = np.sqrt(np.maximum(sumsq / dim - row_mean ** 2, 0.0))
+            mean = float(sums.sum() / (n * dim)) if n else 0.0
+            std = float(np.sqrt(max(sumsq.sum() / (n * dim) - mean ** 2, 0.0))) if n else 0.0
+            self._stats = {"row_mean": row_mean, "row_std": row_std, "mean": mean, "std": std}
+        return self._stats
+
+    def mean(self):
+        """
+        Mean over all values (cached).
+        """
+        return self.stats()["mean"]
+
+    def std(self):
+        """
+        Standard deviation over all values (cached).
+        """
+        return self.stats()["std"]
+
+    def row_means(self):
+        """
+        Per-row means (cached).
+        """
+        return self.stats()["row_mean"]
+
+    def summary(self):
+        """
+        Returns:
+            dict: {"mean", "std"} as floats, the memory event's embedding_stats format.
+        """
+        return {"mean": self.mean(), "std": self.std()}
+
+    # ---- storage ----------------------------------------------------------
+
+    def save(self, path):
+        """
+        Writes the batch as a .npy file: the header, then the buffer itself, with no intermediate copy.
+        """
+        with open(path, "wb") as f:
+            np.lib.format.write_array_header_1_0(f, {"descr": np.lib.format.dtype_to_descr(self._array.dtype),
+                                                     "fortran_order": False, "shape": self.shape})
+            f.write(self.memoryview())
+
+    @classmethod
+    def load(cls, path, mmap=True):
+        """
+        Loads a batch written by save() (or any float32 .npy file), memory-mapped by default.
+        """
+        return cls(np.load(path, mmap_mode="r" if mmap else None))
+
+    def share(self):
+        """
+        Moves the buffer into shared memory (one copy) so other processes can attach to it
+        without pickling; later calls return the same block.
+
+        Returns:
+            dict: A descriptor for EmbeddingBatch.attach(): {"name", "shape"}.
+        """
+        from multiprocessing import shared_memory
+
+        if self._shm is None:
+            shm = shared_memory.SharedMemory(create=True, size=max(self.nbytes, 1))
+            shared = np.ndarray(self._array.shape, dtype=np.float32, buffer=shm.buf)
+            shared[...] = self._array
+            self._array, self._shm = shared, shm
+        return {"name": self._shm.name, "shape": self.shape}
+
+    @classmethod
+    def attach(cls, descriptor):
+        """
+        Attaches to a batch shared with share() in another process (zero-copy).
+        """
+        from multiprocessing import shared_memory
+
+        shm = shared_memory.SharedMemory(name=descriptor["name"])
+        return cls(np.ndarray(tuple(descriptor["shape"]), dtype=np.float32, buffer=shm.buf), _shm=shm)
+
+    def close(self, unlink=False):
+        """
+        Releases this process' handle on shared memory; the creator passes unlink=True once
+        every consumer is done. Views handed out earlier must have been released.
+        """
+        if self._shm is not None:
+            self._array = np.array(self._array)  # keep the data usable after the block goes away
+            self._shm.close()
+            if unlink:
+                self._shm.unlink()
+            self._shm = None
+
+
+def embedding_mean(embeddings):
+    """
+    Mean of an embedding: the cached value for an EmbeddingBatch, one pass over a plain array.
+    """
+    if isinstance(embeddings, EmbeddingBatch):
+        return embeddings.mean()
+    return float(np.mean(embeddings))
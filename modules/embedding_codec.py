@@ -0,0 +1,562 @@
+# modules/embedding_codec.py
+"""
+Embedding Codec Module:
+Compact storage and approximate search for embeddings: PCA followed by product quantization.
+
+A vector is centered, rotated onto the principal directions of the training data (keeping the
+top pca_dim of them) and split into num_subvectors sub-vectors. Each sub-vector is replaced by
+the index of its nearest centroid in a trained 256-entry codebook, so a vector is stored as
+num_subvectors uint8 codes. Principal directions are dealt to sub-vectors so that each gets a
+similar share of the variance (eigenvalue allocation), which keeps every codebook useful.
+
+Similarity is computed on the codes (asymmetric distance computation): the query stays in
+float32, one (num_subvectors, 256) lookup table of partial inner products or squared distances
+is built per query, and a stored vector's score is the sum of its table entries. Adjacent
+sub-vectors are looked up in pairs through 65536-entry tables, halving the gathers per vector.
+
+Training streams over chunks of vectors: the mean and covariance are accumulated over all of
+them and a uniform reservoir sample trains the codebooks, so the training set never has to fit
+in memory. retrain() warm-starts the codebooks of a new codec from an existing one.
+
+Codecs are saved under EMBEDDING_CODEC_DIR by fingerprint. Compression is opt-in: a codec only
+becomes current through enable_codec(), which refuses it unless its recall@10 on the stored
+vectors reaches MIN_RECALL. While a current codec exists, long-term memory stores new fused
+vectors as codes ("fused_pq") instead of float lists; the float vectors are not kept, so this is
+lossy for good. search_long_term_memory() scores each event with the codec that encoded it, so
+events encoded before a retrain stay searchable as long as that codec's file is kept: deleting it
+makes those events unsearchable (a warning is logged when that happens).
+
+    python -m modules.embedding_codec train --sample 100000 --subvectors 16
+    python -m modules.embedding_codec enable <fingerprint> --min-recall 0.9
+    python -m modules.embedding_codec report
+    python -m modules.embedding_codec disable
+"""
+
+import base64
+import hashlib
+import json
+import os
+import threading
+
+import numpy as np
+
+from modules.structured_logging import get_logger
+from modules.tiered_storage import atomic_write_json
+
+logger = get_logger(__name__)
+
+EMBEDDING_CODEC_DIR = "embedding_codecs"
+CURRENT_FILE = "current.json"
+NUM_CENTROIDS = 256
+# Minimum recall@10 of the search on codes, measured on stored vectors, for a codec to be enabled.
+MIN_RECALL = 0.9
+
+
+# ---- training helpers ----------------------------------------------------------
+
+def iter_chunks(vectors, chunk_size=4096):
+    """
+    Groups a stream of vectors into float32 (n, dim) chunks. Matrices in the stream are passed
+    through as chunks of their own; a single matrix is one chunk.
+    """
+    if isinstance(vectors, np.ndarray):
+        vectors = [vectors]
+    rows = []
+    for item in vectors:
+        item = np.asarray(item, dtype=np.float32)
+        if item.ndim == 2:
+            if rows:
+                yield np.stack(rows)
+                rows = []
+            yield item
+            continue
+        rows.append(item)
+        if len(rows) >= chunk_size:
+            yield np.stack(rows)
+            rows = []
+    if rows:
+        yield np.stack(rows)
+
+
+def _balanced_directions(eigenvalues, num_subvectors):
+    # Deals principal directions (largest variance first) to the sub-vector with the smallest
+    # product of variances so far that still has room, and returns them grouped by sub-vector.
+    sub_dim = len(eigenvalues) // num_subvectors
+    buckets = [[] for _ in range(num_subvectors)]
+    log_variance = np.zeros(num_subvectors)
+    for index in np.argsort(eigenvalues)[::-1]:
+        open_buckets = [m for m in range(num_subvectors) if len(buckets[m]) < sub_dim]
+        m = min(open_buckets, key=lambda b: log_variance[b])
+        buckets[m].append(index)
+        log_variance[m] += np.log(max(float(eigenvalues[index]), 1e-12))
+    return [index for bucket in buckets for index in bucket]
+
+
+def _assign(x, centroids, block=8192):
+    # Index of the nearest centroid of every row of x.
+    norms = np.einsum("ij,ij->i", centroids, centroids)
+    labels = np.empty(len(x), dtype=np.intp)
+    for start in range(0, len(x), block):
+        labels[start:start + block] = np.argmin(norms - 2.0 * (x[start:start + block] @ centroids.T), axis=1)
+    return labels
+
+
+def _kmeans(x, k, iters, rng, init=None):
+    centroids = init.copy() if init is not None else x[rng.choice(len(x), k, replace=len(x) < k)].copy()
+    labels = None
+    for _ in range(iters):
+        new_labels = _assign(x, centroids)
+        if labels is not None and np.array_equal(new_labels, labels):
+            break
+        labels = new_labels
+        counts = np.bincount(labels, minlength=k)
+        sums = np.stack([np.bincount(labels, weights=x[:, j], minlength=k) for j in range(x.shape[1])], axis=1)
+        filled = counts > 0
+        centroids[filled] = (sums[filled] / counts[filled, None]).astype(np.float32)
+        # re-seed empty clusters at random training points
+        empty = np.flatnonzero(~filled)
+        if len(empty):
+            centroids[empty] = x[rng.choice(len(x), len(empty))]
+    return centroids
+
+
+# ---- codec ----------------------------------------------------------------------
+
+class PQCodec:
+    """
+    PCA + product quantization codec with asymmetric (float query, uint8 codes) scoring.
+    """
+
+    def __init__(self, dim, num_subvectors=16, pca_dim=None):
+        """
+        Args:
+            dim (int): Input dimension.
+            num_subvectors (int): Bytes per encoded vector.
+            pca_dim (int, optional): Principal directions kept (defaults to dim); must be a
+                                     multiple of num_subvectors.
+        """
+        pca_dim = pca_dim or dim
+        if pca_dim > dim or pca_dim % num_subvectors:
+            raise ValueError(f"pca_dim {pca_dim} must be at most dim {dim} and a multiple of num_subvectors {num_subvectors}")
+        self.dim = dim
+        self.num_subvectors = num_subvectors
+        self.pca_dim = pca_dim
+        self.mean = np.zeros(dim, dtype=np.float32)
+        self.components = np.eye(dim, pca_dim, dtype=np.float32)  # (dim, pca_dim), grouped by sub-vector
+        self.codebooks = None  # (num_subvectors, NUM_CENTROIDS, sub_dim)
+        self.trained_on = 0
+
+    @property
+    def sub_dim(self):
+        return self.pca_dim // self.num_subvectors
+
+    @property
+    def trained(self):
+        return self.codebooks is not None
+
+    def fit(self, chunks, sample_size=65536, iters=20, seed=0, init=None):
+        """
+        Trains the PCA and codebooks over a stream of vectors in one pass.
+
+        Args:
+            chunks (iterable): (n, dim) matrices, or single vectors (see iter_chunks()).
+            sample_size (int): Vectors kept (reservoir sampling) to train the codebooks.
+            iters (int): Maximum k-means iterations per codebook.
+            seed (int): Seed of the sample and of the k-means initialization.
+            init (numpy.array, optional): Initial codebooks (see retrain()).
+
+        Returns:
+            PQCodec: self.
+        """
+        rng = np.random.default_rng(seed)
+        total = np.zeros(self.dim)
+        scatter = np.zeros((self.dim, self.dim))
+        sample = np.empty((sample_size, self.dim), dtype=np.float32)
+        seen = 0
+        for chunk in iter_chunks(chunks):
+            if chunk.shape[1] != self.dim:
+                raise ValueError(f"Expected {self.dim}-d vectors, got {chunk.shape[1]}-d")
+            chunk64 = chunk.astype(np.float64)
+            total += chunk64.sum(axis=0)
+            scatter += chunk64.T @ chunk64
+            # reservoir sampling: row i of the stream replaces a random slot with probability size / (i + 1)
+            index = np.arange(seen, seen + len(chunk))
+            fill = index < sample_size
+            sample[index[fill]] = chunk[fill]
+            slots = rng.integers(0, index[~fill] + 1) if (~fill).any() else np.empty(0, dtype=np.int64)
+            keep = slots < sample_size
+            sample[slots[keep]] = chunk[~fill][keep]
+            seen += len(chunk)
+        if not seen:
+            raise ValueError("No vectors to train on")
+        sample = sample[:min(seen, sample_size)]
+        mean = total / seen
+        covariance = scatter / seen - np.outer(mean, mean)
+        eigenvalues, eigenvectors = np.linalg.eigh(covariance)
+        top = np.argsort(eigenvalues)[::-1][:self.pca_dim]
+        order = _balanced_directions(eigenvalues[top], self.num_subvectors)
+        self.mean = mean.astype(np.float32)
+        self.components = np.ascontiguousarray(eigenvectors[:, top[order]], dtype=np.float32)
+
+        projected = self.project(sample)
+        self.codebooks = np.stack([
+            _kmeans(np.ascontiguousarray(projected[:, m * self.sub_dim:(m + 1) * self.sub_dim]), NUM_CENTROIDS,
+                    iters, rng, None if init is None else init[m])
+            for m in range(self.num_subvectors)])
+        self.trained_on = seen
+        return self
+
+    def retrain(self, chunks, **options):
+        """
+        Trains a new codec of the same shape over a fresh stream, starting the k-means from this
+        codec's codebooks. Codes of the two codecs are not interchangeable.
+
+        Returns:
+            PQCodec: The new codec.
+        """
+        codec = PQCodec(self.dim, self.num_subvectors, self.pca_dim)
+        return codec.fit(chunks, init=self.codebooks, **options)
+
+    # ---- encoding ------------------------------------------------------------
+
+    def project(self, vectors):
+        """
+        Returns:
+            numpy.array: (n, pca_dim) centered, rotated vectors.
+        """
+        return (np.asarray(vectors, dtype=np.float32).reshape(-1, self.dim) - self.mean) @ self.components
+
+    def encode(self, vectors, block=65536):
+        """
+        Returns:
+            numpy.array: (n, num_subvectors) uint8 codes.
+        """
+        vectors = np.asarray(vectors, dtype=np.float32).reshape(-1, self.dim)
+        codes = np.empty((len(vectors), self.num_subvectors), dtype=np.uint8)
+        for start in range(0, len(vectors), block):
+            projected = self.project(vectors[start:start + block])
+            for m in range(self.num_subvectors):
+                codes[start:start + block, m] = _assign(projected[:, m * self.sub_dim:(m + 1) * self.sub_dim],
+                                                        self.codebooks[m])
+        return codes
+
+    def decode(self, codes):
+        """
+        Returns:
+            numpy.array: (n, dim) float32 reconstructions.
+        """
+        codes = np.asarray(codes, dtype=np.uint8).reshape(-1, self.num_subvectors)
+        projected = np.concatenate([self.codebooks[m][codes[:, m]] for m in range(self.num_subvectors)], axis=1)
+        return projected @ self.components.T + self.mean
+
+    # ---- scoring -------------------------------------------------------------
+
+    def lookup_tables(self, queries, metric="ip"):
+        """
+        Builds the per-query tables of asymmetric distance computation.
+
+        Args:
+            queries (numpy.array): (q, dim) or (dim,) float queries.
+            metric (str): "ip" (partial inner products) or "l2" (partial squared distances).
+
+        Returns:
+            tuple: ((q, num_subvectors, 256) float32 tables, (q,) constant term per query).
+        """
+        queries = np.asarray(queries, dtype=np.float32).reshape(-1, self.dim)
+        projected = self.project(queries).reshape(len(queries), self.num_subvectors, 1, self.sub_dim)
+        if metric == "ip":
+            # q . (mean + components z) = q . mean + (q components) . z
+            rotated = (queries @ self.components).reshape(len(queries), self.num_subvectors, self.sub_dim)
+            tables = np.einsum("qms,mks->qmk", rotated, self.codebooks)
+            constant = queries @ self.mean
+        elif metric == "l2":
+            tables = ((projected - self.codebooks[None]) ** 2).sum(axis=-1)
+            # the part of the query outside the kept principal directions
+            centered = queries - self.mean
+            constant = np.einsum("ij,ij->i", centered, centered) - np.einsum("qmis,qmis->q", projected, projected)
+        else:
+            raise ValueError(f"Unknown metric {metric!r}")
+        return tables.astype(np.float32), constant.astype(np.float32)
+
+    def scores(self, queries, codes, metric="ip", block=1 << 20):
+        """
+        Approximate inner products ("ip") or squared distances ("l2") between float queries and
+        encoded vectors, computed from the codes alone.
+
+        Returns:
+            numpy.array: (q, n) float32 scores.
+        """
+        tables, constant = self.lookup_tables(queries, metric)
+        codes = np.ascontiguousarray(codes, dtype=np.uint8).reshape(-1, self.num_subvectors)
+        q, n = len(tables), len(codes)
+        if n >= NUM_CENTROIDS * NUM_CENTROIDS and self.num_subvectors % 2 == 0:
+            # pairs of sub-vectors: one uint16 code indexes a table of all 256 x 256 sums
+            tables = (tables[:, 0::2, None, :] + tables[:, 1::2, :, None]).reshape(q, -1, NUM_CENTROIDS ** 2)
+            codes = codes.view("<u2")
+        out = np.repeat(constant[:, None], n, axis=1)
+        for start in range(0, n, block):
+            columns = np.ascontiguousarray(codes[start:start + block].T)
+            for m, column in enumerate(columns):
+                index = column.astype(np.intp)  # 1-d take with native indices is the fastest gather
+                for i in range(q):
+                    out[i, start:start + block] += tables[i, m].take(index)
+        return out
+
+    def search(self, queries, codes, k=10, metric="ip"):
+        """
+        Returns the k best encoded vectors per query (largest inner products or smallest distances).
+
+        Returns:
+            tuple: ((q, k) scores, (q, k) row indices), best first.
+        """
+        scores = self.scores(queries, codes, metric)
+        signed = -scores if metric == "ip" else scores
+        k = min(k, scores.shape[1])
+        top = np.argpartition(signed, k - 1, axis=1)[:, :k]
+        order = np.argsort(np.take_along_axis(signed, top, axis=1), axis=1)
+        indices = np.take_along_axis(top, order, axis=1)
+        return np.take_along_axis(scores, indices, axis=1), indices
+
+    # ---- persistence ----------------------------------------------------------
+
+    def fingerprint(self):
+        """
+        Returns a short hash of the codec's parameters; codes are only meaningful with the codec
+        that has their fingerprint.
+        """
+        digest = hashlib.sha1(json.dumps([self.dim, self.num_subvectors, self.pca_dim]).encode("ascii"))
+        for array in (self.mean, self.components, self.codebooks):
+            digest.update(np.ascontiguousarray(array).tobytes())
+        return digest.hexdigest()[:12]
+
+    def save(self, path):
+        """
+        Saves the codec to an .npz file.
+        """
+        config = {"dim": self.dim, "num_subvectors": self.num_subvectors, "pca_dim": self.pca_dim,
+                  "trained_on": self.trained_on}
+        tmp_path = path + ".tmp.npz"
+        np.savez(tmp_path, config=np.array(json.dumps(config)), mean=self.mean, components=self.components,
+                 codebooks=self.codebooks)
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path):
+        """
+        Loads a codec written by save().
+        """
+        with np.load(path) as data:
+            config = json.loads(str(data["config"]))
+            codec = cls(config["dim"], config["num_subvectors"], config["pca_dim"])
+            codec.trained_on = config["trained_on"]
+            codec.mean, codec.components, codec.codebooks = data["mean"], data["components"], data["codebooks"]
+        return codec
+
+
+def evaluate_codec(codec, vectors, queries=None, k=10, candidates=100, repeat=3):
+    """
+    Measures a codec against float32 storage on held-out vectors.
+
+    Args:
+        codec (PQCodec): A trained codec.
+        vectors (numpy.array): (n, dim) vectors to encode and scan.
+        queries (numpy.array, optional): (q, dim) queries (defaults to the first 16 vectors).
+        k (int): Neighbors compared for recall.
+        candidates (int): Shortlist size for the re-ranking recall.
+        repeat (int): Timed scans per variant (the fastest counts).
+
+    Returns:
+        dict: compression_ratio, bytes_per_vector, relative reconstruction_error (squared error
+              over squared norm), recall_at_k of the inner-product search, the share of the true
+              top k found in the top `candidates` by codes (what re-ranking the shortlist with
+              float vectors recovers), and the scan throughput (vectors per second and query) on
+              codes and on float32.
+    """
+    import time
+
+    vectors = np.asarray(vectors, dtype=np.float32)
+    queries = vectors[:16] if queries is None else np.asarray(queries, dtype=np.float32)
+    codes = codec.encode(vectors)
+    error = ((codec.decode(codes) - vectors) ** 2).sum() / max(float((vectors ** 2).sum()), 1e-12)
+
+    def fastest(fn):
+        best = float("inf")
+        for _ in range(repeat):
+            start = time.perf_counter()
+            result = fn()
+            best = min(best, time.perf_counter() - start)
+        return best, result
+
+    pq_s, (_, found) = fastest(lambda: codec.search(queries, codes, k))
+    exact_s, exact = fastest(lambda: np.argpartition(-(queries @ vectors.T), k - 1, axis=1)[:, :k])
+    recall = lambda found: float(np.mean([len(set(a) & set(b)) / k for a, b in zip(found.tolist(), exact.tolist())]))
+    _, shortlist = codec.search(queries, codes, candidates)
+    scanned = len(vectors) * len(queries)
+    return {"compression_ratio": vectors.shape[1] * 4 / codec.num_subvectors,
+            "bytes_per_vector": codec.num_subvectors, "reconstruction_error": float(error),
+            f"recall_at_{k}": recall(found), f"recall_{k}_at_{candidates}": recall(shortlist),
+            "pq_scan_vectors_per_s": scanned / pq_s,
+            "float32_scan_vectors_per_s": scanned / exact_s}
+
+
+# ---- codec store ------------------------------------------------------------------
+
+_codecs = {}
+_missing = set()
+_lock = threading.Lock()
+
+
+def save_codec(codec, directory=None, make_current=False):
+    """
+    Saves a codec under its fingerprint and (with make_current) marks it as the current codec.
+    Use enable_codec() to make a codec current after checking its recall.
+
+    Returns:
+        str: The fingerprint.
+    """
+    directory = directory or EMBEDDING_CODEC_DIR
+    os.makedirs(directory, exist_ok=True)
+    fingerprint = codec.fingerprint()
+    codec.save(os.path.join(directory, f"{fingerprint}.npz"))
+    if make_current:
+        atomic_write_json(os.path.join(directory, CURRENT_FILE), {"fingerprint": fingerprint})
+    with _lock:
+        _codecs[(directory, fingerprint)] = codec
+    logger.info("Saved embedding codec %s (%d vectors, %d bytes per vector)", fingerprint, codec.trained_on,
+                codec.num_subvectors)
+    return fingerprint
+
+
+def get_codec(fingerprint, directory=None):
+    """
+    Returns:
+        PQCodec: The saved codec with this fingerprint (memoized), or None if there is none.
+    """
+    directory = directory or EMBEDDING_CODEC_DIR
+    with _lock:
+        if (directory, fingerprint) not in _codecs:
+            path = os.path.join(directory, f"{fingerprint}.npz")
+            if not os.path.exists(path):
+                if (directory, fingerprint) not in _missing:
+                    _missing.add((directory, fingerprint))
+                    logger.warning("Embedding codec %s is missing from %s; events encoded with it cannot be "
+                                   "searched or decoded.", fingerprint, directory)
+                return None
+            _codecs[(directory, fingerprint)] = PQCodec.load(path)
+        return _codecs[(directory, fingerprint)]
+
+
+def enable_codec(codec, vectors, min_recall=MIN_RECALL, directory=None, k=10):
+    """
+    Saves a codec and makes it current, so long-term memory stores new fused vectors as its codes,
+    if its recall@k on `vectors` (held-out stored vectors) reaches min_recall.
+
+    Returns:
+        dict: The evaluate_codec() report the decision was based on.
+
+    Raises:
+        ValueError: If the codec's recall is below min_recall.
+    """
+    report = evaluate_codec(codec, vectors, k=k, repeat=1)
+    if report[f"recall_at_{k}"] < min_recall:
+        raise ValueError(f"Codec {codec.fingerprint()} has recall@{k} {report[f'recall_at_{k}']:.3f} "
+                         f"< {min_recall}; not enabling it.")
+    save_codec(codec, directory, make_current=True)
+    return report
+
+
+def disable_codec(directory=None):
+    """
+    Stops compressing new events; events already stored as codes keep their codecs.
+    """
+    try:
+        os.remove(os.path.join(directory or EMBEDDING_CODEC_DIR, CURRENT_FILE))
+    except FileNotFoundError:
+        pass
+
+
+def current_codec(directory=None):
+    """
+    Returns:
+        PQCodec: The current codec, or None if none was trained.
+    """
+    directory = directory or EMBEDDING_CODEC_DIR
+    try:
+        with open(os.path.join(directory, CURRENT_FILE), "r", encoding="utf-8") as f:
+            fingerprint = json.load(f)["fingerprint"]
+    except (OSError, ValueError, KeyError):
+        return None
+    return get_codec(fingerprint, directory)
+
+
+def pack_codes(codec, vectors):
+    """
+    Encodes vectors for storage in JSON events.
+
+    Returns:
+        list: One {"codec": fingerprint, "codes": base64 string} dict per vector.
+    """
+    fingerprint = codec.fingerprint()
+    return [{"codec": fingerprint, "codes": base64.b64encode(row.tobytes()).decode("ascii")}
+            for row in codec.encode(vectors)]
+
+
+def unpack_codes(packed, directory=None):
+    """
+    Decodes the codes of packed vectors that share one codec.
+
+    Returns:
+        tuple: (PQCodec or None if the codec is missing, (n, num_subvectors) uint8 codes).
+    """
+    codec = get_codec(packed[0]["codec"], directory)
+    blob = b"".join(base64.b64decode(p["codes"]) for p in packed)
+    codes = np.frombuffer(blob, dtype=np.uint8)
+    return codec, codes.reshape(len(packed), -1)
+
+
+if __name__ == "__main__":
+    import argparse
+    import itertools
+
+    parser = argparse.ArgumentParser(description="Train and evaluate the long-term memory embedding codec.")
+    parser.add_argument("command", choices=["train", "enable", "disable", "report"])
+    parser.add_argument("fingerprint", nargs="?", help="Codec to enable or report on (defaults to the current one).")
+    parser.add_argument("--min-recall", type=float, default=MIN_RECALL)
+    parser.add_argument("--sample", type=int, default=65536, help="Vectors sampled to train the codebooks.")
+    parser.add_argument("--subvectors", type=int, default=16, help="Bytes per encoded vector.")
+    parser.add_argument("--pca-dim", type=int, default=None)
+    parser.add_argument("--iters", type=int, default=20)
+    parser.add_argument("--fresh", action="store_true", help="Do not warm-start from the current codec.")
+    parser.add_argument("--dir", default=EMBEDDING_CODEC_DIR)
+    args = parser.parse_args()
+
+    from modules.long_term_memory import iter_fused_embeddings
+
+    codec = get_codec(args.fingerprint, args.dir) if args.fingerprint else current_codec(args.dir)
+    held_out = lambda: np.asarray(list(itertools.islice(iter_fused_embeddings(), 20000)), dtype=np.float32)
+    if args.command == "disable":
+        disable_codec(args.dir)
+        print("Compression disabled; events stored as codes keep their codecs.")
+    elif args.command == "train":
+        first = next(iter_fused_embeddings(), None)
+        if first is None:
+            raise SystemExit("Long-term memory holds no fused embeddings to train on.")
+        if codec is not None and not args.fresh and codec.dim == len(first) and \
+                (codec.num_subvectors, codec.pca_dim) == (args.subvectors, args.pca_dim or codec.dim):
+            codec = codec.retrain(iter_fused_embeddings(), sample_size=args.sample, iters=args.iters)
+        else:
+            codec = PQCodec(len(first), args.subvectors, args.pca_dim).fit(
+                iter_fused_embeddings(), sample_size=args.sample, iters=args.iters)
+        print("Trained codec (enable it with the `enable` command):", save_codec(codec, args.dir))
+        print(json.dumps(evaluate_codec(codec, held_out()), indent=2))
+    elif codec is None:
+        raise SystemExit("No such codec; run `python -m modules.embedding_codec train` first.")
+    elif args.command == "enable":
+        try:
+            report = enable_codec(codec, held_out(), args.min_recall, args.dir)
+        except ValueError as e:
+            raise SystemExit(str(e))
+        print("Current codec:", codec.fingerprint())
+        print(json.dumps(report, indent=2))
+    else:
+        print(json.dumps(evaluate_codec(codec, held_out()), indent=2))
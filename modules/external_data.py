@@ -4,36 +4,125 @@ External Data Module:
 Fetches data from the internet using the Hacker News API to obtain top headlines.
 Requires: requests
 Install via: pip install requests
+The async variants use aiohttp when installed (pip install aiohttp) and threaded requests otherwise.
+
+fetch_hacker_news_headlines() refetches the top list and every item on each call. HeadlineSync
+keeps a cursor of the items it has seen and a local item store under HN_SYNC_DIR, fetches only
+new, changed or stale items, and reports the headlines that are new since the last sync (the
+delta), which is all incremental training needs to see.
 """
 
+import asyncio
+import json
+import os
+import threading
+import time
+from collections import namedtuple
+from contextlib import asynccontextmanager
+
 import requests
 
-def fetch_hacker_news_headlines():
+try:
+    import aiohttp
+except ImportError:  # Optional dependency
+    aiohttp = None
+
+from modules.structured_logging import get_logger, run_in_thread
+from modules.tiered_storage import atomic_write_json
+
+logger = get_logger(__name__)
+
+# Base URL of the Hacker News API; point it at a local stub for tests and benchmarks.
+HN_API_BASE = "https://hacker-news.firebaseio.com/v0"
+
+HN_SYNC_DIR = "hn_sync"
+CURSOR_FILE = "cursor.json"
+ITEMS_FILE = "items.json"
+
+# One sync: the current top headlines, the headlines of new or changed items, and the HTTP
+# requests made (items fetched plus the top and updates lists) versus a full refetch.
+SyncResult = namedtuple("SyncResult", ["headlines", "delta", "fetched", "requests", "baseline_requests"])
+
+def fetch_hacker_news_headlines(base_url=None):
     """
     Fetches the top 10 Hacker News headlines using the Hacker News API.
     
+    Args:
+        base_url (str, optional): API base URL (defaults to HN_API_BASE).
+    
     Returns:
         list: A list of headline strings.
     """
+    base_url = base_url or HN_API_BASE
     try:
         # Get the top story IDs from Hacker News
-        top_ids_response = requests.get("https://hacker-news.firebaseio.com/v0/topstories.json")
+        top_ids_response = requests.get(f"{base_url}/topstories.json")
         top_ids_response.raise_for_status()
         top_ids = top_ids_response.json()[:10]  # Get top 10 story IDs
         
         headlines = []
         for story_id in top_ids:
-            story_response = requests.get(f"https://hacker-news.firebaseio.com/v0/item/{story_id}.json")
+            story_response = requests.get(f"{base_url}/item/{story_id}.json")
             story_response.raise_for_status()
             story = story_response.json()
             if story and "title" in story:
                 headlines.append(story["title"])
-        print(f"[EXTERNAL DATA] Fetched {len(headlines)} Hacker News headlines.")
+        logger.info("Fetched %d Hacker News headlines.", len(headlines))
+        return headlines
+    except Exception as e:
+        logger.warning("Error fetching Hacker News headlines: %s", e)
+        return []
+
+def _get_json(url):
+    response = requests.get(url, timeout=30)
+    response.raise_for_status()
+    return response.json()
+
+@asynccontextmanager
+async def _async_json_getter(concurrency):
+    # Yields `async get_json(url)`, with at most `concurrency` requests in flight.
+    semaphore = asyncio.Semaphore(concurrency)
+    if aiohttp is not None:
+        async with aiohttp.ClientSession(timeout=aiohttp.ClientTimeout(total=30)) as session:
+            async def get_json(url):
+                async with semaphore, session.get(url) as response:
+                    response.raise_for_status()
+                    return await response.json(content_type=None)
+            yield get_json
+    else:
+        async def get_json(url):
+            async with semaphore:
+                return await run_in_thread(asyncio.get_running_loop(), _get_json, url)
+        yield get_json
+
+async def fetch_hacker_news_headlines_async(base_url=None, limit=10, concurrency=10):
+    """
+    Async version of fetch_hacker_news_headlines(): the story requests run concurrently
+    (at most `concurrency` at a time) instead of one after another.
+    
+    Args:
+        base_url (str, optional): API base URL (defaults to HN_API_BASE).
+        limit (int): Number of top stories to fetch.
+        concurrency (int): Maximum requests in flight.
+    
+    Returns:
+        list: A list of headline strings, in top-story order.
+    """
+    base_url = base_url or HN_API_BASE
+    try:
+        async with _async_json_getter(concurrency) as get_json:
+            headlines = await _gather_headlines(get_json, base_url, limit)
+        logger.info("Fetched %d Hacker News headlines.", len(headlines))
         return headlines
     except Exception as e:
-        print(f"[EXTERNAL DATA] Error fetching Hacker News headlines: {e}")
+        logger.warning("Error fetching Hacker News headlines: %s", e)
         return []
 
+async def _gather_headlines(get_json, base_url, limit):
+    top_ids = (await get_json(f"{base_url}/topstories.json"))[:limit]
+    stories = await asyncio.gather(*(get_json(f"{base_url}/item/{story_id}.json") for story_id in top_ids))
+    return [story["title"] for story in stories if story and "title" in story]
+
 def preprocess_external_data(raw_data):
     """
     Preprocesses the external data by joining list items into a single string.
@@ -45,10 +134,175 @@ def preprocess_external_data(raw_data):
         str: A single string combining the raw data.
     """
     processed = " ".join(raw_data)
-    print(f"[EXTERNAL DATA] Preprocessed external data length: {len(processed)} characters.")
+    logger.debug("Preprocessed external data length: %d characters.", len(processed))
     return processed
 
+class HeadlineSync:
+    """
+    Incremental sync of the top stories into a local item store.
+    
+    A sync fetches the top-stories list and the API's list of recently changed items, then only
+    the top items that are new to the cursor, listed as changed, or fetched more than
+    refresh_after seconds ago. The cursor (item id -> fetch and last-seen times, plus the last
+    top and updates lists) and the item store are JSON files in `directory`; items that have
+    been off the top list for longer than `retention` seconds are dropped from both.
+    """
+
+    def __init__(self, directory=HN_SYNC_DIR, base_url=None, limit=10, refresh_after=3600, retention=7 * 86400):
+        """
+        Args:
+            directory (str): Where the cursor and the item store are kept.
+            base_url (str, optional): API base URL (defaults to HN_API_BASE at sync time).
+            limit (int): Number of top stories to track.
+            refresh_after (float): Seconds after which an unchanged item is fetched again anyway.
+            retention (float): Seconds an item is kept after it left the top list.
+        """
+        self.directory = directory
+        self.base_url = base_url
+        self.limit = limit
+        self.refresh_after = refresh_after
+        self.retention = retention
+        self.lock = threading.Lock()
+        self.cursor = self._load(CURSOR_FILE, {"items": {}, "top_ids": [], "updates": None, "synced": None})
+        self.items = self._load(ITEMS_FILE, {})
+
+    def _load(self, name, default):
+        try:
+            with open(os.path.join(self.directory, name), "r", encoding="utf-8") as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return default
+        except (OSError, ValueError) as e:
+            logger.warning("Ignoring unreadable sync state %s: %s", name, e)
+            return default
+
+    def headlines(self, top_ids=None):
+        """
+        Returns:
+            list: Stored headlines of `top_ids` (defaults to the last synced top list), in order.
+        """
+        top_ids = self.cursor["top_ids"] if top_ids is None else top_ids
+        return [self.items[str(i)]["title"] for i in top_ids if str(i) in self.items]
+
+    def _changed(self, updated_ids):
+        # updates.json is a rolling most-recent-first list: only the ids ahead of the head seen
+        # at the last sync changed since then (all of them if that head has scrolled off).
+        if not updated_ids:
+            return set()
+        previous = self.cursor.get("updates")
+        if previous and previous[0] in updated_ids:
+            return set(updated_ids[:updated_ids.index(previous[0])])
+        return set(updated_ids)
+
+    def _due(self, top_ids, updated_ids, now):
+        # Top items to fetch: unseen, reported as changed, or stale.
+        updated = self._changed(updated_ids)
+        due = []
+        for item_id in top_ids:
+            entry = self.cursor["items"].get(str(item_id))
+            if entry is None or item_id in updated or now - entry["fetched"] >= self.refresh_after:
+                due.append(item_id)
+        return due
+
+    def _apply(self, top_ids, updated_ids, fetched, requests_made, now):
+        # Merges fetched items into the store and cursor; a headline is in the delta only the
+        # first time it is seen with this title (concurrent syncs cannot both report it).
+        with self.lock:
+            delta, items_changed = [], False
+            for item_id, item in fetched.items():
+                key = str(item_id)
+                old = self.items.get(key)
+                if item and "title" in item:
+                    if old is None or old["title"] != item["title"]:
+                        delta.append(item["title"])
+                        self.items[key] = {"id": item_id, "title": item["title"], "time": item.get("time")}
+                        items_changed = True
+                elif old is not None:  # deleted or dead
+                    del self.items[key]
+                    items_changed = True
+                self.cursor["items"][key] = {"fetched": now, "seen": now}
+            for item_id in top_ids:
+                self.cursor["items"][str(item_id)]["seen"] = now
+            for key, entry in list(self.cursor["items"].items()):
+                if now - entry["seen"] > self.retention:
+                    del self.cursor["items"][key]
+                    items_changed |= self.items.pop(key, None) is not None
+            self.cursor["top_ids"] = list(top_ids)
+            if updated_ids is not None:
+                self.cursor["updates"] = list(updated_ids)
+            self.cursor["synced"] = now
+            os.makedirs(self.directory, exist_ok=True)
+            if items_changed:
+                atomic_write_json(os.path.join(self.directory, ITEMS_FILE), self.items)
+            atomic_write_json(os.path.join(self.directory, CURSOR_FILE), self.cursor)
+            logger.info("Synced Hacker News: %d of %d top items fetched, %d new headlines.",
+                        len(fetched), len(top_ids), len(delta))
+            return SyncResult(self.headlines(top_ids), delta, len(fetched), requests_made, 1 + len(top_ids))
+
+    def _failed(self, error):
+        logger.warning("Error syncing Hacker News headlines: %s", error)
+        return SyncResult(self.headlines(), [], 0, 0, 1 + self.limit)
+
+    def sync(self, now=None):
+        """
+        Fetches what changed since the last sync.
+        
+        Args:
+            now (float, optional): Current time in seconds since the epoch (defaults to time.time()).
+        
+        Returns:
+            SyncResult: On network errors, the last synced headlines with an empty delta.
+        """
+        base_url = self.base_url or HN_API_BASE
+        now = time.time() if now is None else now
+        try:
+            top_ids = _get_json(f"{base_url}/topstories.json")[:self.limit]
+            try:
+                updated = _get_json(f"{base_url}/updates.json").get("items")
+            except Exception:  # optional endpoint; stale items are still refreshed
+                updated = None
+            due = self._due(top_ids, updated, now)
+            fetched = {item_id: _get_json(f"{base_url}/item/{item_id}.json") for item_id in due}
+        except Exception as e:
+            return self._failed(e)
+        return self._apply(top_ids, updated, fetched, 2 + len(due), now)
+
+    async def sync_async(self, concurrency=10, now=None):
+        """
+        Async version of sync(): the item requests run concurrently.
+        
+        Returns:
+            SyncResult: As sync().
+        """
+        base_url = self.base_url or HN_API_BASE
+        now = time.time() if now is None else now
+        try:
+            async with _async_json_getter(concurrency) as get_json:
+                async def updated_ids():
+                    try:
+                        return (await get_json(f"{base_url}/updates.json")).get("items")
+                    except Exception:
+                        return None
+                top_ids, updated = await asyncio.gather(get_json(f"{base_url}/topstories.json"), updated_ids())
+                top_ids = top_ids[:self.limit]
+                due = self._due(top_ids, updated, now)
+                items = await asyncio.gather(*(get_json(f"{base_url}/item/{item_id}.json") for item_id in due))
+        except Exception as e:
+            return self._failed(e)
+        return self._apply(top_ids, updated, dict(zip(due, items)), 2 + len(due), now)
+
+_sync = None
+
+def get_headline_sync():
+    """
+    Returns the process-wide headline sync at HN_SYNC_DIR.
+    """
+    global _sync
+    if _sync is None or _sync.directory != HN_SYNC_DIR:
+        _sync = HeadlineSync(HN_SYNC_DIR)
+    return _sync
+
 if __name__ == "__main__":
-    headlines = fetch_hacker_news_headlines()
-    processed_data = preprocess_external_data(headlines)
-    print("Processed Data:", processed_data)
\ No newline at end of file
+    result = get_headline_sync().sync()
+    print("Processed Data:", preprocess_external_data(result.headlines))
+    print(f"New headlines: {len(result.delta)} ({result.requests} requests, {result.baseline_requests} for a full refetch)")
\ No newline at end of file
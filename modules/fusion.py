@@ -0,0 +1,221 @@
+# modules/fusion.py
+"""
+Fusion Module:
+Projects text (768-d), image (512-d) and pooled numerical features into one shared,
+configurable-dimension space and combines them into a single multi-modal vector.
+
+Projection matrices are seeded random orthogonal maps (distance-preserving), cached on disk under
+FUSION_CACHE_DIR so every run reuses the same matrices instead of recomputing them. The pipeline's
+projection is fixed: nothing in it calls FusionModel.fit(), which learns projections from data
+(per-modality PCA) for offline use. Saving a fitted model over the cached file makes
+get_fusion_model() load it, but changes every fused vector from then on, so vectors already in
+long-term memory (and codecs trained on them) stop being comparable with new ones.
+
+Fused vectors are stored in long-term memory as JSON floats; a compact form is the opt-in
+embedding codec (modules/embedding_codec.py).
+"""
+
+import hashlib
+import json
+import os
+
+import numpy as np
+
+from modules.structured_logging import get_logger
+
+logger = get_logger(__name__)
+
+FUSION_CACHE_DIR = "fusion_cache"
+FUSION_DIM = 128
+NUMERICAL_FEATURES = 64
+DEFAULT_INPUT_DIMS = {"text": 768, "image": 512, "numerical": NUMERICAL_FEATURES}
+DEFAULT_WEIGHTS = {"text": 1.0, "image": 1.0, "numerical": 0.5}
+MODALITIES = ("text", "image", "numerical")
+
+
+def pool_numerical_features(numerical_data, dim=NUMERICAL_FEATURES):
+    """
+    Pools a normalized (rows, columns) matrix into a fixed-length vector:
+    the min, quartiles and max of each column, padded or truncated to `dim`.
+
+    Args:
+        numerical_data (numpy.array or None): Output of multi_modal.preprocess_numerical_data().
+        dim (int): Length of the pooled vector.
+
+    Returns:
+        numpy.array or None: A float32 vector of length `dim`, or None if there is no data.
+    """
+    if numerical_data is None or numerical_data.size == 0:
+        return None
+    matrix = np.nan_to_num(np.asarray(numerical_data, dtype=np.float32)).reshape(len(numerical_data), -1)
+    quantiles = np.quantile(matrix, [0.0, 0.25, 0.5, 0.75, 1.0], axis=0)  # (5, columns)
+    pooled = quantiles.T.ravel()[:dim]
+    out = np.zeros(dim, dtype=np.float32)
+    out[:len(pooled)] = pooled
+    return out
+
+
+def _random_orthogonal(rows, cols, rng):
+    # (rows, cols) matrix with orthonormal columns (or rows, when cols > rows).
+    gaussian = rng.standard_normal((max(rows, cols), min(rows, cols)))
+    q, _ = np.linalg.qr(gaussian)
+    return (q if rows >= cols else q.T).astype(np.float32)
+
+
+class FusionModel:
+    """
+    Per-modality linear projections into a shared space plus a weighted, normalized combination.
+    """
+
+    def __init__(self, dim=FUSION_DIM, input_dims=None, weights=None, seed=0):
+        """
+        Args:
+            dim (int): Dimension of the fused vector.
+            input_dims (dict, optional): Input dimension per modality (defaults to DEFAULT_INPUT_DIMS).
+            weights (dict, optional): Contribution of each modality (defaults to DEFAULT_WEIGHTS).
+            seed (int): Seed for the initial random projections.
+        """
+        self.dim = dim
+        self.input_dims = dict(DEFAULT_INPUT_DIMS, **(input_dims or {}))
+        self.weights = dict(DEFAULT_WEIGHTS, **(weights or {}))
+        self.seed = seed
+        rng = np.random.default_rng(seed)
+        self.projections = {m: _random_orthogonal(self.input_dims[m], dim, rng) for m in MODALITIES}
+        self.means = {m: np.zeros(self.input_dims[m], dtype=np.float32) for m in MODALITIES}
+
+    def cache_key(self):
+        """
+        Returns a short hash of the configuration that determines the initial projections.
+        """
+        config = json.dumps({"dim": self.dim, "input_dims": self.input_dims, "seed": self.seed}, sort_keys=True)
+        return hashlib.sha1(config.encode("utf-8")).hexdigest()[:12]
+
+    def fit(self, samples):
+        """
+        Learns projections from data: each modality is centered and projected onto its
+        top principal directions. Directions beyond the available rank keep their random init.
+
+        Args:
+            samples (dict): modality -> (n, input_dim) matrix of training vectors.
+
+        Returns:
+            FusionModel: self.
+        """
+        for modality, matrix in samples.items():
+            matrix = np.asarray(matrix, dtype=np.float32)
+            mean = matrix.mean(axis=0)
+            _, _, vt = np.linalg.svd(matrix - mean, full_matrices=False)
+            k = min(self.dim, vt.shape[0])
+            projection = self.projections[modality].copy()
+            projection[:, :k] = vt[:k].T
+            self.projections[modality] = projection
+            self.means[modality] = mean
+        return self
+
+    def fuse_batch(self, text=None, image=None, numerical=None, dtype=np.float32):
+        """
+        Fuses batches of per-modality vectors. Missing modalities (None, or all-NaN rows)
+        are skipped and the remaining weights renormalized per row.
+
+        Args:
+            text (numpy.array, optional): (n, 768) text embeddings.
+            image (numpy.array, optional): (n, 512) image embeddings.
+            numerical (numpy.array, optional): (n, NUMERICAL_FEATURES) pooled numerical features.
+            dtype: Output dtype, e.g. numpy.float16 to halve an in-memory or binary (.npy) copy
+                (it saves nothing once written out as JSON floats).
+
+        Returns:
+            numpy.array: (n, dim) unit-norm fused vectors.
+        """
+        inputs = {"text": text, "image": image, "numerical": numerical}
+        n = next(len(v) for v in inputs.values() if v is not None)
+        fused = np.zeros((n, self.dim), dtype=np.float32)
+        total_weight = np.zeros((n, 1), dtype=np.float32)
+        for modality, matrix in inputs.items():
+            if matrix is None:
+                continue
+            matrix = np.asarray(matrix, dtype=np.float32).reshape(n, -1)
+            present = ~np.isnan(matrix).all(axis=1, keepdims=True)
+            projected = np.nan_to_num(matrix - self.means[modality]) @ self.projections[modality]
+            norms = np.linalg.norm(projected, axis=1, keepdims=True)
+            projected /= np.maximum(norms, 1e-12)
+            weight = self.weights[modality] * present
+            fused += weight * projected
+            total_weight += weight
+        fused /= np.maximum(total_weight, 1e-12)
+        fused /= np.maximum(np.linalg.norm(fused, axis=1, keepdims=True), 1e-12)
+        return fused.astype(dtype, copy=False)
+
+    def fuse(self, text=None, image=None, numerical=None, dtype=np.float32):
+        """
+        Fuses a single input. See fuse_batch().
+
+        Returns:
+            numpy.array: A (dim,) unit-norm fused vector.
+        """
+        as_row = lambda v: None if v is None else np.asarray(v).reshape(1, -1)
+        return self.fuse_batch(as_row(text), as_row(image), as_row(numerical), dtype)[0]
+
+    def save(self, path):
+        """
+        Saves the projections, means and configuration to an .npz file.
+        """
+        arrays = {f"proj_{m}": self.projections[m] for m in MODALITIES}
+        arrays.update({f"mean_{m}": self.means[m] for m in MODALITIES})
+        config = {"dim": self.dim, "input_dims": self.input_dims, "weights": self.weights, "seed": self.seed}
+        np.savez(path, config=np.array(json.dumps(config)), **arrays)
+
+    @classmethod
+    def load(cls, path):
+        """
+        Loads a model written by save().
+        """
+        with np.load(path) as data:
+            config = json.loads(str(data["config"]))
+            model = cls.__new__(cls)
+            model.dim = config["dim"]
+            model.input_dims = config["input_dims"]
+            model.weights = config["weights"]
+            model.seed = config["seed"]
+            model.projections = {m: data[f"proj_{m}"] for m in MODALITIES}
+            model.means = {m: data[f"mean_{m}"] for m in MODALITIES}
+        return model
+
+
+_models = {}
+
+
+def get_fusion_model(dim=FUSION_DIM, seed=0, cache_dir=None):
+    """
+    Returns the fusion model for a configuration, loading its cached projections if present
+    and creating (and caching) them otherwise. Models are also memoized per process and cache directory.
+
+    Args:
+        dim (int): Fused dimension.
+        seed (int): Projection seed.
+        cache_dir (str, optional): Cache directory (defaults to FUSION_CACHE_DIR).
+
+    Returns:
+        FusionModel: The model.
+    """
+    cache_dir = cache_dir or FUSION_CACHE_DIR
+    key = (dim, seed, os.path.abspath(cache_dir))
+    if key in _models:
+        return _models[key]
+    model = FusionModel(dim=dim, seed=seed)
+    path = os.path.join(cache_dir, f"fusion-{model.cache_key()}.npz")
+    if os.path.exists(path):
+        model = FusionModel.load(path)
+    else:
+        os.makedirs(cache_dir, exist_ok=True)
+        model.save(path)
+        logger.info("Cached new projection matrices at %s", path)
+    _models[key] = model
+    return model
+
+
+if __name__ == "__main__":
+    model = get_fusion_model()
+    rng = np.random.default_rng(0)
+    fused = model.fuse(text=rng.standard_normal(768), image=rng.standard_normal(512))
+    print("Fused vector shape:", fused.shape, "norm:", float(np.linalg.norm(fused)))
@@ -0,0 +1,327 @@
+# modules/image_store.py
+"""
+Image Embedding Store Module:
+A persistent cache of image embeddings keyed by file content hash, so the same images are
+not re-decoded and re-run through ResNet18 on every run.
+
+Layout of the store directory:
+  - embeddings.f32: a memory-mapped (capacity, dim) float32 matrix, one row per distinct image content;
+  - index.json: the vision pipeline fingerprint, content hash -> row, and path -> (size, mtime, hash)
+    so unchanged files are recognized from a stat() call without re-hashing;
+  - index.lock: held (tiered_storage.FileLock) while embeddings are added or index.json is written.
+
+When the vision pipeline fingerprint (its weights and transform, see multi_modal.vision_fingerprint())
+changes, the store is cleared automatically. Processes may share one store: writes first adopt the
+embeddings other processes added.
+"""
+
+import hashlib
+import json
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from modules.multi_modal import (ingest_image, load_vision_model, get_image_embeddings_batch,
+                                 vision_fingerprint)
+
+from modules.structured_logging import get_logger
+from modules.tiered_storage import FileLock, atomic_write_json
+
+logger = get_logger(__name__)
+
+IMAGE_STORE_DIR = "image_embeddings"
+IMAGE_EXTENSIONS = (".jpg", ".jpeg", ".png", ".bmp", ".gif", ".webp")
+EMBEDDING_DIM = 512
+_HASH_CHUNK = 1 << 20
+
+
+def hash_file(path):
+    """
+    Returns the BLAKE2b content hash of a file, read in 1 MB chunks.
+    """
+    digest = hashlib.blake2b(digest_size=20)
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(_HASH_CHUNK), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def default_embedder():
+    """
+    Returns an embedder (list of PIL images -> (n, 512) matrix) that loads the vision model on first use,
+    so runs where every image is already cached never load the model.
+    """
+    state = {}
+
+    def embed(images):
+        if "model" not in state:
+            state["model"] = load_vision_model()
+        model, transform = state["model"]
+        return get_image_embeddings_batch(images, model, transform)
+    return embed
+
+
+class ImageEmbeddingStore:
+    """
+    Content-addressed, memory-mapped store of image embeddings.
+    """
+
+    def __init__(self, directory=IMAGE_STORE_DIR, fingerprint=None, dim=EMBEDDING_DIM, embedder=None):
+        """
+        Args:
+            directory (str): Store directory.
+            fingerprint (str, optional): Vision pipeline fingerprint (defaults to vision_fingerprint()).
+            dim (int): Embedding dimension.
+            embedder (callable, optional): list of PIL images -> (n, dim) matrix (defaults to default_embedder()).
+        """
+        self.directory = directory
+        self.fingerprint = fingerprint or vision_fingerprint()
+        self.dim = dim
+        self.embedder = embedder or default_embedder()
+        self.lock = threading.RLock()
+        os.makedirs(directory, exist_ok=True)
+        self._index_path = os.path.join(directory, "index.json")
+        self._matrix_path = os.path.join(directory, "embeddings.f32")
+        self.file_lock = FileLock(os.path.join(directory, "index.lock"))
+        with self.file_lock:
+            self._load()
+
+    # ---- persistence ------------------------------------------------------
+
+    def _read_index(self):
+        if not os.path.exists(self._index_path):
+            return None
+        with open(self._index_path, "r", encoding="utf-8") as f:
+            return json.load(f)
+
+    def _load(self):
+        index = self._read_index()
+        if index is None or index["fingerprint"] != self.fingerprint or index["dim"] != self.dim:
+            if index is not None:
+                logger.info("Vision model or transform changed; invalidating cached embeddings.")
+            index = {"fingerprint": self.fingerprint, "dim": self.dim, "rows": 0, "capacity": 0,
+                     "hashes": {}, "files": {}}
+            if os.path.exists(self._matrix_path):
+                os.remove(self._matrix_path)
+        self.index = index
+        self._dirty = False
+        self.matrix = None
+        if index["capacity"]:
+            self.matrix = np.memmap(self._matrix_path, dtype=np.float32, mode="r+", shape=(index["capacity"], self.dim))
+
+    def _sync(self):
+        # Adopts the embeddings other processes added since index.json was last read, keeping this
+        # process's file stat entries (call under the file lock)
+        index = self._read_index()
+        if index is None or (index["fingerprint"], index["dim"]) != (self.fingerprint, self.dim) \
+                or index["rows"] < self.index["rows"]:
+            files = self.index["files"]
+            self._load()  # cleared by a process with another vision pipeline
+            self.index["files"].update(files)
+            self._dirty = bool(files)
+            return
+        if index["capacity"] > self.index["capacity"]:
+            self.matrix = np.memmap(self._matrix_path, dtype=np.float32, mode="r+", shape=(index["capacity"], self.dim))
+        index["files"].update(self.index["files"])
+        self.index = index
+
+    def _save_index(self):
+        # Call under the file lock, after _sync()
+        if self.matrix is not None:
+            self.matrix.flush()
+        atomic_write_json(self._index_path, self.index)
+        self._dirty = False
+
+    def _refresh(self):
+        with self.lock, self.file_lock:
+            self._sync()
+
+    def _flush(self):
+        with self.lock:
+            if self._dirty:
+                with self.file_lock:
+                    self._sync()
+                    self._save_index()
+
+    def _reserve(self, count):
+        # Grows the memory-mapped matrix geometrically so appends stay amortized O(1).
+        needed = self.index["rows"] + count
+        if needed <= self.index["capacity"]:
+            return
+        capacity = max(needed, 2 * self.index["capacity"], 256)
+        if self.matrix is not None:
+            self.matrix.flush()
+            del self.matrix
+        with open(self._matrix_path, "ab") as f:
+            f.truncate(capacity * self.dim * 4)
+        self.index["capacity"] = capacity
+        self.matrix = np.memmap(self._matrix_path, dtype=np.float32, mode="r+", shape=(capacity, self.dim))
+
+    # ---- lookups ----------------------------------------------------------
+
+    def _content_hash(self, path):
+        # Size + mtime pre-check: only re-hash files whose stat changed.
+        path = os.path.abspath(path)
+        st = os.stat(path)
+        known = self.index["files"].get(path)
+        if known and known[0] == st.st_size and known[1] == st.st_mtime_ns:
+            return known[2]
+        content_hash = hash_file(path)
+        with self.lock:
+            self.index["files"][path] = [st.st_size, st.st_mtime_ns, content_hash]
+            self._dirty = True
+        return content_hash
+
+    def lookup_many(self, paths):
+        """
+        Looks up cached embeddings without computing anything.
+
+        Args:
+            paths (list): Image paths.
+
+        Returns:
+            tuple: (rows, hashes) - the store row for each path (or None if not cached) and its content hash
+                   (None if the file is missing).
+        """
+        rows, hashes = [], []
+        for path in paths:
+            try:
+                content_hash = self._content_hash(path)
+            except OSError:
+                content_hash = None
+            hashes.append(content_hash)
+            rows.append(self.index["hashes"].get(content_hash))
+        return rows, hashes
+
+    def _add(self, content_hashes, embeddings):
+        with self.lock, self.file_lock:
+            self._sync()
+            new = [(h, e) for h, e in zip(content_hashes, embeddings) if h not in self.index["hashes"]]
+            self._reserve(len(new))
+            for content_hash, embedding in new:
+                row = self.index["rows"]
+                self.matrix[row] = embedding
+                self.index["hashes"][content_hash] = row
+                self.index["rows"] = row + 1
+            self._save_index()
+            return len(new)
+
+    def get_many(self, paths, batch_size=32):
+        """
+        Returns embeddings for many images, computing (in batches) and storing only the uncached ones.
+
+        Args:
+            paths (list): Image paths.
+            batch_size (int): Images per forward pass for cache misses.
+
+        Returns:
+            numpy.array: (len(paths), dim) float32 matrix; rows of unreadable images are NaN.
+        """
+        rows, hashes = self.lookup_many(paths)
+        missing = {}
+        for path, row, content_hash in zip(paths, rows, hashes):
+            if row is None and content_hash is not None and content_hash not in missing:
+                missing[content_hash] = path
+        if missing:
+            self._refresh()  # another process may have embedded them meanwhile
+        items = [(h, p) for h, p in missing.items() if h not in self.index["hashes"]]
+        for start in range(0, len(items), batch_size):
+            batch = [(h, ingest_image(p)) for h, p in items[start:start + batch_size]]
+            batch = [(h, image) for h, image in batch if image is not None]
+            if batch:
+                self._add([h for h, _ in batch], self.embedder([image for _, image in batch]))
+        self._flush()
+        with self.lock:
+            out = np.full((len(paths), self.dim), np.nan, dtype=np.float32)
+            for i, content_hash in enumerate(hashes):
+                row = self.index["hashes"].get(content_hash)
+                if row is not None:
+                    out[i] = self.matrix[row]
+        return out
+
+    def get(self, path):
+        """
+        Returns the embedding of one image (computed and stored if needed), or None if it cannot be read.
+        """
+        embedding = self.get_many([path])[0]
+        return None if np.isnan(embedding).all() else embedding
+
+    # ---- directory warming ------------------------------------------------
+
+    def warm_directory(self, root, workers=4, batch_size=32, extensions=IMAGE_EXTENSIONS):
+        """
+        Walks an image tree and embeds every image not yet in the store. Hashing and decoding
+        run on a thread pool while the model embeds the previous batch.
+
+        Args:
+            root (str): Directory to walk.
+            workers (int): Threads for hashing and decoding.
+            batch_size (int): Images per forward pass.
+            extensions (tuple): File extensions treated as images.
+
+        Returns:
+            int: Number of newly embedded images.
+        """
+        paths = []
+        for dirpath, _, filenames in os.walk(root):
+            paths.extend(os.path.join(dirpath, name) for name in sorted(filenames)
+                         if name.lower().endswith(extensions))
+
+        def prepare(path):
+            try:
+                content_hash = self._content_hash(path)
+            except OSError:
+                return None
+            if content_hash in self.index["hashes"]:
+                return None
+            image = ingest_image(path)
+            return (content_hash, image) if image is not None else None
+
+        self._refresh()
+        added = 0
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            pending = {}
+            for item in pool.map(prepare, paths):
+                if item is not None and item[0] not in pending:
+                    pending[item[0]] = item[1]
+                if len(pending) >= batch_size:
+                    added += self._add(list(pending), self.embedder(list(pending.values())))
+                    pending = {}
+            if pending:
+                added += self._add(list(pending), self.embedder(list(pending.values())))
+        self._flush()
+        logger.info("Warmed %s: %d new embeddings, %d total.", root, added, self.index["rows"])
+        return added
+
+    def start_warming(self, root, **kwargs):
+        """
+        Runs warm_directory() on a background thread.
+
+        Returns:
+            threading.Thread: The started thread.
+        """
+        thread = threading.Thread(target=self.warm_directory, args=(root,), kwargs=kwargs, daemon=True)
+        thread.start()
+        return thread
+
+
+_store = None
+
+
+def get_image_store():
+    """
+    Returns the process-wide image store at IMAGE_STORE_DIR.
+    """
+    global _store
+    if _store is None or _store.directory != IMAGE_STORE_DIR:
+        _store = ImageEmbeddingStore(IMAGE_STORE_DIR)
+    return _store
+
+
+if __name__ == "__main__":
+    import sys
+
+    store = get_image_store()
+    store.warm_directory(sys.argv[1] if len(sys.argv) > 1 else ".")
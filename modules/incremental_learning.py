@@ -5,6 +5,10 @@ Simulates continuous training using new data without a full model retraining.
 In a real system, techniques like transfer learning or online learning would be applied.
 """
 
+from modules.structured_logging import get_logger
+
+logger = get_logger(__name__)
+
 def incremental_train(new_data):
     """
     Simulates incremental training using new data.
@@ -13,11 +17,14 @@ def incremental_train(new_data):
         new_data (str): New training data (preprocessed external data or feedback).
         
     Returns:
-        bool: True if training simulation is successful.
+        bool: True if training simulation is successful (or there was nothing new to train on).
     """
-    print("[INCREMENTAL LEARNING] Starting incremental training with new data...")
+    if not new_data.strip():
+        logger.debug("No new data since the last update; skipping incremental training.")
+        return True
+    logger.debug("Starting incremental training with new data...")
     # Simulate processing delay
     import time
     time.sleep(2)  # Simulate training time
-    print("[INCREMENTAL LEARNING] Incremental training complete. Model updated with new data.")
+    logger.debug("Incremental training complete. Model updated with new data.")
     return True
\ No newline at end of file
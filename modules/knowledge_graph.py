@@ -8,6 +8,10 @@ Install via: pip install networkx
 
 import networkx as nx
 
+from modules.structured_logging import get_logger
+
+logger = get_logger(__name__)
+
 def create_knowledge_graph():
     """
     Creates a simple knowledge graph with predefined nodes and edges.
@@ -29,7 +33,7 @@ def create_knowledge_graph():
     G.add_edge("Neural Networks", "Reinforcement Learning", weight=0.7)
     G.add_edge("Artificial Intelligence", "Computer Vision", weight=0.85)
     
-    print("[KNOWLEDGE GRAPH] Knowledge graph created with", G.number_of_nodes(), "nodes and", G.number_of_edges(), "edges.")
+    logger.debug("Knowledge graph created with %d nodes and %d edges.", G.number_of_nodes(), G.number_of_edges())
     return G
 
 def query_knowledge_graph(G, concept):
@@ -45,10 +49,10 @@ def query_knowledge_graph(G, concept):
     """
     if concept in G:
         neighbors = list(G.neighbors(concept))
-        print(f"[KNOWLEDGE GRAPH] Neighbors of '{concept}':", neighbors)
+        logger.debug("Neighbors of %r: %s", concept, neighbors)
         return neighbors
     else:
-        print(f"[KNOWLEDGE GRAPH] Concept '{concept}' not found in the graph.")
+        logger.debug("Concept %r not found in the graph.", concept)
         return []
 
 if __name__ == "__main__":
@@ -2,9 +2,48 @@
 """
 Learning Module:
 This module enables GENESIS-1 to learn from its reasoning outcomes.
-It uses a simple feedback loop as a placeholder for more advanced learning techniques.
+Every (embedding, decision, reward) experience goes into a replay buffer kept in REPLAY_DIR,
+and a linear value head is trained on replayed minibatches (see modules/replay_buffer.py).
 """
 
+import atexit
+import os
+
+import numpy as np
+
+from modules.replay_buffer import ReplayLearner
+from modules.structured_logging import get_logger
+
+logger = get_logger(__name__)
+
+REPLAY_DIR = "replay_buffer"
+ACTIONS = ("negative", "positive")
+
+_learner = None
+
+def decision_action(decision):
+    """
+    Maps a reasoning decision to its index in ACTIONS.
+    """
+    return 1 if "Positive" in decision else 0
+
+def get_replay_learner(dim=768):
+    """
+    Returns the process-wide replay learner persisted in REPLAY_DIR (snapshotted again at exit,
+    so experience from short runs is kept).
+    """
+    global _learner
+    if _learner is None or _learner.directory != REPLAY_DIR or _learner.buffer.dim != dim:
+        _snapshot_learner()
+        _learner = ReplayLearner(dim, len(ACTIONS), REPLAY_DIR)
+    return _learner
+
+@atexit.register
+def _snapshot_learner():
+    # The directory may be gone by now (e.g. a temporary one used by benchmarks)
+    if _learner is not None and os.path.isdir(_learner.directory):
+        _learner.snapshot()
+
 def evaluate_decision(decision):
     """
     Evaluates the reasoning decision and returns a reward signal.
@@ -26,23 +65,24 @@ def evaluate_decision(decision):
 
 def update_learning_model(embeddings, decision, reward):
     """
-    Simulates updating the learning model based on feedback.
-    
-    In a fully developed AGI, this function would adjust internal parameters,
-    update weights, or even modify code based on the reward received.
-    
-    For this prototype, it logs the reward and prints a placeholder message.
+    Records the experience in the replay buffer and trains the value head on a replayed minibatch.
     
     Args:
-        embeddings (numpy.array): The semantic embeddings that led to the decision.
+        embeddings (numpy.array): The semantic embeddings that led to the decision
+                                  (a (dim,) vector or EmbeddingBatch).
         decision (str): The decision from the Reasoning Module.
         reward (int): The reward signal from evaluating the decision.
+        
+    Returns:
+        float: The minibatch's mean squared error, or None until enough experience is stored.
     """
-    print(f"[LEARNING] Received reward: {reward} for decision: {decision}")
-    # Placeholder for updating internal model parameters:
-    print("[LEARNING] Updating model parameters... (this is a placeholder for future learning algorithms)")
-    # In a complete implementation, you might return updated model parameters or status.
-    return
+    embedding = np.asarray(embeddings, dtype=np.float32).reshape(-1)
+    norm = np.linalg.norm(embedding)
+    if norm > 0:
+        embedding = embedding / norm  # unit length keeps the SGD step size independent of the encoder's scale
+    loss = get_replay_learner(len(embedding)).observe(embedding, decision_action(decision), reward)
+    logger.debug("Received reward: %s for decision: %s (replay loss %s)", reward, decision, loss)
+    return loss
 
 def test_learning_module():
     """
@@ -2,24 +2,74 @@
 """
 Long-Term Memory Module:
 Extends the memory system to support long-term storage and retrieval of historical events.
+Uses the same hot/cold tiering as the short-term memory (see modules/tiered_storage.py).
+Once an embedding codec is enabled (see modules/embedding_codec.py), fused vectors are stored as
+product-quantized codes instead of float lists; compression is off until then.
 """
 
-import json
-import os
+import heapq
+import itertools
 from datetime import datetime
 
+import numpy as np
+
+from modules import embedding_codec
+from modules.tiered_storage import TieredStore, DEFAULT_RETENTION_POLICY, run_write_async
+from modules.structured_logging import get_logger
+
+logger = get_logger(__name__)
+
 LONG_TERM_MEMORY_FILE = "long_term_memory.json"
+LONG_TERM_ARCHIVE_DIR = "long_term_memory_archive"
+LONG_TERM_RETENTION_POLICY = dict(DEFAULT_RETENTION_POLICY)
+
+_store = None
+
+def _get_store():
+    """
+    Returns the tiered store for the current LONG_TERM_MEMORY_FILE / LONG_TERM_ARCHIVE_DIR settings.
+    """
+    global _store
+    if _store is None or _store.hot_path != LONG_TERM_MEMORY_FILE or _store.archive_dir != LONG_TERM_ARCHIVE_DIR:
+        _store = TieredStore(LONG_TERM_MEMORY_FILE, LONG_TERM_ARCHIVE_DIR, LONG_TERM_RETENTION_POLICY)
+    return _store
+
+def configure_long_term_retention(**policy):
+    """
+    Updates the retention and downsampling policy of the long-term memory store.
+    
+    Args:
+        **policy: Keys of DEFAULT_RETENTION_POLICY (e.g. cold_max_age_days=365).
+    """
+    unknown = set(policy) - set(DEFAULT_RETENTION_POLICY)
+    if unknown:
+        raise ValueError(f"Unknown retention policy keys: {sorted(unknown)}")
+    LONG_TERM_RETENTION_POLICY.update(policy)
+    _get_store().policy.update(policy)
 
 def initialize_long_term_memory():
     """
     Initializes the long-term memory storage file if it doesn't exist.
     """
-    if not os.path.exists(LONG_TERM_MEMORY_FILE):
-        with open(LONG_TERM_MEMORY_FILE, "w", encoding="utf-8") as f:
-            json.dump([], f, indent=4)
-        print("[LONG-TERM MEMORY] Initialized new long-term memory storage.")
-    else:
-        print("[LONG-TERM MEMORY] Long-term memory storage already exists.")
+    if _get_store().initialize():
+        logger.info("Initialized new long-term memory storage.")
+
+def _compress(events):
+    """
+    Replaces the fused vectors of events by codes of the current embedding codec, if there is one.
+    """
+    codec = embedding_codec.current_codec()
+    if codec is None:
+        return events
+    rows = [i for i, event in enumerate(events) if len(event.get("fused_embedding") or ()) == codec.dim]
+    if not rows:
+        return events
+    packed = embedding_codec.pack_codes(codec, np.asarray([events[i]["fused_embedding"] for i in rows], dtype=np.float32))
+    events = list(events)
+    for i, codes in zip(rows, packed):
+        events[i] = {k: v for k, v in events[i].items() if k != "fused_embedding"}
+        events[i]["fused_pq"] = codes
+    return events
 
 def store_long_term_memory(event):
     """
@@ -29,40 +79,178 @@ def store_long_term_memory(event):
         event (dict): A memory event.
     """
     initialize_long_term_memory()
-    with open(LONG_TERM_MEMORY_FILE, "r", encoding="utf-8") as f:
-        memory = json.load(f)
-    memory.append(event)
-    with open(LONG_TERM_MEMORY_FILE, "w", encoding="utf-8") as f:
-        json.dump(memory, f, indent=4)
-    print("[LONG-TERM MEMORY] Event stored successfully.")
+    _get_store().append(_compress([event])[0])
+    logger.debug("Event stored successfully.")
 
-def retrieve_long_term_memory():
+def store_long_term_memories(events):
     """
-    Retrieves all events from long-term memory.
+    Appends several events to long-term memory with a single write.
+    
+    Args:
+        events (list): Memory events, oldest first.
+    """
+    initialize_long_term_memory()
+    _get_store().append_many(_compress(events))
+    logger.debug("%d events stored successfully.", len(events))
+
+async def store_long_term_memory_async(event):
+    """
+    Async version of store_long_term_memory(): the write runs on the shared store writer thread.
+    
+    Args:
+        event (dict): A long-term memory event.
+    """
+    await run_write_async(store_long_term_memory, event)
+
+def retrieve_long_term_memory(start=None, end=None):
+    """
+    Retrieves events from long-term memory (hot and archived tiers).
+    
+    Args:
+        start (str or datetime, optional): Inclusive lower timestamp bound.
+        end (str or datetime, optional): Inclusive upper timestamp bound.
     
     Returns:
-        list: A list of memory events.
+        list: A list of memory events, oldest first.
     """
     initialize_long_term_memory()
-    with open(LONG_TERM_MEMORY_FILE, "r", encoding="utf-8") as f:
-        memory = json.load(f)
-    return memory
+    return list(_get_store().iter_range(start, end))
 
-def query_long_term_memory(query_term):
+def query_long_term_memory(query_term, start=None, end=None):
     """
     Searches long-term memory for events that contain the query term in the input summary.
+    Events are streamed tier by tier, and archive partitions outside [start, end] are skipped.
     
     Args:
         query_term (str): Term to search for.
+        start (str or datetime, optional): Inclusive lower timestamp bound.
+        end (str or datetime, optional): Inclusive upper timestamp bound.
         
     Returns:
         list: Matching memory events.
     """
-    memory = retrieve_long_term_memory()
-    results = [event for event in memory if query_term.lower() in event.get("input_summary", "").lower()]
-    print(f"[LONG-TERM MEMORY] Found {len(results)} events matching '{query_term}'.")
+    initialize_long_term_memory()
+    term = query_term.lower()
+    results = [event for event in _get_store().iter_range(start, end)
+               if term in event.get("input_summary", "").lower()]
+    logger.debug("Found %d events matching %r.", len(results), query_term)
     return results
 
+def _vector_dim(event):
+    # Dimension of an event's fused vector, stored as floats or as codes (0 if it has none or
+    # its codec is missing).
+    if "fused_pq" in event:
+        codec = embedding_codec.get_codec(event["fused_pq"]["codec"])
+        return codec.dim if codec is not None else 0
+    return len(event.get("fused_embedding") or ())
+
+def iter_fused_embeddings(start=None, end=None):
+    """
+    Streams the fused vectors of long-term memory events, oldest first; coded vectors are
+    decoded (approximately) with their codec. Used to train embedding codecs.
+    
+    Yields:
+        numpy.array: One float32 vector per event that has one.
+    """
+    initialize_long_term_memory()
+    for event in _get_store().iter_range(start, end):
+        if "fused_embedding" in event and event["fused_embedding"]:
+            yield np.asarray(event["fused_embedding"], dtype=np.float32)
+        elif "fused_pq" in event:
+            codec, codes = embedding_codec.unpack_codes([event["fused_pq"]])
+            if codec is not None:
+                yield codec.decode(codes)[0]
+
+def search_long_term_memory(query_vector, top_k=5, start=None, end=None, chunk_size=1024):
+    """
+    Finds the events whose fused multi-modal vector (see modules/fusion.py) is most similar
+    to the query vector. Events are streamed and scored in vectorized chunks; events stored as
+    codes are scored on the codes with the codec that encoded them.
+    
+    Args:
+        query_vector (numpy.array): A fused vector.
+        top_k (int): Number of events to return.
+        start (str or datetime, optional): Inclusive lower timestamp bound.
+        end (str or datetime, optional): Inclusive upper timestamp bound.
+        chunk_size (int): Events scored per matrix product.
+    
+    Returns:
+        list: (similarity, event) pairs, most similar first.
+    """
+    initialize_long_term_memory()
+    query = np.asarray(query_vector, dtype=np.float32)
+    query = query / max(float(np.linalg.norm(query)), 1e-12)
+    best = []  # min-heap of (similarity, sequence, event)
+    sequence = itertools.count()
+    chunk = []
+
+    def score(events):
+        sims = np.empty(len(events), dtype=np.float32)
+        exact = [i for i, e in enumerate(events) if "fused_embedding" in e]
+        if exact:
+            matrix = np.asarray([events[i]["fused_embedding"] for i in exact], dtype=np.float32)
+            sims[exact] = matrix @ query / np.maximum(np.linalg.norm(matrix, axis=1), 1e-12)
+        # coded events: inner products on the codes, per codec (fused vectors are unit-norm)
+        by_codec = {}
+        for i, e in enumerate(events):
+            if "fused_pq" in e:
+                by_codec.setdefault(e["fused_pq"]["codec"], []).append(i)
+        for rows in by_codec.values():
+            codec, codes = embedding_codec.unpack_codes([events[i]["fused_pq"] for i in rows])
+            sims[rows] = codec.scores(query, codes)[0]
+        for sim, event in zip(sims.tolist(), events):
+            item = (sim, next(sequence), event)
+            if len(best) < top_k:
+                heapq.heappush(best, item)
+            elif sim > best[0][0]:
+                heapq.heapreplace(best, item)
+
+    for event in _get_store().iter_range(start, end):
+        if _vector_dim(event) == len(query):
+            chunk.append(event)
+            if len(chunk) >= chunk_size:
+                score(chunk)
+                chunk = []
+    if chunk:
+        score(chunk)
+    return [(sim, event) for sim, _, event in sorted(best, key=lambda item: -item[0])]
+
+def enforce_long_term_retention():
+    """
+    Drops archived segments older than the configured cold_max_age_days.
+    
+    Returns:
+        int: Number of segments removed.
+    """
+    return _get_store().enforce_retention()
+
+def export_long_term_memory(path, start=None, end=None, fields=None, **options):
+    """
+    Streams long-term memory (both tiers) to a JSON Lines, Parquet or Arrow IPC file in constant memory
+    (see modules/memory_export.py).
+    
+    Args:
+        path (str): Output file; the extension selects the format (.jsonl, .jsonl.gz, .jsonl.zst, .parquet, .arrow).
+        start (str or datetime, optional): Inclusive lower bound.
+        end (str or datetime, optional): Inclusive upper bound.
+        fields (list, optional): Fields to export (event_id is always included).
+    
+    Returns:
+        int: Number of events exported.
+    """
+    from modules.memory_export import export_store
+    return export_store(_get_store(), path, start, end, fields, **options)
+
+def import_long_term_memory(path, **options):
+    """
+    Imports an exported file into long-term memory; resumable and idempotent (see memory_export.import_events()).
+    
+    Returns:
+        int: Number of events imported.
+    """
+    from modules.memory_export import import_events
+    return import_events(path, _get_store(), **options)
+
 if __name__ == "__main__":
     # Test storing a dummy event
     dummy_event = {
@@ -3,24 +3,51 @@
 Memory Module:
 Stores and retrieves past events for GENESIS-1.
 This module enables persistent logging of interactions, decisions, and self-improvement data.
+Recent events live in a hot tier (RAM + MEMORY_FILE); older events are rolled into
+compressed, time-partitioned segments under MEMORY_ARCHIVE_DIR (see modules/tiered_storage.py).
 """
 
-import json
-import os
 from datetime import datetime
 
+from modules.tiered_storage import TieredStore, DEFAULT_RETENTION_POLICY, run_write_async
+from modules.structured_logging import get_logger
+
+logger = get_logger(__name__)
+
 MEMORY_FILE = "memory.json"
+MEMORY_ARCHIVE_DIR = "memory_archive"
+MEMORY_RETENTION_POLICY = dict(DEFAULT_RETENTION_POLICY)
+
+_store = None
+
+def _get_store():
+    """
+    Returns the tiered store for the current MEMORY_FILE / MEMORY_ARCHIVE_DIR settings.
+    """
+    global _store
+    if _store is None or _store.hot_path != MEMORY_FILE or _store.archive_dir != MEMORY_ARCHIVE_DIR:
+        _store = TieredStore(MEMORY_FILE, MEMORY_ARCHIVE_DIR, MEMORY_RETENTION_POLICY)
+    return _store
+
+def configure_memory_retention(**policy):
+    """
+    Updates the retention and downsampling policy of the short-term memory store.
+    
+    Args:
+        **policy: Keys of DEFAULT_RETENTION_POLICY (e.g. hot_max_events=500, partition="hour").
+    """
+    unknown = set(policy) - set(DEFAULT_RETENTION_POLICY)
+    if unknown:
+        raise ValueError(f"Unknown retention policy keys: {sorted(unknown)}")
+    MEMORY_RETENTION_POLICY.update(policy)
+    _get_store().policy.update(policy)
 
 def initialize_memory():
     """
     Initializes the memory storage file if it doesn't exist.
     """
-    if not os.path.exists(MEMORY_FILE):
-        with open(MEMORY_FILE, "w", encoding="utf-8") as f:
-            json.dump([], f, indent=4)
-        print("[MEMORY] Initialized new memory storage.")
-    else:
-        print("[MEMORY] Memory storage already exists.")
+    if _get_store().initialize():
+        logger.info("Initialized new memory storage.")
 
 def store_memory(event):
     """
@@ -30,30 +57,95 @@ def store_memory(event):
         event (dict): A dictionary containing event data.
     """
     initialize_memory()
-    # Read the existing memory
-    with open(MEMORY_FILE, "r", encoding="utf-8") as f:
-        memory = json.load(f)
+    # Appends to the hot tier; events beyond the hot window are rolled to the archive.
+    _get_store().append(event)
+    logger.debug("Event stored successfully.")
+
+def store_memories(events):
+    """
+    Appends several memory events with a single write.
     
-    # Append the new event
-    memory.append(event)
+    Args:
+        events (list): Event dictionaries, oldest first.
+    """
+    initialize_memory()
+    _get_store().append_many(events)
+    logger.debug("%d events stored successfully.", len(events))
+
+async def store_memory_async(event):
+    """
+    Async version of store_memory(): the write runs on the shared store writer thread.
+    
+    Args:
+        event (dict): A memory event.
+    """
+    await run_write_async(store_memory, event)
+
+def retrieve_memory(include_archive=False):
+    """
+    Retrieves memory events.
     
-    # Write the updated memory back to the file
-    with open(MEMORY_FILE, "w", encoding="utf-8") as f:
-        json.dump(memory, f, indent=4)
+    Args:
+        include_archive (bool): If True, also stream in the archived (cold) events.
     
-    print("[MEMORY] Event stored successfully.")
+    Returns:
+        list: A list of memory events (each event is a dictionary), oldest first.
+    """
+    initialize_memory()
+    if include_archive:
+        return list(_get_store().iter_range())
+    return _get_store().hot_events()
 
-def retrieve_memory():
+def query_memory_range(start=None, end=None):
     """
-    Retrieves all memory events from the memory storage file.
+    Returns memory events with a timestamp in [start, end], across both tiers.
+    Archive segments outside the range are skipped without being opened.
+    
+    Args:
+        start (str or datetime, optional): Inclusive lower bound.
+        end (str or datetime, optional): Inclusive upper bound.
     
     Returns:
-        list: A list of memory events (each event is a dictionary).
+        list: Matching memory events.
     """
     initialize_memory()
-    with open(MEMORY_FILE, "r", encoding="utf-8") as f:
-        memory = json.load(f)
-    return memory
+    return list(_get_store().iter_range(start, end))
+
+def enforce_memory_retention():
+    """
+    Drops archived segments older than the configured cold_max_age_days.
+    
+    Returns:
+        int: Number of segments removed.
+    """
+    return _get_store().enforce_retention()
+
+def export_memory(path, start=None, end=None, fields=None, **options):
+    """
+    Streams short-term memory (both tiers) to a JSON Lines, Parquet or Arrow IPC file in constant memory
+    (see modules/memory_export.py).
+    
+    Args:
+        path (str): Output file; the extension selects the format (.jsonl, .jsonl.gz, .jsonl.zst, .parquet, .arrow).
+        start (str or datetime, optional): Inclusive lower bound.
+        end (str or datetime, optional): Inclusive upper bound.
+        fields (list, optional): Fields to export (event_id is always included).
+    
+    Returns:
+        int: Number of events exported.
+    """
+    from modules.memory_export import export_store
+    return export_store(_get_store(), path, start, end, fields, **options)
+
+def import_memory(path, **options):
+    """
+    Imports an exported file into short-term memory; resumable and idempotent (see memory_export.import_events()).
+    
+    Returns:
+        int: Number of events imported.
+    """
+    from modules.memory_export import import_events
+    return import_events(path, _get_store(), **options)
 
 def create_memory_event(input_summary, embedding_stats, decision, reward, analysis_report, improvement_outcome):
     """
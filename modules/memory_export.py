@@ -0,0 +1,446 @@
+# modules/memory_export.py
+"""
+Memory Export Module:
+Streams memory stores to and from files for backup and offline analytics, in constant memory.
+
+Formats are chosen by file extension:
+  - JSON Lines: .jsonl, .jsonl.gz (gzip members compressed in parallel), .jsonl.zst (multi-threaded zstd);
+  - Parquet: .parquet (requires pyarrow);
+  - Arrow IPC: .arrow, .ipc or .feather (requires pyarrow).
+
+Exports read a snapshot of the store while the pipeline keeps writing and can be limited to a
+timestamp range and a set of fields. Every exported record carries an event_id (the event's own,
+or a hash of its content), which makes imports idempotent: an import records its position in a
+checkpoint file after every batch, resumes from it, and skips events already in the store (hot or
+cold tier).
+Install the optional dependencies via: pip install pyarrow zstandard
+"""
+
+import argparse
+import functools
+import gzip
+import hashlib
+import json
+import os
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+from modules.tiered_storage import atomic_write_json, parse_timestamp, zstandard
+from modules.structured_logging import get_logger
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # Optional dependency
+    pa = pq = None
+
+logger = get_logger(__name__)
+
+# Schema metadata of columnar exports: columns holding JSON-encoded values
+JSON_COLUMNS_KEY = b"genesis.json_columns"
+# Columnar exports fix their columns with the first batch; fields first seen later go here (as JSON)
+EXTRA_COLUMN = "_extra"
+
+
+def event_id(event):
+    """
+    Returns an event's stable ID: its "event_id" field if present, else a hash of its content.
+    """
+    existing = event.get("event_id")
+    if existing:
+        return existing
+    canonical = json.dumps(event, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha1(canonical.encode("utf-8")).hexdigest()[:20]
+
+
+def detect_format(path):
+    """
+    Returns:
+        tuple: (format, compression) for a file name, e.g. ("jsonl", "gzip") or ("parquet", None).
+    """
+    name = path.lower()
+    if name.endswith(".parquet"):
+        return "parquet", None
+    if name.endswith((".arrow", ".ipc", ".feather")):
+        return "arrow", None
+    if name.endswith(".gz"):
+        return "jsonl", "gzip"
+    if name.endswith(".zst"):
+        return "jsonl", "zstd"
+    return "jsonl", None
+
+
+def _require_pyarrow(fmt):
+    if pa is None:
+        raise ImportError(f"{fmt} export/import requires the 'pyarrow' package.")
+
+
+def iter_store(store, start=None, end=None):
+    """
+    Streams a snapshot of a tiered store's events in [start, end], oldest first.
+    The hot tier is copied first; events the pipeline rolls into the cold tier while the
+    export runs are then emitted once, from the copy.
+
+    Args:
+        store (TieredStore): The store.
+        start (str or datetime, optional): Inclusive lower timestamp bound.
+        end (str or datetime, optional): Inclusive upper timestamp bound.
+
+    Yields:
+        dict: Events.
+    """
+    hot = store.hot_events()
+    hot_ids = {event_id(event) for event in hot}
+    for event in store.iter_range(start, end, hot=[]):
+        if event_id(event) not in hot_ids:
+            yield event
+    yield from store.iter_range(start, end, include_cold=False, hot=hot)
+
+
+def _project(event, fields):
+    record = {"event_id": event_id(event)}
+    if fields is None:
+        record.update(event)
+        return record
+    for field in fields:
+        value = event
+        for part in field.split("."):  # "embedding_stats.mean" selects a nested value
+            value = value.get(part) if isinstance(value, dict) else None
+        record[field] = value
+    return record
+
+
+class _JsonlWriter:
+    def __init__(self, path, compression, workers, level):
+        self.file = open(path, "wb")
+        self.compression = compression
+        if compression == "gzip":
+            # Each batch becomes an independent gzip member; concatenated members are one valid gzip file.
+            self.pool = ThreadPoolExecutor(max_workers=workers)
+            self.compress = functools.partial(gzip.compress, compresslevel=level or 6, mtime=0)
+            self.pending = deque()
+            self.window = 2 * workers
+        elif compression == "zstd":
+            if zstandard is None:
+                raise ImportError("zstd compression requires the 'zstandard' package.")
+            self.stream = zstandard.ZstdCompressor(level=level or 3, threads=workers).stream_writer(self.file)
+
+    def write_batch(self, records):
+        data = "".join(json.dumps(record, default=str) + "\n" for record in records).encode("utf-8")
+        if self.compression == "gzip":
+            self.pending.append(self.pool.submit(self.compress, data))
+            while len(self.pending) > self.window:
+                self.file.write(self.pending.popleft().result())
+        elif self.compression == "zstd":
+            self.stream.write(data)
+        else:
+            self.file.write(data)
+
+    def close(self):
+        if self.compression == "gzip":
+            while self.pending:
+                self.file.write(self.pending.popleft().result())
+            self.pool.shutdown()
+        elif self.compression == "zstd":
+            self.stream.flush(zstandard.FLUSH_FRAME)
+        self.file.close()
+
+
+class _ColumnarWriter:
+    def __init__(self, path, fmt, compression, level):
+        _require_pyarrow(fmt)
+        self.path, self.fmt = path, fmt
+        self.compression, self.level = compression or "zstd", level
+        self.writer = self.sink = self.schema = None
+
+    def _start(self, records):
+        # Columns come from the first batch; nested values are stored as JSON strings.
+        self.columns = list(dict.fromkeys(key for record in records for key in record))
+        self.json_columns = [c for c in self.columns if any(isinstance(r.get(c), (dict, list)) for r in records)]
+        sample = pa.Table.from_pylist([self._row(record) for record in records]).schema
+        fields = [pa.field(f.name, pa.string() if pa.types.is_null(f.type) else f.type) for f in sample]
+        self.schema = pa.schema(fields, metadata={JSON_COLUMNS_KEY: json.dumps(self.json_columns)})
+        if self.fmt == "parquet":
+            self.writer = pq.ParquetWriter(self.path, self.schema, compression=self.compression,
+                                           compression_level=self.level)
+        else:
+            self.sink = pa.OSFile(self.path, "wb")
+            options = pa.ipc.IpcWriteOptions(compression=self.compression, use_threads=True)
+            self.writer = pa.ipc.new_file(self.sink, self.schema, options=options)
+
+    def _row(self, record):
+        row = {}
+        for column in self.columns:
+            value = record.get(column)
+            row[column] = json.dumps(value, default=str) if column in self.json_columns and value is not None else value
+        extra = {key: value for key, value in record.items() if key not in row}
+        row[EXTRA_COLUMN] = json.dumps(extra, default=str) if extra else None
+        return row
+
+    def write_batch(self, records):
+        if self.schema is None:
+            self._start(records)
+        try:
+            table = pa.Table.from_pylist([self._row(record) for record in records], schema=self.schema)
+        except (pa.ArrowInvalid, pa.ArrowTypeError) as e:
+            raise ValueError(f"Events do not fit the {self.fmt} schema inferred from the first batch ({e}); "
+                             "select fields with a consistent type or export to JSON Lines.") from e
+        self.writer.write_table(table)
+
+    def close(self):
+        if self.writer is not None:
+            self.writer.close()
+        if self.sink is not None:
+            self.sink.close()
+        if self.schema is None:
+            open(self.path, "wb").close()  # nothing exported
+
+
+def export_events(events, path, fields=None, batch_size=10000, workers=4, compression_level=None):
+    """
+    Writes events to a JSON Lines, Parquet or Arrow IPC file, batch by batch.
+
+    Args:
+        events (iterable): Events (e.g. iter_store(store)).
+        path (str): Output file; the extension selects the format and JSON Lines compression.
+        fields (list, optional): Fields to keep ("a.b" selects a nested value); event_id is always kept.
+        batch_size (int): Events per batch (bounds memory use).
+        workers (int): Compression threads.
+        compression_level (int, optional): Codec-specific compression level.
+
+    Returns:
+        int: Number of events written.
+    """
+    fmt, compression = detect_format(path)
+    tmp_path = path + ".tmp"
+    if fmt == "jsonl":
+        writer = _JsonlWriter(tmp_path, compression, workers, compression_level)
+    else:
+        writer = _ColumnarWriter(tmp_path, fmt, None, compression_level)
+    count = 0
+    batch = []
+    try:
+        for event in events:
+            batch.append(_project(event, fields))
+            if len(batch) >= batch_size:
+                writer.write_batch(batch)
+                count += len(batch)
+                batch = []
+        if batch:
+            writer.write_batch(batch)
+            count += len(batch)
+    finally:
+        writer.close()
+    os.replace(tmp_path, path)
+    logger.info("Exported %d events to %s.", count, path)
+    return count
+
+
+def export_store(store, path, start=None, end=None, fields=None, **options):
+    """
+    Exports a snapshot of a tiered store, optionally limited to [start, end] and to some fields.
+    Options are passed to export_events().
+
+    Returns:
+        int: Number of events written.
+    """
+    return export_events(iter_store(store, start, end), path, fields, **options)
+
+
+def _decode_columnar(rows, json_columns):
+    for row in rows:
+        extra = row.pop(EXTRA_COLUMN, None)
+        for column in json_columns:
+            if row.get(column) is not None:
+                row[column] = json.loads(row[column])
+        if extra:
+            row.update(json.loads(extra))
+        yield row
+
+
+def iter_records(path, skip=0, batch_size=10000):
+    """
+    Streams the records of an exported file.
+
+    Args:
+        path (str): A JSON Lines, Parquet or Arrow IPC file.
+        skip (int): Records to skip (Parquet row groups and Arrow batches are skipped without decoding).
+        batch_size (int): Rows decoded at a time from columnar files.
+
+    Yields:
+        dict: Records, in file order.
+    """
+    fmt, compression = detect_format(path)
+    if fmt == "jsonl":
+        if compression == "zstd":
+            if zstandard is None:
+                raise ImportError("zstd decompression requires the 'zstandard' package.")
+            f = zstandard.open(path, "rt", encoding="utf-8")
+        elif compression == "gzip":
+            f = gzip.open(path, "rt", encoding="utf-8")
+        else:
+            f = open(path, "r", encoding="utf-8")
+        with f:
+            for line in f:
+                if not line.strip():
+                    continue
+                if skip:
+                    skip -= 1  # skipped records are never parsed
+                    continue
+                yield json.loads(line)
+        return
+    _require_pyarrow(fmt)
+    if os.path.getsize(path) == 0:
+        return
+    if fmt == "parquet":
+        parquet = pq.ParquetFile(path)
+        json_columns = json.loads((parquet.schema_arrow.metadata or {}).get(JSON_COLUMNS_KEY, b"[]"))
+        for group in range(parquet.num_row_groups):
+            rows = parquet.metadata.row_group(group).num_rows
+            if skip >= rows:
+                skip -= rows
+                continue
+            for batch in parquet.iter_batches(batch_size=batch_size, row_groups=[group]):
+                rows = batch.to_pylist()[skip:]
+                skip = max(skip - batch.num_rows, 0)
+                yield from _decode_columnar(rows, json_columns)
+        return
+    with pa.memory_map(path) as source:
+        reader = pa.ipc.open_file(source)
+        json_columns = json.loads((reader.schema.metadata or {}).get(JSON_COLUMNS_KEY, b"[]"))
+        for index in range(reader.num_record_batches):
+            batch = reader.get_batch(index)
+            if skip >= batch.num_rows:
+                skip -= batch.num_rows
+                continue
+            rows = batch.to_pylist()[skip:]
+            skip = 0
+            yield from _decode_columnar(rows, json_columns)
+
+
+def _source_signature(path):
+    st = os.stat(path)
+    return {"source": os.path.abspath(path), "size": st.st_size, "mtime_ns": st.st_mtime_ns}
+
+
+def default_checkpoint_path(path, store):
+    """
+    Returns the checkpoint file used when importing `path` into `store`.
+    """
+    digest = hashlib.sha1(os.path.abspath(path).encode("utf-8")).hexdigest()[:16]
+    return os.path.join(store.archive_dir, "imports", f"{digest}.json")
+
+
+def _write_checkpoint(checkpoint_path, state):
+    os.makedirs(os.path.dirname(checkpoint_path) or ".", exist_ok=True)
+    atomic_write_json(checkpoint_path, state)
+
+
+def _unseen(store, records):
+    # The records whose event_id is neither in the store nor earlier in `records`. Only the cold
+    # segments overlapping the records' time span are read (all of them if a timestamp is missing).
+    timestamps = [parse_timestamp(record.get("timestamp")) for record in records]
+    start = end = None
+    if None not in timestamps:
+        start, end = min(timestamps), max(timestamps)
+    known = {event_id(event) for event in store.iter_range(start, end)}
+    fresh = []
+    for record in records:
+        if record["event_id"] not in known:
+            known.add(record["event_id"])
+            fresh.append(record)
+    return fresh
+
+
+def import_events(path, store, batch_size=1000, checkpoint_path=None, resume=True):
+    """
+    Imports an exported file into a tiered store, resumably and idempotently.
+
+    After every batch the number of records consumed is saved to a checkpoint file. A rerun
+    continues from there; an import that already completed is a no-op. Records whose event_id
+    is already in the store, in either tier, are skipped: the last batch written before an
+    interruption, or everything on a restarted import or a re-import of a modified file.
+
+    Args:
+        path (str): A JSON Lines, Parquet or Arrow IPC file (see export_events()).
+        store (TieredStore): The destination store.
+        batch_size (int): Events per store write.
+        checkpoint_path (str, optional): Defaults to default_checkpoint_path().
+        resume (bool): Continue from an existing checkpoint (False starts over).
+
+    Returns:
+        int: Number of events imported by this call.
+    """
+    checkpoint_path = checkpoint_path or default_checkpoint_path(path, store)
+    signature = _source_signature(path)
+    state = {**signature, "records": 0, "imported": 0, "complete": False}
+    if resume and os.path.exists(checkpoint_path):
+        with open(checkpoint_path, "r", encoding="utf-8") as f:
+            saved = json.load(f)
+        if all(saved.get(key) == value for key, value in signature.items()):
+            state = saved
+        else:
+            logger.warning("%s changed since the last import; starting over.", path)
+    if state["complete"]:
+        return 0
+    store.initialize()
+    batch_size = max(1, batch_size)
+    imported = 0
+    batch = []
+    position = state["records"]
+
+    def flush():
+        nonlocal imported, batch
+        fresh = _unseen(store, batch) if batch else []
+        if fresh:
+            store.append_many(fresh)
+        imported += len(fresh)
+        state["imported"] += len(fresh)
+        state["records"] = position
+        batch = []
+        _write_checkpoint(checkpoint_path, state)
+
+    for record in iter_records(path, skip=position):
+        position += 1
+        record["event_id"] = event_id(record)
+        batch.append(record)
+        if len(batch) >= batch_size:
+            flush()
+    state["complete"] = True
+    flush()
+    logger.info("Imported %d events from %s.", imported, path)
+    return imported
+
+
+def _get_named_store(name):
+    if name == "memory":
+        from modules.memory import _get_store
+    else:
+        from modules.long_term_memory import _get_store
+    return _get_store()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Export or import GENESIS-1 memory stores.")
+    sub = parser.add_subparsers(dest="command", required=True)
+    export_parser = sub.add_parser("export", help="Stream a store into a .jsonl[.gz|.zst], .parquet or .arrow file.")
+    export_parser.add_argument("store", choices=["memory", "long_term"])
+    export_parser.add_argument("path")
+    export_parser.add_argument("--start", help="Inclusive lower timestamp bound (ISO-8601).")
+    export_parser.add_argument("--end", help="Inclusive upper timestamp bound (ISO-8601).")
+    export_parser.add_argument("--fields", help="Comma-separated fields to keep, e.g. timestamp,reward,embedding_stats.mean")
+    export_parser.add_argument("--workers", type=int, default=4)
+    import_parser = sub.add_parser("import", help="Import an exported file (resumable, idempotent).")
+    import_parser.add_argument("store", choices=["memory", "long_term"])
+    import_parser.add_argument("path")
+    import_parser.add_argument("--restart", action="store_true", help="Ignore an existing checkpoint.")
+    args = parser.parse_args()
+
+    store = _get_named_store(args.store)
+    if args.command == "export":
+        fields = args.fields.split(",") if args.fields else None
+        count = export_store(store, args.path, args.start, args.end, fields, workers=args.workers)
+        print(f"Exported {count} events to {args.path}.")
+    else:
+        count = import_events(args.path, store, resume=not args.restart)
+        print(f"Imported {count} events from {args.path}.")
@@ -0,0 +1,95 @@
+# modules/metrics.py
+"""
+Metrics Module:
+Per-stage latency and throughput counters for the pipeline.
+
+Stages are timed with the stage_timer() context manager; stage_summary() reports, per stage,
+the number of calls, items processed, total and mean latency and items per second. The
+autotuner reads these to compare runtime configurations.
+"""
+
+import threading
+import time
+from contextlib import contextmanager
+
+
+class StageMetrics:
+    """
+    Thread-safe accumulator of per-stage timings.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.stages = {}
+
+    def record(self, stage, seconds, items=1):
+        """
+        Adds one timed call of a stage.
+
+        Args:
+            stage (str): Stage name, e.g. "embed_text".
+            seconds (float): Wall-clock duration of the call.
+            items (int): Number of items the call processed.
+        """
+        with self.lock:
+            entry = self.stages.setdefault(stage, {"calls": 0, "items": 0, "total_s": 0.0})
+            entry["calls"] += 1
+            entry["items"] += items
+            entry["total_s"] += seconds
+
+    @contextmanager
+    def timer(self, stage, items=1):
+        """
+        Times the enclosed block as one call of `stage`.
+        """
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(stage, time.perf_counter() - start, items)
+
+    def summary(self):
+        """
+        Returns:
+            dict: stage -> {calls, items, total_s, mean_s, items_per_s}.
+        """
+        with self.lock:
+            return {
+                stage: dict(entry,
+                            mean_s=entry["total_s"] / entry["calls"],
+                            items_per_s=entry["items"] / entry["total_s"] if entry["total_s"] > 0 else None)
+                for stage, entry in self.stages.items()
+            }
+
+    def reset(self):
+        """
+        Clears all recorded timings.
+        """
+        with self.lock:
+            self.stages = {}
+
+
+METRICS = StageMetrics()
+
+
+def stage_timer(stage, items=1):
+    """
+    Times a block as one call of `stage` in the process-wide metrics, e.g.:
+        with stage_timer("embed_text", items=len(texts)):
+            ...
+    """
+    return METRICS.timer(stage, items)
+
+
+def stage_summary():
+    """
+    Returns the process-wide per-stage summary (see StageMetrics.summary()).
+    """
+    return METRICS.summary()
+
+
+def reset_metrics():
+    """
+    Clears the process-wide metrics.
+    """
+    METRICS.reset()
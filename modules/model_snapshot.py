@@ -0,0 +1,332 @@
+# modules/model_snapshot.py
+"""
+Model Snapshot Module:
+Fast cold starts for the text and vision encoders. A snapshot is a directory holding the
+encoder's weights as one safetensors file (plus, for the text encoder, its config and tokenizer).
+Loading builds the architecture on the meta device, so no weight memory is allocated, and then
+points every parameter and buffer at a copy-on-write memory map of the file. Processes on one
+host therefore share the page-cache copy of the weights, and pages are only read when touched.
+
+    python -m modules.model_snapshot                # text and vision encoders into model_snapshots/
+    python -m modules.model_snapshot --text bert-base-uncased --no-vision
+
+understanding.load_model() and multi_modal.load_vision_model() use a matching snapshot under
+SNAPSHOT_DIR when one exists, and fall back to the original checkpoints otherwise.
+
+weights_fingerprint() digests an encoder's weights; caches of encoder outputs (stage cache,
+dedup index, image store) are keyed on it, so a different checkpoint or snapshot invalidates
+them. Snapshots record it in snapshot.json, so loading one does not hash the weights again.
+"""
+
+import hashlib
+import json
+import mmap
+import os
+import re
+import struct
+from datetime import datetime
+
+import torch
+import torch.nn as nn
+
+from modules.structured_logging import get_logger
+from modules.tiered_storage import atomic_write_json
+
+logger = get_logger(__name__)
+
+SNAPSHOT_DIR = "model_snapshots"
+WEIGHTS_FILE = "model.safetensors"
+SNAPSHOT_FILE = "snapshot.json"
+SNAPSHOT_FORMAT = 1
+
+_DTYPES = {torch.float64: "F64", torch.float32: "F32", torch.float16: "F16", torch.bfloat16: "BF16",
+           torch.int64: "I64", torch.int32: "I32", torch.int16: "I16", torch.int8: "I8",
+           torch.uint8: "U8", torch.bool: "BOOL"}
+_TORCH_DTYPES = {code: dtype for dtype, code in _DTYPES.items()}
+
+
+# ---- safetensors files ------------------------------------------------------
+
+def save_tensors(tensors, path, metadata=None):
+    """
+    Writes tensors in the safetensors layout: an 8-byte header length, a JSON header of
+    dtypes, shapes and byte offsets, then the raw little-endian data. Tensors are ordered by
+    element size, so every tensor starts aligned to its own element size.
+
+    Args:
+        tensors (dict): name -> tensor.
+        path (str): Output file (replaced atomically).
+        metadata (dict, optional): String key/values stored in the header.
+    """
+    items = sorted(tensors.items(), key=lambda item: (-item[1].element_size(), item[0]))
+    header, offset = {}, 0
+    for name, tensor in items:
+        nbytes = tensor.numel() * tensor.element_size()
+        header[name] = {"dtype": _DTYPES[tensor.dtype], "shape": list(tensor.shape),
+                        "data_offsets": [offset, offset + nbytes]}
+        offset += nbytes
+    if metadata:
+        header["__metadata__"] = metadata
+    blob = json.dumps(header, separators=(",", ":")).encode("utf-8")
+    blob += b" " * (-len(blob) % 8)
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(struct.pack("<Q", len(blob)))
+        f.write(blob)
+        for _, tensor in items:
+            if tensor.numel():
+                f.write(tensor.detach().cpu().contiguous().reshape(-1).view(torch.uint8).numpy())
+    os.replace(tmp_path, path)
+
+
+def map_tensors(path):
+    """
+    Maps a safetensors file without reading it: each tensor is a view of a private (copy-on-write)
+    memory map, so the data stays in the shared page cache until a page is written.
+
+    Returns:
+        tuple: (name -> tensor dict, metadata dict).
+    """
+    with open(path, "rb") as f:
+        buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_COPY)
+    (header_size,) = struct.unpack_from("<Q", buffer, 0)
+    header = json.loads(buffer[8:8 + header_size])
+    metadata = header.pop("__metadata__", {})
+    start = 8 + header_size
+    tensors = {}
+    for name, info in header.items():
+        dtype = _TORCH_DTYPES[info["dtype"]]
+        begin, end = info["data_offsets"]
+        if end == begin:
+            tensors[name] = torch.empty(info["shape"], dtype=dtype)
+            continue
+        count = (end - begin) // torch.empty((), dtype=dtype).element_size()
+        # the tensor keeps the map alive; it is unmapped once the last view is gone
+        tensors[name] = torch.frombuffer(buffer, dtype=dtype, count=count, offset=start + begin).view(info["shape"])
+    return tensors, metadata
+
+
+# ---- modules ------------------------------------------------------------------
+
+def weights_fingerprint(module):
+    """
+    Digest of a module's parameters and buffers (names, dtypes, shapes and values), computed once
+    per module (snapshot loaders set it from snapshot.json).
+
+    Returns:
+        str: 16 hex digits.
+    """
+    fingerprint = getattr(module, "_weights_fingerprint", None)
+    if fingerprint is None:
+        tensors, aliases = _module_tensors(module)
+        digest = hashlib.blake2b(json.dumps(aliases, sort_keys=True).encode("utf-8"), digest_size=8)
+        for name in sorted(tensors):
+            tensor = tensors[name]
+            digest.update(f"{name}:{_DTYPES[tensor.dtype]}:{list(tensor.shape)}".encode("utf-8"))
+            if tensor.numel():
+                digest.update(tensor.detach().cpu().contiguous().reshape(-1).view(torch.uint8).numpy())
+        fingerprint = module._weights_fingerprint = digest.hexdigest()
+    return fingerprint
+
+
+def model_identity(model):
+    """
+    Identity of a text encoder for cache keys: its config's name_or_path plus weights_fingerprint().
+    """
+    name = getattr(getattr(model, "config", None), "name_or_path", "") or type(model).__name__
+    return f"{name}@{weights_fingerprint(model)}"
+
+
+def _module_tensors(module):
+    # Every parameter and buffer (persistent or not); tied ones are stored once and aliased.
+    tensors, aliases, seen = {}, {}, {}
+    for name, tensor in list(module.named_parameters(remove_duplicate=False)) + \
+            list(module.named_buffers(remove_duplicate=False)):
+        if tensor is None:
+            continue
+        if id(tensor) in seen:
+            aliases[name] = seen[id(tensor)]
+        else:
+            seen[id(tensor)] = name
+            tensors[name] = tensor
+    return tensors, aliases
+
+
+def save_module(module, path):
+    """
+    Writes the parameters and buffers of a module, including modified heads and tied weights,
+    to a safetensors file.
+    """
+    tensors, aliases = _module_tensors(module)
+    save_tensors(tensors, path, {"aliases": json.dumps(aliases)})
+
+
+def _assign(module, name, value):
+    owner, _, leaf = name.rpartition(".")
+    target = module.get_submodule(owner) if owner else module
+    if leaf in target._parameters:
+        if not isinstance(value, nn.Parameter):
+            value = nn.Parameter(value, requires_grad=target._parameters[leaf].requires_grad)
+        target._parameters[leaf] = value
+    else:
+        target._buffers[leaf] = value
+    return value
+
+
+def load_module(skeleton, path):
+    """
+    Points the parameters and buffers of `skeleton` (usually built on the meta device) at the
+    memory-mapped tensors of a file written by save_module().
+
+    Raises:
+        ValueError: If the file does not match the skeleton's names or shapes.
+
+    Returns:
+        nn.Module: The skeleton, now holding the mapped weights.
+    """
+    tensors, metadata = map_tensors(path)
+    aliases = json.loads(metadata.get("aliases", "{}"))
+    expected, expected_aliases = _module_tensors(skeleton)
+    if set(expected) != set(tensors) or expected_aliases != aliases:
+        missing = sorted(set(expected) - set(tensors))
+        unexpected = sorted(set(tensors) - set(expected))
+        raise ValueError(f"Snapshot {path} does not match the model (missing {missing[:5]}, unexpected {unexpected[:5]})")
+    for name, tensor in expected.items():
+        if tuple(tensor.shape) != tuple(tensors[name].shape):
+            raise ValueError(f"Snapshot {path}: shape of {name} is {tuple(tensors[name].shape)}, "
+                             f"expected {tuple(tensor.shape)}")
+    assigned = {name: _assign(skeleton, name, tensor) for name, tensor in tensors.items()}
+    for name, source in aliases.items():
+        _assign(skeleton, name, assigned[source])
+    return skeleton
+
+
+# ---- encoder snapshots ----------------------------------------------------------
+
+def snapshot_dir(kind, source, root=None):
+    """
+    Returns the snapshot directory of an encoder, e.g. model_snapshots/text/distilbert-base-uncased.
+
+    Args:
+        kind (str): "text" or "vision".
+        source (str): The model name (text) or multi_modal.VISION_MODEL_ID (vision).
+        root (str, optional): Snapshot root (defaults to SNAPSHOT_DIR).
+    """
+    return os.path.join(root or SNAPSHOT_DIR, kind, re.sub(r"[^\w.-]+", "_", source))
+
+
+def _write_manifest(directory, kind, source, model):
+    atomic_write_json(os.path.join(directory, SNAPSHOT_FILE), {
+        "format": SNAPSHOT_FORMAT, "kind": kind, "source": source, "weights": weights_fingerprint(model),
+        "torch": torch.__version__, "created": datetime.now().isoformat(),
+    }, indent=2)
+
+
+def _read_manifest(directory):
+    with open(os.path.join(directory, SNAPSHOT_FILE), "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def find_snapshot(kind, source, root=None):
+    """
+    Returns:
+        str: The snapshot directory for this encoder, or None if there is no complete snapshot.
+    """
+    directory = snapshot_dir(kind, source, root)
+    try:
+        manifest = _read_manifest(directory)
+    except (OSError, ValueError):
+        return None
+    if (manifest.get("format"), manifest.get("kind"), manifest.get("source")) != (SNAPSHOT_FORMAT, kind, source):
+        return None
+    return directory if os.path.exists(os.path.join(directory, WEIGHTS_FILE)) else None
+
+
+def save_text_snapshot(tokenizer, model, model_name, root=None):
+    """
+    Snapshots a text encoder (tokenizer, config and weights).
+
+    Returns:
+        str: The snapshot directory.
+    """
+    directory = snapshot_dir("text", model_name, root)
+    os.makedirs(directory, exist_ok=True)
+    tokenizer.save_pretrained(directory)
+    model.config.save_pretrained(directory)
+    save_module(model, os.path.join(directory, WEIGHTS_FILE))
+    _write_manifest(directory, "text", model_name, model)
+    logger.info("Wrote text encoder snapshot: %s", directory)
+    return directory
+
+
+def load_text_snapshot(directory):
+    """
+    Loads a text encoder snapshot with memory-mapped weights.
+
+    Returns:
+        tokenizer, model: As understanding.load_model().
+    """
+    from transformers import AutoConfig, AutoModel, AutoTokenizer
+
+    manifest = _read_manifest(directory)
+    config = AutoConfig.from_pretrained(directory)
+    config.name_or_path = manifest["source"]  # identifies the snapshot like the checkpoint it was taken from
+    with torch.device("meta"):
+        model = AutoModel.from_config(config)
+    load_module(model, os.path.join(directory, WEIGHTS_FILE)).eval()
+    if manifest.get("weights"):
+        model._weights_fingerprint = manifest["weights"]
+    return AutoTokenizer.from_pretrained(directory), model
+
+
+def save_vision_snapshot(model, root=None):
+    """
+    Snapshots the vision encoder returned by multi_modal.load_vision_model() (the ResNet without
+    its classification layer).
+
+    Returns:
+        str: The snapshot directory.
+    """
+    from modules.multi_modal import VISION_MODEL_ID
+
+    directory = snapshot_dir("vision", VISION_MODEL_ID, root)
+    os.makedirs(directory, exist_ok=True)
+    save_module(model, os.path.join(directory, WEIGHTS_FILE))
+    _write_manifest(directory, "vision", VISION_MODEL_ID, model)
+    logger.info("Wrote vision encoder snapshot: %s", directory)
+    return directory
+
+
+def load_vision_snapshot(directory):
+    """
+    Loads a vision encoder snapshot with memory-mapped weights.
+
+    Returns:
+        model, transform: As multi_modal.load_vision_model().
+    """
+    from modules.multi_modal import build_vision_model, build_vision_transform
+
+    manifest = _read_manifest(directory)
+    with torch.device("meta"):
+        model = build_vision_model(pretrained=False)
+    load_module(model, os.path.join(directory, WEIGHTS_FILE)).eval()
+    if manifest.get("weights"):
+        model._weights_fingerprint = manifest["weights"]
+    return model, build_vision_transform()
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Write memory-mappable snapshots of the GENESIS-1 encoders.")
+    parser.add_argument("--text", default="distilbert-base-uncased", help="Text model to snapshot.")
+    parser.add_argument("--no-text", action="store_true", help="Skip the text encoder.")
+    parser.add_argument("--no-vision", action="store_true", help="Skip the vision encoder.")
+    parser.add_argument("--dir", default=SNAPSHOT_DIR, help="Snapshot root directory.")
+    args = parser.parse_args()
+    if not args.no_text:
+        from modules.understanding import load_model
+        print(save_text_snapshot(*load_model(args.text, use_snapshot=False), args.text, root=args.dir))
+    if not args.no_vision:
+        from modules.multi_modal import load_vision_model
+        print(save_vision_snapshot(load_vision_model(use_snapshot=False)[0], root=args.dir))
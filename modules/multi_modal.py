@@ -6,6 +6,7 @@ Requires: Pillow, torchvision, pandas, numpy
 Install via: pip install pillow torchvision pandas numpy
 """
 
+import os
 from PIL import Image
 import torch
 import torchvision.transforms as transforms
@@ -14,26 +15,116 @@ import numpy as np
 from torchvision import models
 import torch.nn as nn
 
-def load_vision_model():
+from modules.structured_logging import get_logger
+
+logger = get_logger(__name__)
+
+# Names the vision pipeline below and its snapshot directory; embedding caches key on vision_fingerprint().
+VISION_MODEL_ID = "resnet18-imagenet/avgpool-512"
+
+def build_vision_transform():
     """
-    Loads a pre-trained ResNet18 model and removes the final classification layer to extract embeddings.
+    Builds the preprocessing transform used by the vision model.
     
     Returns:
-        model: The modified ResNet18 model.
         transform: The preprocessing transform.
     """
-    model = models.resnet18(pretrained=True)
-    # Remove the final fully-connected layer to extract embeddings
-    model = nn.Sequential(*list(model.children())[:-1])
-    model.eval()  # Set to evaluation mode
-    transform = transforms.Compose([
+    return transforms.Compose([
         transforms.Resize((224, 224)),
         transforms.ToTensor(),
         transforms.Normalize(mean=[0.485, 0.456, 0.406],
                              std=[0.229, 0.224, 0.225])
     ])
+
+def build_vision_model(pretrained=True):
+    """
+    Builds the ResNet18 embedding model: the network without its final classification layer.
+    
+    Args:
+        pretrained (bool): Load the ImageNet weights (False leaves them randomly initialized).
+    
+    Returns:
+        model: The modified ResNet18 model.
+    """
+    model = models.resnet18(pretrained=pretrained)
+    # Remove the final fully-connected layer to extract embeddings
+    return nn.Sequential(*list(model.children())[:-1])
+
+def load_vision_model(use_snapshot=True):
+    """
+    Loads a pre-trained ResNet18 model and removes the final classification layer to extract embeddings.
+    A snapshot written by `python -m modules.model_snapshot` is preferred when present, and the
+    process CPU budget (modules.resources) is applied to torch unless the caller applied one.
+    
+    Args:
+        use_snapshot (bool): Whether to look for a snapshot first.
+    
+    Returns:
+        model: The modified ResNet18 model.
+        transform: The preprocessing transform.
+    """
+    from modules.model_snapshot import find_snapshot, load_vision_snapshot
+    from modules.resources import get_resource_manager
+
+    get_resource_manager().ensure_applied()
+    snapshot = find_snapshot("vision", VISION_MODEL_ID) if use_snapshot else None
+    if snapshot:
+        try:
+            return load_vision_snapshot(snapshot)
+        except (OSError, ValueError) as e:
+            logger.warning("Ignoring vision model snapshot %s: %s", snapshot, e)
+    model = build_vision_model()
+    model.eval()  # Set to evaluation mode
+    transform = build_vision_transform()
     return model, transform
 
+def vision_fingerprint(model=None, transform=None):
+    """
+    Identifies the vision pipeline for embedding caches: any change to the weights or transform changes it.
+    
+    Without a model, the weights are identified without loading them: by the weights hash recorded in
+    the vision snapshot when there is one, otherwise by the torchvision checkpoint file name (which
+    embeds a hash of its contents). Writing a snapshot therefore changes the fingerprint once. With a
+    model (e.g. a custom or fine-tuned one), model_snapshot.weights_fingerprint() is used.
+    
+    Args:
+        model (optional): A vision model whose weights should be fingerprinted.
+        transform (optional): The preprocessing transform (defaults to build_vision_transform()).
+        
+    Returns:
+        str: A hex digest.
+    """
+    import hashlib
+    from modules.model_snapshot import weights_fingerprint
+    
+    digest = hashlib.sha1()
+    digest.update(repr(transform or build_vision_transform()).encode("utf-8"))
+    if model is None:
+        weights = _snapshot_weights() or _pretrained_checkpoint()
+    else:
+        weights = weights_fingerprint(model)
+    digest.update(weights.encode("utf-8"))
+    return digest.hexdigest()
+
+def _snapshot_weights():
+    from modules.model_snapshot import _read_manifest, find_snapshot
+
+    snapshot = find_snapshot("vision", VISION_MODEL_ID)
+    if not snapshot:
+        return None
+    try:
+        return _read_manifest(snapshot).get("weights")
+    except (OSError, ValueError):
+        return None
+
+def _pretrained_checkpoint():
+    # e.g. "resnet18-f37072fd.pth": torchvision names checkpoints after a prefix of their sha256
+    try:
+        url = models.ResNet18_Weights.IMAGENET1K_V1.url
+    except AttributeError:  # torchvision < 0.13
+        url = models.resnet.model_urls["resnet18"]
+    return os.path.basename(url)
+
 def ingest_image(file_path):
     """
     Loads an image from the given file path.
@@ -46,10 +137,10 @@ def ingest_image(file_path):
     """
     try:
         image = Image.open(file_path).convert("RGB")
-        print(f"[MULTI-MODAL] Successfully ingested image: {file_path}")
+        logger.debug("Ingested image: %s", file_path)
         return image
     except Exception as e:
-        print(f"[MULTI-MODAL] Error loading image: {e}")
+        logger.warning("Error loading image %s: %s", file_path, e)
         return None
 
 def get_image_embedding(image, model, transform):
@@ -69,9 +160,33 @@ def get_image_embedding(image, model, transform):
         embedding = model(input_tensor)
     # Flatten the embedding tensor and convert to numpy array
     embedding = embedding.view(embedding.size(0), -1).squeeze().numpy()
-    print(f"[MULTI-MODAL] Image embedding generated with shape: {embedding.shape}")
+    logger.debug("Image embedding generated with shape: %s", embedding.shape)
     return embedding
 
+def get_image_embeddings_batch(images, model, transform, batch_size=32):
+    """
+    Embeds many images, running the vision model on stacked batches.
+    
+    Args:
+        images (list): PIL Images.
+        model: Pre-trained vision model.
+        transform: Preprocessing transform.
+        batch_size (int): Images per forward pass.
+        
+    Returns:
+        numpy.array: A (len(images), 512) matrix of image embeddings.
+    """
+    rows = []
+    with torch.no_grad():
+        for start in range(0, len(images), batch_size):
+            batch = torch.stack([transform(image) for image in images[start:start + batch_size]])
+            rows.append(model(batch).flatten(start_dim=1))
+    if not rows:
+        return np.empty((0, 512), dtype=np.float32)
+    embeddings = torch.cat(rows).numpy()
+    logger.debug("Image embeddings generated with shape: %s", embeddings.shape)
+    return embeddings
+
 def ingest_numerical_data(csv_path):
     """
     Loads numerical data from a CSV file into a pandas DataFrame.
@@ -84,10 +199,10 @@ def ingest_numerical_data(csv_path):
     """
     try:
         df = pd.read_csv(csv_path)
-        print(f"[MULTI-MODAL] Successfully ingested numerical data from: {csv_path}")
+        logger.debug("Ingested numerical data from: %s", csv_path)
         return df
     except Exception as e:
-        print(f"[MULTI-MODAL] Error loading CSV data: {e}")
+        logger.warning("Error loading CSV data %s: %s", csv_path, e)
         return None
 
 def preprocess_numerical_data(df):
@@ -103,7 +218,7 @@ def preprocess_numerical_data(df):
     numeric = df.select_dtypes(include=[np.number])
     normalized = (numeric - numeric.mean()) / numeric.std()
     processed = normalized.to_numpy()
-    print(f"[MULTI-MODAL] Preprocessed numerical data with shape: {processed.shape}")
+    logger.debug("Preprocessed numerical data with shape: %s", processed.shape)
     return processed
 
 if __name__ == "__main__":
@@ -6,41 +6,97 @@ Enhanced reasoning that now can incorporate knowledge graph queries.
 
 import numpy as np
 from modules.knowledge_graph import create_knowledge_graph, query_knowledge_graph
+from modules.embedding_batch import EmbeddingBatch, embedding_mean
 
 def simple_reasoning(embeddings):
     """
     Original simple reasoning function using embeddings.
     
     Args:
-        embeddings (numpy.array): Semantic embeddings.
+        embeddings (numpy.array or EmbeddingBatch): Semantic embeddings.
         
     Returns:
         str: A reasoning decision.
     """
-    mean_value = np.mean(embeddings)
+    mean_value = embedding_mean(embeddings)
     if mean_value > 0:
         decision = "Positive inference: The input context is interpreted as positive."
     else:
         decision = "Negative inference: The input context is interpreted as negative."
     return decision
 
-def enhanced_reasoning(embeddings, concept="Machine Learning"):
+def simple_reasoning_batch(embedding_matrix):
+    """
+    Vectorized simple_reasoning over a batch of embeddings.
+    
+    Args:
+        embedding_matrix (numpy.array or EmbeddingBatch): A (batch, dim) matrix, one embedding per row.
+        
+    Returns:
+        list: One reasoning decision per row.
+    """
+    if isinstance(embedding_matrix, EmbeddingBatch):
+        positive = embedding_matrix.row_means() > 0
+    else:
+        positive = np.asarray(embedding_matrix).reshape(len(embedding_matrix), -1).mean(axis=1) > 0
+    return [
+        "Positive inference: The input context is interpreted as positive." if p
+        else "Negative inference: The input context is interpreted as negative."
+        for p in positive
+    ]
+
+def _retrieval_sentence(retrieval):
+    seeds = [label for label, _ in retrieval["seeds"]]
+    related = [label for label, _, _ in retrieval["related"]]
+    return f" Concepts nearest to the input are: {seeds}, expanding to: {related}."
+
+def enhanced_reasoning(embeddings, concept="Machine Learning", KG=None, concept_index=None):
     """
     Enhanced reasoning that queries a knowledge graph to enrich the decision.
     
     Args:
         embeddings (numpy.array): Semantic embeddings.
         concept (str): A concept to query in the knowledge graph.
+        KG (Graph, optional): A prebuilt knowledge graph (built on demand if omitted).
+        concept_index (ConceptIndex, optional): If given, the decision also names the graph concepts
+            nearest to the input embedding and their multi-hop neighborhood (see modules.concept_retrieval).
         
     Returns:
         str: An enriched reasoning decision.
     """
     basic_decision = simple_reasoning(embeddings)
-    KG = create_knowledge_graph()
+    if KG is None:
+        KG = create_knowledge_graph()
     related_concepts = query_knowledge_graph(KG, concept)
     decision = f"{basic_decision} Additionally, related concepts for '{concept}' are: {related_concepts}."
+    if concept_index is not None:
+        decision += _retrieval_sentence(concept_index.retrieve(embeddings))
     return decision
 
+def enhanced_reasoning_batch(embedding_matrix, concept="Machine Learning", KG=None, concept_index=None):
+    """
+    Batched enhanced_reasoning: one vectorized decision pass and a single knowledge graph query.
+    
+    Args:
+        embedding_matrix (numpy.array): A (batch, dim) matrix, one embedding per row.
+        concept (str): A concept to query in the knowledge graph.
+        KG (Graph, optional): A prebuilt knowledge graph (built on demand if omitted).
+        concept_index (ConceptIndex, optional): See enhanced_reasoning(); all rows are matched
+            against the graph's labels in one matrix product.
+        
+    Returns:
+        list: One enriched reasoning decision per row.
+    """
+    if KG is None:
+        KG = create_knowledge_graph()
+    related_concepts = query_knowledge_graph(KG, concept)
+    suffix = f" Additionally, related concepts for '{concept}' are: {related_concepts}."
+    decisions = [basic + suffix for basic in simple_reasoning_batch(embedding_matrix)]
+    if concept_index is not None:
+        retrievals = concept_index.retrieve_batch(embedding_matrix)
+        decisions = [decision + _retrieval_sentence(r) for decision, r in zip(decisions, retrievals)]
+    return decisions
+
 if __name__ == "__main__":
     dummy_embeddings = np.random.randn(768)
     print("Simple Reasoning:", simple_reasoning(dummy_embeddings))
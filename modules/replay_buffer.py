@@ -0,0 +1,421 @@
+# modules/replay_buffer.py
+"""
+Replay Buffer Module:
+Experience replay for the learning module, kept in preallocated NumPy ring buffers.
+
+A ReplayBuffer holds a (capacity, dim) float32 embedding matrix plus action and reward arrays.
+An append writes one row at the ring position, plus an O(log capacity) priority update. Minibatches are drawn uniformly or in proportion to
+priority through a sum tree, which is walked for the whole batch at once. A LinearHead (one weight
+row per action) consumes whole minibatches in one vectorized SGD step. ReplayLearner ties them together.
+
+Storage grows with the fill level (doubling from INITIAL_ROWS rows up to capacity), so a buffer
+that holds a few experiences takes a few rows, not capacity rows.
+
+When a directory is given the arrays are memory-mapped files in it:
+  - embeddings.f32, actions.i32, rewards.f32, priorities.f64: (rows, ...) arrays, one row per experience;
+  - meta.json: shape, fill level, ring position and a version counter;
+  - buffer.lock: held (tiered_storage.FileLock) by transaction();
+  - head.npz: the linear head's weights.
+Reopening the directory restores the buffer. Several processes may share one directory when they
+write through transaction() (ReplayLearner.observe does): it takes the lock, adopts the appends
+other processes recorded in meta.json, and records its own on exit, so no two processes write the
+same row. Each process trains its own head; head.npz holds the last one snapshotted.
+"""
+
+import json
+import os
+import threading
+from collections import namedtuple
+from contextlib import contextmanager
+
+import numpy as np
+
+from modules.tiered_storage import FileLock, atomic_write_json
+from modules.structured_logging import get_logger
+
+logger = get_logger(__name__)
+
+ReplayBatch = namedtuple("ReplayBatch", ["indices", "embeddings", "actions", "rewards", "weights"])
+
+_ARRAYS = (("embeddings", "embeddings.f32", np.float32), ("actions", "actions.i32", np.int32),
+           ("rewards", "rewards.f32", np.float32), ("priorities", "priorities.f64", np.float64))
+
+INITIAL_ROWS = 1024
+
+
+class SumTree:
+    """
+    A binary tree over `capacity` non-negative priorities in which every node holds the sum of its
+    children, so prefix-sum lookups and updates take O(log capacity).
+    """
+
+    def __init__(self, capacity):
+        self.depth = max(capacity - 1, 1).bit_length()
+        self.leaves = 1 << self.depth  # a power of two: every leaf at the same depth
+        self.nodes = np.zeros(2 * self.leaves, dtype=np.float64)
+
+    @property
+    def total(self):
+        return float(self.nodes[1])
+
+    def build(self, priorities):
+        """
+        Replaces all priorities at once, filling the tree bottom-up one level at a time.
+        """
+        self.nodes[:] = 0.0
+        self.nodes[self.leaves:self.leaves + len(priorities)] = priorities
+        level = self.leaves
+        while level > 1:
+            level //= 2
+            self.nodes[level:2 * level] = self.nodes[2 * level:4 * level:2] + self.nodes[2 * level + 1:4 * level:2]
+
+    def update(self, indices, priorities):
+        """
+        Sets the priorities of `indices` and recomputes only the affected ancestors.
+        """
+        nodes = np.asarray(indices, dtype=np.int64) + self.leaves
+        self.nodes[nodes] = priorities
+        for _ in range(self.depth):
+            # Shared ancestors are recomputed more than once, each time to the same sum
+            nodes //= 2
+            self.nodes[nodes] = self.nodes[2 * nodes] + self.nodes[2 * nodes + 1]
+
+    def set(self, index, priority):
+        """
+        Sets one priority (the scalar path used by appends).
+        """
+        node = index + self.leaves
+        delta = priority - self.nodes[node]
+        while node:
+            self.nodes[node] += delta
+            node //= 2
+
+    def find(self, values):
+        """
+        For each value in [0, total), returns the leaf whose priority interval contains it.
+        All values descend the tree together.
+        """
+        values = np.array(values, dtype=np.float64)
+        nodes = np.ones(len(values), dtype=np.int64)
+        for _ in range(self.depth):
+            left = 2 * nodes
+            left_sums = self.nodes[left]
+            right = values >= left_sums
+            values -= np.where(right, left_sums, 0.0)
+            nodes = left + right
+        return nodes - self.leaves
+
+
+class ReplayBuffer:
+    """
+    Fixed-capacity ring buffer of (embedding, action, reward) experiences with prioritized sampling.
+    """
+
+    def __init__(self, capacity, dim, directory=None, alpha=0.6, epsilon=1e-3):
+        """
+        Args:
+            capacity (int): Maximum number of experiences; the oldest are overwritten first.
+            dim (int): Embedding dimension.
+            directory (str, optional): Directory of memory-mapped arrays. An existing buffer with
+                the same capacity and dim is restored (it may be in use by other processes, see
+                transaction()); otherwise the buffer starts empty.
+            alpha (float): Priority exponent (0 samples uniformly, 1 fully by priority).
+            epsilon (float): Added to every error so no experience gets zero priority.
+        """
+        self.capacity = capacity
+        self.dim = dim
+        self.directory = directory
+        self.alpha = alpha
+        self.epsilon = epsilon
+        self.size = 0
+        self.position = 0
+        self.max_priority = 1.0
+        self.version = 0
+        self.rows = 0
+        self.tree = SumTree(capacity)
+        self.file_lock = None
+        if directory is None:
+            self._allocate(min(capacity, INITIAL_ROWS))
+            return
+        os.makedirs(directory, exist_ok=True)
+        self.file_lock = FileLock(os.path.join(directory, "buffer.lock"))
+        with self.file_lock:
+            meta = self._read_meta()
+            if meta is not None and (meta["capacity"], meta["dim"]) != (capacity, dim):
+                logger.info("Replay buffer shape changed from (%d, %d); starting empty.", meta["capacity"], meta["dim"])
+                for _, filename, _ in _ARRAYS:
+                    if os.path.exists(os.path.join(directory, filename)):
+                        os.remove(os.path.join(directory, filename))
+                meta = None
+                self._write_meta()
+            self._allocate(max(self._file_rows(), min(capacity, INITIAL_ROWS)))
+            if meta:
+                self._adopt(meta)
+
+    def _file_rows(self):
+        # Rows already allocated on disk (by this or another process)
+        path = os.path.join(self.directory, _ARRAYS[0][1])
+        row_bytes = self.dim * np.dtype(_ARRAYS[0][2]).itemsize
+        return min(self.capacity, os.path.getsize(path) // row_bytes) if os.path.exists(path) else 0
+
+    def _allocate(self, rows):
+        """
+        Grows every array to `rows` rows, keeping their contents (files are extended in place).
+        """
+        for name, filename, dtype in _ARRAYS:
+            shape = (rows, self.dim) if name == "embeddings" else (rows,)
+            old = getattr(self, name, None)
+            if self.directory is None:
+                array = np.zeros(shape, dtype=dtype)
+                if old is not None:
+                    array[:len(old)] = old
+            else:
+                if old is not None:
+                    old.flush()
+                path = os.path.join(self.directory, filename)
+                nbytes = int(np.prod(shape)) * np.dtype(dtype).itemsize
+                with open(path, "ab") as f:
+                    if f.tell() < nbytes:
+                        f.truncate(nbytes)
+                array = np.memmap(path, dtype=dtype, mode="r+", shape=shape)
+            setattr(self, name, array)
+        self.rows = rows
+
+    def _reserve(self, count):
+        # Makes room for `count` rows from the ring position on
+        needed = min(self.capacity, self.position + count)
+        if needed > self.rows:
+            self._allocate(min(self.capacity, max(needed, 2 * self.rows)))
+
+    def _read_meta(self):
+        path = os.path.join(self.directory, "meta.json")
+        if not os.path.exists(path):
+            return None
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+
+    def _write_meta(self):
+        atomic_write_json(os.path.join(self.directory, "meta.json"),
+                          {"capacity": self.capacity, "dim": self.dim, "size": self.size, "position": self.position,
+                           "max_priority": self.max_priority, "version": self.version})
+
+    def _adopt(self, meta):
+        self.size, self.position, self.max_priority = meta["size"], meta["position"], meta["max_priority"]
+        self.version = meta.get("version", 0)
+        if self._file_rows() > self.rows:
+            self._allocate(self._file_rows())
+        self.tree.build(self.priorities[:self.size])
+
+    @contextmanager
+    def transaction(self):
+        """
+        Holds the buffer's cross-process lock: on entry, adopts the appends and priority updates other
+        processes recorded since this one's last transaction; on exit, records this one's in meta.json.
+        A no-op for in-memory buffers.
+        """
+        if self.file_lock is None:
+            yield self
+            return
+        with self.file_lock:
+            meta = self._read_meta()
+            if meta is not None and meta.get("version", 0) != self.version:
+                self._adopt(meta)
+            yield self
+            self.version += 1
+            self._write_meta()
+
+    def __len__(self):
+        return self.size
+
+    def append(self, embedding, action, reward):
+        """
+        Writes one experience at the ring position with the highest priority seen so far,
+        so it is likely to be replayed at least once.
+
+        Returns:
+            int: The row it was written to.
+        """
+        self._reserve(1)
+        row = self.position
+        self.embeddings[row] = embedding
+        self.actions[row] = action
+        self.rewards[row] = reward
+        self.priorities[row] = self.max_priority
+        self.tree.set(row, self.max_priority)
+        self.position = (row + 1) % self.capacity
+        self.size = min(self.size + 1, self.capacity)
+        return row
+
+    def extend(self, embeddings, actions, rewards):
+        """
+        Appends many experiences with vectorized writes (only the last `capacity` are kept).
+
+        Returns:
+            numpy.array: The rows written to.
+        """
+        embeddings = np.asarray(embeddings, dtype=np.float32)[-self.capacity:]
+        self._reserve(len(embeddings))
+        rows = (self.position + np.arange(len(embeddings))) % self.capacity
+        self.embeddings[rows] = embeddings
+        self.actions[rows] = np.asarray(actions)[-self.capacity:]
+        self.rewards[rows] = np.asarray(rewards)[-self.capacity:]
+        self.priorities[rows] = self.max_priority
+        self.tree.update(rows, self.priorities[rows])
+        self.position = int((self.position + len(rows)) % self.capacity)
+        self.size = min(self.size + len(rows), self.capacity)
+        return rows
+
+    def sample(self, batch_size, prioritized=True, beta=0.4, rng=None):
+        """
+        Draws a minibatch.
+
+        Args:
+            batch_size (int): Number of experiences (drawn with replacement).
+            prioritized (bool): Sample in proportion to priority (stratified over the sum tree)
+                instead of uniformly.
+            beta (float): Importance-sampling exponent that corrects the prioritized bias.
+            rng (numpy.random.Generator, optional): Random source.
+
+        Returns:
+            ReplayBatch: indices, embeddings, actions, rewards and importance weights
+                         (normalized to a maximum of 1; all ones for uniform sampling).
+        """
+        if not self.size:
+            raise ValueError("Cannot sample from an empty replay buffer.")
+        rng = rng or np.random.default_rng()
+        if prioritized:
+            total = self.tree.total
+            values = (np.arange(batch_size) + rng.random(batch_size)) * (total / batch_size)
+            indices = np.minimum(self.tree.find(values), self.size - 1)  # guards against rounding at the end
+            probabilities = self.priorities[indices] / total
+            weights = (self.size * probabilities) ** -beta
+            weights = (weights / weights.max()).astype(np.float32)
+        else:
+            indices = rng.integers(0, self.size, batch_size)
+            weights = np.ones(batch_size, dtype=np.float32)
+        return ReplayBatch(indices, self.embeddings[indices], self.actions[indices], self.rewards[indices], weights)
+
+    def update_priorities(self, indices, errors):
+        """
+        Sets the priorities of sampled experiences from their latest prediction errors.
+        """
+        priorities = (np.abs(errors) + self.epsilon) ** self.alpha
+        self.priorities[indices] = priorities
+        self.tree.update(indices, priorities)
+        self.max_priority = max(self.max_priority, float(priorities.max()))
+
+    def snapshot(self):
+        """
+        Flushes the memory-mapped arrays to disk and records the fill level and ring position in meta.json.
+        """
+        if self.directory is None:
+            raise ValueError("snapshot() needs a buffer opened with a directory.")
+        with self.transaction():
+            for name, _, _ in _ARRAYS:
+                getattr(self, name).flush()
+
+
+class LinearHead:
+    """
+    A linear value head with one weight row per action: Q(s, a) = W[a] . s + b[a].
+    """
+
+    def __init__(self, dim, n_actions, learning_rate=0.1):
+        self.weights = np.zeros((n_actions, dim), dtype=np.float32)
+        self.bias = np.zeros(n_actions, dtype=np.float32)
+        self.learning_rate = learning_rate
+
+    def predict(self, embeddings, actions=None):
+        """
+        Returns Q values: (n, n_actions), or (n,) for the given actions.
+        """
+        if actions is None:
+            return embeddings @ self.weights.T + self.bias
+        return np.einsum("ij,ij->i", embeddings, self.weights[actions]) + self.bias[actions]
+
+    def update(self, batch):
+        """
+        One importance-weighted SGD step on the squared error over a whole minibatch.
+
+        Returns:
+            numpy.array: Per-sample errors (reward - prediction) before the step.
+        """
+        errors = batch.rewards - self.predict(batch.embeddings, batch.actions)
+        scaled = (self.learning_rate / len(errors)) * batch.weights * errors
+        one_hot = np.zeros((len(errors), len(self.bias)), dtype=np.float32)
+        one_hot[np.arange(len(errors)), batch.actions] = 1.0
+        self.weights += one_hot.T @ (scaled[:, None] * batch.embeddings)
+        self.bias += one_hot.T @ scaled
+        return errors
+
+    def save(self, path):
+        tmp_path = f"{path}.{os.getpid()}.tmp.npz"
+        np.savez(tmp_path, weights=self.weights, bias=self.bias)
+        os.replace(tmp_path, path)
+
+    def load(self, path):
+        with np.load(path) as data:
+            if data["weights"].shape == self.weights.shape:
+                self.weights, self.bias = data["weights"], data["bias"]
+
+
+class ReplayLearner:
+    """
+    Stores every experience and trains a LinearHead on a replayed minibatch after each one.
+    """
+
+    def __init__(self, dim, n_actions, directory=None, capacity=50000, batch_size=32, snapshot_every=100,
+                 prioritized=True, seed=None):
+        """
+        Args:
+            dim (int): Embedding dimension.
+            n_actions (int): Number of discrete actions.
+            directory (str, optional): Where the buffer and head persist (in memory only if None).
+            capacity (int): Replay buffer capacity.
+            batch_size (int): Minibatch size; training starts once the buffer holds this many.
+            snapshot_every (int): Experiences between snapshots.
+            prioritized (bool): Prioritized rather than uniform replay.
+            seed (int, optional): Seed of the sampling random source.
+        """
+        self.buffer = ReplayBuffer(capacity, dim, directory)
+        self.head = LinearHead(dim, n_actions)
+        self.directory = directory
+        self.batch_size = batch_size
+        self.snapshot_every = snapshot_every
+        self.prioritized = prioritized
+        self.rng = np.random.default_rng(seed)
+        self.lock = threading.Lock()
+        self.steps = 0
+        if directory is not None and os.path.exists(os.path.join(directory, "head.npz")) and len(self.buffer):
+            self.head.load(os.path.join(directory, "head.npz"))
+
+    def observe(self, embedding, action, reward):
+        """
+        Appends one experience and runs one update step on a replayed minibatch.
+
+        Returns:
+            float: The minibatch's mean squared error, or None while the buffer is still too small.
+        """
+        with self.lock, self.buffer.transaction():
+            self.buffer.append(embedding, action, reward)
+            loss = None
+            if len(self.buffer) >= self.batch_size:
+                batch = self.buffer.sample(self.batch_size, self.prioritized, rng=self.rng)
+                errors = self.head.update(batch)
+                self.buffer.update_priorities(batch.indices, errors)
+                loss = float(np.mean(errors ** 2))
+            self.steps += 1
+            if self.directory is not None and self.steps % self.snapshot_every == 0:
+                self._snapshot()
+        return loss
+
+    def _snapshot(self):
+        self.buffer.snapshot()
+        self.head.save(os.path.join(self.directory, "head.npz"))
+
+    def snapshot(self):
+        """
+        Persists the buffer and the head now (e.g. at shutdown).
+        """
+        with self.lock:
+            self._snapshot()
@@ -0,0 +1,331 @@
+# modules/resources.py
+"""
+Resources Module:
+One CPU budget for the whole process, so that torch, BLAS and the pipeline's thread and process
+pools stop sizing themselves to the machine independently and oversubscribing it.
+
+available_cpus() counts the cores this process may actually use: the CPU affinity mask (taskset,
+cpusets) capped by the cgroup CPU quota (docker --cpus, Kubernetes limits). os.cpu_count() and
+torch's default thread count ignore both. GENESIS_CPUS overrides the detection.
+
+The budget divides those cores between the compute consumers running at the same time:
+  - a process pool of N workers gives each worker cpus // N cores (and, if pinned, a disjoint
+    slice of the affinity mask);
+  - inside a process, the CPU stages running concurrently (integrate_system_async pipelines
+    sharing an event loop, for instance) split the process's cores. Torch's intra-op thread count
+    is process-wide, so concurrent() sets it to one stage's share whenever a stage enters or
+    leaves, and back to the process budget when the last one leaves (a parallel region already
+    running keeps the pool size it started with);
+  - BLAS (numpy, pandas) gets as many threads as torch's intra-op pool, and torch's inter-op
+    pool is kept small, since the pipeline parallelizes across stages itself.
+The OMP/MKL/OpenBLAS environment variables are set to the same numbers, so libraries loaded
+later and child processes start within the budget. threadpoolctl, when installed, also limits
+BLAS pools that are already running.
+"""
+
+import math
+import os
+import sys
+import threading
+from collections import namedtuple
+from contextlib import contextmanager
+
+from modules.structured_logging import get_logger
+
+try:
+    from threadpoolctl import threadpool_limits
+except ImportError:  # Optional dependency
+    threadpool_limits = None
+
+logger = get_logger(__name__)
+
+CPUS_ENV = "GENESIS_CPUS"
+CGROUP_ROOT = "/sys/fs/cgroup"
+THREAD_ENV_VARS = ("OMP_NUM_THREADS", "MKL_NUM_THREADS", "OPENBLAS_NUM_THREADS", "NUMEXPR_NUM_THREADS",
+                   "VECLIB_MAXIMUM_THREADS")
+
+# Threads per compute consumer. interop_threads is torch's inter-op pool (set once per process).
+Budget = namedtuple("Budget", ["cpus", "concurrency", "torch_threads", "interop_threads", "blas_threads"])
+
+
+# ---- detection --------------------------------------------------------------
+
+def _read(path):
+    try:
+        with open(path, "r", encoding="ascii") as f:
+            return f.read().strip()
+    except OSError:
+        return None
+
+
+def cgroup_cpu_limit(root=CGROUP_ROOT):
+    """
+    Returns the cgroup CPU quota of this process in (fractional) cores, or None if unlimited.
+    Reads cgroup v2 (cpu.max) and falls back to cgroup v1 (cpu.cfs_quota_us / cpu.cfs_period_us).
+    """
+    limit = _read(os.path.join(root, "cpu.max"))
+    if limit:
+        quota, _, period = limit.partition(" ")
+        if quota != "max" and period:
+            return int(quota) / int(period)
+        return None
+    for directory in (os.path.join(root, "cpu,cpuacct"), os.path.join(root, "cpu")):
+        quota, period = _read(os.path.join(directory, "cpu.cfs_quota_us")), _read(os.path.join(directory, "cpu.cfs_period_us"))
+        if quota and period and int(quota) > 0:
+            return int(quota) / int(period)
+    return None
+
+
+def affinity_cpus():
+    """
+    Returns:
+        list: The CPU ids this process may run on (all CPUs where affinity is not supported).
+    """
+    if hasattr(os, "sched_getaffinity"):
+        return sorted(os.sched_getaffinity(0))
+    return list(range(os.cpu_count() or 1))
+
+
+def available_cpus():
+    """
+    Returns:
+        int: Cores usable by this process: GENESIS_CPUS if set, otherwise the affinity mask
+             capped by the cgroup quota (rounded up), at least 1.
+    """
+    override = os.environ.get(CPUS_ENV)
+    if override:
+        return max(1, int(override))
+    cpus = len(affinity_cpus())
+    quota = cgroup_cpu_limit()
+    if quota:
+        cpus = min(cpus, math.ceil(quota))
+    return max(1, cpus)
+
+
+# ---- planning ------------------------------------------------------------------
+
+def plan_budget(cpus=None, concurrency=1):
+    """
+    Splits `cpus` cores between `concurrency` compute stages running at once.
+
+    Returns:
+        Budget: The per-stage thread counts.
+    """
+    cpus = cpus or available_cpus()
+    concurrency = max(1, concurrency)
+    threads = max(1, cpus // concurrency)
+    return Budget(cpus, concurrency, threads, min(2, cpus), threads)
+
+
+def worker_cpu_sets(workers, cpus=None):
+    """
+    Divides the affinity mask into one disjoint, contiguous CPU set per worker process (workers
+    share CPUs round-robin when there are more workers than CPUs).
+
+    Args:
+        workers (int): Number of worker processes.
+        cpus (list, optional): CPU ids to divide (defaults to the first available_cpus() ids
+                               of the affinity mask).
+
+    Returns:
+        list: One set of CPU ids per worker.
+    """
+    cpus = list(cpus) if cpus is not None else affinity_cpus()[:available_cpus()]
+    if workers >= len(cpus):
+        return [{cpus[i % len(cpus)]} for i in range(workers)]
+    size, extra = divmod(len(cpus), workers)
+    sets, start = [], 0
+    for i in range(workers):
+        end = start + size + (1 if i < extra else 0)
+        sets.append(set(cpus[start:end]))
+        start = end
+    return sets
+
+
+# ---- applying -------------------------------------------------------------------
+
+def set_thread_env(threads):
+    """
+    Sets the OMP/MKL/OpenBLAS/numexpr thread variables, read by libraries when they load and
+    inherited by child processes.
+    """
+    for name in THREAD_ENV_VARS:
+        os.environ[name] = str(threads)
+
+
+def apply_torch_threads(threads, interop_threads=None):
+    """
+    Sets torch's intra-op threads (a process-wide setting) and, if torch has not started its
+    inter-op pool yet, its inter-op threads. Torch is only touched if it is
+    already imported, so model-free processes start fast; it picks up OMP_NUM_THREADS otherwise.
+    """
+    torch = sys.modules.get("torch")
+    if torch is None:
+        return
+    if torch.get_num_threads() != threads:
+        torch.set_num_threads(threads)
+    if interop_threads and torch.get_num_interop_threads() != interop_threads:
+        try:
+            torch.set_num_interop_threads(interop_threads)
+        except RuntimeError:  # the inter-op pool is already running; its size is fixed
+            pass
+
+
+def apply_blas_threads(threads):
+    """
+    Limits the BLAS/OpenMP pools already loaded in this process (needs threadpoolctl).
+
+    Returns:
+        bool: Whether the limit was applied.
+    """
+    if threadpool_limits is None:
+        return False
+    threadpool_limits(limits=threads)
+    return True
+
+
+def init_worker(threads, cpu_sets=None, slot=None):
+    """
+    Process pool initializer: applies a worker's thread budget and, when `cpu_sets` is given,
+    pins the worker to one of them (chosen by the shared `slot` counter, a multiprocessing.Value).
+    """
+    set_thread_env(threads)
+    apply_torch_threads(threads, 1)
+    apply_blas_threads(threads)
+    if cpu_sets and hasattr(os, "sched_setaffinity"):
+        with slot.get_lock():
+            index = slot.value
+            slot.value += 1
+        os.sched_setaffinity(0, cpu_sets[index % len(cpu_sets)])
+
+
+class ResourceManager:
+    """
+    Tracks the process's CPU budget and the number of compute stages currently running.
+    """
+
+    def __init__(self, cpus=None):
+        """
+        Args:
+            cpus (int, optional): Cores to budget (defaults to available_cpus()).
+        """
+        self.cpus = cpus or available_cpus()
+        self.lock = threading.Lock()
+        self.active = 0
+        self.applied = None
+
+    @property
+    def budget(self):
+        """
+        Budget: The thread counts for the stages currently running (at least one).
+        """
+        return plan_budget(self.cpus, self.active or 1)
+
+    def apply(self, torch_threads=None):
+        """
+        Applies the process budget to torch, BLAS and the thread environment variables.
+
+        Args:
+            torch_threads (int, optional): Explicit intra-op/BLAS thread count (e.g. a tuned
+                                           runtime configuration), overriding the budget.
+
+        Returns:
+            Budget: The applied budget.
+        """
+        budget = plan_budget(self.cpus)
+        if torch_threads:
+            budget = budget._replace(torch_threads=int(torch_threads), blas_threads=int(torch_threads))
+        set_thread_env(budget.blas_threads)
+        apply_torch_threads(budget.torch_threads, budget.interop_threads)
+        apply_blas_threads(budget.blas_threads)
+        self.applied = budget
+        logger.debug("Applied CPU budget %s", budget)
+        return budget
+
+    def ensure_applied(self):
+        """
+        Applies the default budget unless a budget was already applied in this process.
+        """
+        if self.applied is None:
+            self.apply()
+
+    @contextmanager
+    def concurrent(self):
+        """
+        Marks a compute stage as running for the duration of the block. torch.set_num_threads() is
+        process-wide, so the torch thread count is set to the share of one stage among those
+        running, both when a stage enters and when it exits; after the last one exits it is the
+        applied process budget again.
+
+        Yields:
+            Budget: The share of the cores when the stage entered.
+        """
+        with self.lock:
+            self.active += 1
+            budget = plan_budget(self.cpus, self.active)
+            apply_torch_threads(budget.torch_threads)
+        try:
+            yield budget
+        finally:
+            with self.lock:
+                self.active -= 1
+                apply_torch_threads(self.budget.torch_threads if self.active else
+                                    (self.applied or plan_budget(self.cpus)).torch_threads)
+
+    def call(self, fn, *args, **kwargs):
+        """
+        Runs fn(*args, **kwargs) as a concurrent() compute stage (e.g. on an executor thread).
+        """
+        with self.concurrent():
+            return fn(*args, **kwargs)
+
+    def pool_workers(self, requested=None, io_bound=False):
+        """
+        Sizes a thread or process pool within the budget.
+
+        Args:
+            requested (int, optional): The caller's worker count (defaults to the maximum).
+            io_bound (bool): Workers mostly wait on I/O and may exceed the core count
+                             (capped like concurrent.futures' default, cpus + 4 up to 32).
+
+        Returns:
+            int: The worker count.
+        """
+        limit = min(32, self.cpus + 4) if io_bound else self.cpus
+        return max(1, min(requested or limit, limit))
+
+    def process_pool_options(self, workers=None, pin=False):
+        """
+        Builds ProcessPoolExecutor keyword arguments whose workers share the budget: each gets
+        cpus // workers threads and, with pin=True, its own slice of the affinity mask.
+
+        Args:
+            workers (int, optional): Worker processes (defaults to one per budgeted core).
+            pin (bool): Pin each worker to a disjoint set of CPUs (Linux).
+
+        Returns:
+            dict: max_workers, initializer and initargs.
+        """
+        workers = workers or self.cpus
+        threads = max(1, self.cpus // workers)
+        if pin and hasattr(os, "sched_setaffinity"):
+            import multiprocessing
+            initargs = (threads, worker_cpu_sets(workers), multiprocessing.Value("i", 0))
+        else:
+            initargs = (threads,)
+        return {"max_workers": workers, "initializer": init_worker, "initargs": initargs}
+
+
+_manager = None
+_manager_lock = threading.Lock()
+
+
+def get_resource_manager():
+    """
+    Returns the process-wide resource manager.
+    """
+    global _manager
+    with _manager_lock:
+        if _manager is None:
+            _manager = ResourceManager()
+        return _manager
@@ -5,6 +5,8 @@ Analyzes system performance and triggers self-improvement routines.
 This module simulates the process of self-analysis and auto-modification.
 """
 
+from modules.embedding_batch import embedding_mean
+
 def analyze_system(embeddings, decision, reward):
     """
     Analyzes system performance based on the generated embeddings, reasoning decision, and reward.
@@ -16,7 +18,7 @@ def analyze_system(embeddings, decision, reward):
       - A flag indicating if improvement is needed (e.g., if reward is negative).
     
     Args:
-        embeddings (numpy.array): The semantic embeddings.
+        embeddings (numpy.array or EmbeddingBatch): The semantic embeddings.
         decision (str): The reasoning decision.
         reward (int): The reward signal from the Learning Module.
         
@@ -24,28 +26,38 @@ def analyze_system(embeddings, decision, reward):
         dict: An analysis report containing performance metrics.
     """
     analysis_report = {
-        "average_embedding_value": float(embeddings.mean()),
+        "average_embedding_value": embedding_mean(embeddings),
         "decision": decision,
         "reward": reward,
         "improvement_needed": reward < 0  # Flag: True if negative reward, else False.
     }
     return analysis_report
 
-def self_improve(analysis_report):
+def self_improve(analysis_report, objective=None, seed=0, config_path=None):
     """
-    Simulates the self-improvement process based on the analysis report.
+    Runs the self-improvement process based on the analysis report.
     
-    If improvement is needed, this function simulates modifying system parameters.
-    For the prototype, it simply logs the event and returns a status message.
+    If improvement is needed and a tuning objective is given, the runtime configuration
+    (batch size, workers, torch threads, inference backend) is autotuned against it and the
+    winner persisted for later runs (see modules.autotuner). Without an objective, the
+    update is only logged: the pipelines call this per input without one, since a search takes
+    many pipeline runs, and tuning is requested from the command line (main.py --autotune).
     
     Args:
         analysis_report (dict): The analysis report from analyze_system.
+        objective (callable, optional): (config, budget) -> cost, e.g. main.tuning_objective().
+        seed (int): Autotuner seed.
+        config_path (str, optional): Runtime config file (defaults to autotuner.RUNTIME_CONFIG_FILE).
         
     Returns:
         str: A message indicating the outcome of the self-improvement process.
     """
-    if analysis_report["improvement_needed"]:
-        # Simulate improvement process (placeholder)
+    if analysis_report["improvement_needed"] and objective is not None:
+        from modules.autotuner import autotune
+        result = autotune(objective, seed=seed, config_path=config_path)
+        settings = ", ".join(f"{k}={v}" for k, v in sorted(result.best.items()))
+        outcome = f"Self-improvement executed: Runtime configuration tuned ({settings})."
+    elif analysis_report["improvement_needed"]:
         outcome = "Self-improvement executed: System parameters updated."
     else:
         outcome = "System is performing optimally. No self-improvement required."
@@ -0,0 +1,297 @@
+# modules/stage_cache.py
+"""
+Stage Cache Module:
+Memoizes pipeline stages across calls and runs, so re-running the pipeline on a mostly
+unchanged corpus only computes what changed.
+
+A stage result is cached under a key derived from the stage name, its declared version and the
+keys of its inputs. An input is either:
+  - the result of another stage (a Cached), which contributes its key;
+  - a file (source_file()), which contributes its path, size and modification time;
+  - a plain value (str, number, array, list, dict ...), which contributes a hash of its content.
+Keys are built from upstream keys rather than upstream values, so an edited file or a bumped
+version changes the key of every stage downstream of it, and a stage's key is known before its
+inputs are computed (a cached embedding is found without loading the text model).
+
+Two tiers: an in-memory LRU bounded by entry count and bytes, in front of a directory of pickled
+results (<stage>/<key>.pkl) bounded by bytes, where the least recently used files are evicted.
+Cached values are shared between callers and must not be mutated.
+"""
+
+import hashlib
+import os
+import pickle
+import threading
+import time
+from collections import OrderedDict, namedtuple
+
+import numpy as np
+
+from modules.structured_logging import get_logger
+
+logger = get_logger(__name__)
+
+STAGE_CACHE_DIR = "stage_cache"
+
+# One stage result: hit is True when it came from the cache (value is None on a lookup miss).
+Cached = namedtuple("Cached", ["stage", "key", "value", "hit"])
+
+
+def _update(digest, value):
+    # Feeds a stage input into the key digest, tagged by type so that e.g. 1 and "1" differ.
+    if isinstance(value, Cached):
+        digest.update(b"K" + value.key.encode("ascii"))
+    elif value is None or isinstance(value, (bool, int, float)):
+        digest.update(f"V{type(value).__name__}:{value!r};".encode("utf-8"))
+    elif isinstance(value, str):
+        digest.update(b"S%d:" % len(value) + value.encode("utf-8"))
+    elif isinstance(value, bytes):
+        digest.update(b"B%d:" % len(value) + value)
+    elif isinstance(value, np.ndarray):
+        digest.update(f"A{value.dtype.str}{value.shape}:".encode("ascii"))
+        digest.update(np.ascontiguousarray(value).view(np.uint8))
+    elif isinstance(value, (list, tuple)):
+        digest.update(b"L%d:" % len(value))
+        for item in value:
+            _update(digest, item)
+    elif isinstance(value, dict):
+        digest.update(b"D%d:" % len(value))
+        for key in sorted(value, key=repr):
+            _update(digest, key)
+            _update(digest, value[key])
+    else:
+        raise TypeError(f"Cannot key a stage input of type {type(value).__name__}")
+
+
+def source_file(path):
+    """
+    Wraps a file path as a stage input keyed on the file's path, size and mtime (the file is not
+    read). Stages receive the path itself; None stands for an absent optional file.
+
+    Returns:
+        Cached: A pseudo-result of the "file" stage.
+    """
+    if path is None:
+        return Cached("file", "none", None, True)
+    st = os.stat(path)
+    identity = f"{os.path.abspath(path)}|{st.st_size}|{st.st_mtime_ns}"
+    return Cached("file", hashlib.blake2b(identity.encode("utf-8"), digest_size=16).hexdigest(), path, True)
+
+
+class StageCache:
+    """
+    Two-tier memo of stage results with per-stage hit counters.
+    """
+
+    def __init__(self, directory=STAGE_CACHE_DIR, memory_items=4096, memory_bytes=256 << 20, disk_bytes=1 << 30):
+        """
+        Args:
+            directory (str): Directory of the disk tier (None keeps results in memory only).
+            memory_items (int): Maximum entries in the memory tier.
+            memory_bytes (int): Maximum pickled size of the memory tier's entries.
+            disk_bytes (int): Maximum total size of the disk tier's files.
+        """
+        self.directory = directory
+        self.memory_items = memory_items
+        self.memory_bytes = memory_bytes
+        self.disk_bytes = disk_bytes
+        self.lock = threading.RLock()
+        self.memory = OrderedDict()  # key -> (value, size), least recently used first
+        self.memory_size = 0
+        self._disk = None  # path -> [size, last use], scanned on first use
+        self._disk_size = 0
+        self.counters = {}
+
+    # ---- keys ---------------------------------------------------------------
+
+    def key(self, stage, *inputs, version=0):
+        """
+        Returns the cache key of a stage applied to `inputs` (see the module docstring).
+        """
+        digest = hashlib.blake2b(digest_size=16)
+        _update(digest, stage)
+        _update(digest, version)
+        for value in inputs:
+            _update(digest, value)
+        return digest.hexdigest()
+
+    # ---- tiers ----------------------------------------------------------------
+
+    def _disk_path(self, stage, key):
+        return os.path.join(self.directory, stage, key + ".pkl")
+
+    def _disk_index(self):
+        if self._disk is None:
+            self._disk = {}
+            if self.directory and os.path.isdir(self.directory):
+                for stage in os.scandir(self.directory):
+                    if not stage.is_dir():
+                        continue
+                    for entry in os.scandir(stage.path):
+                        if entry.name.endswith(".pkl"):
+                            st = entry.stat()
+                            self._disk[entry.path] = [st.st_size, st.st_mtime]
+            self._disk_size = sum(size for size, _ in self._disk.values())
+        return self._disk
+
+    def _remember(self, key, value, size):
+        if key in self.memory:
+            self.memory_size -= self.memory.pop(key)[1]
+        if size > self.memory_bytes:
+            return
+        self.memory[key] = (value, size)
+        self.memory_size += size
+        while len(self.memory) > self.memory_items or self.memory_size > self.memory_bytes:
+            _, (_, evicted) = self.memory.popitem(last=False)
+            self.memory_size -= evicted
+
+    def _read_disk(self, stage, key):
+        path = self._disk_path(stage, key)
+        index = self._disk_index()
+        if path not in index and not os.path.exists(path):  # another process may have written it
+            return None
+        try:
+            with open(path, "rb") as f:
+                blob = f.read()
+            value = pickle.loads(blob)
+        except FileNotFoundError:  # evicted by another process
+            self._forget(path)
+            return None
+        except Exception as e:  # unreadable entry (e.g. written by an incompatible library version)
+            logger.warning("Dropping unreadable stage cache entry %s: %s", path, e)
+            self._forget(path)
+            return None
+        now = time.time()
+        os.utime(path, (now, now))  # recency for LRU eviction, shared with other processes
+        if path not in index:
+            self._disk_size += len(blob)
+        index[path] = [len(blob), now]
+        return value, len(blob)
+
+    def _forget(self, path):
+        entry = self._disk_index().pop(path, None)
+        if entry:
+            self._disk_size -= entry[0]
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+
+    def _write_disk(self, stage, key, blob):
+        path = self._disk_path(stage, key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}-{threading.get_ident()}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(blob)
+        os.replace(tmp_path, path)
+        index = self._disk_index()
+        if path in index:
+            self._disk_size -= index[path][0]
+        index[path] = [len(blob), time.time()]
+        self._disk_size += len(blob)
+        if self._disk_size > self.disk_bytes:
+            # evict the least recently used files down to 90% of the limit
+            for old_path, _ in sorted(index.items(), key=lambda item: item[1][1]):
+                if self._disk_size <= 0.9 * self.disk_bytes:
+                    break
+                if old_path != path:
+                    self._forget(old_path)
+
+    # ---- lookups --------------------------------------------------------------
+
+    def _count(self, stage, outcome):
+        counters = self.counters.setdefault(stage, {"lookups": 0, "memory_hits": 0, "disk_hits": 0, "misses": 0})
+        counters["lookups"] += 1
+        counters[outcome] += 1
+
+    def lookup(self, stage, *inputs, version=0):
+        """
+        Looks up a stage result without computing it.
+
+        Args:
+            stage (str): Stage name.
+            *inputs: The stage's inputs (Cached results, source_file() inputs or plain values).
+            version: The stage's code/config version; bump it to invalidate the stage and,
+                through the keys, everything downstream of it.
+
+        Returns:
+            Cached: hit=True with the cached value, or hit=False with value None. Pass a miss to
+                    store() once the value is computed.
+        """
+        key = self.key(stage, *inputs, version=version)
+        with self.lock:
+            if key in self.memory:
+                self.memory.move_to_end(key)
+                self._count(stage, "memory_hits")
+                return Cached(stage, key, self.memory[key][0], True)
+            found = self._read_disk(stage, key) if self.directory else None
+            if found is not None:
+                self._remember(key, *found)
+                self._count(stage, "disk_hits")
+                return Cached(stage, key, found[0], True)
+            self._count(stage, "misses")
+            return Cached(stage, key, None, False)
+
+    def store(self, cached, value):
+        """
+        Stores the computed value of a lookup() miss in both tiers.
+
+        Returns:
+            Cached: The result, usable as an input of downstream stages.
+        """
+        blob = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+        with self.lock:
+            self._remember(cached.key, value, len(blob))
+            if self.directory:
+                self._write_disk(cached.stage, cached.key, blob)
+        return Cached(cached.stage, cached.key, value, False)
+
+    def run(self, stage, fn, *inputs, version=0):
+        """
+        Returns the cached result of a stage, or computes it with fn(*input values) and caches it.
+        Cached inputs are passed to fn as their values (source_file() inputs as their paths).
+
+        Returns:
+            Cached: The stage result.
+        """
+        cached = self.lookup(stage, *inputs, version=version)
+        if cached.hit:
+            return cached
+        return self.store(cached, fn(*(value.value if isinstance(value, Cached) else value for value in inputs)))
+
+    # ---- reporting --------------------------------------------------------------
+
+    def stats(self):
+        """
+        Returns:
+            dict: "stages" (stage -> lookups, memory_hits, disk_hits, misses and hit_rate) and
+                  the entry counts and sizes of both tiers.
+        """
+        with self.lock:
+            stages = {}
+            for stage, counters in sorted(self.counters.items()):
+                hits = counters["memory_hits"] + counters["disk_hits"]
+                stages[stage] = dict(counters, hit_rate=hits / counters["lookups"])
+            disk = self._disk_index() if self.directory else {}
+            return {"stages": stages, "memory_entries": len(self.memory), "memory_bytes": self.memory_size,
+                    "disk_entries": len(disk), "disk_bytes": self._disk_size}
+
+    def reset_stats(self):
+        """
+        Clears the hit counters (cached results are kept).
+        """
+        with self.lock:
+            self.counters = {}
+
+
+_cache = None
+
+
+def get_stage_cache():
+    """
+    Returns the process-wide stage cache at STAGE_CACHE_DIR.
+    """
+    global _cache
+    if _cache is None or _cache.directory != STAGE_CACHE_DIR:
+        _cache = StageCache(STAGE_CACHE_DIR)
+    return _cache
@@ -0,0 +1,255 @@
+# modules/structured_logging.py
+"""
+Structured Logging Module:
+Configurable, structured logging for every GENESIS-1 module, replacing unconditional print().
+
+  - Modules log through get_logger(__name__): a logger under the "genesis" hierarchy
+    (modules.memory -> genesis.memory), with %-style arguments, so messages below the
+    configured level are never formatted.
+  - Levels are set globally and per module, from configure_logging() or the environment:
+        GENESIS_LOG_LEVEL="WARNING,memory=DEBUG,knowledge_graph=INFO"
+    The default level is WARNING, so the pipeline's per-input messages (DEBUG/INFO) produce no output.
+  - Records are queued by the calling thread and written by a background listener thread,
+    so a slow or full stderr pipe never blocks the pipeline.
+  - Output is one JSON object per line (GENESIS_LOG_FORMAT=text for plain lines) carrying the
+    request ID set with request_context(), so all lines of one pipeline run can be correlated.
+"""
+
+import atexit
+import contextvars
+import copy
+import functools
+import inspect
+import json
+import logging
+import os
+import queue
+import sys
+import threading
+import uuid
+from contextlib import contextmanager
+from logging.handlers import QueueHandler, QueueListener
+
+ROOT_LOGGER = "genesis"
+LOG_LEVEL_ENV = "GENESIS_LOG_LEVEL"
+LOG_FORMAT_ENV = "GENESIS_LOG_FORMAT"
+DEFAULT_LEVEL = "WARNING"
+
+_request_id = contextvars.ContextVar("genesis_request_id", default=None)
+_lock = threading.Lock()
+_state = {"configured": False, "listener": None, "handler": None, "module_levels": []}
+
+# LogRecord attributes that are not user-supplied `extra` fields
+_RECORD_FIELDS = set(vars(logging.LogRecord("", 0, "", 0, "", None, None))) | {"message", "asctime", "request_id"}
+
+
+def new_request_id():
+    """
+    Returns a new random request ID (16 hex characters).
+    """
+    return uuid.uuid4().hex[:16]
+
+
+def current_request_id():
+    """
+    Returns the request ID of the current context, or None outside request_context().
+    """
+    return _request_id.get()
+
+
+@contextmanager
+def request_context(request_id=None):
+    """
+    Tags every record logged in this context (including asyncio tasks it starts) with a request ID.
+
+    Args:
+        request_id (str, optional): The ID to use (defaults to a new one).
+
+    Yields:
+        str: The request ID.
+    """
+    token = _request_id.set(request_id or new_request_id())
+    try:
+        yield _request_id.get()
+    finally:
+        _request_id.reset(token)
+
+
+def with_request_id(func):
+    """
+    Decorator running `func` (sync or async) in a request_context(), unless one is already active.
+    """
+    if inspect.iscoroutinefunction(func):
+        @functools.wraps(func)
+        async def async_wrapper(*args, **kwargs):
+            with request_context(current_request_id()):
+                return await func(*args, **kwargs)
+        return async_wrapper
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        with request_context(current_request_id()):
+            return func(*args, **kwargs)
+    return wrapper
+
+
+def run_in_thread(loop, fn, *args, executor=None):
+    """
+    Runs `fn(*args)` on an executor thread in a copy of the caller's context, so its log
+    records keep the request ID.
+
+    Args:
+        loop (asyncio.AbstractEventLoop): The running loop.
+        fn (callable): The blocking function.
+        executor (concurrent.futures.Executor, optional): Defaults to the loop's executor.
+
+    Returns:
+        asyncio.Future: Resolves to the return value of `fn`.
+    """
+    return loop.run_in_executor(executor, functools.partial(contextvars.copy_context().run, fn, *args))
+
+
+class _RequestIdFilter(logging.Filter):
+    # Runs on the logging thread, where the request's context variables are visible.
+    def filter(self, record):
+        if not hasattr(record, "request_id"):
+            record.request_id = _request_id.get()
+        return True
+
+
+class JsonFormatter(logging.Formatter):
+    """
+    Formats a record as one JSON object: ts, level, logger, msg, request_id, any `extra`
+    fields and, for exceptions, exc.
+    """
+
+    def format(self, record):
+        entry = {
+            "ts": round(record.created, 6),
+            "level": record.levelname,
+            "logger": record.name,
+            "msg": record.getMessage(),
+            "request_id": getattr(record, "request_id", None),
+        }
+        entry.update((key, value) for key, value in vars(record).items() if key not in _RECORD_FIELDS)
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            entry["exc"] = record.exc_text
+        return json.dumps(entry, default=str)
+
+
+TEXT_FORMAT = "%(asctime)s %(levelname)s %(name)s [%(request_id)s] %(message)s"
+
+
+class _QueueHandler(QueueHandler):
+    def prepare(self, record):
+        # Resolve the message and traceback on the calling thread (arguments may be mutated
+        # later); the listener thread only serializes and writes.
+        record = copy.copy(record)
+        record.msg, record.args = record.getMessage(), None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+
+def parse_levels(spec):
+    """
+    Parses a level specification such as "WARNING,memory=DEBUG".
+
+    Returns:
+        tuple: (global level or None, {module: level})
+    """
+    level, modules = None, {}
+    for part in filter(None, (p.strip() for p in (spec or "").split(","))):
+        if "=" in part:
+            name, value = (s.strip() for s in part.split("=", 1))
+            modules[name] = value.upper()
+        else:
+            level = part.upper()
+    return level, modules
+
+
+def _logger_name(name):
+    name = name[len("modules."):] if name.startswith("modules.") else name
+    return ROOT_LOGGER if name in ("", ROOT_LOGGER) else f"{ROOT_LOGGER}.{name}"
+
+
+def configure_logging(level=None, levels=None, fmt=None, stream=None, queued=True):
+    """
+    (Re)configures GENESIS-1 logging. Arguments left as None come from the environment.
+
+    Args:
+        level (str or int, optional): Global level (GENESIS_LOG_LEVEL, default WARNING).
+        levels (dict, optional): {module: level}, e.g. {"memory": "DEBUG"}, applied on top of the
+            per-module levels from GENESIS_LOG_LEVEL.
+        fmt (str, optional): "json" or "text" (GENESIS_LOG_FORMAT, default json).
+        stream (file, optional): Output stream (defaults to sys.stderr).
+        queued (bool): Write from a background listener thread (False writes synchronously).
+    """
+    env_level, env_modules = parse_levels(os.environ.get(LOG_LEVEL_ENV))
+    module_levels = {**env_modules, **(levels or {})}
+    fmt = (fmt or os.environ.get(LOG_FORMAT_ENV) or "json").lower()
+    with _lock:
+        _shutdown_locked()
+        root = logging.getLogger(ROOT_LOGGER)
+        root.setLevel(level or env_level or DEFAULT_LEVEL)
+        root.propagate = False
+        for name in _state["module_levels"]:
+            logging.getLogger(name).setLevel(logging.NOTSET)
+        _state["module_levels"] = [_logger_name(name) for name in module_levels]
+        for name, module_level in module_levels.items():
+            logging.getLogger(_logger_name(name)).setLevel(module_level)
+
+        handler = logging.StreamHandler(stream or sys.stderr)
+        handler.setFormatter(JsonFormatter() if fmt == "json" else logging.Formatter(TEXT_FORMAT))
+        if queued:
+            records = queue.SimpleQueue()
+            front = _QueueHandler(records)
+            _state["listener"] = QueueListener(records, handler)
+            _state["listener"].start()
+        else:
+            front = handler
+        front.addFilter(_RequestIdFilter())
+        root.addHandler(front)
+        _state["handler"] = front
+        _state["configured"] = True
+
+
+def _shutdown_locked():
+    root = logging.getLogger(ROOT_LOGGER)
+    if _state["handler"] is not None:
+        root.removeHandler(_state["handler"])
+        _state["handler"] = None
+    if _state["listener"] is not None:
+        _state["listener"].stop()  # writes out everything still queued
+        _state["listener"] = None
+
+
+def shutdown_logging():
+    """
+    Flushes queued records and stops the listener thread (also runs at interpreter exit).
+    """
+    with _lock:
+        _shutdown_locked()
+        _state["configured"] = False
+
+
+def get_logger(name):
+    """
+    Returns the logger for a module, configuring logging from the environment on first use.
+
+    Args:
+        name (str): Usually __name__ (e.g. "modules.memory" -> "genesis.memory").
+    """
+    if not _state["configured"]:
+        with _lock:
+            configure = not _state["configured"]
+            _state["configured"] = True  # claimed; configure_logging() below finishes the setup
+        if configure:
+            configure_logging()
+    return logging.getLogger(_logger_name(name))
+
+
+atexit.register(shutdown_logging)
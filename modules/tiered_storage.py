@@ -0,0 +1,470 @@
+# modules/tiered_storage.py
+"""
+Tiered Storage Module:
+Backs the short-term and long-term memory stores with two tiers:
+  - a hot tier: the most recent events, kept in RAM and mirrored to a small JSON file;
+  - a cold tier: older events rolled into time-partitioned, compressed JSON Lines segments.
+
+Each cold segment is listed in an index file together with its min/max timestamp,
+so range queries can skip partitions without opening them.
+Compression uses zstd when the optional `zstandard` package is installed, gzip otherwise.
+
+Many processes can write to one store: writers take an advisory lock on `<hot file>.lock`,
+re-read the hot tier if another writer changed it, and replace files by atomic rename, so
+readers (which take no lock) always see a complete file. Every stored event gets a `seq`
+number, increasing in write order across all writers.
+"""
+
+import asyncio
+import functools
+import gzip
+import json
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+
+try:
+    import zstandard
+except ImportError:  # Optional dependency
+    zstandard = None
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+# One writer thread for store writes issued from async code (see run_write_async()).
+_write_executor = None
+
+def run_write_async(fn, *args):
+    """
+    Runs a blocking store write on the shared writer thread and returns an awaitable.
+    Writes from concurrent pipelines are serialized (never interleaved on the same files)
+    and the event loop never waits on disk.
+    
+    Args:
+        fn (callable): The blocking write, e.g. memory.store_memory.
+        *args: Its arguments.
+    
+    Returns:
+        asyncio.Future: Resolves to fn's return value.
+    """
+    global _write_executor
+    if _write_executor is None:
+        _write_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="store-writer")
+    return asyncio.get_running_loop().run_in_executor(_write_executor, functools.partial(fn, *args))
+
+DEFAULT_RETENTION_POLICY = {
+    "hot_max_events": 1000,        # Events kept in the hot tier
+    "segment_events": 250,         # Minimum number of overflowing events rolled at once
+    "partition": "day",            # Cold partition granularity: "hour", "day" or "month"
+    "compression": "auto",         # "zstd", "gzip" or "auto" (zstd if available)
+    "cold_max_age_days": None,     # Drop cold segments older than this (None keeps everything)
+    "downsample_after_days": None, # Downsample events older than this when they are rolled
+    "downsample_every": 1,         # Keep every n-th event when downsampling
+}
+
+PARTITION_FORMATS = {
+    "hour": "%Y-%m-%dT%H",
+    "day": "%Y-%m-%d",
+    "month": "%Y-%m",
+}
+
+INDEX_FILE = "index.json"
+
+
+def parse_timestamp(value):
+    """
+    Converts an ISO-8601 string or datetime into a datetime.
+
+    Args:
+        value (str or datetime or None): The timestamp to parse.
+
+    Returns:
+        datetime or None: The parsed timestamp, or None if it is missing or malformed.
+    """
+    if value is None or isinstance(value, datetime):
+        return value
+    try:
+        return datetime.fromisoformat(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def resolve_codec(compression):
+    """
+    Resolves the compression setting of a retention policy into a concrete codec.
+
+    Args:
+        compression (str): "zstd", "gzip" or "auto".
+
+    Returns:
+        str: "zstd" or "gzip".
+    """
+    if compression == "zstd" and zstandard is None:
+        raise ImportError("zstd compression requires the 'zstandard' package.")
+    if compression == "auto":
+        return "zstd" if zstandard is not None else "gzip"
+    return compression
+
+
+def atomic_write_json(path, data, **dump_options):
+    """
+    Writes JSON to a temporary file and renames it over `path`, so readers see either
+    the old or the new file, never a partial one.
+    """
+    tmp_path = f"{path}.{os.getpid()}-{threading.get_ident()}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(data, f, **dump_options)
+    os.replace(tmp_path, path)
+
+
+class FileLock:
+    """
+    An exclusive advisory lock on a file, held across processes (flock, or msvcrt on Windows)
+    and threads. Re-entrant within a thread.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._thread_lock = threading.RLock()
+        self._depth = 0
+        self._fd = None
+
+    def __enter__(self):
+        self._thread_lock.acquire()
+        if self._depth == 0:
+            fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+            try:
+                if fcntl is not None:
+                    fcntl.flock(fd, fcntl.LOCK_EX)
+                else:
+                    while True:
+                        try:
+                            msvcrt.locking(fd, msvcrt.LK_LOCK, 1)
+                            break
+                        except OSError:  # LK_LOCK gives up after 10 seconds; keep waiting
+                            continue
+            except BaseException:
+                os.close(fd)
+                self._thread_lock.release()
+                raise
+            self._fd = fd
+        self._depth += 1
+        return self
+
+    def __exit__(self, *exc):
+        self._depth -= 1
+        if self._depth == 0:
+            if fcntl is not None:
+                fcntl.flock(self._fd, fcntl.LOCK_UN)
+            else:
+                os.lseek(self._fd, 0, os.SEEK_SET)
+                msvcrt.locking(self._fd, msvcrt.LK_UNLCK, 1)
+            os.close(self._fd)
+            self._fd = None
+        self._thread_lock.release()
+
+
+def open_segment(path, mode, codec):
+    """
+    Opens a compressed JSON Lines segment as a text stream.
+
+    Args:
+        path (str): Segment file path.
+        mode (str): "rt" or "wt".
+        codec (str): "zstd" or "gzip".
+
+    Returns:
+        file: A text-mode file object.
+    """
+    if codec == "zstd":
+        if zstandard is None:
+            raise ImportError(f"Cannot read zstd segment {path}: 'zstandard' is not installed.")
+        return zstandard.open(path, mode, encoding="utf-8")
+    return gzip.open(path, mode, encoding="utf-8")
+
+
+class TieredStore:
+    """
+    A memory store with an in-RAM hot tier and a compressed, time-partitioned cold tier.
+    """
+
+    def __init__(self, hot_path, archive_dir, policy=None):
+        """
+        Args:
+            hot_path (str): JSON file mirroring the hot tier.
+            archive_dir (str): Directory holding the cold segments and their index.
+            policy (dict, optional): Overrides for DEFAULT_RETENTION_POLICY.
+        """
+        self.hot_path = hot_path
+        self.archive_dir = archive_dir
+        self.policy = dict(DEFAULT_RETENTION_POLICY)
+        if policy:
+            self.policy.update(policy)
+        self._hot = None
+        self._hot_signature = None
+        self.lock = FileLock(hot_path + ".lock")
+
+    # ---- hot tier -------------------------------------------------------
+
+    def initialize(self):
+        """
+        Creates the hot tier file if it doesn't exist.
+
+        Returns:
+            bool: True if a new file was created.
+        """
+        if os.path.exists(self.hot_path):
+            return False
+        with self.lock:
+            if os.path.exists(self.hot_path):
+                return False
+            self._write_hot([])
+        return True
+
+    def _file_signature(self):
+        try:
+            st = os.stat(self.hot_path)
+        except FileNotFoundError:
+            return None
+        return (st.st_mtime_ns, st.st_size, st.st_ino)
+
+    def _load_hot(self):
+        # Only re-read the file when another writer changed it since our last read.
+        signature = self._file_signature()
+        if self._hot is None or signature != self._hot_signature:
+            if signature is None:
+                self._hot = []
+            else:
+                with open(self.hot_path, "r", encoding="utf-8") as f:
+                    self._hot = json.load(f)
+            self._hot_signature = signature
+        return self._hot
+
+    def _write_hot(self, events):
+        atomic_write_json(self.hot_path, events, indent=4)
+        self._hot = events
+        self._hot_signature = self._file_signature()
+
+    def append(self, event):
+        """
+        Appends one event to the hot tier, rolling old events to the cold tier if needed.
+
+        Args:
+            event (dict): The event to store.
+        """
+        self.append_many([event])
+
+    def append_many(self, events):
+        """
+        Appends several events with a single hot-tier write. Safe with concurrent writers:
+        the read-modify-write runs under the store lock.
+
+        Args:
+            events (list): Events to store, oldest first. They are stored as copies
+                carrying the next sequence numbers.
+        """
+        with self.lock:
+            hot = list(self._load_hot())
+            last_seq = self._last_seq(hot)
+            hot.extend(dict(event, seq=last_seq + i) for i, event in enumerate(events, 1))
+            overflow = len(hot) - self.policy["hot_max_events"]
+            if overflow >= self.policy["segment_events"]:
+                self._roll(hot[:overflow])
+                hot = hot[overflow:]
+            self._write_hot(hot)
+
+    def _last_seq(self, hot):
+        for event in reversed(hot):
+            if "seq" in event:
+                return event["seq"]
+        return max((s.get("max_seq") or 0 for s in self.load_index()), default=0)
+
+    def hot_events(self):
+        """
+        Returns the hot tier events without touching the cold tier.
+
+        Returns:
+            list: A copy of the hot tier.
+        """
+        return list(self._load_hot())
+
+    # ---- cold tier ------------------------------------------------------
+
+    def _index_path(self):
+        return os.path.join(self.archive_dir, INDEX_FILE)
+
+    def load_index(self):
+        """
+        Loads the cold tier index.
+
+        Returns:
+            list: Segment metadata dictionaries, ordered by min_ts.
+        """
+        path = self._index_path()
+        if not os.path.exists(path):
+            return []
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)["segments"]
+
+    def _write_index(self, segments):
+        segments.sort(key=lambda s: (s["min_ts"] or "", s["file"]))
+        atomic_write_json(self._index_path(), {"segments": segments}, indent=4)
+
+    def _partition_key(self, ts):
+        if ts is None:
+            return "undated"
+        return ts.strftime(PARTITION_FORMATS[self.policy["partition"]])
+
+    def _downsample(self, events, now):
+        after_days = self.policy["downsample_after_days"]
+        every = self.policy["downsample_every"]
+        if after_days is None or every <= 1:
+            return events
+        cutoff = now - timedelta(days=after_days)
+        kept = []
+        old_seen = 0
+        for event in events:
+            ts = parse_timestamp(event.get("timestamp"))
+            if ts is not None and ts < cutoff:
+                old_seen += 1
+                if (old_seen - 1) % every:
+                    continue
+            kept.append(event)
+        return kept
+
+    def _roll(self, events, now=None):
+        now = now or datetime.utcnow()
+        events = self._downsample(events, now)
+        os.makedirs(self.archive_dir, exist_ok=True)
+        codec = resolve_codec(self.policy["compression"])
+        extension = ".jsonl.zst" if codec == "zstd" else ".jsonl.gz"
+
+        partitions = {}
+        for event in events:
+            key = self._partition_key(parse_timestamp(event.get("timestamp")))
+            partitions.setdefault(key, []).append(event)
+
+        segments = self.load_index()
+        existing = {s["file"] for s in segments}
+        for key, part_events in partitions.items():
+            seq = sum(1 for s in segments if s["partition"] == key)
+            filename = f"{key}-{seq:05d}{extension}"
+            while filename in existing:
+                seq += 1
+                filename = f"{key}-{seq:05d}{extension}"
+            existing.add(filename)
+            with open_segment(os.path.join(self.archive_dir, filename), "wt", codec) as f:
+                for event in part_events:
+                    f.write(json.dumps(event) + "\n")
+            timestamps = [e.get("timestamp") for e in part_events if parse_timestamp(e.get("timestamp"))]
+            seqs = [e["seq"] for e in part_events if "seq" in e]
+            segments.append({
+                "file": filename,
+                "partition": key,
+                "codec": codec,
+                "count": len(part_events),
+                "min_ts": min(timestamps, key=parse_timestamp) if timestamps else None,
+                "max_ts": max(timestamps, key=parse_timestamp) if timestamps else None,
+                "min_seq": min(seqs) if seqs else None,
+                "max_seq": max(seqs) if seqs else None,
+            })
+        self._write_index(segments)
+
+    def enforce_retention(self, now=None):
+        """
+        Deletes cold segments whose newest event is older than cold_max_age_days.
+
+        Args:
+            now (datetime, optional): Reference time (defaults to utcnow).
+
+        Returns:
+            int: Number of segments removed.
+        """
+        max_age = self.policy["cold_max_age_days"]
+        if max_age is None:
+            return 0
+        cutoff = (now or datetime.utcnow()) - timedelta(days=max_age)
+        with self.lock:
+            segments = self.load_index()
+            kept = [s for s in segments if not (parse_timestamp(s["max_ts"]) is not None
+                                                and parse_timestamp(s["max_ts"]) < cutoff)]
+            if len(kept) != len(segments):
+                # Update the index first: readers never see a listed segment that is gone
+                self._write_index(kept)
+                for segment in segments:
+                    if segment not in kept:
+                        os.remove(os.path.join(self.archive_dir, segment["file"]))
+        return len(segments) - len(kept)
+
+    def iter_segment(self, segment):
+        """
+        Streams the events of one cold segment.
+
+        Args:
+            segment (dict): Segment metadata from the index.
+
+        Yields:
+            dict: Events in the segment.
+        """
+        path = os.path.join(self.archive_dir, segment["file"])
+        with open_segment(path, "rt", segment["codec"]) as f:
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
+
+    def iter_range(self, start=None, end=None, include_cold=True, hot=None):
+        """
+        Streams events whose timestamp lies in [start, end], oldest tier first.
+        Cold segments whose min/max timestamps fall outside the range are never opened.
+        The hot tier is read first, so events a concurrent writer rolls to the cold tier
+        meanwhile are emitted once (from the hot snapshot, recognized by their seq).
+
+        Args:
+            start (str or datetime, optional): Inclusive lower bound.
+            end (str or datetime, optional): Inclusive upper bound.
+            include_cold (bool): Whether to scan the cold tier.
+            hot (list, optional): A hot tier snapshot to scan instead of the current hot tier
+                (an empty list scans the cold tier only).
+
+        Yields:
+            dict: Matching events.
+        """
+        start = parse_timestamp(start)
+        end = parse_timestamp(end)
+        bounded = start is not None or end is not None
+
+        def in_range(event):
+            if not bounded:
+                return True
+            ts = parse_timestamp(event.get("timestamp"))
+            if ts is None:
+                return False
+            return (start is None or ts >= start) and (end is None or ts <= end)
+
+        if hot is None:
+            hot = self.hot_events()
+        first_hot_seq = next((event["seq"] for event in hot if "seq" in event), None)
+
+        if include_cold:
+            for segment in self.load_index():
+                if bounded:
+                    min_ts = parse_timestamp(segment["min_ts"])
+                    max_ts = parse_timestamp(segment["max_ts"])
+                    if min_ts is None:
+                        continue
+                    if (end is not None and min_ts > end) or (start is not None and max_ts < start):
+                        continue
+                if first_hot_seq is not None and (segment.get("min_seq") or 0) >= first_hot_seq:
+                    continue
+                for event in self.iter_segment(segment):
+                    if first_hot_seq is not None and event.get("seq", 0) >= first_hot_seq:
+                        continue
+                    if in_range(event):
+                        yield event
+        for event in hot:
+            if in_range(event):
+                yield event
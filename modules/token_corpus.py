@@ -0,0 +1,224 @@
+# modules/token_corpus.py
+"""
+Token Corpus Module:
+A pre-tokenized corpus format, so corpora re-embedded after a model or backend change skip
+text normalization and tokenization entirely.
+
+A corpus directory holds:
+  - tokens-<build>.i32: every document's token IDs, concatenated into one flat int32 buffer;
+  - offsets-<build>.i64: (num_docs + 1) offsets into the tokens, document i being tokens[offsets[i]:offsets[i+1]];
+  - meta.json: the tokenizer key, the source documents (path, size, mtime), build settings and the
+    names of the two arrays.
+
+Both arrays are memory-mapped on open. A rebuild writes new arrays under a new build ID and then
+replaces meta.json atomically, so a reader (or a crash at any point) only ever sees a matching
+meta.json and pair of arrays. A corpus is only valid for the tokenizer it was built with:
+tokenizer_key() combines the tokenizer name, the transformers version and a hash of the vocabulary.
+
+The corpus serves offline re-embedding of a fixed document set (understanding.get_embeddings_from_tokens(),
+e.g. after a model or backend change); the pipelines' repeated runs are served by the stage cache instead.
+"""
+
+import glob
+import hashlib
+import json
+import os
+import re
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from modules.perception import ingest_local_file, preprocess_text
+from modules.structured_logging import get_logger
+from modules.tiered_storage import atomic_write_json
+
+logger = get_logger(__name__)
+
+TOKEN_CORPUS_DIR = "token_corpus"
+DEFAULT_MAX_LENGTH = 512
+
+
+def tokenizer_key(tokenizer, max_length=DEFAULT_MAX_LENGTH):
+    """
+    Identifies a tokenizer configuration: name, transformers version, vocabulary and truncation length.
+
+    Returns:
+        str: e.g. "distilbert-base-uncased-3f2a9c1b0d4e".
+    """
+    import transformers
+
+    name = os.path.basename(str(getattr(tokenizer, "name_or_path", "") or type(tokenizer).__name__).rstrip("/"))
+    digest = hashlib.sha1()
+    digest.update(f"{type(tokenizer).__name__}|transformers-{transformers.__version__}|{max_length}".encode("utf-8"))
+    digest.update(json.dumps(sorted(tokenizer.get_vocab().items())).encode("utf-8"))
+    return f"{re.sub(r'[^A-Za-z0-9._-]+', '_', name) or 'tokenizer'}-{digest.hexdigest()[:12]}"
+
+
+def _source_entry(path):
+    st = os.stat(path)
+    return {"path": os.path.abspath(path), "size": st.st_size, "mtime_ns": st.st_mtime_ns}
+
+
+def _tokenize_chunk(paths, tokenizer, max_length):
+    # Reads, normalizes (as the pipeline does) and tokenizes one chunk of documents.
+    texts = [" ".join(preprocess_text(ingest_local_file(path))) for path in paths]
+    encoded = tokenizer(texts, truncation=True, max_length=max_length)["input_ids"]
+    return [np.asarray(ids, dtype=np.int32) for ids in encoded]
+
+
+def build_token_corpus(paths, tokenizer, out_dir=TOKEN_CORPUS_DIR, workers=4, chunk_size=64,
+                       max_length=DEFAULT_MAX_LENGTH):
+    """
+    Tokenizes text files into a token corpus. Chunks of files are read and tokenized on a
+    thread pool (fast tokenizers release the GIL while encoding a batch) and appended in input order.
+
+    Args:
+        paths (iterable): Text file paths, or a directory whose *.txt files are used (recursively).
+        tokenizer: A Hugging Face tokenizer.
+        out_dir (str): Corpus directory.
+        workers (int): Tokenizing threads.
+        chunk_size (int): Documents per tokenizer call.
+        max_length (int): Truncation length, as used at embedding time.
+
+    Returns:
+        TokenCorpus: The opened corpus.
+    """
+    if isinstance(paths, str) and os.path.isdir(paths):
+        root = paths
+        paths = sorted(os.path.join(dirpath, name) for dirpath, _, names in os.walk(root)
+                       for name in names if name.endswith(".txt"))
+    paths = list(paths)
+    os.makedirs(out_dir, exist_ok=True)
+    build = uuid.uuid4().hex[:12]
+    files = {"tokens": f"tokens-{build}.i32", "offsets": f"offsets-{build}.i64"}
+    offsets = [0]
+    chunks = [paths[i:i + chunk_size] for i in range(0, len(paths), chunk_size)]
+    with open(os.path.join(out_dir, files["tokens"]), "wb") as out, ThreadPoolExecutor(max_workers=workers) as pool:
+        for arrays in pool.map(lambda chunk: _tokenize_chunk(chunk, tokenizer, max_length), chunks):
+            for ids in arrays:
+                out.write(ids.tobytes())
+                offsets.append(offsets[-1] + len(ids))
+    np.asarray(offsets, dtype=np.int64).tofile(os.path.join(out_dir, files["offsets"]))
+    meta = {
+        "tokenizer_key": tokenizer_key(tokenizer, max_length),
+        "max_length": max_length,
+        "pad_token_id": tokenizer.pad_token_id or 0,
+        "num_docs": len(paths),
+        "num_tokens": offsets[-1],
+        "sources": [_source_entry(path) for path in paths],
+        "files": files,
+    }
+    # meta.json switches readers to the new arrays in one step; then the old builds are removed
+    atomic_write_json(os.path.join(out_dir, "meta.json"), meta)
+    for pattern in ("tokens*.i32", "offsets*.i64"):
+        for path in glob.glob(os.path.join(out_dir, pattern)):
+            if os.path.basename(path) not in files.values():
+                try:
+                    os.remove(path)
+                except OSError:  # still mapped by a reader on a platform that forbids removal
+                    pass
+    logger.info("Built %s: %d documents, %d tokens.", out_dir, len(paths), offsets[-1])
+    return TokenCorpus(out_dir)
+
+
+class TokenCorpus:
+    """
+    A memory-mapped, read-only view of a token corpus.
+    """
+
+    def __init__(self, directory):
+        self.directory = directory
+        with open(os.path.join(directory, "meta.json"), "r", encoding="utf-8") as f:
+            self.meta = json.load(f)
+        files = self.meta.get("files", {"tokens": "tokens.i32", "offsets": "offsets.i64"})
+        self.offsets = np.fromfile(os.path.join(directory, files["offsets"]), dtype=np.int64)
+        tokens_path = os.path.join(directory, files["tokens"])
+        # Copy-on-write mapping: writable views for torch.from_numpy, while the file is never modified.
+        # (np.memmap cannot map an empty file.)
+        self.tokens = (np.memmap(tokens_path, dtype=np.int32, mode="c") if self.offsets[-1]
+                       else np.empty(0, dtype=np.int32))
+        self.lengths = np.diff(self.offsets)
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def __getitem__(self, index):
+        """
+        Returns document `index`'s token IDs as a zero-copy view of the mapped buffer.
+        """
+        return self.tokens[self.offsets[index]:self.offsets[index + 1]]
+
+    @property
+    def paths(self):
+        return [source["path"] for source in self.meta["sources"]]
+
+    def matches(self, tokenizer, paths=None):
+        """
+        Returns True if the corpus was built with this tokenizer configuration and, when
+        `paths` is given, from exactly these files, unchanged since the build.
+        """
+        if self.meta["tokenizer_key"] != tokenizer_key(tokenizer, self.meta["max_length"]):
+            return False
+        if paths is None:
+            return True
+        try:
+            return [_source_entry(path) for path in paths] == self.meta["sources"]
+        except OSError:
+            return False
+
+    def batch(self, indices):
+        """
+        Assembles documents into a padded batch.
+
+        Returns:
+            tuple: (input_ids, attention_mask) torch tensors. When every document has the same
+            length and they are adjacent in the buffer, input_ids is a view of the mapped tokens;
+            otherwise the IDs are copied once into a padded int32 buffer shared with the tensor.
+        """
+        import torch
+
+        indices = np.asarray(indices, dtype=np.int64)
+        lengths = self.lengths[indices]
+        width = int(lengths.max()) if len(indices) else 0
+        starts = self.offsets[indices]
+        if len(indices) and (lengths == width).all() and (np.diff(starts) == width).all():
+            ids = self.tokens[starts[0]:starts[0] + width * len(indices)].reshape(len(indices), width)
+            ids = torch.from_numpy(np.asarray(ids))
+            return ids, torch.ones(ids.shape, dtype=torch.int64)
+        ids = np.full((len(indices), width), self.meta["pad_token_id"], dtype=np.int32)
+        mask = np.zeros((len(indices), width), dtype=np.int64)
+        for row, (start, length) in enumerate(zip(starts, lengths)):
+            ids[row, :length] = self.tokens[start:start + length]
+            mask[row, :length] = 1
+        return torch.from_numpy(ids), torch.from_numpy(mask)
+
+
+def get_token_corpus(paths, tokenizer, out_dir=TOKEN_CORPUS_DIR, **build_options):
+    """
+    Opens the token corpus in `out_dir` if it matches the tokenizer and the source files,
+    and (re)builds it otherwise.
+
+    Returns:
+        TokenCorpus: The corpus.
+    """
+    paths = list(paths)
+    if os.path.exists(os.path.join(out_dir, "meta.json")):
+        corpus = TokenCorpus(out_dir)
+        if corpus.matches(tokenizer, paths):
+            return corpus
+        logger.info("%s is stale for this tokenizer or these files; rebuilding.", out_dir)
+    return build_token_corpus(paths, tokenizer, out_dir, **build_options)
+
+
+if __name__ == "__main__":
+    import argparse
+    from transformers import AutoTokenizer
+
+    parser = argparse.ArgumentParser(description="Pre-tokenize a directory of text files.")
+    parser.add_argument("source", help="Directory of .txt files.")
+    parser.add_argument("--out", default=TOKEN_CORPUS_DIR)
+    parser.add_argument("--tokenizer", default="distilbert-base-uncased")
+    parser.add_argument("--workers", type=int, default=4)
+    args = parser.parse_args()
+    build_token_corpus(args.source, AutoTokenizer.from_pretrained(args.tokenizer), args.out, workers=args.workers)
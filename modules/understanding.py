@@ -5,18 +5,43 @@ Transforms preprocessed text into semantic embeddings using a pre-trained model.
 """
 
 from transformers import AutoTokenizer, AutoModel
+import numpy as np
 import torch
 
-def load_model(model_name="distilbert-base-uncased"):
+from modules.model_snapshot import find_snapshot, load_text_snapshot
+from modules.resources import get_resource_manager
+from modules.structured_logging import get_logger
+
+logger = get_logger(__name__)
+
+# Inference context for batched embedding: "no_grad" or "inference_mode" (set by the autotuner's runtime config).
+INFERENCE_BACKEND = "no_grad"
+
+def _inference_context():
+    return torch.inference_mode() if INFERENCE_BACKEND == "inference_mode" else torch.no_grad()
+
+def load_model(model_name="distilbert-base-uncased", use_snapshot=True):
     """
     Loads a pre-trained tokenizer and model.
     
+    A snapshot written by `python -m modules.model_snapshot` is preferred when present: its
+    weights are memory-mapped instead of parsed from the checkpoint. Unless the caller applied
+    one already, the process CPU budget (modules.resources) is applied to torch first.
+    
     Args:
         model_name (str): The identifier of the pre-trained model.
+        use_snapshot (bool): Whether to look for a snapshot first.
         
     Returns:
         tokenizer, model: The loaded tokenizer and model.
     """
+    get_resource_manager().ensure_applied()
+    snapshot = find_snapshot("text", model_name) if use_snapshot else None
+    if snapshot:
+        try:
+            return load_text_snapshot(snapshot)
+        except (OSError, ValueError) as e:
+            logger.warning("Ignoring text model snapshot %s: %s", snapshot, e)
     tokenizer = AutoTokenizer.from_pretrained(model_name)
     model = AutoModel.from_pretrained(model_name)
     return tokenizer, model
@@ -38,6 +63,58 @@ def get_embeddings(text, tokenizer, model):
     embeddings = outputs.last_hidden_state.mean(dim=1).squeeze()
     return embeddings.detach().numpy()
 
+def get_embeddings_batch(texts, tokenizer, model, batch_size=16):
+    """
+    Converts many texts into embeddings, running the model on padded batches.
+    Padding tokens are masked out of the mean pooling, so each row matches get_embeddings().
+    
+    Args:
+        texts (list): Input texts.
+        tokenizer: The pre-trained tokenizer.
+        model: The pre-trained model.
+        batch_size (int): Number of texts per forward pass.
+    
+    Returns:
+        numpy.array: A (len(texts), hidden_size) matrix of text embeddings.
+    """
+    rows = []
+    with _inference_context():
+        for start in range(0, len(texts), batch_size):
+            inputs = tokenizer(list(texts[start:start + batch_size]), return_tensors="pt", truncation=True, padding=True)
+            hidden = model(**inputs).last_hidden_state
+            mask = inputs["attention_mask"].unsqueeze(-1).to(hidden.dtype)
+            rows.append((hidden * mask).sum(dim=1) / mask.sum(dim=1).clamp(min=1))
+    if not rows:
+        return np.empty((0, model.config.hidden_size), dtype=np.float32)
+    return torch.cat(rows).numpy()
+
+def get_embeddings_from_tokens(corpus, model, batch_size=16, indices=None):
+    """
+    Embeds documents of a pre-tokenized corpus (see modules.token_corpus) without running the tokenizer.
+    Documents are batched in order of length to minimize padding; rows come back in input order
+    and match get_embeddings_batch() on the same texts.
+    
+    Args:
+        corpus (TokenCorpus): The pre-tokenized corpus.
+        model: The pre-trained model the corpus' tokenizer belongs to.
+        batch_size (int): Number of documents per forward pass.
+        indices (list, optional): Documents to embed (defaults to all).
+    
+    Returns:
+        numpy.array: A (len(indices), hidden_size) matrix of text embeddings.
+    """
+    indices = np.arange(len(corpus)) if indices is None else np.asarray(indices, dtype=np.int64)
+    out = np.empty((len(indices), model.config.hidden_size), dtype=np.float32)
+    order = np.argsort(corpus.lengths[indices], kind="stable")
+    with _inference_context():
+        for start in range(0, len(order), batch_size):
+            rows = order[start:start + batch_size]
+            input_ids, attention_mask = corpus.batch(indices[rows])
+            hidden = model(input_ids=input_ids, attention_mask=attention_mask).last_hidden_state
+            mask = attention_mask.unsqueeze(-1).to(hidden.dtype)
+            out[rows] = ((hidden * mask).sum(dim=1) / mask.sum(dim=1).clamp(min=1)).numpy()
+    return out
+
 def test_understanding_module():
     """
     Test function for the Understanding Module.
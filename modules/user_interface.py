@@ -5,8 +5,13 @@ Provides a simple command-line interface for users to give feedback.
 Handles CI environments where interactive input is not available.
 """
 
+import asyncio
 import os
 
+from modules.structured_logging import get_logger, run_in_thread
+
+logger = get_logger(__name__)
+
 def get_user_feedback():
     """
     Prompts the user for feedback regarding the system's decision.
@@ -16,18 +21,37 @@ def get_user_feedback():
         str: The feedback input by the user, or empty string in CI.
     """
     if os.environ.get('CI') == 'true':
-        print("[USER INTERFACE] Running in CI mode - skipping feedback")
+        logger.info("Running in CI mode - skipping feedback")
         return ""
     
     try:
         feedback = input("Enter your feedback on the system's decision (or type 'none' to skip): ")
     except EOFError:
-        print("[USER INTERFACE] No input available - proceeding without feedback")
+        logger.info("No input available - proceeding without feedback")
         return ""
         
     if feedback.strip().lower() == "none":
-        print("[USER INTERFACE] No feedback provided.")
+        logger.info("No feedback provided.")
         return ""
         
-    print(f"[USER INTERFACE] Feedback received: {feedback}")
-    return feedback
\ No newline at end of file
+    logger.info("Feedback received: %s", feedback)
+    return feedback
+
+async def get_user_feedback_async():
+    """
+    Default awaitable feedback provider: runs get_user_feedback() on a worker thread,
+    so waiting for the user never blocks the event loop.
+    
+    Returns:
+        str: The feedback input by the user, or empty string in CI.
+    """
+    return await run_in_thread(asyncio.get_running_loop(), get_user_feedback)
+
+def static_feedback(feedback):
+    """
+    Returns an awaitable feedback provider that always answers `feedback`
+    (e.g. for services where feedback arrives with the request).
+    """
+    async def provider():
+        return feedback
+    return provider
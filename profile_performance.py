@@ -25,6 +25,18 @@ if __name__ == "__main__":
     print("\n=== PROFILING RESULTS ===")
     stats.print_stats(20)
     
+    # Keep the previous profile as the baseline for regression checks
+    if os.path.exists('profile_results.prof'):
+        os.replace('profile_results.prof', 'profile_results.prev.prof')
+
     # Save results to file
     stats.dump_stats('profile_results.prof')
-    print("\n[PROFILER] Saved profile results to profile_results.prof")
\ No newline at end of file
+    print("\n[PROFILER] Saved profile results to profile_results.prof")
+
+    # Rank GENESIS-1 hotspots and stages, diffed against the previous profile
+    from modules.code_analyzer import hotspot_report, write_report, propose_code_enhancements
+    baseline = 'profile_results.prev.prof' if os.path.exists('profile_results.prev.prof') else None
+    report = hotspot_report('profile_results.prof', baseline=baseline)
+    write_report(report, 'hotspots.json')
+    print("[PROFILER]", propose_code_enhancements(report))
+    print("[PROFILER] Saved hotspot report to hotspots.json")
\ No newline at end of file
@@ -1,21 +1,472 @@
 # sandbox.py
+"""
+Sandbox:
+Runs Python scripts in isolated interpreters.
+
+  - run_in_sandbox(): one fresh `python` subprocess per script (simple, slow to start).
+  - SandboxPool: a pool of warm worker interpreters (pre-forked, with modules pre-imported)
+    that run many small scripts concurrently, with per-job wall-clock and memory limits,
+    streamed stdout/stderr and a results queue. Workers are recycled after a number of jobs.
+
+Isolation: on POSIX each job runs in a child forked from its warm worker, so whatever a job
+changes (sys.modules, builtins, os.environ, the cwd, signal handlers, its own rlimits) dies
+with the child, and the memory limit is set as both the soft and the hard limit. The child
+still starts from the worker's state (preloaded modules, environment, open pipes to the pool),
+so jobs are less isolated from the pool than run_in_sandbox()'s fresh interpreter is. Without
+fork (Windows), jobs run in the worker itself: cwd, environment, sys.path, sys.modules and
+signal handlers are restored after each job, but anything else a job changes reaches later
+jobs on that worker.
+"""
+
+import io
+import itertools
+import json
+import multiprocessing
+import multiprocessing.connection
+import os
+import queue
+import runpy
+import select
+import signal
 import subprocess
+import sys
+import threading
+import time
+import traceback
+from collections import namedtuple
+from concurrent.futures import Future
+
+from modules.resources import available_cpus
+
+try:
+    import resource
+except ImportError:  # Not available on Windows; memory limits are disabled there.
+    resource = None
+
+SandboxResult = namedtuple("SandboxResult", ["job_id", "stdout", "stderr", "returncode", "duration", "violation"])
+
+# Seconds past its timeout before a forked job that ignored SandboxTimeout is killed.
+KILL_GRACE = 0.5
+
 
 def run_in_sandbox(script):
     """
     Executes a Python script in a subprocess to simulate sandboxing.
-    
+
     Args:
         script (str): Path to the Python script.
-    
+
     Returns:
         tuple: (stdout, stderr) from the subprocess execution.
     """
     result = subprocess.run(["python", script], capture_output=True, text=True)
     return result.stdout, result.stderr
 
+
+class SandboxTimeout(BaseException):
+    """
+    Raised inside a worker when a job exceeds its wall-clock limit.
+    Derives from BaseException so job code catching Exception cannot swallow it.
+    """
+
+
+class _StreamWriter(io.TextIOBase):
+    """
+    Replacement for sys.stdout/sys.stderr inside a worker: forwards text to the parent line by line.
+    """
+
+    def __init__(self, job_id, name, events):
+        self.job_id = job_id
+        self.name = name
+        self.events = events
+        self.buffer = []
+
+    def writable(self):
+        return True
+
+    def write(self, text):
+        self.buffer.append(text)
+        if "\n" in text or sum(len(t) for t in self.buffer) > 4096:
+            self.flush()
+        return len(text)
+
+    def flush(self):
+        if self.buffer:
+            self.events.send(("stream", self.job_id, self.name, "".join(self.buffer)))
+            self.buffer = []
+
+
+def _current_address_space():
+    # VmSize of this process in bytes, or None where /proc is unavailable.
+    try:
+        with open("/proc/self/status", "r", encoding="ascii") as f:
+            for line in f:
+                if line.startswith("VmSize:"):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    return None
+
+
+def _on_alarm(signum, frame):
+    raise SandboxTimeout()
+
+
+def _run_job(job, events, final_limits):
+    """
+    Runs one job in this process and returns (returncode, violation).
+    With final_limits (a forked child), the memory limit is also set as the hard limit,
+    so the job cannot raise it again; otherwise the previous limits are restored afterwards.
+    """
+    job_id, script, code, timeout, memory_limit = job
+    stdout = _StreamWriter(job_id, "stdout", events)
+    stderr = _StreamWriter(job_id, "stderr", events)
+    saved_streams, saved_argv = (sys.stdout, sys.stderr), sys.argv
+    sys.stdout, sys.stderr = stdout, stderr
+    original_limits = resource.getrlimit(resource.RLIMIT_AS) if resource else None
+    returncode, violation = 0, None
+    try:
+        if resource and memory_limit:
+            # The limit applies to memory allocated by the job, on top of the warm interpreter.
+            soft = (_current_address_space() or 0) + memory_limit
+            if original_limits[1] != resource.RLIM_INFINITY:
+                soft = min(soft, original_limits[1])
+            resource.setrlimit(resource.RLIMIT_AS, (soft, soft if final_limits else original_limits[1]))
+        if timeout and hasattr(signal, "setitimer"):
+            signal.setitimer(signal.ITIMER_REAL, timeout)
+        if script is not None:
+            sys.argv = [script]
+            runpy.run_path(script, run_name="__main__")
+        else:
+            exec(compile(code, "<sandbox>", "exec"), {"__name__": "__main__"})
+    except SandboxTimeout:
+        returncode, violation = -1, "timeout"
+    except MemoryError:
+        returncode, violation = -1, "memory"
+    except SystemExit as e:
+        returncode = e.code if isinstance(e.code, int) else (0 if e.code is None else 1)
+    except BaseException:
+        returncode = 1
+        traceback.print_exc()
+    finally:
+        if hasattr(signal, "setitimer"):
+            signal.setitimer(signal.ITIMER_REAL, 0)
+        if resource and memory_limit and not final_limits:
+            resource.setrlimit(resource.RLIMIT_AS, original_limits)
+        stdout.flush()
+        stderr.flush()
+        sys.stdout, sys.stderr = saved_streams
+        sys.argv = saved_argv
+    return returncode, violation
+
+
+def _run_forked(job, events):
+    """
+    Runs one job in a child forked from this worker and returns (returncode, violation).
+    The child reports its result on a private pipe; a child that exits without reporting
+    crashed, and one still running KILL_GRACE seconds past its timeout (it swallowed
+    SandboxTimeout) is killed.
+    """
+    timeout = job[3]
+    status_read, status_write = os.pipe()
+    pid = os.fork()
+    if pid == 0:
+        exit_code = 1
+        try:
+            os.close(status_read)
+            report = json.dumps(_run_job(job, events, final_limits=True)).encode("utf-8")
+            os.write(status_write, report)
+            exit_code = 0
+        finally:
+            os._exit(exit_code)
+    os.close(status_write)
+    try:
+        ready, _, _ = select.select([status_read], [], [], timeout + KILL_GRACE if timeout else None)
+        report = os.read(status_read, 4096) if ready else b""
+    finally:
+        os.close(status_read)
+    if not ready:
+        os.kill(pid, signal.SIGKILL)
+    _, status = os.waitpid(pid, 0)
+    if not ready:
+        return -1, "timeout"
+    if report:
+        return tuple(json.loads(report))
+    return (-os.WTERMSIG(status) if os.WIFSIGNALED(status) else os.WEXITSTATUS(status)), "crash"
+
+
+def _process_state():
+    return (os.getcwd(), dict(os.environ), list(sys.path), dict(sys.modules),
+            {signum: signal.getsignal(signum) for signum in signal.valid_signals()
+             if signal.getsignal(signum) is not None})
+
+
+def _restore_process_state(state):
+    cwd, environ, path, modules, handlers = state
+    os.chdir(cwd)
+    os.environ.clear()
+    os.environ.update(environ)
+    sys.path[:] = path
+    for name in set(sys.modules) - set(modules):
+        del sys.modules[name]
+    sys.modules.update(modules)
+    for signum, handler in handlers.items():
+        if signal.getsignal(signum) is not handler:
+            signal.signal(signum, handler)
+
+
+def _worker_main(jobs, events, preload):
+    """
+    Worker loop: imports the preload modules once, then runs jobs until told to stop.
+    Jobs run in forked children where fork exists; otherwise in this interpreter, which then
+    exits after a limit violation, as it is no longer safe to keep.
+    Each worker has its own pipes, so a worker that dies mid-write cannot block the others.
+    """
+    for module in preload:
+        __import__(module)
+    if hasattr(signal, "setitimer"):
+        signal.signal(signal.SIGALRM, _on_alarm)
+    events.send(("ready",))
+
+    while True:
+        try:
+            job = jobs.recv()
+        except EOFError:
+            return
+        if job is None:
+            return
+        start = time.perf_counter()
+        if hasattr(os, "fork"):
+            returncode, violation = _run_forked(job, events)
+        else:
+            state = _process_state()
+            returncode, violation = _run_job(job, events, final_limits=False)
+            _restore_process_state(state)
+        events.send(("done", job[0], returncode, time.perf_counter() - start, violation))
+        if violation and not hasattr(os, "fork"):
+            return
+
+
+class _Worker:
+    def __init__(self, ctx, worker_id, preload):
+        self.worker_id = worker_id
+        jobs_recv, self.jobs = ctx.Pipe(duplex=False)
+        self.events, events_send = ctx.Pipe(duplex=False)
+        self.process = ctx.Process(target=_worker_main, args=(jobs_recv, events_send, preload), daemon=True)
+        self.process.start()
+        # Close our copies of the child's ends so EOF is seen when the worker dies.
+        jobs_recv.close()
+        events_send.close()
+        self.jobs_run = 0
+        self.current = None  # (job_id, deadline)
+        self.ready = False
+
+    def stop(self, kill=False):
+        if kill:
+            self.process.kill()
+        else:
+            try:
+                self.jobs.send(None)
+            except OSError:
+                pass
+
+
+class SandboxPool:
+    """
+    A pool of warm Python interpreters for running many small scripts.
+
+    Example:
+        with SandboxPool(workers=4, timeout=5, memory_limit_mb=256) as pool:
+            futures = [pool.submit(script=path) for path in paths]
+            results = [f.result() for f in futures]
+    """
+
+    def __init__(self, workers=None, max_jobs_per_worker=100, timeout=10.0, memory_limit_mb=512,
+                 preload=(), on_output=None):
+        """
+        Args:
+            workers (int, optional): Number of worker interpreters (defaults to the available cores).
+            max_jobs_per_worker (int): Recycle a worker after this many jobs.
+            timeout (float): Default per-job wall-clock limit in seconds.
+            memory_limit_mb (int): Default per-job address-space limit in MB (POSIX only; None disables).
+            preload (tuple): Module names imported once per worker before any job runs.
+            on_output (callable, optional): Called as on_output(job_id, stream_name, text) as output arrives.
+        """
+        method = "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+        self._ctx = multiprocessing.get_context(method)
+        self._preload = tuple(preload)
+        self.max_jobs_per_worker = max_jobs_per_worker
+        self.timeout = timeout
+        self.memory_limit_mb = memory_limit_mb
+        self.on_output = on_output
+        self.results = queue.Queue()  # Completed SandboxResults, in completion order
+
+        self._lock = threading.Lock()
+        self._pending = []
+        self._futures = {}
+        self._output = {}
+        self._ids = itertools.count()
+        self._worker_ids = itertools.count()
+        self._closed = False
+        self._workers = {}
+        for _ in range(workers or available_cpus()):
+            self._spawn()
+        self._dispatcher = threading.Thread(target=self._dispatch_loop, daemon=True)
+        self._dispatcher.start()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _spawn(self):
+        worker = _Worker(self._ctx, next(self._worker_ids), self._preload)
+        self._workers[worker.worker_id] = worker
+
+    def submit(self, script=None, code=None, timeout=None, memory_limit_mb=None):
+        """
+        Queues a job. Exactly one of script or code must be given.
+
+        Args:
+            script (str, optional): Path to a Python script.
+            code (str, optional): Python source to execute.
+            timeout (float, optional): Overrides the pool's wall-clock limit.
+            memory_limit_mb (int, optional): Overrides the pool's memory limit.
+
+        Returns:
+            Future: Resolves to a SandboxResult.
+        """
+        if (script is None) == (code is None):
+            raise ValueError("Provide exactly one of 'script' or 'code'.")
+        if self._closed:
+            raise RuntimeError("SandboxPool is closed.")
+        timeout = self.timeout if timeout is None else timeout
+        memory_limit_mb = self.memory_limit_mb if memory_limit_mb is None else memory_limit_mb
+        job_id = next(self._ids)
+        future = Future()
+        with self._lock:
+            self._futures[job_id] = future
+            self._output[job_id] = {"stdout": [], "stderr": []}
+            memory_limit = memory_limit_mb * 1024 * 1024 if memory_limit_mb else None
+            self._pending.append((job_id, script, code, timeout, memory_limit))
+            self._schedule()
+        return future
+
+    def run(self, script=None, code=None, **limits):
+        """
+        Runs one job and waits for it.
+
+        Returns:
+            SandboxResult: The job result.
+        """
+        return self.submit(script=script, code=code, **limits).result()
+
+    def _schedule(self):
+        # Caller holds self._lock.
+        for worker in self._workers.values():
+            if not self._pending:
+                return
+            if worker.ready and worker.current is None:
+                job = self._pending.pop(0)
+                timeout = job[3]
+                # Hard deadline: kill the worker if neither the alarm nor the worker could stop the job.
+                deadline = time.monotonic() + timeout + KILL_GRACE + 2.0 if timeout else None
+                worker.current = (job[0], deadline)
+                worker.jobs_run += 1
+                worker.jobs.send(job)
+
+    def _finish(self, job_id, returncode, duration, violation):
+        output = self._output.pop(job_id)
+        result = SandboxResult(job_id, "".join(output["stdout"]), "".join(output["stderr"]),
+                               returncode, duration, violation)
+        self._futures.pop(job_id).set_result(result)
+        self.results.put(result)
+
+    def _retire(self, worker, kill=False):
+        # Caller holds self._lock.
+        del self._workers[worker.worker_id]
+        worker.stop(kill)
+        worker.events.close()
+        if not self._closed:
+            self._spawn()
+
+    def _dispatch_loop(self):
+        while True:
+            with self._lock:
+                if self._closed and not self._futures:
+                    return
+                connections = {worker.events: worker for worker in self._workers.values()}
+            ready = multiprocessing.connection.wait(list(connections), timeout=0.1)
+            with self._lock:
+                for connection in ready:
+                    worker = connections[connection]
+                    if worker.worker_id not in self._workers:
+                        continue
+                    try:
+                        event = connection.recv()
+                    except (EOFError, OSError):
+                        # The worker died: fail its current job and replace it.
+                        if worker.current is not None:
+                            self._finish(worker.current[0], -1, None, "crash")
+                        self._retire(worker, kill=True)
+                        continue
+                    self._handle(worker, event)
+                self._check_deadlines()
+                self._schedule()
+
+    def _handle(self, worker, event):
+        kind = event[0]
+        if kind == "ready":
+            worker.ready = True
+        elif kind == "stream":
+            _, job_id, name, text = event
+            if job_id in self._output:
+                self._output[job_id][name].append(text)
+                if self.on_output:
+                    self.on_output(job_id, name, text)
+        elif kind == "done":
+            _, job_id, returncode, duration, violation = event
+            worker.current = None
+            if job_id in self._futures:
+                self._finish(job_id, returncode, duration, violation)
+            # Recycle a worker after N jobs, or after a violation where jobs run in the worker itself
+            if (violation and not hasattr(os, "fork")) or worker.jobs_run >= self.max_jobs_per_worker:
+                self._retire(worker)
+
+    def _check_deadlines(self):
+        now = time.monotonic()
+        for worker in list(self._workers.values()):
+            if worker.current is None:
+                continue
+            job_id, deadline = worker.current
+            if deadline is not None and now > deadline:
+                self._finish(job_id, -1, None, "timeout")
+                self._retire(worker, kill=True)
+
+    def close(self):
+        """
+        Waits for queued jobs to finish, then stops all workers.
+        """
+        with self._lock:
+            self._closed = True
+        self._dispatcher.join()
+        for worker in list(self._workers.values()):
+            worker.stop()
+        for worker in list(self._workers.values()):
+            worker.process.join(timeout=5)
+            if worker.process.exitcode is None:
+                worker.process.kill()
+        self._workers.clear()
+
+
 if __name__ == "__main__":
     # Test by running a simple script (create a test_script.py if needed)
     out, err = run_in_sandbox("test_script.py")
     print("Sandbox Output:", out)
-    print("Sandbox Errors:", err)
\ No newline at end of file
+    print("Sandbox Errors:", err)
+
+    with SandboxPool(workers=2) as pool:
+        result = pool.run(script="test_script.py")
+    print("Sandbox Pool Output:", result.stdout)
+    print("Sandbox Pool Errors:", result.stderr)
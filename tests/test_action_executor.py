@@ -0,0 +1,122 @@
+# tests/test_action_executor.py
+import asyncio
+import json
+import os
+import shutil
+import tempfile
+import threading
+import time
+import unittest
+from unittest import mock
+from modules import action
+from modules.action_executor import ActionRegistry, ActionExecutor, ActionLog, append_json_array
+
+POSITIVE = "Positive inference: proceed."
+NEGATIVE = "Negative inference: hold back."
+
+class TestActionExecutor(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.log_path = os.path.join(self.tmpdir, "actions.json")
+        with open(self.log_path, "w") as f:
+            json.dump([{"timestamp": "2025-02-26T17:53:58", "reasoning_output": POSITIVE,
+                        "selected_action": {"type": "NOTIFY", "description": "Tell someone."}}], f, indent=4)
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir)
+
+    def test_registry_from_log_and_batched_log_appends(self):
+        registry = ActionRegistry.from_log(self.log_path)
+        self.assertEqual(set(registry.types), {"EXECUTE_TASK", "CAUTION_TASK", "NOTIFY"})
+        self.assertEqual(registry.types["NOTIFY"].handler(POSITIVE), "NOTIFY action executed: Tell someone.")
+        self.assertEqual(registry.dispatch(NEGATIVE).name, "CAUTION_TASK")
+
+        executor = ActionExecutor(registry, ActionLog(self.log_path, flush_every=3))
+        results = asyncio.run(executor.execute_many([POSITIVE, NEGATIVE] * 4))
+        self.assertEqual([r.action for r in results], ["EXECUTE_TASK", "CAUTION_TASK"] * 4)
+        self.assertTrue(all(r.status == "ok" for r in results))
+        with open(self.log_path) as f:
+            entries = json.load(f)
+        self.assertEqual(len(entries), 9)
+        self.assertEqual(entries[-1]["selected_action"]["type"], "CAUTION_TASK")
+
+        empty = os.path.join(self.tmpdir, "empty.json")
+        with open(empty, "w") as f:
+            f.write("[]\n")
+        append_json_array(empty, [{"n": 1}, {"n": 2}])
+        with open(empty) as f:
+            self.assertEqual(json.load(f), [{"n": 1}, {"n": 2}])
+
+    def test_limits_timeouts_and_idempotency(self):
+        state = {"running": 0, "peak": 0, "calls": 0}
+        lock = threading.Lock()
+
+        def slow(decision):
+            with lock:
+                state["calls"] += 1
+                state["running"] += 1
+                state["peak"] = max(state["peak"], state["running"])
+            time.sleep(0.02)
+            with lock:
+                state["running"] -= 1
+            return "done"
+
+        async def hang(decision):
+            await asyncio.sleep(10)
+
+        registry = ActionRegistry()
+        registry.register("EXECUTE_TASK", slow, concurrency=2, rate=100, burst=2)
+        registry.register("CAUTION_TASK", hang, timeout=0.05)
+        executor = ActionExecutor(registry)
+
+        results = asyncio.run(executor.execute_many([POSITIVE] * 8 + [NEGATIVE], ["a", "b", "a"] + [None] * 6))
+        self.assertEqual(state["peak"], 2)
+        self.assertEqual(state["calls"], 7)  # "a" ran once
+        self.assertEqual(results[2].status, "duplicate")
+        self.assertEqual(results[2].result, "done")
+        self.assertEqual(results[-1].status, "timeout")
+        # Bursts of 2, then 100/s: the last of the 7 calls cannot start before ~50 ms
+        self.assertGreater(max(r.queued_s for r in results[:8]), 0.04)
+
+        again = asyncio.run(executor.execute_many([POSITIVE], ["b"]))
+        self.assertEqual((again[0].status, state["calls"]), ("duplicate", 7))
+        stats = executor.stats()
+        self.assertEqual(stats["actions"], 8)
+        self.assertEqual(stats["statuses"]["duplicate"], 2)
+        self.assertGreater(stats["actions_per_s"], 0)
+
+    def test_waiters_get_an_error_when_the_first_submission_fails(self):
+        async def hang(decision):
+            await asyncio.sleep(10)
+
+        registry = ActionRegistry()
+        registry.register("EXECUTE_TASK", hang, timeout=30)
+        registry.register("CAUTION_TASK", lambda decision: "held back")
+        executor = ActionExecutor(registry)
+
+        async def run():
+            first = asyncio.ensure_future(executor.submit(POSITIVE, "k"))
+            await asyncio.sleep(0.01)
+            batch = asyncio.ensure_future(executor.execute_many([POSITIVE, NEGATIVE], ["k", None]))
+            await asyncio.sleep(0.01)
+            first.cancel()
+            return await batch
+
+        waiter, other = asyncio.run(run())
+        self.assertEqual((waiter.action, waiter.status), ("EXECUTE_TASK", "error"))
+        self.assertEqual(other.status, "ok")
+        self.assertNotIn("k", executor.results)  # a retry runs the action again
+
+    def test_execute_actions_inside_a_running_loop(self):
+        async def caller():
+            synchronous = action.execute_actions([POSITIVE])
+            return synchronous, await action.execute_actions_async([NEGATIVE])
+
+        with mock.patch.object(action, "ACTIONS_FILE", self.log_path):
+            synchronous, asynchronous = asyncio.run(caller())
+            outside = action.execute_actions([NEGATIVE])
+        self.assertEqual([r.action for r in synchronous + asynchronous + outside],
+                         ["EXECUTE_TASK", "CAUTION_TASK", "CAUTION_TASK"])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,74 @@
+# tests/test_async_pipeline.py
+import asyncio
+import os
+import shutil
+import tempfile
+import threading
+import unittest
+from unittest import mock
+from benchmarks.data import TINY_VOCABULARY as WORDS, tiny_text_model
+from benchmarks.harness import isolated_memory
+from benchmarks.hn_stub import serve_hn_stub
+from modules import external_data, fusion
+from modules.memory import retrieve_memory
+from modules.user_interface import static_feedback
+import main
+from main import integrate_system_async
+
+class TestAsyncPipeline(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.text_model = tiny_text_model(self.tmpdir)
+        self.paths = []
+        for i in range(3):
+            path = os.path.join(self.tmpdir, f"doc_{i}.txt")
+            with open(path, "w", encoding="utf-8") as f:
+                f.write(" ".join(WORDS[i:i + 5]))
+            self.paths.append(path)
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir)
+
+    def test_concurrent_pipelines_share_the_loop(self):
+        # Each training stage waits until all three pipelines are training at once, and until the
+        # event loop has ticked while it was blocked: overlap is checked with events, not timings.
+        all_training = threading.Barrier(3, timeout=30)
+        loop_ticked = threading.Event()
+
+        def train(new_data):
+            all_training.wait()
+            loop_ticked.clear()
+            return loop_ticked.wait(30)
+
+        async def run_all():
+            done = asyncio.Event()
+
+            async def heartbeat():
+                while not done.is_set():
+                    loop_ticked.set()
+                    await asyncio.sleep(0.01)
+
+            beat = asyncio.create_task(heartbeat())
+            results = await asyncio.gather(*(
+                integrate_system_async(path, feedback_provider=static_feedback(f"feedback {i}"), text_model=self.text_model)
+                for i, path in enumerate(self.paths)))
+            done.set()
+            await beat
+            return results
+
+        with serve_hn_stub(5) as stub, isolated_memory(self.tmpdir), \
+                mock.patch.object(external_data, "HN_API_BASE", stub.base_url), \
+                mock.patch.object(fusion, "FUSION_CACHE_DIR", os.path.join(self.tmpdir, "fusion_cache")), \
+                mock.patch.object(main, "incremental_train", side_effect=train) as train_mock:
+            results = asyncio.run(run_all())
+            memory_logs = retrieve_memory()
+
+        self.assertEqual([r["user_feedback"] for r in results], ["feedback 0", "feedback 1", "feedback 2"])
+        self.assertTrue(all(r["external_data"] for r in results))
+        self.assertEqual(len(memory_logs), 3)
+        # The three training stages overlapped, and the event loop kept running meanwhile.
+        self.assertEqual(train_mock.call_count, 3)
+        self.assertTrue(all(r["incremental_train_success"] for r in results))
+
+if __name__ == '__main__':
+    unittest.main()
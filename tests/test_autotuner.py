@@ -0,0 +1,77 @@
+# tests/test_autotuner.py
+import os
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+from benchmarks.data import tiny_text_model, write_text_files
+from benchmarks.harness import isolated_memory
+from modules import fusion
+from modules.autotuner import Autotuner, load_runtime_config, DEFAULT_RUNTIME_CONFIG
+from modules.metrics import StageMetrics
+from modules.memory import retrieve_memory
+from modules.self_improvement import self_improve
+from modules.stage_cache import get_stage_cache
+import main
+
+SPACE = {"batch_size": [4, 8, 16, 32, 64], "workers": [1, 2, 4, 8]}
+
+def synthetic_cost(config, budget):
+    # Deterministic cost surface with its optimum at batch_size=32, workers=4.
+    return abs(config["batch_size"] - 32) / 32 + abs(config["workers"] - 4) / 4
+
+class TestAutotuner(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.config_path = os.path.join(self.tmpdir, "runtime_config.json")
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir)
+
+    def test_search_is_deterministic_under_seed(self):
+        runs = [Autotuner(synthetic_cost, SPACE, seed=3, num_candidates=20).run() for _ in range(2)]
+        self.assertEqual(runs[0].best, runs[1].best)
+        self.assertEqual([t["config"] for t in runs[0].trials], [t["config"] for t in runs[1].trials])
+        # Successive halving: 20 -> 10 -> 5 -> 2 candidates, doubling the budget each round.
+        self.assertEqual([t["budget"] for t in runs[0].trials], [1] * 20 + [2] * 10 + [4] * 5 + [8] * 2)
+        exhaustive = Autotuner(synthetic_cost, SPACE, seed=0, num_candidates=len(SPACE["batch_size"]) * len(SPACE["workers"])).run()
+        self.assertEqual(exhaustive.best, {"batch_size": 32, "workers": 4})
+
+    def test_self_improve_persists_tuned_config(self):
+        outcome = self_improve({"improvement_needed": True}, objective=synthetic_cost, seed=1, config_path=self.config_path)
+        self.assertIn("Runtime configuration tuned", outcome)
+        config = load_runtime_config(self.config_path)
+        self.assertEqual(set(config), set(DEFAULT_RUNTIME_CONFIG))
+        self.assertLessEqual(synthetic_cost(config, 1), synthetic_cost(DEFAULT_RUNTIME_CONFIG, 1))
+        self.assertIn("No self-improvement", self_improve({"improvement_needed": False}, objective=synthetic_cost))
+
+    def test_tuning_trials_recompute_every_stage_and_leave_no_trace(self):
+        paths = write_text_files(os.path.join(self.tmpdir, "corpus"), 6, words=30)
+        shared = {"external_data": "", "user_feedback": "", "incremental_train_success": False,
+                  "text_model": tiny_text_model(self.tmpdir)}
+        stores = os.path.join(self.tmpdir, "stores")
+        with isolated_memory(stores), \
+                mock.patch.object(fusion, "FUSION_CACHE_DIR", os.path.join(self.tmpdir, "fusion_cache")), \
+                mock.patch.object(main, "update_learning_model") as learn, \
+                mock.patch.object(main, "execute_actions") as act:
+            objective = main.tuning_objective(paths, shared)
+            trials = [objective(dict(DEFAULT_RUNTIME_CONFIG, batch_size=batch_size), 1)[1] for batch_size in (4, 2)]
+            # a later trial embeds and reasons over every input again, at its own batch size
+            for trial, batch_size in zip(trials, (4, 2)):
+                self.assertEqual(trial["stages"]["embed_text"]["items"], len(paths))
+                self.assertEqual(trial["stages"]["embed_text"]["calls"], -(-len(paths) // batch_size))
+            self.assertEqual((learn.call_count, act.call_count), (0, 0))
+            self.assertEqual(retrieve_memory(), [])
+            self.assertEqual(get_stage_cache().stats()["stages"], {})
+            self.assertEqual(main.get_dedup_index(main.model_identity(shared["text_model"][1])).index["rows"], 0)
+
+    def test_stage_metrics(self):
+        metrics = StageMetrics()
+        for _ in range(3):
+            with metrics.timer("embed_text", items=4):
+                pass
+        summary = metrics.summary()["embed_text"]
+        self.assertEqual((summary["calls"], summary["items"]), (3, 12))
+
+if __name__ == '__main__':
+    unittest.main()
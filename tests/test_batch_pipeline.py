@@ -0,0 +1,104 @@
+# tests/test_batch_pipeline.py
+import io
+import os
+import shutil
+import tempfile
+import unittest
+from contextlib import redirect_stdout
+from unittest import mock
+import numpy as np
+import torch
+from benchmarks.data import tiny_text_model
+from benchmarks.harness import isolated_memory
+from modules import fusion
+from modules.concept_retrieval import ConceptIndex, text_model_embedder
+from modules.knowledge_graph import create_knowledge_graph
+from modules.memory import retrieve_memory
+from modules.reasoning import enhanced_reasoning, enhanced_reasoning_batch
+from modules.understanding import get_embeddings, get_embeddings_batch
+import main
+from main import cli, discover_inputs, integrate_many
+
+class TestBatchPipeline(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.text_model = tiny_text_model(self.tmpdir)
+        self.shared = {"external_data": "", "user_feedback": "", "incremental_train_success": False,
+                       "text_model": self.text_model}
+        self.isolated = [isolated_memory(os.path.join(self.tmpdir, "stores")),
+                         mock.patch.object(fusion, "FUSION_CACHE_DIR", os.path.join(self.tmpdir, "fusion_cache"))]
+        for patch in self.isolated:
+            patch.__enter__()
+
+    def tearDown(self):
+        for patch in reversed(self.isolated):
+            patch.__exit__(None, None, None)
+        shutil.rmtree(self.tmpdir)
+
+    def write(self, name, content, mode="w"):
+        path = os.path.join(self.tmpdir, name)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, mode) as f:
+            f.write(content)
+        return path
+
+    def test_batched_embeddings_and_reasoning_match_single_inputs(self):
+        tokenizer, model = self.text_model
+        texts = ["agent memory", "vision signal model data system graph", "learning"]
+        matrix = get_embeddings_batch(texts, tokenizer, model, batch_size=2)
+        self.assertEqual(matrix.shape, (3, 768))
+        for text, row in zip(texts, matrix):
+            with torch.no_grad():
+                self.assertTrue(np.allclose(row, get_embeddings(text, tokenizer, model), atol=1e-5))
+        self.assertEqual(get_embeddings_batch([], tokenizer, model).shape, (0, 768))
+
+        KG = create_knowledge_graph()
+        index = ConceptIndex(KG, embedder=text_model_embedder(tokenizer, model))
+        batch = enhanced_reasoning_batch(matrix, "Machine Learning", KG, index)
+        single = [enhanced_reasoning(row, "Machine Learning", KG, index) for row in matrix]
+        # the decision and graph context match; retrieval may only reorder near-tied concepts
+        split = lambda decision: decision.split(" Concepts nearest to the input")[0]
+        self.assertEqual([split(d) for d in batch], [split(d) for d in single])
+        for batched, row in zip(index.retrieve_batch(matrix), matrix):
+            similarities = [similarity for _, similarity in index.retrieve(row)["seeds"]]
+            self.assertTrue(np.allclose([similarity for _, similarity in batched["seeds"]], similarities, atol=1e-5))
+
+    def test_integrate_many_yields_an_error_for_unreadable_inputs(self):
+        paths = [self.write("docs/a.txt", "agent memory graph"),
+                 os.path.join(self.tmpdir, "docs", "missing.txt"),
+                 self.write("docs/b.txt", b"\xff\xfe not utf-8", mode="wb"),
+                 self.write("docs/c.txt", "vision signal model")]
+        with self.assertLogs("genesis.main", level="ERROR") as logs:
+            results = list(integrate_many(paths, batch_size=3, workers=2, ci_mode=True, shared=self.shared))
+        self.assertEqual([r["text_filepath"] for r in results], paths)
+        self.assertEqual([r["error"] is None for r in results], [True, False, False, True])
+        self.assertTrue(results[1]["error"].startswith("FileNotFoundError"))
+        self.assertTrue(results[2]["error"].startswith("UnicodeDecodeError"))
+        self.assertEqual(len(logs.records), 2)
+        self.assertTrue(all(r["decision"] and r["fused_embedding"].shape for r in (results[0], results[3])))
+        self.assertEqual(len(retrieve_memory()), 2)
+
+    def test_cli_processes_discovered_inputs(self):
+        self.write("corpus/a.txt", "agent memory graph")
+        self.write("corpus/a.csv", "x,y\n1,2\n3,4\n")
+        self.write("corpus/a.png", b"", mode="wb")
+        self.write("corpus/nested/b.txt", "vision signal model")
+        corpus = os.path.join(self.tmpdir, "corpus")
+        stem = os.path.join(corpus, "a")
+        self.assertEqual(list(discover_inputs(corpus)),
+                         [(stem + ".txt", stem + ".png", stem + ".csv"),
+                          (os.path.join(corpus, "nested", "b.txt"), None, None)])
+        self.assertEqual([item[0] for item in discover_inputs(os.path.join(corpus, "*.txt"))], [stem + ".txt"])
+
+        os.remove(stem + ".png")  # keep the vision model out of the run
+        shared = {key: value for key, value in self.shared.items() if key != "text_model"}
+        with mock.patch.object(main, "run_shared_setup", return_value=shared), \
+                mock.patch.object(main, "load_model", return_value=self.text_model), \
+                mock.patch.object(main, "load_runtime_config", return_value={"batch_size": 4, "workers": 2}), \
+                mock.patch.object(main, "apply_runtime_config"), redirect_stdout(io.StringIO()) as out:
+            cli(["--inputs", corpus, "--ci"])
+        self.assertIn("[BATCH] Processed 2 inputs (0 failed).", out.getvalue())
+        self.assertEqual(len(retrieve_memory()), 2)
+
+if __name__ == '__main__':
+    unittest.main()
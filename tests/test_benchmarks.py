@@ -0,0 +1,21 @@
+# tests/test_benchmarks.py
+import unittest
+from benchmarks.data import generate_texts, generate_memory_history
+from benchmarks.compare import compare_reports
+
+def report(**timings):
+    return {"meta": {}, "results": {name: {"status": "ok", "median_s": t} for name, t in timings.items()}}
+
+class TestBenchmarkSuite(unittest.TestCase):
+    def test_generators_are_seeded(self):
+        self.assertEqual(generate_texts(3, 50, seed=7), generate_texts(3, 50, seed=7))
+        self.assertNotEqual(generate_texts(3, 50, seed=7), generate_texts(3, 50, seed=8))
+        self.assertEqual(generate_memory_history(10, seed=7), generate_memory_history(10, seed=7))
+
+    def test_compare_flags_regressions(self):
+        rows = compare_reports(report(a=1.0, b=1.0, c=1.0, d=0.0001), report(a=1.3, b=0.5, c=1.05, d=0.0003), threshold=0.15)
+        status = {row["name"]: row["status"] for row in rows}
+        self.assertEqual(status, {"a": "regression", "b": "improvement", "c": "ok", "d": "ok"})
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,65 @@
+# tests/test_code_analyzer.py
+import cProfile
+import json
+import os
+import shutil
+import tempfile
+import unittest
+from modules.auto_code_generator import generate_code_enhancement
+from modules.code_analyzer import hotspot_report, propose_code_enhancements, write_report
+from modules.dedup import simhash
+from modules.perception import preprocess_text
+
+TEXT = "Agent learning, neural network memory; reasoning graph vision! " * 50
+
+def workload(preprocess_runs, hash_runs):
+    for _ in range(preprocess_runs):
+        preprocess_text(TEXT)
+    tokens = preprocess_text(TEXT)
+    for _ in range(hash_runs):
+        simhash(tokens)
+
+class TestCodeAnalyzer(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir)
+
+    def profile(self, name, *args):
+        path = os.path.join(self.tmpdir, name)
+        profiler = cProfile.Profile()
+        profiler.runcall(workload, *args)
+        profiler.dump_stats(path)
+        return path
+
+    def test_stage_attribution_and_regressions(self):
+        base = self.profile("base.prof", 20, 20)
+        slow = self.profile("slow.prof", 20, 200)
+        report = hotspot_report(slow, baseline=base, min_seconds=0.0)
+        self.assertEqual(next(iter(report["stages"])), "dedup")
+        self.assertEqual(set(report["stages"]), {"dedup", "preprocess"})
+        self.assertEqual({f["file"] for f in report["top_cumulative"]},
+                         {"tests/test_code_analyzer.py", "modules/perception.py", "modules/dedup.py"})
+        simhash_entry = next(f for f in report["top_self"] if f["name"] == "simhash")
+        self.assertEqual((simhash_entry["calls"], simhash_entry["stage"]), (200, "dedup"))
+        self.assertIn(("stage", "dedup"), [(r["kind"], r["name"]) for r in report["regressions"]])
+
+        path = os.path.join(self.tmpdir, "hotspots.json")
+        write_report(report, path)
+        with open(path) as f:
+            self.assertEqual(json.load(f)["regressions"], report["regressions"])
+        self.assertEqual(hotspot_report(path)["stages"], report["stages"])
+        self.assertIn("dedup regressed", generate_code_enhancement(report))
+        self.assertIn("modules/dedup.py", propose_code_enhancements(report))
+
+    def test_metrics_and_foreign_profiles(self):
+        report = hotspot_report({"embed_text": {"total_s": 3.0}, "reasoning": {"total_s": 1.0}})
+        self.assertEqual(report["stages"]["embed_text"], {"seconds": 3.0, "share": 0.75})
+        self.assertIn("get_embeddings_batch", generate_code_enhancement(report))
+        # The checked-in profile was recorded on Windows under another directory
+        report = hotspot_report(os.path.join(os.path.dirname(__file__), "..", "profile_results.prof"))
+        self.assertEqual(list(report["stages"])[:2], ["user_feedback", "load_model"])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,96 @@
+# tests/test_concept_retrieval.py
+import shutil
+import tempfile
+import unittest
+import networkx as nx
+import numpy as np
+import torch
+from transformers import DistilBertModel
+from benchmarks.data import tiny_text_model
+from modules.concept_retrieval import ConceptIndex, text_model_embedder
+from modules.knowledge_graph import create_knowledge_graph
+from modules.reasoning import enhanced_reasoning, enhanced_reasoning_batch
+
+class CountingEmbedder:
+    # Embeds a label as a seeded random vector derived from its text, counting labels embedded.
+    cache_name = "counting"
+
+    def __init__(self):
+        self.embedded = 0
+
+    def __call__(self, labels):
+        self.embedded += len(labels)
+        return np.stack([np.random.default_rng(sum(map(ord, label))).standard_normal(16) for label in labels])
+
+class TestConceptRetrieval(unittest.TestCase):
+    def setUp(self):
+        self.cache_dir = tempfile.mkdtemp()
+        self.KG = create_knowledge_graph()
+
+    def tearDown(self):
+        shutil.rmtree(self.cache_dir)
+
+    def test_nearest_and_weighted_expansion(self):
+        embedder = CountingEmbedder()
+        index = ConceptIndex(self.KG, embedder=embedder, cache_dir=self.cache_dir, decay=1.0)
+        query = embedder(["Neural Networks"])[0]
+        seeds = index.nearest(query, k=1)[0]
+        self.assertEqual(seeds[0][0], "Neural Networks")
+        self.assertAlmostEqual(seeds[0][1], 1.0, places=5)
+
+        expanded = index.expand(["Neural Networks"], hops=2)
+        self.assertAlmostEqual(expanded["Machine Learning"][0], 0.8, places=5)
+        self.assertAlmostEqual(expanded["Artificial Intelligence"][0], 0.72, places=5)
+        self.assertEqual(expanded["Artificial Intelligence"][1], 2)
+        self.assertNotIn("Computer Vision", expanded)  # three hops away
+        self.assertIs(index.expand(["Neural Networks"], hops=2), expanded)
+        self.assertEqual(index.cache_info()["hits"], 1)
+
+        decision = enhanced_reasoning(query, KG=self.KG, concept_index=index)
+        self.assertIn("Concepts nearest to the input", decision)
+        self.assertEqual(enhanced_reasoning_batch(query.reshape(1, -1), KG=self.KG, concept_index=index), [decision])
+
+    def test_label_embeddings_are_cached_incrementally(self):
+        embedder = CountingEmbedder()
+        ConceptIndex(self.KG, embedder=embedder, cache_dir=self.cache_dir)
+        self.KG.add_edge("Computer Vision", "Image Segmentation", weight=0.6)
+        index = ConceptIndex(self.KG, embedder=embedder, cache_dir=self.cache_dir)
+        self.assertEqual(embedder.embedded, 6)
+        self.assertEqual(index.matrix.shape, (6, 16))
+
+    def test_label_cache_follows_the_text_model_weights(self):
+        tokenizer, model = tiny_text_model(self.cache_dir)
+        with torch.no_grad():
+            tuned = DistilBertModel(model.config).eval()
+            tuned.load_state_dict(model.state_dict())
+            tuned.embeddings.word_embeddings.weight.mul_(2)
+        original = ConceptIndex(self.KG, embedder=text_model_embedder(tokenizer, model), cache_dir=self.cache_dir)
+        # same name_or_path, other weights: the labels are embedded again, not read from the cache
+        reloaded = ConceptIndex(self.KG, embedder=text_model_embedder(tokenizer, tuned), cache_dir=self.cache_dir)
+        self.assertFalse(np.allclose(original.matrix, reloaded.matrix))
+        expected = ConceptIndex(self.KG, embeddings=text_model_embedder(tokenizer, tuned)(original.labels))
+        self.assertTrue(np.allclose(reloaded.matrix, expected.matrix, atol=1e-5))
+
+    def test_large_graph_expansion_matches_networkx(self):
+        G = nx.gnm_random_graph(2000, 6000, seed=1)
+        rng = np.random.default_rng(1)
+        for u, v in G.edges:
+            G[u][v]["weight"] = float(rng.uniform(0.1, 1.0))
+        index = ConceptIndex(G, embeddings=rng.standard_normal((2000, 8)), decay=1.0)
+        expanded = index.expand([0, 1], hops=2)
+        # Reference: best path product within two hops, by brute force over networkx neighbors.
+        best = {}
+        for seed in (0, 1):
+            for a in G[seed]:
+                w1 = G[seed][a]["weight"]
+                best[a] = max(best.get(a, 0.0), w1)
+                for b in G[a]:
+                    best[b] = max(best.get(b, 0.0), w1 * G[a][b]["weight"])
+        best.pop(0, None)
+        best.pop(1, None)
+        self.assertEqual(set(expanded), set(best))
+        for label, (score, _) in expanded.items():
+            self.assertAlmostEqual(score, best[label], places=5)
+
+if __name__ == '__main__':
+    unittest.main()
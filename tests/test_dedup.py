@@ -0,0 +1,73 @@
+# tests/test_dedup.py
+import random
+import shutil
+import tempfile
+import unittest
+import numpy as np
+from modules.dedup import DedupIndex, similarity, simhash
+from modules.perception import preprocess_text
+
+class TestDedup(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        rng = random.Random(0)
+        vocab = [f"word{i}" for i in range(3000)]
+        self.docs = [" ".join(rng.choice(vocab) for _ in range(200)) for _ in range(20)]
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir)
+
+    def near_copy(self, doc):
+        words = doc.split()
+        words[100] = "changed"
+        return "  " + " ".join(words).upper() + "!"
+
+    def test_signatures(self):
+        a, b = simhash(preprocess_text(self.docs[0])), simhash(preprocess_text(self.near_copy(self.docs[0])))
+        self.assertGreaterEqual(similarity(a, b), 0.9)
+        self.assertLess(similarity(a, simhash(preprocess_text(self.docs[1]))), 0.75)
+        self.assertEqual(simhash([]), 0)
+
+    def test_lookup_batch_aliases_and_persistence(self):
+        index = DedupIndex(self.tmpdir, dim=4)
+        signatures = [index.signature(preprocess_text(d)) for d in self.docs[:3]]
+        index.add_many(signatures[:2], np.eye(4, dtype=np.float32)[:2], ["first", "second"])
+        index.save()
+
+        reopened = DedupIndex(self.tmpdir, dim=4)
+        batch = [reopened.signature(preprocess_text(t)) for t in
+                 (self.near_copy(self.docs[1]), self.docs[2], self.near_copy(self.docs[2]), self.docs[3])]
+        rows, aliases = reopened.lookup_many(batch)
+        self.assertEqual(rows, [1, None, None, None])
+        self.assertEqual(aliases, [None, None, 1, None])
+        embedding, decision = reopened.get(1)
+        self.assertEqual(decision, "second")
+        self.assertTrue(np.array_equal(embedding, [0, 1, 0, 0]))
+        stats = reopened.stats()
+        self.assertEqual((stats["lookups"], stats["hits"], stats["misses"], stats["stored"]), (4, 2, 2, 2))
+
+        self.assertEqual(DedupIndex(self.tmpdir, dim=8).stats()["stored"], 0)  # parameters changed
+
+    def test_indexes_sharing_a_directory_keep_every_row(self):
+        # Two indexes stand in for two processes storing inputs in the same directory
+        first, second = DedupIndex(self.tmpdir, dim=4, model_id="m@1"), DedupIndex(self.tmpdir, dim=4, model_id="m@1")
+        signatures = [first.signature(preprocess_text(d)) for d in self.docs[:4]]
+        self.assertEqual(first.add_many(signatures[:2], np.eye(4, dtype=np.float32)[:2], ["a", "b"]), [0, 1])
+        self.assertEqual(second.add(signatures[2], np.eye(4, dtype=np.float32)[2], "c"), 2)
+        self.assertEqual(first.add(signatures[3], np.eye(4, dtype=np.float32)[3], "d"), 3)
+        self.assertEqual(first.lookup(signatures[2]), 2)
+        reopened = DedupIndex(self.tmpdir, dim=4, model_id="m@1")
+        self.assertEqual([reopened.get(row)[1] for row in range(4)], ["a", "b", "c", "d"])
+        self.assertEqual(DedupIndex(self.tmpdir, dim=4, model_id="m@2").stats()["stored"], 0)  # another text model
+
+    def test_false_positive_rate_on_labeled_pairs(self):
+        index = DedupIndex(self.tmpdir)
+        pairs = [(d, self.near_copy(d), True) for d in self.docs[:10]]
+        pairs += [(self.docs[i], self.docs[i + 10], False) for i in range(10)]
+        report = index.evaluate(pairs)
+        self.assertEqual(report["pairs"], 20)
+        self.assertEqual(report["false_positive_rate"], 0.0)
+        self.assertEqual(report["recall"], 1.0)
+
+if __name__ == '__main__':
+    unittest.main()
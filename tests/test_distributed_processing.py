@@ -0,0 +1,96 @@
+# tests/test_distributed_processing.py
+import os
+import shutil
+import tempfile
+import unittest
+from benchmarks.harness import isolated_memory
+from distributed_processing import merge_into_memory, partition, run_sharded, preprocess_shard, ShardFailed
+from modules.long_term_memory import retrieve_long_term_memory
+from modules.memory import create_memory_event, retrieve_memory
+
+def flaky_shard(items, shared):
+    # Fails the first attempt of every shard, succeeds on retry.
+    marker = os.path.join(shared, os.path.basename(items[0]) + ".seen")
+    if not os.path.exists(marker):
+        open(marker, "w").close()
+        raise RuntimeError("transient failure")
+    return [os.path.basename(path) for path in items]
+
+def logged_shard(items, shared):
+    # preprocess_shard that logs which shards actually ran.
+    with open(os.path.join(shared, "runs.log"), "a") as f:
+        f.write(os.path.basename(items[0]) + "\n")
+    return preprocess_shard(items)
+
+def failing_shard(items, shared):
+    raise RuntimeError("permanent failure")
+
+class TestDistributedProcessing(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.paths = []
+        for i in range(10):
+            path = os.path.join(self.tmpdir, f"doc_{i}.txt")
+            with open(path, "w", encoding="utf-8") as f:
+                f.write("word " * (i + 1))
+            self.paths.append(path)
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir)
+
+    def test_partition_preserves_order(self):
+        shards = partition(range(10), 3)
+        self.assertEqual([len(s.items) for s in shards], [4, 3, 3])
+        self.assertEqual([i for s in shards for i in s.items], list(range(10)))
+        self.assertEqual(len(partition(range(2), 8)), 2)
+
+    def test_results_in_input_order_and_checkpoints_reused(self):
+        checkpoint_dir = os.path.join(self.tmpdir, "checkpoints")
+        log_path = os.path.join(self.tmpdir, "runs.log")
+        def run():
+            return run_sharded(self.paths, logged_shard, workers=2, num_shards=4, checkpoint_dir=checkpoint_dir,
+                               shared=self.tmpdir)
+        def shards_run():
+            with open(log_path) as f:
+                names = sorted(f.read().split())
+            os.remove(log_path)
+            return names
+
+        results = run()
+        self.assertEqual([count for shard in results for _, count in shard], list(range(1, 11)))
+        self.assertEqual(shards_run(), ["doc_0.txt", "doc_3.txt", "doc_6.txt", "doc_8.txt"])
+        # Unchanged inputs and shard function: served entirely from checkpoints.
+        self.assertEqual(run(), results)
+        self.assertFalse(os.path.exists(log_path))
+        # A different shard function does not reuse them.
+        with self.assertRaises(ShardFailed):
+            run_sharded(self.paths, failing_shard, workers=2, num_shards=4, checkpoint_dir=checkpoint_dir, max_retries=0)
+        # An edited input invalidates only its own shard.
+        with open(self.paths[9], "a", encoding="utf-8") as f:
+            f.write("word " * 5)
+        edited = run()
+        self.assertEqual(shards_run(), ["doc_8.txt"])
+        self.assertEqual(edited[-1][-1][1], 15)
+
+    def test_failed_shards_are_retried(self):
+        results = run_sharded(self.paths, flaky_shard, workers=2, num_shards=3, shared=self.tmpdir)
+        self.assertEqual(sum(results, []), [os.path.basename(p) for p in self.paths])
+        with self.assertRaises(ShardFailed):
+            run_sharded(self.paths, failing_shard, workers=2, num_shards=3, max_retries=1)
+
+    def test_rerun_does_not_merge_checkpointed_shards_again(self):
+        def shard(names, error=None):
+            return [{"memory_event": create_memory_event(name, {}, "decision", 1, {}, "outcome"),
+                     "long_term_event": {"input_summary": name}, "error": error} for name in names]
+        checkpoint_dir = os.path.join(self.tmpdir, "checkpoints")
+        results = [shard(["a", "b"]), shard(["c"], error="OSError: unreadable"), shard(["d"])]
+        with isolated_memory(self.tmpdir):
+            self.assertEqual(merge_into_memory(results, checkpoint_dir), 3)
+            self.assertEqual(merge_into_memory(results, checkpoint_dir), 0)
+            # a recomputed shard has new events and is merged
+            self.assertEqual(merge_into_memory([results[0], shard(["d2"])], checkpoint_dir), 1)
+            self.assertEqual([e["input_summary"] for e in retrieve_memory()], ["a", "b", "d", "d2"])
+            self.assertEqual(len(retrieve_long_term_memory()), 4)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,65 @@
+# tests/test_embedding_batch.py
+import os
+import shutil
+import tempfile
+import unittest
+import numpy as np
+import torch
+from modules.embedding_batch import EmbeddingBatch
+from modules.reasoning import simple_reasoning, simple_reasoning_batch
+from modules.self_improvement import analyze_system
+
+class TestEmbeddingBatch(unittest.TestCase):
+    def setUp(self):
+        self.matrix = np.random.default_rng(0).standard_normal((130, 768)).astype(np.float32)
+
+    def test_stats_views_and_stage_compatibility(self):
+        tensor = torch.from_numpy(self.matrix)
+        batch = EmbeddingBatch(tensor)
+        self.assertTrue(np.shares_memory(batch.array, self.matrix))  # no copy from the model output
+        self.assertFalse(batch.array.flags.writeable)
+        self.assertTrue(np.allclose(batch.stats()["row_mean"], self.matrix.mean(axis=1), atol=1e-6))
+        self.assertTrue(np.allclose(batch.stats()["row_std"], self.matrix.std(axis=1), atol=1e-5))
+        self.assertAlmostEqual(batch.mean(), float(self.matrix.mean()), places=6)
+        self.assertAlmostEqual(batch.std(), float(self.matrix.std()), places=5)
+
+        row = batch[3]
+        self.assertTrue(np.shares_memory(row.array, self.matrix))
+        self.assertAlmostEqual(row.summary()["std"], float(self.matrix[3].std()), places=5)
+        self.assertEqual(simple_reasoning(row), simple_reasoning(self.matrix[3]))
+        self.assertEqual(simple_reasoning_batch(batch), simple_reasoning_batch(self.matrix))
+        self.assertAlmostEqual(analyze_system(row, "d", 1)["average_embedding_value"], float(self.matrix[3].mean()), places=6)
+        self.assertTrue(np.shares_memory(np.asarray(batch, dtype=np.float32), self.matrix))
+
+        last = batch[-1]  # negative rows use the cached statistics of the same row
+        self.assertTrue(np.array_equal(last.array, self.matrix[-1]))
+        self.assertAlmostEqual(last.mean(), float(self.matrix[-1].mean()), places=6)
+        with self.assertRaises(IndexError):
+            batch[len(self.matrix)]
+        with self.assertRaises(TypeError):
+            batch[1:3]
+
+    def test_file_and_shared_memory_roundtrip(self):
+        tmpdir = tempfile.mkdtemp()
+        try:
+            path = os.path.join(tmpdir, "batch.npy")
+            EmbeddingBatch(self.matrix).save(path)
+            self.assertTrue(np.array_equal(np.load(path), self.matrix))
+            loaded = EmbeddingBatch.load(path)
+            base = loaded.array
+            while base.base is not None and not isinstance(base, np.memmap):
+                base = base.base
+            self.assertIsInstance(base, np.memmap)  # mapped, not read into memory
+        finally:
+            shutil.rmtree(tmpdir)
+
+        owner = EmbeddingBatch(self.matrix)
+        descriptor = owner.share()
+        consumer = EmbeddingBatch.attach(descriptor)
+        self.assertTrue(np.array_equal(consumer.array, self.matrix))
+        consumer.close()
+        owner.close(unlink=True)
+        self.assertTrue(np.array_equal(owner.array, self.matrix))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,106 @@
+# tests/test_embedding_codec.py
+import os
+import shutil
+import tempfile
+import unittest
+from datetime import datetime, timedelta
+import numpy as np
+from modules import embedding_codec, long_term_memory
+from modules.embedding_codec import PQCodec, current_codec, disable_codec, enable_codec, evaluate_codec, save_codec
+
+def clustered(count, dim=32, seed=0):
+    # Unit vectors near 64 directions of a 16-d subspace: quantizable almost without loss.
+    rng = np.random.default_rng(seed)
+    centers = rng.standard_normal((64, 16)) @ rng.standard_normal((16, dim))
+    vectors = centers[rng.integers(0, 64, count)] + 0.01 * rng.standard_normal((count, dim))
+    return (vectors / np.linalg.norm(vectors, axis=1, keepdims=True)).astype(np.float32)
+
+class TestEmbeddingCodec(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.vectors = clustered(3000)
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir)
+
+    def test_codes_and_asymmetric_scores(self):
+        codec = PQCodec(32, num_subvectors=8, pca_dim=16)
+        codec.fit((self.vectors[i:i + 500] for i in range(0, 3000, 500)), sample_size=1000, iters=10)
+        codes = codec.encode(self.vectors)
+        self.assertEqual((codes.dtype, codes.shape), (np.uint8, (3000, 8)))
+        decoded = codec.decode(codes)
+        queries = self.vectors[:4]
+        np.testing.assert_allclose(codec.scores(queries, codes), queries @ decoded.T, atol=1e-4)
+        np.testing.assert_allclose(codec.scores(queries, codes, "l2"),
+                                   ((queries[:, None] - decoded[None]) ** 2).sum(-1), atol=1e-4)
+        # the pair-table path (large scans) agrees with the per-sub-vector path
+        many = np.tile(codes, (22, 1))
+        np.testing.assert_allclose(codec.scores(queries, many)[:, -3000:], codec.scores(queries, codes), atol=1e-4)
+        _, found = codec.search(queries, codes, k=1, metric="l2")
+        self.assertTrue(np.allclose(decoded[found[:, 0]], decoded[:4], atol=1e-5))
+
+        report = evaluate_codec(codec, self.vectors, k=5, candidates=50, repeat=1)
+        self.assertEqual((report["compression_ratio"], report["bytes_per_vector"]), (16.0, 8))
+        self.assertLess(report["reconstruction_error"], 0.01)
+        self.assertGreater(report["recall_5_at_50"], 0.9)  # neighbors within a cluster are near-ties
+
+        path = os.path.join(self.tmpdir, "codec.npz")
+        codec.save(path)
+        loaded = PQCodec.load(path)
+        self.assertEqual(loaded.fingerprint(), codec.fingerprint())
+        np.testing.assert_array_equal(loaded.encode(self.vectors), codes)
+        retrained = codec.retrain(clustered(2000, seed=0), sample_size=1000, iters=2)
+        self.assertEqual(retrained.trained_on, 2000)
+        self.assertNotEqual(retrained.fingerprint(), codec.fingerprint())
+        with self.assertRaises(ValueError):
+            PQCodec(32, num_subvectors=5)
+
+    def test_long_term_memory_stores_and_searches_codes(self):
+        saved = (long_term_memory.LONG_TERM_MEMORY_FILE, long_term_memory.LONG_TERM_ARCHIVE_DIR,
+                 embedding_codec.EMBEDDING_CODEC_DIR)
+        long_term_memory.LONG_TERM_MEMORY_FILE = os.path.join(self.tmpdir, "long_term_memory.json")
+        long_term_memory.LONG_TERM_ARCHIVE_DIR = os.path.join(self.tmpdir, "archive")
+        embedding_codec.EMBEDDING_CODEC_DIR = os.path.join(self.tmpdir, "codecs")
+        try:
+            start = datetime(2025, 1, 1)
+            events = [{"timestamp": (start + i * timedelta(minutes=1)).isoformat(), "n": i,
+                       "fused_embedding": self.vectors[i].tolist()} for i in range(40)]
+            long_term_memory.store_long_term_memories(events[:20])  # no codec yet: float lists
+            codec = PQCodec(32, num_subvectors=8).fit(self.vectors, sample_size=1000)
+            save_codec(codec)
+            self.assertIsNone(current_codec())  # compression is opt-in
+            # a codec that loses neighbours is refused
+            noise = np.random.default_rng(1).standard_normal((2000, 32)).astype(np.float32)
+            with self.assertRaises(ValueError):
+                enable_codec(PQCodec(32, num_subvectors=4).fit(noise, sample_size=1000, iters=2), noise)
+            self.assertIsNone(current_codec())
+            self.assertGreater(enable_codec(codec, self.vectors[:200])["recall_at_10"], 0.9)
+            self.assertIs(current_codec(), codec)
+            long_term_memory.store_long_term_memories(events[20:30])
+            long_term_memory.store_long_term_memory(events[30])
+            # a retrained codec becomes current; codes of the previous one stay searchable
+            enable_codec(codec.retrain(self.vectors[::-1], sample_size=1000, iters=2), self.vectors[:200])
+            long_term_memory.store_long_term_memories(events[31:39])
+            disable_codec()
+            long_term_memory.store_long_term_memory(events[39])
+
+            stored = long_term_memory.retrieve_long_term_memory()
+            self.assertEqual(["fused_pq" in e for e in stored], [False] * 20 + [True] * 19 + [False])
+            self.assertEqual(len({e["fused_pq"]["codec"] for e in stored[20:39]}), 2)
+            self.assertIn("fused_embedding", events[25])  # callers' events are not modified
+            self.assertEqual(len(list(long_term_memory.iter_fused_embeddings())), 40)
+            for i in (5, 25, 35, 39):
+                similarity, event = long_term_memory.search_long_term_memory(self.vectors[i], top_k=1)[0]
+                self.assertGreater(similarity, 0.99)
+                np.testing.assert_allclose(self.vectors[event["n"]], self.vectors[i], atol=0.05)
+            # a deleted codec makes its events unsearchable, with a warning
+            os.remove(os.path.join(embedding_codec.EMBEDDING_CODEC_DIR, codec.fingerprint() + ".npz"))
+            embedding_codec._codecs.clear()
+            with self.assertLogs("genesis.embedding_codec", "WARNING"):
+                self.assertEqual(len(list(long_term_memory.iter_fused_embeddings())), 29)
+        finally:
+            (long_term_memory.LONG_TERM_MEMORY_FILE, long_term_memory.LONG_TERM_ARCHIVE_DIR,
+             embedding_codec.EMBEDDING_CODEC_DIR) = saved
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,95 @@
+# tests/test_external_sync.py
+import asyncio
+import os
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+from benchmarks.harness import isolated_memory
+from benchmarks.hn_stub import serve_hn_stub
+from modules import external_data
+from modules.external_data import HeadlineSync
+
+NOW = 1700000000.0
+
+class TestHeadlineSync(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir)
+
+    def test_fetches_only_new_and_changed_items(self):
+        directory = os.path.join(self.tmpdir, "hn_sync")
+        with serve_hn_stub(12) as stub:
+            sync = HeadlineSync(directory, base_url=stub.base_url, limit=5, refresh_after=600, retention=3600)
+            first = sync.sync(now=NOW)
+            self.assertEqual((first.fetched, first.requests, first.baseline_requests), (5, 7, 6))
+            self.assertEqual(first.delta, first.headlines)
+            self.assertEqual(len(first.headlines), 5)
+
+            unchanged = sync.sync(now=NOW + 60)
+            self.assertEqual((unchanged.fetched, unchanged.requests, unchanged.delta), (0, 2, []))
+            self.assertEqual(unchanged.headlines, first.headlines)
+
+            stub.add_item(50000000, "Brand new story")
+            stub.update_item(stub.top_ids[2], "Retitled story")
+            stub.update_item(stub.top_ids[3], "Another retitled story")
+            changed = sync.sync(now=NOW + 120)
+            self.assertEqual(changed.fetched, 3)
+            self.assertEqual(changed.delta, ["Brand new story", "Retitled story", "Another retitled story"])
+            self.assertEqual(changed.headlines[0], "Brand new story")
+            # the edits stay on the rolling updates list but are not fetched again
+            self.assertEqual(sync.sync(now=NOW + 180).fetched, 0)
+
+            # the cursor and item store persist across instances
+            reloaded = HeadlineSync(directory, base_url=stub.base_url, limit=5, refresh_after=600, retention=3600)
+            self.assertEqual(reloaded.headlines(), changed.headlines)
+            self.assertEqual(reloaded.sync(now=NOW + 240).fetched, 0)
+            # stale items are fetched again but unchanged titles are not re-emitted
+            stale = reloaded.sync(now=NOW + 900)
+            self.assertEqual((stale.fetched, stale.delta), (5, []))
+            # items off the top list past the retention period are dropped
+            self.assertEqual(len(reloaded.items), 6)
+            reloaded.sync(now=NOW + 4000)
+            self.assertEqual(sorted(reloaded.items), sorted(str(i) for i in stub.top_ids[:5]))
+            item_requests = stub.item_requests()
+
+        # without the API, the stored headlines are served and nothing is new
+        offline = reloaded.sync(now=NOW + 5000)
+        self.assertEqual((offline.headlines, offline.delta, offline.requests), (stale.headlines, [], 0))
+        self.assertEqual(item_requests, 5 + 3 + 5 + 5)
+
+    def test_async_sync_emits_each_headline_once(self):
+        with serve_hn_stub(8) as stub:
+            stub.handle = mock.Mock(side_effect=lambda path, handle=stub.handle:
+                                    (404, None) if path == "/v0/updates.json" else handle(path))
+            sync = HeadlineSync(os.path.join(self.tmpdir, "hn_sync"), base_url=stub.base_url)
+
+            async def sync_concurrently():
+                return await asyncio.gather(*(sync.sync_async(now=NOW) for _ in range(3)))
+
+            results = asyncio.run(sync_concurrently())
+            self.assertTrue(all(len(r.headlines) == 8 for r in results))
+            self.assertEqual(sorted(h for r in results for h in r.delta), sorted(results[0].headlines))
+            later = asyncio.run(sync.sync_async(now=NOW + 60))
+            self.assertEqual((later.fetched, later.delta), (0, []))
+
+    def test_pipeline_trains_on_the_delta(self):
+        import main
+
+        with serve_hn_stub(5) as stub, isolated_memory(self.tmpdir), \
+                mock.patch.object(external_data, "HN_API_BASE", stub.base_url), \
+                mock.patch.object(main, "incremental_train", return_value=True) as train:
+            first = main.run_shared_setup(ci_mode=True)
+            second = main.run_shared_setup(ci_mode=True)
+            stub.add_item(50000000, "Brand new story")
+            third = main.run_shared_setup(ci_mode=True)
+        self.assertEqual(first["external_delta"], first["external_data"])
+        self.assertEqual((second["external_delta"], second["external_data"]), ("", first["external_data"]))
+        self.assertTrue(third["external_data"].startswith("Brand new story"))
+        self.assertEqual([c.args[0] for c in train.call_args_list], [first["external_data"], "", "Brand new story"])
+        self.assertTrue(os.path.exists(os.path.join(self.tmpdir, "hn_sync", "cursor.json")))
+
+if __name__ == '__main__':
+    unittest.main()
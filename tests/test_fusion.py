@@ -0,0 +1,61 @@
+# tests/test_fusion.py
+import shutil
+import tempfile
+import unittest
+import numpy as np
+from modules.fusion import FusionModel, get_fusion_model, pool_numerical_features
+
+class TestFusion(unittest.TestCase):
+    def setUp(self):
+        rng = np.random.default_rng(0)
+        self.text = rng.standard_normal((4, 768))
+        self.image = rng.standard_normal((4, 512))
+        self.numerical = np.stack([pool_numerical_features(rng.standard_normal((50, 3))) for _ in range(4)])
+
+    def test_batch_matches_single_and_handles_missing_modalities(self):
+        model = FusionModel(dim=32, seed=1)
+        image = self.image.copy()
+        image[1] = np.nan
+        fused = model.fuse_batch(self.text, image, self.numerical)
+        self.assertEqual(fused.shape, (4, 32))
+        self.assertTrue(np.allclose(np.linalg.norm(fused, axis=1), 1.0, atol=1e-5))
+        self.assertTrue(np.allclose(model.fuse(self.text[1], None, self.numerical[1]), fused[1], atol=1e-6))
+        self.assertEqual(model.fuse_batch(self.text, dtype=np.float16).dtype, np.float16)
+
+    def test_fit_projects_onto_principal_directions(self):
+        rng = np.random.default_rng(1)
+        directions = np.linalg.qr(rng.standard_normal((768, 3)))[0].T  # 3 orthonormal directions
+        samples = rng.standard_normal((200, 3)) * [10.0, 5.0, 2.0] @ directions + 3.0
+        model = FusionModel(dim=8, seed=0).fit({"text": samples})
+        self.assertTrue(np.allclose(model.means["text"], samples.mean(axis=0), atol=1e-4))
+        # the leading columns are the directions of largest variance; other modalities keep their projection
+        self.assertTrue(np.allclose(np.abs(directions @ model.projections["text"][:, :3]).max(axis=0), 1.0, atol=1e-3))
+        self.assertTrue(np.allclose(model.projections["image"], FusionModel(dim=8, seed=0).projections["image"]))
+        self.assertEqual(model.fuse_batch(samples[:4]).shape, (4, 8))
+
+    def test_projections_are_cached_and_deterministic(self):
+        cache_dir = tempfile.mkdtemp()
+        try:
+            model = get_fusion_model(dim=16, seed=7, cache_dir=cache_dir)
+            loaded = FusionModel.load(f"{cache_dir}/fusion-{model.cache_key()}.npz")
+            fresh = FusionModel(dim=16, seed=7)
+            for fused in (loaded.fuse_batch(self.text), fresh.fuse_batch(self.text)):
+                self.assertTrue(np.allclose(model.fuse_batch(self.text), fused))
+        finally:
+            shutil.rmtree(cache_dir)
+
+    def test_models_are_memoized_per_cache_directory(self):
+        first, second = tempfile.mkdtemp(), tempfile.mkdtemp()
+        try:
+            fitted = FusionModel(dim=8, seed=3).fit({"text": self.text})
+            fitted.save(f"{second}/fusion-{fitted.cache_key()}.npz")
+            get_fusion_model(dim=8, seed=3, cache_dir=first)
+            model = get_fusion_model(dim=8, seed=3, cache_dir=second)
+            self.assertTrue(np.allclose(model.projections["text"], fitted.projections["text"]))
+            self.assertIs(get_fusion_model(dim=8, seed=3, cache_dir=second), model)
+        finally:
+            shutil.rmtree(first)
+            shutil.rmtree(second)
+
+if __name__ == '__main__':
+    unittest.main()
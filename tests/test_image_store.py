@@ -0,0 +1,75 @@
+# tests/test_image_store.py
+import os
+import shutil
+import tempfile
+import unittest
+import numpy as np
+from PIL import Image
+from modules.image_store import ImageEmbeddingStore
+
+class CountingEmbedder:
+    # Stands in for the vision model: embeds an image as its mean colour, counting calls.
+    def __init__(self):
+        self.embedded = 0
+
+    def __call__(self, images):
+        self.embedded += len(images)
+        return np.stack([np.resize(np.asarray(image, dtype=np.float32).mean(axis=(0, 1)), 512) for image in images])
+
+class TestImageStore(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.store_dir = os.path.join(self.tmpdir, "store")
+        self.paths = []
+        for i, color in enumerate([(255, 0, 0), (0, 255, 0), (255, 0, 0)]):
+            path = os.path.join(self.tmpdir, "images", f"img_{i}.png")
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            Image.new("RGB", (8, 8), color).save(path)
+            self.paths.append(path)
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir)
+
+    def test_content_hash_dedup_and_persistence(self):
+        embedder = CountingEmbedder()
+        store = ImageEmbeddingStore(self.store_dir, fingerprint="v1", embedder=embedder)
+        matrix = store.get_many(self.paths + [os.path.join(self.tmpdir, "missing.png")])
+        self.assertEqual(embedder.embedded, 2)  # img_0 and img_2 have identical content
+        self.assertTrue(np.array_equal(matrix[0], matrix[2]))
+        self.assertTrue(np.isnan(matrix[3]).all())
+
+        reopened = ImageEmbeddingStore(self.store_dir, fingerprint="v1", embedder=embedder)
+        self.assertTrue(np.array_equal(reopened.get_many(self.paths), matrix[:3]))
+        self.assertEqual(embedder.embedded, 2)
+
+    def test_changed_files_and_fingerprint_invalidate(self):
+        embedder = CountingEmbedder()
+        ImageEmbeddingStore(self.store_dir, fingerprint="v1", embedder=embedder).warm_directory(self.tmpdir, workers=2)
+        self.assertEqual(embedder.embedded, 2)
+
+        Image.new("RGB", (8, 8), (0, 0, 255)).save(self.paths[1])
+        os.utime(self.paths[1], ns=(1, 1))
+        store = ImageEmbeddingStore(self.store_dir, fingerprint="v1", embedder=embedder)
+        self.assertEqual(store.get(self.paths[1])[2], 255.0)
+        self.assertEqual(embedder.embedded, 3)
+
+        ImageEmbeddingStore(self.store_dir, fingerprint="v2", embedder=embedder).get_many(self.paths)
+        self.assertEqual(embedder.embedded, 5)
+
+    def test_stores_sharing_a_directory_keep_every_embedding(self):
+        first_embedder, second_embedder = CountingEmbedder(), CountingEmbedder()
+        first = ImageEmbeddingStore(self.store_dir, fingerprint="v1", embedder=first_embedder)
+        second = ImageEmbeddingStore(self.store_dir, fingerprint="v1", embedder=second_embedder)
+        first.get(self.paths[0])
+        second.get(self.paths[1])  # written after the first store's row, not over it
+        self.assertEqual(second.index["rows"], 2)
+        matrix = first.get_many(self.paths)
+        self.assertEqual((first_embedder.embedded, second_embedder.embedded), (1, 1))
+        self.assertEqual(matrix[1][1], 255.0)
+
+        reopened = ImageEmbeddingStore(self.store_dir, fingerprint="v1", embedder=CountingEmbedder())
+        self.assertTrue(np.array_equal(reopened.get_many(self.paths), matrix))
+        self.assertEqual(len(reopened.index["files"]), 3)
+
+if __name__ == '__main__':
+    unittest.main()
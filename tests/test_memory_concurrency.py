@@ -0,0 +1,43 @@
+# tests/test_memory_concurrency.py
+import os
+import shutil
+import tempfile
+import threading
+import unittest
+
+from benchmarks.bench_memory_concurrency import stress_store
+from modules.tiered_storage import TieredStore
+
+class TestMemoryConcurrency(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir)
+
+    def test_writer_processes_lose_nothing(self):
+        result = stress_store(self.tmpdir, processes=4, events=60, batch=3)
+        self.assertEqual(result["lost"], 0)
+        self.assertEqual(result["duplicates"], 0)
+        self.assertTrue(result["seq_ok"])
+        self.assertEqual(result["partial_reads"], 0)
+
+    def test_threads_with_separate_store_objects(self):
+        paths = (os.path.join(self.tmpdir, "memory.json"), os.path.join(self.tmpdir, "archive"))
+        policy = {"hot_max_events": 20, "segment_events": 5, "compression": "gzip"}
+
+        def write(writer):
+            store = TieredStore(*paths, policy)
+            for n in range(50):
+                store.append({"timestamp": f"2025-01-01T00:00:{n:02d}", "writer": writer, "n": n})
+        threads = [threading.Thread(target=write, args=(w,)) for w in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        events = list(TieredStore(*paths, policy).iter_range())
+        self.assertEqual(sorted((e["writer"], e["n"]) for e in events), [(w, n) for w in range(4) for n in range(50)])
+        self.assertEqual(sorted(e["seq"] for e in events), list(range(1, 201)))
+
+if __name__ == "__main__":
+    unittest.main()
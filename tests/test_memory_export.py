@@ -0,0 +1,92 @@
+# tests/test_memory_export.py
+import gzip
+import os
+import shutil
+import tempfile
+import unittest
+from datetime import datetime, timedelta
+from unittest import mock
+
+from modules import memory_export
+from modules.memory_export import export_store, import_events, iter_records, iter_store
+from modules.tiered_storage import TieredStore
+
+def make_events(count, start=datetime(2025, 1, 1), step=timedelta(hours=6)):
+    return [{"timestamp": (start + i * step).isoformat(), "reward": i % 2, "n": i,
+             "embedding_stats": {"mean": i / 10, "std": 1.0}} for i in range(count)]
+
+class TestMemoryExport(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.store = self.make_store("source")
+        self.store.append_many(make_events(60))
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir)
+
+    def make_store(self, name):
+        return TieredStore(os.path.join(self.tmpdir, f"{name}.json"), os.path.join(self.tmpdir, f"{name}_archive"),
+                           {"hot_max_events": 10, "segment_events": 5, "compression": "gzip"})
+
+    def test_gzip_round_trip_with_range_and_projection(self):
+        path = os.path.join(self.tmpdir, "export.jsonl.gz")
+        # Small batches: several gzip members compressed in parallel, concatenated in order
+        self.assertEqual(export_store(self.store, path, batch_size=7, workers=3), 60)
+        with gzip.open(path, "rt") as f:
+            self.assertEqual(sum(1 for _ in f), 60)
+        records = list(iter_records(path))
+        self.assertEqual([r["n"] for r in records], list(range(60)))
+        self.assertEqual(len({r["event_id"] for r in records}), 60)
+
+        path = os.path.join(self.tmpdir, "range.jsonl")
+        count = export_store(self.store, path, "2025-01-02T00:00:00", "2025-01-03T23:59:59",
+                             fields=["timestamp", "embedding_stats.mean"])
+        records = list(iter_records(path))
+        self.assertEqual(count, 8)
+        self.assertEqual(set(records[0]), {"event_id", "timestamp", "embedding_stats.mean"})
+        self.assertEqual(records[0]["embedding_stats.mean"], 0.4)
+
+    def test_snapshot_survives_concurrent_rolls(self):
+        events = iter_store(self.store)
+        first = next(events)
+        # The pipeline keeps writing: the snapshot's hot events get rolled to the cold tier
+        self.store.append_many(make_events(20, start=datetime(2025, 6, 1)))
+        ns = [first["n"]] + [e["n"] for e in events if e["timestamp"] < "2025-06"]
+        self.assertEqual(sorted(ns), list(range(60)))
+
+    def test_import_is_resumable_and_idempotent(self):
+        path = os.path.join(self.tmpdir, "export.jsonl")
+        export_store(self.store, path)
+        target = self.make_store("target")
+        original = target.append_many
+        calls = []
+
+        def crash_after_write(batch):
+            original(batch)
+            calls.append(len(batch))
+            if len(calls) == 3:
+                raise KeyboardInterrupt  # interrupted after the write, before the checkpoint
+        with mock.patch.object(target, "append_many", crash_after_write):
+            with self.assertRaises(KeyboardInterrupt):
+                import_events(path, target, batch_size=8)
+        self.assertEqual(import_events(path, target, batch_size=8), 60 - 24)
+        self.assertEqual(import_events(path, target, batch_size=8), 0)
+        # most events have rolled into the cold tier by now, and are still recognized
+        self.assertEqual(import_events(path, target, batch_size=8, resume=False), 0)
+        os.utime(path, ns=(1, 1))
+        self.assertEqual(import_events(path, target, batch_size=32), 0)
+        imported = list(iter_store(target))
+        self.assertEqual([e["n"] for e in imported], list(range(60)))
+        self.assertEqual(imported[0]["event_id"], memory_export.event_id(next(iter_store(self.store))))
+
+    @unittest.skipIf(memory_export.pa is None, "pyarrow is not installed")
+    def test_columnar_round_trip(self):
+        for name in ("export.parquet", "export.arrow"):
+            path = os.path.join(self.tmpdir, name)
+            export_store(self.store, path, batch_size=16)
+            records = list(iter_records(path, skip=20, batch_size=16))
+            self.assertEqual([r["n"] for r in records], list(range(20, 60)))
+            self.assertEqual(records[0]["embedding_stats"], {"mean": 2.0, "std": 1.0})
+
+if __name__ == "__main__":
+    unittest.main()
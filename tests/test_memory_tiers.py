@@ -0,0 +1,52 @@
+# tests/test_memory_tiers.py
+import os
+import shutil
+import tempfile
+import unittest
+from datetime import datetime, timedelta
+
+from modules.tiered_storage import TieredStore
+
+def make_events(count, start=datetime(2025, 1, 1), step=timedelta(hours=6)):
+    return [{"timestamp": (start + i * step).isoformat(), "reward": 1, "n": i} for i in range(count)]
+
+class TestTieredStore(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.store = TieredStore(
+            os.path.join(self.tmpdir, "memory.json"),
+            os.path.join(self.tmpdir, "archive"),
+            {"hot_max_events": 10, "segment_events": 5, "compression": "gzip"},
+        )
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir)
+
+    def test_overflow_rolls_into_day_partitions(self):
+        self.store.append_many(make_events(40))
+        self.assertEqual(len(self.store.hot_events()), 10)
+        segments = self.store.load_index()
+        self.assertEqual(sum(s["count"] for s in segments), 30)
+        # 6-hourly events: four per day partition
+        self.assertTrue(all(s["count"] <= 4 for s in segments))
+        self.assertEqual([e["n"] for e in self.store.iter_range()], list(range(40)))
+
+    def test_range_query_skips_partitions(self):
+        self.store.append_many(make_events(40))
+        opened = []
+        original = self.store.iter_segment
+        self.store.iter_segment = lambda seg: opened.append(seg["file"]) or original(seg)
+        events = list(self.store.iter_range("2025-01-02T00:00:00", "2025-01-02T23:59:59"))
+        self.assertEqual([e["n"] for e in events], [4, 5, 6, 7])
+        self.assertEqual(len(opened), 1)
+
+    def test_downsampling_and_retention(self):
+        self.store.policy.update({"downsample_after_days": 1, "downsample_every": 2, "cold_max_age_days": 30})
+        old = make_events(20, start=datetime.utcnow() - timedelta(days=60))
+        self.store.append_many(old + make_events(10, start=datetime.utcnow()))
+        self.assertEqual(sum(s["count"] for s in self.store.load_index()), 10)
+        self.assertGreater(self.store.enforce_retention(), 0)
+        self.assertEqual(self.store.load_index(), [])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,95 @@
+# tests/test_model_snapshot.py
+import os
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+import torch
+import torch.nn as nn
+from transformers import DistilBertModel
+from benchmarks.data import tiny_text_model
+from modules import model_snapshot
+from modules.model_snapshot import (find_snapshot, load_module, load_text_snapshot, load_vision_snapshot, model_identity,
+                                    save_module, save_text_snapshot, save_vision_snapshot, weights_fingerprint)
+from modules.multi_modal import build_vision_model, vision_fingerprint
+from modules.understanding import get_embeddings_batch
+
+try:
+    from safetensors.torch import load_file
+except ImportError:  # Optional dependency: only used to check the file format
+    load_file = None
+
+class Tied(nn.Module):
+    def __init__(self):
+        super().__init__()
+        self.encoder = nn.Embedding(10, 4)
+        self.decoder = nn.Linear(4, 10, bias=False)
+        self.decoder.weight = self.encoder.weight
+        self.register_buffer("steps", torch.arange(3), persistent=False)
+
+class TestModelSnapshot(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        torch.manual_seed(0)
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir)
+
+    def test_text_snapshot_round_trip(self):
+        tokenizer, model = tiny_text_model(self.tmpdir, dim=32, n_layers=2)
+        root = os.path.join(self.tmpdir, "snapshots")
+        self.assertIsNone(find_snapshot("text", "tiny/distilbert", root))
+        directory = save_text_snapshot(tokenizer, model, "tiny/distilbert", root=root)
+        self.assertEqual(find_snapshot("text", "tiny/distilbert", root), directory)
+
+        loaded_tokenizer, loaded = load_text_snapshot(directory)
+        self.assertFalse(loaded.training)
+        self.assertFalse(any(p.is_meta for p in loaded.parameters()))
+        texts = ["agent memory graph", "vision signal model data system"]
+        expected = get_embeddings_batch(texts, tokenizer, model)
+        self.assertTrue(torch.allclose(torch.from_numpy(get_embeddings_batch(texts, loaded_tokenizer, loaded)),
+                                       torch.from_numpy(expected)))
+        # the snapshot keeps the checkpoint's identity without hashing its weights again
+        model.config.name_or_path = "tiny/distilbert"
+        self.assertEqual(loaded._weights_fingerprint, weights_fingerprint(model))
+        self.assertEqual(model_identity(loaded), model_identity(model))
+        with torch.no_grad():
+            tuned = DistilBertModel(model.config).eval()
+            tuned.load_state_dict(model.state_dict())
+            tuned.transformer.layer[0].ffn.lin1.bias.add_(1e-3)
+        self.assertNotEqual(model_identity(tuned), model_identity(model))
+        if load_file is not None:
+            weights = load_file(os.path.join(directory, "model.safetensors"))
+            self.assertTrue(torch.equal(weights["transformer.layer.1.ffn.lin2.weight"],
+                                        model.transformer.layer[1].ffn.lin2.weight))
+
+    def test_vision_snapshot_keeps_truncated_head(self):
+        model = build_vision_model(pretrained=False).eval()
+        with mock.patch.object(model_snapshot, "SNAPSHOT_DIR", self.tmpdir):
+            checkpoint_fingerprint = vision_fingerprint()
+            directory = save_vision_snapshot(model)
+            # caches follow the snapshot's weights, and the loaded model identifies the same weights
+            self.assertNotEqual(vision_fingerprint(), checkpoint_fingerprint)
+            self.assertEqual(vision_fingerprint(), vision_fingerprint(model))
+        loaded, transform = load_vision_snapshot(directory)
+        self.assertEqual(vision_fingerprint(loaded, transform), vision_fingerprint(model))
+        self.assertIsInstance(loaded, nn.Sequential)
+        images = torch.randn(2, 3, 64, 64)
+        with torch.no_grad():
+            self.assertTrue(torch.allclose(loaded(images), model(images)))
+        self.assertEqual(loaded(images).shape[1], 512)
+
+    def test_tied_weights_buffers_and_mismatch(self):
+        path = os.path.join(self.tmpdir, "tied.safetensors")
+        source = Tied()
+        save_module(source, path)
+        with torch.device("meta"):
+            loaded = load_module(Tied(), path)
+        self.assertIs(loaded.decoder.weight, loaded.encoder.weight)
+        self.assertTrue(torch.equal(loaded.encoder.weight, source.encoder.weight))
+        self.assertTrue(torch.equal(loaded.steps, torch.arange(3)))
+        with self.assertRaises(ValueError):
+            load_module(nn.Linear(4, 10), path)
+
+if __name__ == '__main__':
+    unittest.main()
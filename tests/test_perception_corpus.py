@@ -0,0 +1,85 @@
+# tests/test_perception_corpus.py
+import codecs
+import os
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+from modules.perception import LazyText, ingest_corpus, iter_corpus_paths, read_document
+
+class TestCorpusIngestion(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.corpus = os.path.join(self.tmpdir, "corpus")
+        self.manifest = os.path.join(self.tmpdir, "manifest.json")
+        self.write("a.txt", "plain ascii text".encode("utf-8"))
+        self.write("nested/b.txt", codecs.BOM_UTF8 + "café with a BOM".encode("utf-8"))
+        self.write("nested/c.txt", "naïve latin-1".encode("latin-1"))
+        self.write("nested/deeper/large.txt", ("été " * 5000).encode("utf-8"))
+        self.write("notes.md", b"not matched by the pattern")
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir)
+
+    def write(self, name, data):
+        path = os.path.join(self.corpus, name)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "wb") as f:
+            f.write(data)
+        return path
+
+    def ingest(self, **kwargs):
+        stats = {}
+        docs = {os.path.relpath(d.path, self.corpus): d for d in
+                ingest_corpus(self.corpus, workers=2, manifest_path=self.manifest, mmap_threshold=1024,
+                              stats=stats, **kwargs)}
+        return docs, stats
+
+    def test_encodings_mmap_and_stable_ids(self):
+        docs, stats = self.ingest()
+        self.assertEqual(sorted(docs), ["a.txt", "nested/b.txt", "nested/c.txt", "nested/deeper/large.txt"])
+        self.assertEqual(docs["nested/b.txt"].text, "café with a BOM")
+        self.assertEqual(docs["nested/c.txt"].encoding, "latin-1")
+        self.assertEqual(docs["nested/c.txt"].text, "naïve latin-1")
+        large = docs["nested/deeper/large.txt"]
+        self.assertIsInstance(large.text, LazyText)  # decoded on use, in chunks
+        with mock.patch("modules.perception.TEXT_CHUNK_BYTES", 1001):  # cuts "é" in half at every chunk end
+            chunks = list(large.text)
+        self.assertEqual((large.encoding, len(chunks), chunks[0][:4]), ("utf-8", 30, "été "))
+        self.assertEqual("".join(chunks), "été " * 5000)
+        self.assertEqual(large, read_document(large.path, mmap_threshold=1 << 30))  # mmap and buffered reads agree
+        self.assertEqual((stats["files"], stats["documents"], stats["skipped"]), (4, 4, 0))
+        self.assertEqual(iter_corpus_paths([os.path.join(self.corpus, "*.md"), self.corpus + "/a.txt"]),
+                         [os.path.join(self.corpus, "a.txt"), os.path.join(self.corpus, "notes.md")])
+
+    @unittest.skipUnless(hasattr(os, "symlink"), "needs symlinks")
+    def test_symlinked_directories_are_walked_once(self):
+        os.symlink(self.corpus, os.path.join(self.corpus, "nested", "loop"))
+        os.symlink(os.path.join(self.corpus, "nested", "deeper"), os.path.join(self.corpus, "alias"))
+        paths = [os.path.relpath(p, self.corpus) for p in iter_corpus_paths(self.corpus)]
+        self.assertEqual(len(paths), 4)
+        self.assertIn("a.txt", paths)
+
+    def test_manifest_skips_unchanged_files(self):
+        first, _ = self.ingest()
+        docs, stats = self.ingest()
+        self.assertEqual((docs, stats["skipped"]), ({}, 4))
+
+        touched = os.path.join(self.corpus, "a.txt")
+        os.utime(touched, ns=(1, 1))  # same bytes, new mtime: read, hashed and skipped
+        self.write("nested/c.txt", b"edited")
+        docs, stats = self.ingest()
+        self.assertEqual(list(docs), ["nested/c.txt"])
+        self.assertNotEqual(docs["nested/c.txt"].doc_id, first["nested/c.txt"].doc_id)
+        self.assertEqual((stats["documents"], stats["skipped"]), (1, 3))
+
+    def test_closing_early_records_only_yielded_documents(self):
+        stream = ingest_corpus(self.corpus, workers=2, manifest_path=self.manifest)
+        first = next(stream)
+        stream.close()
+        docs, _ = self.ingest()
+        self.assertEqual(len(docs), 3)
+        self.assertNotIn(os.path.relpath(first.path, self.corpus), docs)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,81 @@
+# tests/test_replay_buffer.py
+import os
+import shutil
+import tempfile
+import unittest
+import numpy as np
+from modules.replay_buffer import ReplayBuffer, ReplayLearner, SumTree
+
+class TestReplayBuffer(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.rng = np.random.default_rng(0)
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir)
+
+    def test_sum_tree_matches_prefix_sums(self):
+        priorities = self.rng.random(37)
+        tree = SumTree(37)
+        tree.build(priorities)
+        self.assertAlmostEqual(tree.total, priorities.sum())
+        tree.update([3, 3, 20], [0.0, 5.0, 2.0])
+        priorities[[3, 20]] = [5.0, 2.0]
+        values = self.rng.random(1000) * priorities.sum()
+        expected = np.searchsorted(np.cumsum(priorities), values, side="right")
+        self.assertTrue(np.array_equal(tree.find(values), expected))
+
+    def test_ring_wraps_and_prioritized_sampling(self):
+        buffer = ReplayBuffer(8, 4)
+        for i in range(6):
+            buffer.append(np.full(4, i), i % 2, float(i))
+        buffer.extend(np.arange(20, dtype=np.float32).reshape(5, 4), [0] * 5, [10.0] * 5)
+        self.assertEqual((len(buffer), buffer.position), (8, 3))
+        self.assertEqual(list(buffer.rewards), [10, 10, 10, 3, 4, 5, 10, 10])
+
+        buffer.update_priorities(np.arange(8), np.where(np.arange(8) == 4, 100.0, 0.0))
+        batch = buffer.sample(1000, rng=self.rng)
+        self.assertGreater(np.mean(batch.indices == 4), 0.5)
+        self.assertEqual(batch.weights.max(), 1.0)
+        self.assertEqual(batch.weights[batch.indices == 4].min(), batch.weights.min())
+        self.assertTrue(np.all(buffer.sample(50, prioritized=False, rng=self.rng).weights == 1.0))
+
+    def test_learner_fits_rewards_and_survives_restart(self):
+        learner = ReplayLearner(16, 2, self.tmpdir, capacity=256, batch_size=16, snapshot_every=50, seed=0)
+        directions = np.eye(16, dtype=np.float32)[:2]
+        for i in range(300):
+            action = i % 2
+            learner.observe(directions[action], action, 1.0 if action else -1.0)
+        q = learner.head.predict(directions, np.array([0, 1]))
+        self.assertTrue(np.allclose(q, [-1.0, 1.0], atol=0.1))
+
+        restored = ReplayLearner(16, 2, self.tmpdir, capacity=256, batch_size=16, seed=0)
+        self.assertEqual(len(restored.buffer), 256)
+        self.assertEqual(restored.buffer.position, 300 % 256)
+        self.assertTrue(np.array_equal(restored.head.weights, learner.head.weights))
+        self.assertAlmostEqual(restored.buffer.tree.total, learner.buffer.tree.total, places=6)
+
+        reshaped = ReplayLearner(8, 2, self.tmpdir, capacity=256)
+        self.assertEqual(len(reshaped.buffer), 0)
+
+    def test_learners_sharing_a_directory_keep_every_experience(self):
+        # Two learners stand in for two processes appending to the same replay directory
+        first = ReplayLearner(4, 2, self.tmpdir, capacity=4096, batch_size=4, seed=0)
+        second = ReplayLearner(4, 2, self.tmpdir, capacity=4096, batch_size=4, seed=1)
+        for i in range(20):
+            (first if i % 3 else second).observe(np.full(4, i, dtype=np.float32), i % 2, 1.0)
+        for learner in (first, second):
+            with learner.buffer.transaction():
+                pass  # adopts the other learner's appends
+            self.assertEqual((len(learner.buffer), learner.buffer.position), (20, 20))
+            self.assertEqual(learner.buffer.embeddings[:20, 0].tolist(), list(range(20)))
+        # storage grows with the fill level instead of being allocated for the whole capacity
+        self.assertEqual(os.path.getsize(os.path.join(self.tmpdir, "embeddings.f32")), 1024 * 4 * 4)
+        with second.buffer.transaction():
+            second.buffer.extend(np.ones((2000, 4), dtype=np.float32), np.zeros(2000, dtype=np.int32), np.zeros(2000))
+        with first.buffer.transaction():
+            self.assertEqual((len(first.buffer), first.buffer.rows), (2020, 2048))
+        self.assertEqual(ReplayBuffer(4096, 4, self.tmpdir).size, 2020)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,91 @@
+# tests/test_resources.py
+import os
+import shutil
+import sys
+import tempfile
+import threading
+import unittest
+from unittest import mock
+from distributed_processing import run_sharded
+from modules.resources import (ResourceManager, available_cpus, cgroup_cpu_limit, plan_budget, worker_cpu_sets,
+                               CPUS_ENV, THREAD_ENV_VARS)
+
+def worker_budget(items, shared):
+    # Runs in a pool worker: reports the thread budget and CPU affinity it was given.
+    return [(os.environ["OMP_NUM_THREADS"], tuple(sorted(os.sched_getaffinity(0))) if hasattr(os, "sched_getaffinity") else None)]
+
+class TestResources(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.environ = mock.patch.dict(os.environ)
+        self.environ.start()
+        self.torch = sys.modules.get("torch")
+        self.torch_threads = self.torch.get_num_threads() if self.torch else None
+
+    def tearDown(self):
+        if self.torch:
+            self.torch.set_num_threads(self.torch_threads)
+        self.environ.stop()
+        shutil.rmtree(self.tmpdir)
+
+    def write(self, name, content):
+        path = os.path.join(self.tmpdir, name)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w") as f:
+            f.write(content)
+
+    def test_cgroup_limits(self):
+        self.assertIsNone(cgroup_cpu_limit(self.tmpdir))
+        self.write("cpu/cpu.cfs_quota_us", "250000\n")
+        self.write("cpu/cpu.cfs_period_us", "100000\n")
+        self.assertEqual(cgroup_cpu_limit(self.tmpdir), 2.5)
+        self.write("cpu.max", "max 100000\n")  # cgroup v2 takes precedence
+        self.assertIsNone(cgroup_cpu_limit(self.tmpdir))
+        self.write("cpu.max", "150000 100000\n")
+        self.assertEqual(cgroup_cpu_limit(self.tmpdir), 1.5)
+        with mock.patch("modules.resources.cgroup_cpu_limit", return_value=1.5), \
+                mock.patch("modules.resources.affinity_cpus", return_value=list(range(64))):
+            self.assertEqual(available_cpus(), 2)
+            os.environ[CPUS_ENV] = "12"
+            self.assertEqual(available_cpus(), 12)
+
+    def test_budgets_split_cores(self):
+        self.assertEqual(plan_budget(16, 4)[:3], (16, 4, 4))
+        self.assertEqual(plan_budget(2, 8).torch_threads, 1)
+        self.assertEqual(worker_cpu_sets(3, range(8)), [{0, 1, 2}, {3, 4, 5}, {6, 7}])
+        self.assertEqual(worker_cpu_sets(3, [4, 5]), [{4}, {5}, {4}])
+
+        manager = ResourceManager(cpus=8)
+        self.assertEqual((manager.pool_workers(), manager.pool_workers(64, io_bound=True), manager.pool_workers(2)), (8, 12, 2))
+        self.assertEqual(manager.apply(torch_threads=3).blas_threads, 3)
+        self.assertTrue(all(os.environ[name] == "3" for name in THREAD_ENV_VARS))
+
+        # Budgets shrink while stages overlap and recover when they finish; the process-wide
+        # torch thread count follows, and returns to the applied budget after the last stage
+        inside, release = threading.Event(), threading.Event()
+        def stage():
+            with manager.concurrent():
+                inside.set()
+                release.wait()
+        with mock.patch("modules.resources.apply_torch_threads") as apply_torch_threads:
+            thread = threading.Thread(target=stage)
+            thread.start()
+            inside.wait()
+            with manager.concurrent() as budget:
+                self.assertEqual((budget.concurrency, budget.torch_threads), (2, 4))
+            release.set()
+            thread.join()
+            self.assertEqual([c.args[0] for c in apply_torch_threads.call_args_list], [8, 4, 8, 3])
+        self.assertEqual(manager.call(lambda: manager.budget.torch_threads), 8)
+        self.assertEqual(manager.active, 0)
+
+    def test_pinned_process_pool(self):
+        options = ResourceManager(cpus=4).process_pool_options(2, pin=True)
+        self.assertEqual(options["initargs"][0], 2)
+        with mock.patch("modules.resources.available_cpus", return_value=1):
+            results = run_sharded(list(range(4)), worker_budget, workers=2, num_shards=2, pin=True)
+        allowed = tuple(sorted(os.sched_getaffinity(0))[:1]) if hasattr(os, "sched_getaffinity") else None
+        self.assertEqual({r[0] for r in results}, {("1", allowed)})
+
+if __name__ == '__main__':
+    unittest.main()
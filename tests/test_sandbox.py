@@ -0,0 +1,54 @@
+# tests/test_sandbox.py
+import os
+import unittest
+from sandbox import SandboxPool, resource
+
+class TestSandboxPool(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.pool = SandboxPool(workers=2, max_jobs_per_worker=2, timeout=1, memory_limit_mb=64)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.pool.close()
+
+    def test_concurrent_jobs_and_output(self):
+        futures = [self.pool.submit(code=f"print({i} * 2)") for i in range(5)]
+        self.assertEqual([f.result().stdout for f in futures], [f"{i * 2}\n" for i in range(5)])
+
+    def test_errors_and_exit_codes(self):
+        self.assertEqual(self.pool.run(code="raise SystemExit(3)").returncode, 3)
+        result = self.pool.run(code="1 / 0")
+        self.assertEqual(result.returncode, 1)
+        self.assertIn("ZeroDivisionError", result.stderr)
+
+    def test_limit_violations_recycle_workers(self):
+        self.assertEqual(self.pool.run(code="while True: pass").violation, "timeout")
+        if resource is not None:
+            self.assertEqual(self.pool.run(code="x = bytearray(512 * 1024 * 1024)").violation, "memory")
+        self.assertEqual(self.pool.run(code="import os; os._exit(1)").violation, "crash")
+        self.assertEqual(self.pool.run(code="print('still alive')").stdout, "still alive\n")
+
+    @unittest.skipUnless(hasattr(os, "fork"), "jobs run in forked children only where fork exists")
+    def test_jobs_cannot_affect_later_jobs(self):
+        with SandboxPool(workers=1, timeout=1, memory_limit_mb=64) as pool:
+            tamper = ("import builtins, os, signal, sys\n"
+                      "os.environ['SANDBOX_LEAK'] = '1'; os.chdir('/'); sys.modules['json'] = None\n"
+                      "builtins.len = None; signal.signal(signal.SIGALRM, signal.SIG_IGN)")
+            self.assertEqual(pool.run(code=tamper).returncode, 0)
+            check = ("import json, os\n"
+                     "print(len('abc'), 'SANDBOX_LEAK' in os.environ, os.getcwd() == '/', json.dumps(1))")
+            self.assertEqual(pool.run(code=check).stdout, f"3 False {os.getcwd() == '/'} 1\n")
+            # The alarm handler was restored, and a job swallowing SandboxTimeout is killed anyway
+            self.assertEqual(pool.run(code="while True: pass").violation, "timeout")
+            swallow = "import time\nwhile True:\n    try:\n        time.sleep(10)\n    except BaseException:\n        pass"
+            self.assertEqual(pool.run(code=swallow).violation, "timeout")
+            if resource is not None:
+                lift = "import resource\nresource.setrlimit(resource.RLIMIT_AS, (resource.RLIM_INFINITY,) * 2)"
+                result = pool.run(code=lift)
+                self.assertEqual(result.returncode, 1)
+                self.assertIn("ValueError", result.stderr)
+            self.assertEqual(pool.run(code="print('still alive')").stdout, "still alive\n")
+
+if __name__ == '__main__':
+    unittest.main()
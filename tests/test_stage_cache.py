@@ -0,0 +1,112 @@
+# tests/test_stage_cache.py
+import os
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+import numpy as np
+import torch
+from transformers import DistilBertModel
+from benchmarks.data import TINY_VOCABULARY as WORDS, tiny_text_model
+from benchmarks.harness import isolated_memory
+from modules import fusion
+from modules.stage_cache import StageCache, get_stage_cache, source_file
+from main import integrate_many
+
+class TestStageCache(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.calls = []
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir)
+
+    def write(self, name, text):
+        path = os.path.join(self.tmpdir, name)
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(text)
+        return path
+
+    def pipeline(self, cache, path, versions=(1, 1)):
+        def read(p):
+            self.calls.append("read")
+            with open(p, encoding="utf-8") as f:
+                return f.read()
+
+        def embed(text):
+            self.calls.append("embed")
+            return np.array([len(text)], dtype=np.float32)
+        text = cache.run("read", read, source_file(path), version=versions[0])
+        return cache.run("embed", embed, text, version=versions[1])
+
+    def test_downstream_invalidation_and_tiers(self):
+        path = self.write("doc.txt", "hello")
+        cache = StageCache(os.path.join(self.tmpdir, "cache"))
+        self.assertEqual(self.pipeline(cache, path).value, [5])
+        self.assertTrue(self.pipeline(cache, path).hit)
+        self.assertEqual(self.calls, ["read", "embed"])
+
+        self.pipeline(cache, path, versions=(1, 2))  # bumped downstream version: only it reruns
+        self.assertEqual(self.calls[2:], ["embed"])
+        self.write("doc.txt", "hello world")  # changed input: everything downstream reruns
+        self.assertEqual(self.pipeline(cache, path).value, [11])
+        self.assertEqual(self.calls[3:], ["read", "embed"])
+
+        reopened = StageCache(os.path.join(self.tmpdir, "cache"))
+        self.assertTrue(self.pipeline(reopened, path).hit)
+        stats = reopened.stats()
+        self.assertEqual(stats["stages"]["embed"]["disk_hits"], 1)
+        self.assertEqual(stats["disk_entries"], 5)
+        self.assertEqual(self.pipeline(reopened, path).value, [11])
+        self.assertEqual(reopened.stats()["stages"]["embed"]["memory_hits"], 1)
+        self.assertNotEqual(cache.key("s", 1), cache.key("s", "1"))
+        with self.assertRaises(TypeError):
+            cache.key("s", object())
+
+    def test_size_limits_evict_least_recently_used(self):
+        cache = StageCache(os.path.join(self.tmpdir, "cache"), memory_items=2, disk_bytes=1500)
+        blobs = [cache.run("blob", lambda i: np.zeros(100 + i, dtype=np.float32), i) for i in range(4)]
+        self.assertEqual(list(cache.memory), [blobs[2].key, blobs[3].key])
+        self.assertEqual(cache.stats()["disk_entries"], 2)
+        self.assertFalse(cache.lookup("blob", 0).hit)
+        self.assertTrue(cache.lookup("blob", 3).hit)
+
+    def test_rerun_of_integrate_many_only_computes_changed_inputs(self):
+        shared = {"external_data": "", "user_feedback": "", "incremental_train_success": False,
+                  "text_model": tiny_text_model(self.tmpdir)}
+        rng = np.random.default_rng(0)
+        paths = [self.write(f"doc_{i}.txt", " ".join(rng.choice(WORDS, size=40))) for i in range(4)]
+
+        def run():
+            get_stage_cache().reset_stats()
+            results = list(integrate_many(paths, batch_size=2, workers=2, ci_mode=True, shared=shared))
+            return results, get_stage_cache().stats()["stages"]
+
+        with isolated_memory(self.tmpdir), \
+                mock.patch.object(fusion, "FUSION_CACHE_DIR", os.path.join(self.tmpdir, "fusion_cache")):
+            first, stats = run()
+            self.assertEqual(stats["embed_text"]["misses"], 4)
+            second, stats = run()
+            self.assertEqual({s: c["hit_rate"] for s, c in stats.items()},
+                             {"preprocess": 1.0, "signature": 1.0, "embed_text": 1.0, "reasoning": 1.0})
+            self.assertEqual([r["decision"] for r in first], [r["decision"] for r in second])
+            self.assertTrue(np.allclose(first[3]["text_embeddings"], second[3]["text_embeddings"]))
+
+            self.write("doc_2.txt", "vision signal " * 30)
+            third, stats = run()
+            self.assertEqual((stats["preprocess"]["misses"], stats["embed_text"]["misses"]), (1, 1))
+            self.assertFalse(np.allclose(second[2]["text_embeddings"], third[2]["text_embeddings"]))
+
+            # other weights under the same model name miss every cached embedding
+            tokenizer, model = shared["text_model"]
+            with torch.no_grad():
+                tuned = DistilBertModel(model.config).eval()
+                tuned.load_state_dict(model.state_dict())
+                tuned.transformer.layer[0].ffn.lin1.bias.add_(1e-3)
+            shared = dict(shared, text_model=(tokenizer, tuned))
+            fourth, stats = run()
+            self.assertEqual((stats["preprocess"]["hit_rate"], stats["embed_text"]["misses"]), (1.0, 4))
+            self.assertFalse(np.allclose(third[3]["text_embeddings"], fourth[3]["text_embeddings"]))
+
+if __name__ == '__main__':
+    unittest.main()
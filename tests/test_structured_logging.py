@@ -0,0 +1,115 @@
+# tests/test_structured_logging.py
+import asyncio
+import contextlib
+import io
+import json
+import os
+import unittest
+from unittest import mock
+from modules import structured_logging
+from modules.structured_logging import configure_logging, shutdown_logging, get_logger, request_context, parse_levels, run_in_thread
+from modules.action import execute_action
+from modules.perception import preprocess_text
+from modules.knowledge_graph import create_knowledge_graph, query_knowledge_graph
+from modules.external_data import preprocess_external_data
+
+class TestStructuredLogging(unittest.TestCase):
+    def setUp(self):
+        self.env = mock.patch.dict(os.environ, {}, clear=False)
+        self.env.start()
+        os.environ.pop(structured_logging.LOG_LEVEL_ENV, None)
+        os.environ.pop(structured_logging.LOG_FORMAT_ENV, None)
+        self.stream = io.StringIO()
+
+    def tearDown(self):
+        self.env.stop()
+        configure_logging()
+
+    def records(self):
+        shutdown_logging()  # drains the queue
+        return [json.loads(line) for line in self.stream.getvalue().splitlines()]
+
+    def run_hot_paths(self):
+        KG = create_knowledge_graph()
+        query_knowledge_graph(KG, "Machine Learning")
+        preprocess_text("Hello, World! Some text.")
+        preprocess_external_data(["a headline", "another headline"])
+        return execute_action("Positive inference: " + "x" * 1000)
+
+    def test_hot_paths_are_silent_at_default_level(self):
+        configure_logging(stream=self.stream)
+        stdout = io.StringIO()
+        with contextlib.redirect_stdout(stdout):
+            self.run_hot_paths()
+        self.assertEqual(stdout.getvalue(), "")
+        self.assertEqual(self.records(), [])
+
+    def test_per_module_level_json_and_request_id(self):
+        configure_logging(levels={"action": "DEBUG"}, stream=self.stream)
+        with request_context("req-1"):
+            self.run_hot_paths()
+        records = self.records()
+        self.assertTrue(records)
+        self.assertEqual({r["logger"] for r in records}, {"genesis.action"})
+        self.assertEqual({r["request_id"] for r in records}, {"req-1"})
+        self.assertEqual({r["level"] for r in records}, {"DEBUG"})
+
+    def test_formatting_is_lazy(self):
+        calls = []
+
+        class Expensive:
+            def __str__(self):
+                calls.append(1)
+                return "expensive"
+        configure_logging(stream=self.stream)
+        get_logger("modules.action").debug("value: %s", Expensive())
+        self.assertEqual(calls, [])
+        get_logger("modules.action").warning("value: %s", Expensive(), extra={"stage": "test"})
+        records = self.records()
+        self.assertTrue(calls)
+        self.assertEqual(records[0]["msg"], "value: expensive")
+        self.assertEqual(records[0]["stage"], "test")
+
+    def test_request_ids_follow_asyncio_tasks(self):
+        configure_logging(level="INFO", stream=self.stream)
+        logger = get_logger("modules.test")
+
+        async def handle(request_id):
+            with request_context(request_id):
+                for step in range(3):
+                    logger.info("step %d", step)
+                    await asyncio.sleep(0)
+
+        async def serve():
+            await asyncio.gather(handle("a"), handle("b"))
+        asyncio.run(serve())
+        records = self.records()
+        self.assertEqual(len(records), 6)
+        for request_id in ("a", "b"):
+            self.assertEqual([r["msg"] for r in records if r["request_id"] == request_id], ["step 0", "step 1", "step 2"])
+
+    def test_request_ids_follow_executor_threads(self):
+        configure_logging(level="INFO", stream=self.stream)
+        logger = get_logger("modules.test")
+
+        def blocking(step):
+            logger.info("step %s", step)
+            return step
+
+        async def handle(request_id):
+            with request_context(request_id):
+                return await run_in_thread(asyncio.get_running_loop(), blocking, request_id)
+
+        async def serve():
+            return await asyncio.gather(handle("a"), handle("b"))
+        self.assertEqual(asyncio.run(serve()), ["a", "b"])
+        records = self.records()
+        self.assertEqual({(r["msg"], r["request_id"]) for r in records}, {("step a", "a"), ("step b", "b")})
+
+    def test_parse_levels(self):
+        self.assertEqual(parse_levels("warning, memory=DEBUG,knowledge_graph=info"),
+                         ("WARNING", {"memory": "DEBUG", "knowledge_graph": "INFO"}))
+        self.assertEqual(parse_levels(None), (None, {}))
+
+if __name__ == "__main__":
+    unittest.main()
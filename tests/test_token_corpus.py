@@ -0,0 +1,66 @@
+# tests/test_token_corpus.py
+import os
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+import numpy as np
+from benchmarks.data import TINY_VOCABULARY as WORDS, tiny_text_model
+from modules import token_corpus
+from modules.token_corpus import build_token_corpus, get_token_corpus, TokenCorpus
+from modules.understanding import get_embeddings_batch, get_embeddings_from_tokens
+
+class TestTokenCorpus(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.tokenizer, self.model = tiny_text_model(self.tmpdir, dim=32)
+        rng = np.random.default_rng(0)
+        self.paths = []
+        for i in range(7):
+            path = os.path.join(self.tmpdir, "docs", f"doc_{i}.txt")
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(path, "w", encoding="utf-8") as f:
+                f.write("Hello, " + " ".join(rng.choice(WORDS, size=i * 3 + 1)) + "!")
+            self.paths.append(path)
+        self.corpus_dir = os.path.join(self.tmpdir, "corpus")
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir)
+
+    def test_token_ids_and_embeddings_match_tokenizer_path(self):
+        corpus = build_token_corpus(self.paths, self.tokenizer, self.corpus_dir, workers=2, chunk_size=3)
+        texts = [open(p).read().lower().replace(",", "").replace("!", "") for p in self.paths]
+        expected = self.tokenizer(texts)["input_ids"]
+        self.assertEqual([list(corpus[i]) for i in range(len(corpus))], expected)
+        from_tokens = get_embeddings_from_tokens(corpus, self.model, batch_size=3)
+        from_text = get_embeddings_batch(texts, self.tokenizer, self.model, batch_size=3)
+        self.assertTrue(np.allclose(from_tokens, from_text, atol=1e-5))
+
+    def test_reused_until_sources_or_tokenizer_change(self):
+        build_token_corpus(os.path.join(self.tmpdir, "docs"), self.tokenizer, self.corpus_dir)
+        self.assertTrue(TokenCorpus(self.corpus_dir).matches(self.tokenizer, self.paths))
+        with open(self.paths[0], "a") as f:
+            f.write(" memory")
+        self.assertFalse(TokenCorpus(self.corpus_dir).matches(self.tokenizer, self.paths))
+        corpus = get_token_corpus(self.paths, self.tokenizer, self.corpus_dir)
+        self.assertTrue(corpus.matches(self.tokenizer, self.paths))
+        self.tokenizer.add_tokens(["genesis"])
+        self.assertFalse(corpus.matches(self.tokenizer))
+
+    def test_interrupted_rebuild_keeps_the_previous_corpus(self):
+        first = build_token_corpus(self.paths, self.tokenizer, self.corpus_dir)
+        expected = [list(first[i]) for i in range(len(first))]
+        with mock.patch.object(token_corpus, "atomic_write_json", side_effect=KeyboardInterrupt), \
+                self.assertRaises(KeyboardInterrupt):
+            build_token_corpus(self.paths[::-1], self.tokenizer, self.corpus_dir)
+        reopened = TokenCorpus(self.corpus_dir)
+        self.assertTrue(reopened.matches(self.tokenizer, self.paths))
+        self.assertEqual([list(reopened[i]) for i in range(len(reopened))], expected)
+
+        rebuilt = build_token_corpus(self.paths[::-1], self.tokenizer, self.corpus_dir)
+        self.assertEqual([list(rebuilt[i]) for i in range(len(rebuilt))], expected[::-1])
+        self.assertEqual(sorted(os.listdir(self.corpus_dir)),
+                         sorted(["meta.json"] + list(rebuilt.meta["files"].values())))
+
+if __name__ == '__main__':
+    unittest.main()